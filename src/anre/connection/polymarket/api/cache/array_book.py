@@ -0,0 +1,200 @@
+from dataclasses import dataclass, field
+
+import numpy as np
+from sortedcontainers import SortedDict
+
+from anre.connection.polymarket.api.cache.base import Book1000
+from anre.utils.dataStructure.general import GeneralBaseMutable
+
+PRICE1000_LEVEL_COUNT = 1001  # price1000 is in the closed range [0, 1000]
+_NO_BID1000 = -1
+_NO_ASK1000 = PRICE1000_LEVEL_COUNT
+
+
+def _new_level_array() -> np.ndarray:
+    return np.zeros(PRICE1000_LEVEL_COUNT, dtype=np.int64)
+
+
+@dataclass(frozen=False, repr=False)
+class ArrayBook1000(GeneralBaseMutable):
+    """Fixed tick limit order book. Same semantics as `Book1000`, but levels are numpy arrays
+
+    Sizes are stored in preallocated int arrays indexed by price1000, so a level lookup is an
+    array access, best bid/ask are tracked incrementally and depth sums or book differences are
+    vectorized.
+
+    Note: a level with zero size is treated as absent (there is no `remove_zero_size_records` step).
+    """
+
+    bids: np.ndarray = field(default_factory=_new_level_array)
+    asks: np.ndarray = field(default_factory=_new_level_array)
+    _best_bid1000: int = field(default=_NO_BID1000, repr=False)
+    _best_ask1000: int = field(default=_NO_ASK1000, repr=False)
+
+    def __post_init__(self):
+        assert isinstance(self.bids, np.ndarray) and self.bids.shape == (PRICE1000_LEVEL_COUNT,)
+        assert isinstance(self.asks, np.ndarray) and self.asks.shape == (PRICE1000_LEVEL_COUNT,)
+        assert self.bids.dtype == np.int64 and self.asks.dtype == np.int64
+        self._reset_best_price1000s()
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, ArrayBook1000):
+            return False
+        return np.array_equal(self.bids, other.bids) and np.array_equal(self.asks, other.asks)
+
+    @classmethod
+    def new_from_native_prices(
+        cls, bids: list[dict[str, float | str]], asks: list[dict[str, float | str]]
+    ) -> 'ArrayBook1000':
+        instance = cls()
+        for bid in bids:
+            instance.bids[int(round(float(bid['price']) * 1000))] = int(
+                round(float(bid['size']) * 1000)
+            )
+        for ask in asks:
+            instance.asks[int(round(float(ask['price']) * 1000))] = int(
+                round(float(ask['size']) * 1000)
+            )
+        instance._reset_best_price1000s()
+        return instance
+
+    @classmethod
+    def new_from_level1000_list(
+        cls, bid_level1000_list: list[tuple[int, int]], ask_level1000_list: list[tuple[int, int]]
+    ) -> 'ArrayBook1000':
+        """Levels are (price1000, size1000), e.g. from `decode.BookRecord`"""
+        instance = cls()
+        for price1000, size1000 in bid_level1000_list:
+            instance.bids[price1000] = size1000
+        for price1000, size1000 in ask_level1000_list:
+            instance.asks[price1000] = size1000
+        instance._reset_best_price1000s()
+        return instance
+
+    @classmethod
+    def new_from_book1000(cls, book1000: Book1000) -> 'ArrayBook1000':
+        instance = cls()
+        if book1000.bids:
+            instance.bids[list(book1000.bids.keys())] = list(book1000.bids.values())
+        if book1000.asks:
+            instance.asks[list(book1000.asks.keys())] = list(book1000.asks.values())
+        instance._reset_best_price1000s()
+        return instance
+
+    def to_book1000(self) -> Book1000:
+        bid_price1000s = np.flatnonzero(self.bids)
+        ask_price1000s = np.flatnonzero(self.asks)
+        return Book1000(
+            bids=SortedDict(zip(bid_price1000s.tolist(), self.bids[bid_price1000s].tolist())),
+            asks=SortedDict(zip(ask_price1000s.tolist(), self.asks[ask_price1000s].tolist())),
+        )
+
+    def copy(self) -> 'ArrayBook1000':
+        return self.__class__(bids=self.bids.copy(), asks=self.asks.copy())
+
+    def update_overwrite(self, price: float, size: float, side: str):
+        self.update_overwrite1000(
+            price1000=int(round(price * 1000)), size1000=int(round(size * 1000)), side=side
+        )
+
+    def update_add(self, price: float, size: float, side: str):
+        self.update_add1000(
+            price1000=int(round(price * 1000)), size1000=int(round(size * 1000)), side=side
+        )
+
+    def update_overwrite1000(self, price1000: int, size1000: int, side: str):
+        self._set_level(price1000=price1000, size1000=max(size1000, 0), side=side)
+
+    def update_add1000(self, price1000: int, size1000: int, side: str):
+        self._check_price1000(price1000)
+        if side == 'BUY':
+            self._set_level(price1000, int(self.bids[price1000]) + size1000, side)
+        elif side == 'SELL':
+            self._set_level(price1000, int(self.asks[price1000]) + size1000, side)
+        else:
+            raise ValueError(f'unknown side: {side}')
+
+    def update_reset1000(self, bids: np.ndarray, asks: np.ndarray):
+        """Overwrite all levels in place (arrays are indexed by price1000)"""
+        self.bids[:] = bids
+        self.asks[:] = asks
+        self._reset_best_price1000s()
+
+    def get_size1000(self, price1000: int, side: str) -> int:
+        self._check_price1000(price1000)
+        if side == 'BUY':
+            return int(self.bids[price1000])
+        elif side == 'SELL':
+            return int(self.asks[price1000])
+        else:
+            raise ValueError(f'unknown side: {side}')
+
+    def remove_zero_size_records(self):
+        # zero size levels are never stored, kept for the `Book1000` interface
+        pass
+
+    def get_best_price1000s(self) -> tuple[int, int]:
+        """Best bid and ask. Empty side gives 0 or 1000 (as in `BoolMarketOrderBook`)"""
+        best_bid = self._best_bid1000 if self._best_bid1000 != _NO_BID1000 else 0
+        best_ask = self._best_ask1000 if self._best_ask1000 != _NO_ASK1000 else 1000
+        return best_bid, best_ask
+
+    def get_depth_size1000(
+        self, side: str, price1000_from: int = 0, price1000_to: int = 1000
+    ) -> int:
+        """Total size1000 of the levels in the closed price1000 range"""
+        assert 0 <= price1000_from <= price1000_to <= 1000
+        if side == 'BUY':
+            return int(self.bids[price1000_from : price1000_to + 1].sum())
+        elif side == 'SELL':
+            return int(self.asks[price1000_from : price1000_to + 1].sum())
+        else:
+            raise ValueError(f'unknown side: {side}')
+
+    def get_levels(self, side: str) -> tuple[np.ndarray, np.ndarray]:
+        """Non-empty levels as (price1000s, size1000s), ordered from the best price"""
+        if side == 'BUY':
+            price1000s = np.flatnonzero(self.bids)[::-1]
+            return price1000s, self.bids[price1000s]
+        elif side == 'SELL':
+            price1000s = np.flatnonzero(self.asks)
+            return price1000s, self.asks[price1000s]
+        else:
+            raise ValueError(f'unknown side: {side}')
+
+    def sub(self, other: 'ArrayBook1000') -> 'ArrayBook1000':
+        return self.__class__(bids=self.bids - other.bids, asks=self.asks - other.asks)
+
+    @staticmethod
+    def _check_price1000(price1000: int):
+        if not 0 <= price1000 <= 1000:
+            raise ValueError(f'price1000 is out of range [0, 1000]: {price1000}')
+
+    def _set_level(self, price1000: int, size1000: int, side: str):
+        self._check_price1000(price1000)
+        if side == 'BUY':
+            self.bids[price1000] = size1000
+            if size1000 != 0:
+                if price1000 > self._best_bid1000:
+                    self._best_bid1000 = price1000
+            elif price1000 == self._best_bid1000:
+                nonzero = np.flatnonzero(self.bids[:price1000])
+                self._best_bid1000 = int(nonzero[-1]) if nonzero.size else _NO_BID1000
+        elif side == 'SELL':
+            self.asks[price1000] = size1000
+            if size1000 != 0:
+                if price1000 < self._best_ask1000:
+                    self._best_ask1000 = price1000
+            elif price1000 == self._best_ask1000:
+                nonzero = np.flatnonzero(self.asks[price1000 + 1 :])
+                self._best_ask1000 = (
+                    price1000 + 1 + int(nonzero[0]) if nonzero.size else _NO_ASK1000
+                )
+        else:
+            raise ValueError(f'unknown side: {side}')
+
+    def _reset_best_price1000s(self):
+        bid_price1000s = np.flatnonzero(self.bids)
+        ask_price1000s = np.flatnonzero(self.asks)
+        self._best_bid1000 = int(bid_price1000s[-1]) if bid_price1000s.size else _NO_BID1000
+        self._best_ask1000 = int(ask_price1000s[0]) if ask_price1000s.size else _NO_ASK1000
@@ -30,9 +30,19 @@ class Book1000(GeneralBaseMutable):
         })
         return cls(bids=bids, asks=asks)
 
+    @classmethod
+    def new_from_level1000_list(
+        cls, bid_level1000_list: list[tuple[int, int]], ask_level1000_list: list[tuple[int, int]]
+    ):
+        """Levels are (price1000, size1000), e.g. from `decode.BookRecord`"""
+        return cls(bids=SortedDict(bid_level1000_list), asks=SortedDict(ask_level1000_list))
+
     def update_overwrite(self, price: float, size: float, side: str):
-        size1000 = int(round(size * 1000))
-        price1000 = int(round(price * 1000))
+        self.update_overwrite1000(
+            price1000=int(round(price * 1000)), size1000=int(round(size * 1000)), side=side
+        )
+
+    def update_overwrite1000(self, price1000: int, size1000: int, side: str):
         if side == 'BUY':
             if size1000 > 0:
                 self.bids[price1000] = size1000
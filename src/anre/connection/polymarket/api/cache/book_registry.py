@@ -0,0 +1,175 @@
+from collections import defaultdict
+
+from anre.connection.polymarket.api.cache.base import Book1000
+from anre.connection.polymarket.api.cache.public_book import PublicMarketOrderBookCache
+from anre.connection.polymarket.api.types import BoolMarketCred
+from anre.connection.polymarket.api.websocket.messenger import Messenger
+from anre.connection.polymarket.api.websocket.websocket import PolymarketWebSocket
+
+
+def get_best_price1000s(book1000: Book1000) -> tuple[int, int]:
+    """Best bid and ask. Empty side gives 0 or 1000 (as in `BoolMarketOrderBook`)"""
+    best_bid = book1000.bids.keys()[-1] if book1000.bids else 0
+    best_ask = book1000.asks.keys()[0] if book1000.asks else 1000
+    return best_bid, best_ask
+
+
+class BookRegistry:
+    """Public order book caches of many bool markets, indexed by condition_id and asset_id
+
+    Websocket messages of all markets are dispatched in one batch: they are grouped by market (the
+    order within a market is kept) and every touched market is updated once. Top of book of every
+    asset is kept in a dict, so it is an O(1) lookup after each batch.
+    """
+
+    def __init__(self):
+        self._mob_dict: dict[str, PublicMarketOrderBookCache] = {}
+        self._asset_mob_dict: dict[str, PublicMarketOrderBookCache] = {}
+        self._best_price1000s_dict: dict[str, tuple[int, int]] = {}
+        self._unknown_asset_message_count = 0
+
+    def __len__(self) -> int:
+        return len(self._mob_dict)
+
+    def __contains__(self, condition_id: str) -> bool:
+        return condition_id in self._mob_dict
+
+    @classmethod
+    def new(cls, bool_market_cred_list: list[BoolMarketCred]) -> 'BookRegistry':
+        self = cls()
+        for bool_market_cred in bool_market_cred_list:
+            self.add_market(bool_market_cred)
+        return self
+
+    @property
+    def condition_ids(self) -> list[str]:
+        return list(self._mob_dict)
+
+    @property
+    def asset_ids(self) -> list[str]:
+        return list(self._asset_mob_dict)
+
+    @property
+    def unknown_asset_message_count(self) -> int:
+        return self._unknown_asset_message_count
+
+    def add_market(self, bool_market_cred: BoolMarketCred) -> PublicMarketOrderBookCache:
+        assert isinstance(bool_market_cred, BoolMarketCred)
+        condition_id = bool_market_cred.condition_id
+        assert condition_id not in self._mob_dict, f'market is already registered: {condition_id}'
+        for asset_id in [bool_market_cred.main_asset_id, bool_market_cred.counter_asset_id]:
+            assert asset_id not in self._asset_mob_dict, (
+                f'asset_id is already registered: {asset_id}'
+            )
+
+        mob = PublicMarketOrderBookCache.new_init(**bool_market_cred.to_dict())
+        self._mob_dict[condition_id] = mob
+        for asset_book in [mob.main_asset_book, mob.counter_asset_book]:
+            self._asset_mob_dict[asset_book.asset_id] = mob
+            self._best_price1000s_dict[asset_book.asset_id] = get_best_price1000s(
+                asset_book.book1000
+            )
+        return mob
+
+    def remove_market(self, condition_id: str):
+        mob = self._mob_dict.pop(condition_id)
+        for asset_book in [mob.main_asset_book, mob.counter_asset_book]:
+            self._asset_mob_dict.pop(asset_book.asset_id)
+            self._best_price1000s_dict.pop(asset_book.asset_id)
+
+    def get_mob(self, condition_id: str) -> PublicMarketOrderBookCache:
+        return self._mob_dict[condition_id]
+
+    def get_mob_by_asset_id(self, asset_id: str) -> PublicMarketOrderBookCache:
+        return self._asset_mob_dict[asset_id]
+
+    def get_best_price1000s(self, asset_id: str) -> tuple[int, int]:
+        return self._best_price1000s_dict[asset_id]
+
+    def get_main_asset_best_price1000s(self, condition_id: str) -> tuple[int, int]:
+        return self._best_price1000s_dict[self._mob_dict[condition_id].main_asset_book.asset_id]
+
+    def get_best_price1000s_dict(self) -> dict[str, tuple[int, int]]:
+        return self._best_price1000s_dict.copy()
+
+    def update_from_ws_message_list(
+        self, ws_message_list: list[dict], validate: bool = False
+    ) -> set[str]:
+        """Dispatch a batch of market channel messages. Returns condition_ids of updated markets"""
+        asset_message_list_dict: dict[str, list[dict]] = defaultdict(list)
+        for ws_message in ws_message_list:
+            event_type = ws_message['event_type']
+            if event_type in ['book', 'price_change']:
+                asset_message_list_dict[ws_message['asset_id']].append(ws_message)
+            elif event_type in ['_internal', 'tick_size_change']:
+                pass
+            else:
+                raise ValueError(f'unknown event type: {event_type}')
+
+        return self._update_asset_message_list_dict(
+            asset_message_list_dict=asset_message_list_dict,
+            validate=validate,
+            is_ws=True,
+        )
+
+    def update_from_clob_mob_list(
+        self, clob_mob_list: list[dict], validate: bool = True
+    ) -> set[str]:
+        asset_message_list_dict: dict[str, list[dict]] = defaultdict(list)
+        for clob_mob in clob_mob_list:
+            asset_message_list_dict[clob_mob['asset_id']].append(clob_mob)
+
+        return self._update_asset_message_list_dict(
+            asset_message_list_dict=asset_message_list_dict,
+            validate=validate,
+            is_ws=False,
+        )
+
+    def update_from_messenger(self, messenger: Messenger, validate: bool = False) -> set[str]:
+        return self.update_from_ws_message_list(
+            ws_message_list=messenger.get_pop_messages(), validate=validate
+        )
+
+    def new_web_socket_list(
+        self, messenger: Messenger, shard_size: int = 500
+    ) -> list[PolymarketWebSocket]:
+        """Market channel websockets, each subscribed to at most `shard_size` asset_ids
+
+        All of them put into the same messenger, so one `update_from_messenger` call dispatches the
+        messages of all shards. Sockets are not started.
+        """
+        assert shard_size > 0
+        asset_ids = self.asset_ids
+        return [
+            PolymarketWebSocket.new_markets(
+                asset_ids=asset_ids[i : i + shard_size], messenger=messenger
+            )
+            for i in range(0, len(asset_ids), shard_size)
+        ]
+
+    def _update_asset_message_list_dict(
+        self, asset_message_list_dict: dict[str, list[dict]], validate: bool, is_ws: bool
+    ) -> set[str]:
+        touched_mob_dict: dict[str, PublicMarketOrderBookCache] = {}
+        for asset_id, message_list in asset_message_list_dict.items():
+            mob = self._asset_mob_dict.get(asset_id)
+            if mob is None:
+                # e.g. messages of the removed market, that are still in the queue
+                self._unknown_asset_message_count += len(message_list)
+                continue
+            if is_ws:
+                mob.update_from_ws_message_list(ws_message_list=message_list, validate=False)
+            else:
+                mob.update_from_clob_mob_list(clob_mob_list=message_list, validate=False)
+            touched_mob_dict[mob.condition_id] = mob
+            asset_book = (
+                mob.main_asset_book
+                if mob.main_asset_book.asset_id == asset_id
+                else mob.counter_asset_book
+            )
+            self._best_price1000s_dict[asset_id] = get_best_price1000s(asset_book.book1000)
+
+        if validate:
+            for mob in touched_mob_dict.values():
+                mob.validate()
+        return set(touched_mob_dict)
@@ -1,48 +1,46 @@
+import logging
 from dataclasses import dataclass, field
 
-from anre.connection.polymarket.api.cache.base import AssetBook as BaseAssetBook
-from anre.connection.polymarket.api.cache.base import Book1000
-from anre.connection.polymarket.api.cache.base import BoolMarketOrderBook as BaseMarketOrderBook
+import numpy as np
 
+from anre.connection.polymarket.api.cache.array_book import ArrayBook1000
+from anre.connection.polymarket.api.cache.base import AssetBook
+from anre.connection.polymarket.api.cache.mirror_book import MirrorBoolMarketOrderBook
 
-@dataclass(frozen=False, repr=False)
-class HouseAssetBook(BaseAssetBook):
-    asset_id: str
-    book1000: Book1000 = field(default_factory=Book1000)
+logger = logging.getLogger(__name__)
 
 
-@dataclass(frozen=False, repr=False)
-class HouseOrderBookCache(BaseMarketOrderBook):
-    condition_id: str
-    main_asset_book: HouseAssetBook
-    counter_asset_book: HouseAssetBook
-    _house_live_order_dict: dict[str, dict] = field(default_factory=list)
+@dataclass(frozen=False, repr=False, eq=False)
+class HouseOrderBookCache(MirrorBoolMarketOrderBook):
+    """House book built from our live orders
 
-    def __post_init__(self):
-        assert self.main_asset_book.asset_id != self.counter_asset_book.asset_id, (
-            f'yes_asset_id and no_asset_id must be different. Got: {self.main_asset_book.asset_id} and {self.counter_asset_book.asset_id}'
-        )
+    Only the main asset book is stored, the counter asset book is its mirror view: an order level
+    delta is a single array write and both sides are symmetric by construction.
+    """
+
+    _house_live_order_dict: dict[str, dict] = field(default_factory=dict)
+    # order id -> (asset_id, price1000, side, size1000_remaining) as it is applied to the books
+    _house_live_order_level_dict: dict[str, tuple[str, int, str, int]] = field(default_factory=dict)
+    # every n-th ws iteration the incremental books are checked against a full rebuild (0 - never)
+    full_check_period: int = 100
+    _ws_iteration_count: int = 0
 
     def __eq__(self, other):
         if not isinstance(other, HouseOrderBookCache):
             return False
         return (
             self.condition_id == other.condition_id
+            and self.counter_asset_id == other.counter_asset_id
             and self.main_asset_book == other.main_asset_book
-            and self.counter_asset_book == other.counter_asset_book
         )
 
-    @classmethod
-    def new_init(
-        cls, condition_id: str, main_asset_id: str, counter_asset_id: str
-    ) -> 'HouseOrderBookCache':
-        main_asset_book = HouseAssetBook(asset_id=main_asset_id)
-        counter_asset_book = HouseAssetBook(asset_id=counter_asset_id)
-        return cls(
-            condition_id=condition_id,
-            main_asset_book=main_asset_book,
-            counter_asset_book=counter_asset_book,
-        )
+    def copy(self) -> 'HouseOrderBookCache':
+        instance = super().copy()
+        instance._house_live_order_dict = dict(self._house_live_order_dict)
+        instance._house_live_order_level_dict = dict(self._house_live_order_level_dict)
+        instance.full_check_period = self.full_check_period
+        instance._ws_iteration_count = self._ws_iteration_count
+        return instance
 
     @staticmethod
     def counter_side(side: str) -> str:
@@ -61,66 +59,148 @@ class HouseOrderBookCache(BaseMarketOrderBook):
         self, clob_house_order_list: list[dict], validate: bool = True
     ):
         live_order_dict = {order['id']: order for order in clob_house_order_list}
-        main_asset_book, counter_asset_book = self._get_asset_books_from_live_orders(
-            live_order_dict=live_order_dict
+        main_book1000 = self._get_main_book1000_from_live_orders(live_order_dict=live_order_dict)
+        live_order_level_dict = {
+            order_id: self._get_live_order_level(live_order)
+            for order_id, live_order in live_order_dict.items()
+        }
+        # in place, the counter asset view stays bound to the main book
+        self.main_asset_book.book1000.update_reset1000(
+            bids=main_book1000.bids, asks=main_book1000.asks
         )
-        self.main_asset_book, self.counter_asset_book, self._house_live_order_dict = (
-            main_asset_book,
-            counter_asset_book,
+        self._house_live_order_dict, self._house_live_order_level_dict = (
             live_order_dict,
+            live_order_level_dict,
         )
         if validate:
             self.validate()
 
     def update_iteration_from_ws_message_list(
         self, ws_message_list: list[dict], validate: bool = True
-    ):
+    ) -> list[tuple[str, int, int, str]]:
+        """Apply order/trade events as signed level deltas (new minus old remaining size)
+
+        Only the levels of the touched orders are updated. Returns the applied deltas as
+        (asset_id, price1000, size1000_delta, side), so dependent books can follow incrementally.
+        """
+        level_delta_list = []
         for ws_message in ws_message_list:
             if ws_message["event_type"] in ["order", "trade"]:
+                order_id = ws_message['id']
+                old_level = self._house_live_order_level_dict.pop(order_id, None)
                 if ws_message['status'] == 'LIVE':
-                    self._house_live_order_dict[ws_message['id']] = ws_message
+                    new_level = self._get_live_order_level(ws_message)
+                    self._house_live_order_dict[order_id] = ws_message
+                    self._house_live_order_level_dict[order_id] = new_level
                 else:
-                    self._house_live_order_dict.pop(ws_message['id'], None)
+                    new_level = None
+                    self._house_live_order_dict.pop(order_id, None)
+
+                if old_level is not None:
+                    asset_id, price1000, side, size1000 = old_level
+                    level_delta_list.append((asset_id, price1000, -size1000, side))
+                if new_level is not None:
+                    asset_id, price1000, side, size1000 = new_level
+                    level_delta_list.append((asset_id, price1000, size1000, side))
             elif ws_message["event_type"] == "_internal":
                 pass
             else:
                 raise ValueError(f'unknown event type: {ws_message["event_type"]}')
-        self.main_asset_book, self.counter_asset_book = self._get_asset_books_from_live_orders(
-            live_order_dict=self._house_live_order_dict
-        )
+
+        for asset_id, price1000, size1000_delta, side in level_delta_list:
+            self._update_level_delta1000(
+                asset_id=asset_id, price1000=price1000, size1000_delta=size1000_delta, side=side
+            )
+
+        self._ws_iteration_count += 1
+        if self.full_check_period and self._ws_iteration_count % self.full_check_period == 0:
+            # corrections are returned too, so dependent books follow the rebuild
+            level_delta_list.extend(self.check_consistency())
         if validate:
             self.validate()
+        return level_delta_list
 
-    def _get_asset_books_from_live_orders(self, live_order_dict: dict[str, dict]):
-        main_asset_book = HouseAssetBook(asset_id=self.main_asset_book.asset_id)
-        counter_asset_book = HouseAssetBook(asset_id=self.counter_asset_book.asset_id)
-        # live_order = list(live_order_dict.values())[3]
+    def check_consistency(self) -> list[tuple[str, int, int, str]]:
+        """Full rebuild from live orders, compared to the incrementally updated books
+
+        On a mismatch it is logged and the books are replaced by the rebuild. Returns the
+        correction deltas of the main asset book (the counter book follows it), as in
+        `update_iteration_from_ws_message_list`.
+        """
+        main_book1000 = self._get_main_book1000_from_live_orders(
+            live_order_dict=self._house_live_order_dict
+        )
+        if main_book1000 == self.main_asset_book.book1000:
+            return []
+
+        logger.warning(
+            f'House book of {self.condition_id}: incremental books differ from the full rebuild, '
+            f'the rebuild is used'
+        )
+        level_delta_list = []
+        asset_id = self.main_asset_book.asset_id
+        for side, old_levels, new_levels in [
+            ('BUY', self.main_asset_book.book1000.bids, main_book1000.bids),
+            ('SELL', self.main_asset_book.book1000.asks, main_book1000.asks),
+        ]:
+            size1000_deltas = new_levels - old_levels
+            for price1000 in np.flatnonzero(size1000_deltas):
+                level_delta_list.append((
+                    asset_id,
+                    int(price1000),
+                    int(size1000_deltas[price1000]),
+                    side,
+                ))
+        self.main_asset_book.book1000.update_reset1000(
+            bids=main_book1000.bids, asks=main_book1000.asks
+        )
+        return level_delta_list
+
+    def get_mirror_book(self) -> MirrorBoolMarketOrderBook:
+        """Plain mirror book with the current levels (no live order state)"""
+        return MirrorBoolMarketOrderBook(
+            condition_id=self.condition_id,
+            main_asset_book=AssetBook(
+                asset_id=self.main_asset_book.asset_id,
+                book1000=self.main_asset_book.book1000.copy(),
+            ),
+            counter_asset_id=self.counter_asset_id,
+        )
+
+    def _get_live_order_level(self, live_order: dict) -> tuple[str, int, str, int]:
+        assert live_order['market'] == self.condition_id
+        assert live_order['status'] == 'LIVE'
+        if live_order['outcome'] == 'Yes':
+            assert live_order['asset_id'] == self.main_asset_book.asset_id
+        elif live_order['outcome'] == 'No':
+            assert live_order['asset_id'] == self.counter_asset_id
+        else:
+            raise ValueError(f'unknown outcome: {live_order["outcome"]}')
+        size_remaining = float(live_order['original_size']) - float(live_order['size_matched'])
+        price1000 = int(round(float(live_order['price']) * 1000))
+        size1000 = int(round(size_remaining * 1000))
+        return live_order['asset_id'], price1000, live_order['side'], size1000
+
+    def _update_level_delta1000(
+        self, asset_id: str, price1000: int, size1000_delta: int, side: str
+    ):
+        book1000 = self.get_asset_book1000(asset_id)
+        size1000 = book1000.get_size1000(price1000=price1000, side=side) + size1000_delta
+        assert size1000 >= 0, f'negative house level size1000: {size1000} at {price1000}'
+        # single write, the counter side is a view of the main side
+        book1000.update_add1000(price1000=price1000, size1000=size1000_delta, side=side)
+
+    def _get_main_book1000_from_live_orders(
+        self, live_order_dict: dict[str, dict]
+    ) -> ArrayBook1000:
+        mirror_book = MirrorBoolMarketOrderBook.new_init(
+            condition_id=self.condition_id,
+            main_asset_id=self.main_asset_book.asset_id,
+            counter_asset_id=self.counter_asset_id,
+        )
         for _, live_order in live_order_dict.items():
-            assert live_order['market'] == self.condition_id
-            assert live_order['status'] == 'LIVE'
-            size_remaining = float(live_order['original_size']) - float(live_order['size_matched'])
-            price = float(live_order['price'])
-            side = live_order['side']
-            if live_order['outcome'] == 'Yes':
-                # direct
-                assert live_order['asset_id'] == self.main_asset_book.asset_id
-                main_asset_book.book1000.update_add(price=price, size=size_remaining, side=side)
-                # counter
-                counter_asset_book.book1000.update_add(
-                    price=self.counter_price(price=price),
-                    size=size_remaining,
-                    side=self.counter_side(side=side),
-                )
-            elif live_order['outcome'] == 'No':
-                # direct
-                assert live_order['asset_id'] == self.counter_asset_book.asset_id
-                counter_asset_book.book1000.update_add(price=price, size=size_remaining, side=side)
-                # counter
-                main_asset_book.book1000.update_add(
-                    price=self.counter_price(price=price),
-                    size=size_remaining,
-                    side=self.counter_side(side=side),
-                )
-            else:
-                raise ValueError(f'unknown outcome: {live_order["outcome"]}')
-        return main_asset_book, counter_asset_book
+            asset_id, price1000, side, size1000 = self._get_live_order_level(live_order)
+            mirror_book.get_asset_book1000(asset_id).update_add1000(
+                price1000=price1000, size1000=size1000, side=side
+            )
+        return mirror_book.main_asset_book.book1000
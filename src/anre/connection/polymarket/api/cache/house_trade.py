@@ -6,34 +6,104 @@ import pandas as pd
 from anre.connection.polymarket.api.clob.parse import ClobTradeParser
 from anre.connection.polymarket.api.data import DataClient
 from anre.connection.polymarket.api.types import HouseTradeRec
-from anre.connection.polymarket.api.utils import get_position_by_outcome
 from anre.utils.dataStructure.general import GeneralBaseMutable
 
+# trade sizes have up to 6 decimals, position is summed as scaled int (no float drift)
+_SIZE_SCALE = 10**6
+# trade status is final, it will not be changed by later updates
+_FINAL_TRADE_STATUSES = ('CONFIRMED', 'FAILED')
+
 
 @dataclass(frozen=False, repr=False)
 class HouseTradeCache(GeneralBaseMutable):
+    """House trades of a single market with the running position
+
+    Position (by outcome) is updated per new or changed trade record, so it is not
+    recalculated over the full history. `get_after_timestamp` is the cursor for the `after=`
+    parameter of the trade requests: only newer or not yet final trades need to be fetched.
+    A trade that gets FAILED is removed (with its part of the position).
+    """
+
     condition_id: str
     _house_trade_rec_dict: dict[str, HouseTradeRec] = field(default_factory=dict)
+    _yes_scaled_position: int = 0
+    _no_scaled_position: int = 0
+    # newest final (CONFIRMED or FAILED) trade, FAILED trades are not kept in the dict
+    _final_timestamp: int | None = None
+
+    def __post_init__(self):
+        trade_rec_dict, self._house_trade_rec_dict = self._house_trade_rec_dict, {}
+        self._yes_scaled_position, self._no_scaled_position = 0, 0
+        self._final_timestamp = None
+        self._update_trade_rec_dict(trade_rec_dict)
 
     def update_from_clob_trade_dict_list(self, clob_trade_dict_list: list[dict]) -> None:
-        trade_rec_dict = ClobTradeParser.parse_house_trade_dict_list(clob_trade_dict_list)
-        assert all([
-            trade_rec.conditionId == self.condition_id for trade_rec in trade_rec_dict.values()
-        ])
-        self._house_trade_rec_dict.update(trade_rec_dict)
+        trade_rec_dict = ClobTradeParser.parse_house_trade_dict_list(
+            clob_trade_dict_list, with_failed=True
+        )
+        self._update_trade_rec_dict(trade_rec_dict)
 
     def update_from_ws_trade_dict_list(self, ws_trade_dict_list: list[dict]) -> None:
         subset = [el for el in ws_trade_dict_list if el.get('type') == 'TRADE']
         # panasu, kad strukura atitinka
-        trade_rec_dict = ClobTradeParser.parse_house_trade_dict_list(subset)
-        assert all([
-            trade_rec.conditionId == self.condition_id for trade_rec in trade_rec_dict.values()
-        ])
-        self._house_trade_rec_dict.update(trade_rec_dict)
+        trade_rec_dict = ClobTradeParser.parse_house_trade_dict_list(subset, with_failed=True)
+        self._update_trade_rec_dict(trade_rec_dict)
 
     def update_from_data_trade_dict_list(self, data_trade_dict_list: list[dict]) -> None:
         trade_rec_dict = DataClient.parse_house_trade_dict_list(data_trade_dict_list)
-        self._house_trade_rec_dict.update(trade_rec_dict)
+        self._update_trade_rec_dict(trade_rec_dict)
+
+    def get_house_trade_rec_dict(self) -> dict[str, HouseTradeRec]:
+        return dict(self._house_trade_rec_dict)
+
+    def get_after_timestamp(self) -> int | None:
+        """Cursor for `after=`. None if there are no trades yet (full history is needed)
+
+        Trades that are not final yet (e.g. MATCHED, MINED) can still change the status, so the
+        cursor does not pass the oldest of them.
+        """
+        pending_timestamps = [
+            trade_rec.timestamp
+            for trade_rec in self._house_trade_rec_dict.values()
+            if trade_rec.status not in _FINAL_TRADE_STATUSES
+        ]
+        if pending_timestamps:
+            return int(min(pending_timestamps)) - 1
+        if self._final_timestamp is None:
+            return None
+        return self._final_timestamp - 1
+
+    def _update_trade_rec_dict(self, trade_rec_dict: dict[str, HouseTradeRec]) -> None:
+        for key, trade_rec in trade_rec_dict.items():
+            assert trade_rec.conditionId == self.condition_id, (
+                f'trade is not for this condition_id. Expected: {self.condition_id}, got: {trade_rec.conditionId}'
+            )
+            old_trade_rec = self._house_trade_rec_dict.pop(key, None)
+            if old_trade_rec is not None:
+                self._add_to_position(old_trade_rec, sign=-1)
+            if trade_rec.status in _FINAL_TRADE_STATUSES:
+                timestamp = int(trade_rec.timestamp)
+                if self._final_timestamp is None or timestamp > self._final_timestamp:
+                    self._final_timestamp = timestamp
+            if trade_rec.status == 'FAILED':
+                continue
+            self._add_to_position(trade_rec, sign=1)
+            self._house_trade_rec_dict[key] = trade_rec
+
+    def _add_to_position(self, trade_rec: HouseTradeRec, sign: int) -> None:
+        scaled_size = int(round(trade_rec.size * _SIZE_SCALE))
+        if trade_rec.side == 'BUY':
+            scaled_size = sign * scaled_size
+        elif trade_rec.side == 'SELL':
+            scaled_size = -sign * scaled_size
+        else:
+            raise ValueError(f'Unexpected side: {trade_rec.side}')
+        if trade_rec.outcome == 'Yes':
+            self._yes_scaled_position += scaled_size
+        elif trade_rec.outcome == 'No':
+            self._no_scaled_position += scaled_size
+        else:
+            raise ValueError(f'Unexpected outcome: {trade_rec.outcome}')
 
     @staticmethod
     def create_house_trade_df(house_trade_recs: Sequence[HouseTradeRec]) -> pd.DataFrame:
@@ -44,7 +114,7 @@ class HouseTradeCache(GeneralBaseMutable):
         return self.create_house_trade_df(list(self._house_trade_rec_dict.values()))
 
     def get_position_by_outcome(self) -> tuple[float | int, float | int]:
-        return get_position_by_outcome(list(self._house_trade_rec_dict.values()))
+        return self._yes_scaled_position / _SIZE_SCALE, self._no_scaled_position / _SIZE_SCALE
 
         # house_trade_df = self.get_house_trade_df()
         # house_trade_df = house_trade_df.loc[lambda df: df['status']!='FAILED']
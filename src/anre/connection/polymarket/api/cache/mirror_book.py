@@ -0,0 +1,213 @@
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from anre.connection.polymarket.api.cache.array_book import ArrayBook1000
+from anre.connection.polymarket.api.cache.base import AssetBook, Book1000, BoolMarketOrderBook
+
+
+def counter_side(side: str) -> str:
+    if side == 'BUY':
+        return 'SELL'
+    elif side == 'SELL':
+        return 'BUY'
+    else:
+        raise ValueError(f'unknown side: {side}')
+
+
+class ComplementArrayBook1000:
+    """Read/write view of the counter asset book derived from the main asset book
+
+    In a bool market price p of the main asset is price 1000-p of the counter asset and bids swap
+    with asks. Levels are numpy views of the main book arrays, nothing is copied or stored.
+    """
+
+    def __init__(self, main_book1000: ArrayBook1000):
+        assert isinstance(main_book1000, ArrayBook1000)
+        self._main_book1000 = main_book1000
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, ComplementArrayBook1000):
+            return False
+        return self._main_book1000 == other._main_book1000
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}(best_price1000s={self.get_best_price1000s()})'
+
+    @property
+    def main_book1000(self) -> ArrayBook1000:
+        return self._main_book1000
+
+    @property
+    def bids(self) -> np.ndarray:
+        return self._main_book1000.asks[::-1]
+
+    @property
+    def asks(self) -> np.ndarray:
+        return self._main_book1000.bids[::-1]
+
+    def update_overwrite(self, price: float, size: float, side: str):
+        self.update_overwrite1000(
+            price1000=int(round(price * 1000)), size1000=int(round(size * 1000)), side=side
+        )
+
+    def update_add(self, price: float, size: float, side: str):
+        self.update_add1000(
+            price1000=int(round(price * 1000)), size1000=int(round(size * 1000)), side=side
+        )
+
+    def update_overwrite1000(self, price1000: int, size1000: int, side: str):
+        self._main_book1000.update_overwrite1000(
+            price1000=1000 - price1000, size1000=size1000, side=counter_side(side)
+        )
+
+    def update_add1000(self, price1000: int, size1000: int, side: str):
+        self._main_book1000.update_add1000(
+            price1000=1000 - price1000, size1000=size1000, side=counter_side(side)
+        )
+
+    def update_reset1000(self, bids: np.ndarray, asks: np.ndarray):
+        self._main_book1000.update_reset1000(bids=asks[::-1], asks=bids[::-1])
+
+    def get_size1000(self, price1000: int, side: str) -> int:
+        return self._main_book1000.get_size1000(price1000=1000 - price1000, side=counter_side(side))
+
+    def remove_zero_size_records(self):
+        pass
+
+    def get_best_price1000s(self) -> tuple[int, int]:
+        main_best_bid, main_best_ask = self._main_book1000.get_best_price1000s()
+        return 1000 - main_best_ask, 1000 - main_best_bid
+
+    def get_depth_size1000(
+        self, side: str, price1000_from: int = 0, price1000_to: int = 1000
+    ) -> int:
+        return self._main_book1000.get_depth_size1000(
+            side=counter_side(side),
+            price1000_from=1000 - price1000_to,
+            price1000_to=1000 - price1000_from,
+        )
+
+    def get_levels(self, side: str) -> tuple[np.ndarray, np.ndarray]:
+        price1000s, size1000s = self._main_book1000.get_levels(side=counter_side(side))
+        return 1000 - price1000s, size1000s
+
+    def to_array_book1000(self) -> ArrayBook1000:
+        return ArrayBook1000(bids=self.bids.copy(), asks=self.asks.copy())
+
+    def to_book1000(self) -> Book1000:
+        return self.to_array_book1000().to_book1000()
+
+
+@dataclass(frozen=False, repr=False)
+class MirrorBoolMarketOrderBook(BoolMarketOrderBook):
+    """Bool market book that stores only the main asset book
+
+    The counter asset book is a `ComplementArrayBook1000` view on the main book, so both sides are
+    symmetric by construction: updates through any side cost a single write and there is no
+    symmetry to validate.
+    """
+
+    condition_id: str
+    main_asset_book: AssetBook
+    counter_asset_book: AssetBook = field(init=False)
+    counter_asset_id: str
+
+    def __post_init__(self):
+        assert isinstance(self.main_asset_book.book1000, ArrayBook1000)
+        assert self.main_asset_book.asset_id != self.counter_asset_id, (
+            f'main_asset_id and counter_asset_id must be different. Got: {self.main_asset_book.asset_id} and {self.counter_asset_id}'
+        )
+        self.counter_asset_book = AssetBook(
+            asset_id=self.counter_asset_id,
+            book1000=ComplementArrayBook1000(main_book1000=self.main_asset_book.book1000),
+        )
+
+    @classmethod
+    def new_init(
+        cls, condition_id: str, main_asset_id: str, counter_asset_id: str
+    ) -> 'MirrorBoolMarketOrderBook':
+        return cls(
+            condition_id=condition_id,
+            main_asset_book=AssetBook(asset_id=main_asset_id, book1000=ArrayBook1000()),
+            counter_asset_id=counter_asset_id,
+        )
+
+    @classmethod
+    def new_from_bool_market_order_book(
+        cls, bool_market_order_book: BoolMarketOrderBook
+    ) -> 'MirrorBoolMarketOrderBook':
+        """Only the main asset book is taken, the counter one is expected to be its mirror"""
+        main_book1000 = bool_market_order_book.main_asset_book.book1000
+        if isinstance(main_book1000, ArrayBook1000):
+            main_array_book1000 = main_book1000.copy()
+        else:
+            main_array_book1000 = ArrayBook1000.new_from_book1000(main_book1000)
+        return cls(
+            condition_id=bool_market_order_book.condition_id,
+            main_asset_book=AssetBook(
+                asset_id=bool_market_order_book.main_asset_book.asset_id,
+                book1000=main_array_book1000,
+            ),
+            counter_asset_id=bool_market_order_book.counter_asset_book.asset_id,
+        )
+
+    def to_bool_market_order_book(self) -> BoolMarketOrderBook:
+        """Materialize both sides into the plain `Book1000` based book"""
+        return BoolMarketOrderBook(
+            condition_id=self.condition_id,
+            main_asset_book=AssetBook(
+                asset_id=self.main_asset_book.asset_id,
+                book1000=self.main_asset_book.book1000.to_book1000(),
+            ),
+            counter_asset_book=AssetBook(
+                asset_id=self.counter_asset_id,
+                book1000=self.counter_asset_book.book1000.to_book1000(),
+            ),
+        )
+
+    def copy(self) -> 'MirrorBoolMarketOrderBook':
+        return self.__class__(
+            condition_id=self.condition_id,
+            main_asset_book=AssetBook(
+                asset_id=self.main_asset_book.asset_id,
+                book1000=self.main_asset_book.book1000.copy(),
+            ),
+            counter_asset_id=self.counter_asset_id,
+        )
+
+    def get_asset_book1000(self, asset_id: str) -> ArrayBook1000 | ComplementArrayBook1000:
+        if asset_id == self.main_asset_book.asset_id:
+            return self.main_asset_book.book1000
+        elif asset_id == self.counter_asset_id:
+            return self.counter_asset_book.book1000
+        else:
+            raise ValueError(f'unknown asset_id: {asset_id}')
+
+    def equals_book_values(self, other: BoolMarketOrderBook) -> bool:
+        if isinstance(other, MirrorBoolMarketOrderBook):
+            return self.main_asset_book.book1000 == other.main_asset_book.book1000
+        return self.to_bool_market_order_book().equals_book_values(other)
+
+    def get_main_asset_best_price1000s(self) -> tuple[int, int]:
+        return self.main_asset_book.book1000.get_best_price1000s()
+
+    def validate(self):
+        # symmetric by construction, only check that the view is still bound to the main book
+        assert self.counter_asset_book.book1000.main_book1000 is self.main_asset_book.book1000
+
+    def sub(self, other: BoolMarketOrderBook, validate: bool = True) -> 'MirrorBoolMarketOrderBook':
+        other_book1000 = other.main_asset_book.book1000
+        if not isinstance(other_book1000, ArrayBook1000):
+            other_book1000 = ArrayBook1000.new_from_book1000(other_book1000)
+        instance = self.__class__(
+            condition_id=self.condition_id,
+            main_asset_book=AssetBook(
+                asset_id=self.main_asset_book.asset_id,
+                book1000=self.main_asset_book.book1000.sub(other_book1000),
+            ),
+            counter_asset_id=self.counter_asset_id,
+        )
+        if validate:
+            instance.validate()
+        return instance
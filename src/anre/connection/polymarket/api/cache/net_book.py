@@ -1,9 +1,14 @@
 from dataclasses import dataclass
 
+import numpy as np
+
+from anre.connection.polymarket.api.cache.array_book import ArrayBook1000
 from anre.connection.polymarket.api.cache.base import AssetBook
 from anre.connection.polymarket.api.cache.base import BoolMarketOrderBook as BaseMarketOrderBook
 from anre.connection.polymarket.api.cache.house_book import HouseOrderBookCache
+from anre.connection.polymarket.api.cache.mirror_book import MirrorBoolMarketOrderBook
 from anre.connection.polymarket.api.cache.public_book import PublicMarketOrderBookCache
+from anre.connection.polymarket.api.websocket.decode import BookRecord, WsMessage, to_ws_record
 
 
 @dataclass
@@ -19,7 +24,9 @@ class NetBoolMarketOrderBook(BaseMarketOrderBook):
         house_order_book: HouseOrderBookCache,
         validate: bool = True,
     ) -> 'NetBoolMarketOrderBook':
-        temp_market_order_book = public_market_order_book.sub(house_order_book, validate=False)
+        temp_market_order_book = public_market_order_book.sub(
+            house_order_book.to_bool_market_order_book(), validate=False
+        )
         instance = cls(
             condition_id=temp_market_order_book.condition_id,
             main_asset_book=temp_market_order_book.main_asset_book,
@@ -30,3 +37,192 @@ class NetBoolMarketOrderBook(BaseMarketOrderBook):
             assert all([item >= -0.01 for item in instance.main_asset_book.book1000.bids.values()])
             assert all([item >= -0.01 for item in instance.main_asset_book.book1000.asks.values()])
         return instance
+
+
+class IncrementalNetBoolMarketOrderBook:
+    """Net book (public minus house) maintained in place
+
+    Public, house and net books are kept as mirror books. A public `price_change` or a house order
+    delta touches only the changed level of the net book, and a full snapshot reset is a couple of
+    vectorized array operations. There is no deepcopy and no per level walk on refresh.
+    """
+
+    def __init__(self, condition_id: str, main_asset_id: str, counter_asset_id: str):
+        cred = dict(
+            condition_id=condition_id,
+            main_asset_id=main_asset_id,
+            counter_asset_id=counter_asset_id,
+        )
+        self.condition_id = condition_id
+        self._public_book = MirrorBoolMarketOrderBook.new_init(**cred)
+        self._house_book = MirrorBoolMarketOrderBook.new_init(**cred)
+        self._net_book = MirrorBoolMarketOrderBook.new_init(**cred)
+        self._public_timestamp_dict: dict[str, float] = {
+            main_asset_id: float(0),
+            counter_asset_id: float(0),
+        }
+
+    @classmethod
+    def new(
+        cls,
+        public_market_order_book: BaseMarketOrderBook,
+        house_order_book: BaseMarketOrderBook,
+        validate: bool = True,
+    ) -> 'IncrementalNetBoolMarketOrderBook':
+        instance = cls(
+            condition_id=public_market_order_book.condition_id,
+            main_asset_id=public_market_order_book.main_asset_book.asset_id,
+            counter_asset_id=public_market_order_book.counter_asset_book.asset_id,
+        )
+        instance.update_reset_public_book(public_market_order_book)
+        instance.update_reset_house_book(house_order_book)
+        if validate:
+            instance.validate()
+        return instance
+
+    @property
+    def net_book(self) -> MirrorBoolMarketOrderBook:
+        """Live net book. It is mutated in place, use `get_net_book_snapshot` to keep a state"""
+        return self._net_book
+
+    @property
+    def public_book(self) -> MirrorBoolMarketOrderBook:
+        return self._public_book
+
+    @property
+    def house_book(self) -> MirrorBoolMarketOrderBook:
+        return self._house_book
+
+    def get_net_book_snapshot(self) -> MirrorBoolMarketOrderBook:
+        return self._net_book.copy()
+
+    def get_main_asset_best_price1000s(self) -> tuple[int, int]:
+        return self._net_book.get_main_asset_best_price1000s()
+
+    def validate(self):
+        public_book1000 = self._public_book.main_asset_book.book1000
+        house_book1000 = self._house_book.main_asset_book.book1000
+        net_book1000 = self._net_book.main_asset_book.book1000
+        assert np.array_equal(net_book1000.bids, public_book1000.bids - house_book1000.bids)
+        assert np.array_equal(net_book1000.asks, public_book1000.asks - house_book1000.asks)
+        assert net_book1000.bids.min() >= 0, 'net book has negative bid levels'
+        assert net_book1000.asks.min() >= 0, 'net book has negative ask levels'
+
+    ### full resets
+
+    def update_reset_public_book(self, public_market_order_book: BaseMarketOrderBook):
+        self._assert_same_market(public_market_order_book)
+        main_array_book1000 = self._get_main_array_book1000(public_market_order_book)
+        self._public_book.main_asset_book.book1000.update_reset1000(
+            bids=main_array_book1000.bids, asks=main_array_book1000.asks
+        )
+        for asset_book in (
+            public_market_order_book.main_asset_book,
+            public_market_order_book.counter_asset_book,
+        ):
+            self._public_timestamp_dict[asset_book.asset_id] = getattr(
+                asset_book, 'timestamp', float(0)
+            )
+        self._recalc_net_book()
+
+    def update_reset_house_book(self, house_order_book: BaseMarketOrderBook):
+        self._assert_same_market(house_order_book)
+        main_array_book1000 = self._get_main_array_book1000(house_order_book)
+        self._house_book.main_asset_book.book1000.update_reset1000(
+            bids=main_array_book1000.bids, asks=main_array_book1000.asks
+        )
+        self._recalc_net_book()
+
+    ### level updates
+
+    def update_public_level1000(self, asset_id: str, price1000: int, size1000: int, side: str):
+        public_book1000 = self._public_book.get_asset_book1000(asset_id)
+        old_size1000 = public_book1000.get_size1000(price1000=price1000, side=side)
+        public_book1000.update_overwrite1000(price1000=price1000, size1000=size1000, side=side)
+        size1000_delta = public_book1000.get_size1000(price1000=price1000, side=side) - old_size1000
+        if size1000_delta:
+            self._net_book.get_asset_book1000(asset_id).update_add1000(
+                price1000=price1000, size1000=size1000_delta, side=side
+            )
+
+    def update_house_level_delta1000(
+        self, asset_id: str, price1000: int, size1000_delta: int, side: str
+    ):
+        if size1000_delta:
+            self._house_book.get_asset_book1000(asset_id).update_add1000(
+                price1000=price1000, size1000=size1000_delta, side=side
+            )
+            self._net_book.get_asset_book1000(asset_id).update_add1000(
+                price1000=price1000, size1000=-size1000_delta, side=side
+            )
+
+    def update_from_public_ws_message_list(
+        self, ws_message_list: list[WsMessage], validate: bool = False
+    ):
+        for ws_message in ws_message_list:
+            self._update_from_public_ws_message(ws_message=ws_message)
+        if validate:
+            self.validate()
+
+    def _update_from_public_ws_message(self, ws_message: WsMessage):
+        assert 'event_type' in ws_message, (
+            f'message does not have `event_type`. It is not stream message: {ws_message}'
+        )
+        event_type = ws_message['event_type']
+        if event_type in ['book', 'price_change']:
+            ws_message = to_ws_record(ws_message)
+            assert ws_message.market == self.condition_id, (
+                f'message is not for this condition_id. Expected: {self.condition_id}, got: {ws_message.market}'
+            )
+            asset_id = ws_message.asset_id
+            assert asset_id in self._public_timestamp_dict, f'unknown asset_id: {asset_id}'
+            timestamp = ws_message.timestamp
+            assert timestamp > self._public_timestamp_dict[asset_id], (
+                f'update message is not newer. Last update: {self._public_timestamp_dict[asset_id]}, new update: {timestamp}'
+            )
+            if isinstance(ws_message, BookRecord):
+                array_book1000 = ArrayBook1000.new_from_level1000_list(
+                    bid_level1000_list=ws_message.bid_level1000_list,
+                    ask_level1000_list=ws_message.ask_level1000_list,
+                )
+                self._public_book.get_asset_book1000(asset_id).update_reset1000(
+                    bids=array_book1000.bids, asks=array_book1000.asks
+                )
+                self._recalc_net_book()
+            else:
+                for price1000, size1000, side in ws_message.change1000_list:
+                    self.update_public_level1000(
+                        asset_id=asset_id, price1000=price1000, size1000=size1000, side=side
+                    )
+            self._public_timestamp_dict[asset_id] = timestamp
+
+        elif event_type in ['_internal', 'tick_size_change']:
+            pass
+
+        else:
+            raise ValueError(f'unknown event type: {event_type}')
+
+    ### helpers
+
+    def _recalc_net_book(self):
+        public_book1000 = self._public_book.main_asset_book.book1000
+        house_book1000 = self._house_book.main_asset_book.book1000
+        self._net_book.main_asset_book.book1000.update_reset1000(
+            bids=public_book1000.bids - house_book1000.bids,
+            asks=public_book1000.asks - house_book1000.asks,
+        )
+
+    def _assert_same_market(self, bool_market_order_book: BaseMarketOrderBook):
+        assert bool_market_order_book.condition_id == self.condition_id
+        assert (
+            bool_market_order_book.main_asset_book.asset_id
+            == self._net_book.main_asset_book.asset_id
+        )
+        assert bool_market_order_book.counter_asset_book.asset_id == self._net_book.counter_asset_id
+
+    @staticmethod
+    def _get_main_array_book1000(bool_market_order_book: BaseMarketOrderBook) -> ArrayBook1000:
+        main_book1000 = bool_market_order_book.main_asset_book.book1000
+        if isinstance(main_book1000, ArrayBook1000):
+            return main_book1000
+        return ArrayBook1000.new_from_book1000(main_book1000)
@@ -3,6 +3,12 @@ from dataclasses import dataclass, field
 from anre.connection.polymarket.api.cache.base import AssetBook as BaseAssetBook
 from anre.connection.polymarket.api.cache.base import Book1000
 from anre.connection.polymarket.api.cache.base import BoolMarketOrderBook as BaseMarketOrderBook
+from anre.connection.polymarket.api.websocket.decode import (
+    BookRecord,
+    PriceChangeRecord,
+    WsMessage,
+    to_ws_record,
+)
 
 
 @dataclass(frozen=False, repr=False)
@@ -26,43 +32,42 @@ class PublicAssetBook(BaseAssetBook):
         self.timestamp = timestamp
         self.hash = message['hash']
 
-    def update_from_ws_message(self, message: dict):
+    def update_from_ws_message(self, message: WsMessage):
         assert 'event_type' in message, (
             f'message does not have `event_type`. It is not stream message: {message}'
         )
-        event_type = message['event_type']
-        if event_type == 'book':
-            assert message['asset_id'] == self.asset_id, (
-                f'message is not for this asset_id. Expected: {self.asset_id}, got: {message["asset_id"]}'
+        message = to_ws_record(message)
+        if isinstance(message, BookRecord):
+            assert message.asset_id == self.asset_id, (
+                f'message is not for this asset_id. Expected: {self.asset_id}, got: {message.asset_id}'
             )
-            timestamp = float(message['timestamp'])
-            assert timestamp > self.timestamp, (
-                f'update message is not newer. Last update: {self.timestamp}, new update: {timestamp}'
+            assert message.timestamp > self.timestamp, (
+                f'update message is not newer. Last update: {self.timestamp}, new update: {message.timestamp}'
             )
-            book1000 = Book1000.new_from_native_prices(asks=message['asks'], bids=message['bids'])
-            self.book1000 = book1000
-            self.timestamp = timestamp
-            self.hash = message['hash']
-
-        elif event_type == 'price_change':
-            assert message['asset_id'] == self.asset_id, (
-                f'message is not for this asset_id. Expected: {self.asset_id}, got: {message["asset_id"]}'
+            self.book1000 = Book1000.new_from_level1000_list(
+                bid_level1000_list=message.bid_level1000_list,
+                ask_level1000_list=message.ask_level1000_list,
             )
-            timestamp = float(message['timestamp'])
-            assert timestamp > self.timestamp, (
-                f'update message is not newer. Last update: {self.timestamp}, new update: {timestamp}'
+            self.timestamp = message.timestamp
+            self.hash = message.hash
+
+        elif isinstance(message, PriceChangeRecord):
+            assert message.asset_id == self.asset_id, (
+                f'message is not for this asset_id. Expected: {self.asset_id}, got: {message.asset_id}'
+            )
+            assert message.timestamp > self.timestamp, (
+                f'update message is not newer. Last update: {self.timestamp}, new update: {message.timestamp}'
             )
 
-            for change in message['changes']:
-                self.book1000.update_overwrite(
-                    price=float(change['price']), size=float(change['size']), side=change['side']
-                )
+            book1000 = self.book1000
+            for price1000, size1000, side in message.change1000_list:
+                book1000.update_overwrite1000(price1000=price1000, size1000=size1000, side=side)
 
-            self.hash = message['hash']
-            self.timestamp = timestamp
+            self.hash = message.hash
+            self.timestamp = message.timestamp
 
         else:
-            raise ValueError(f'unknown event type: {event_type}')
+            raise ValueError(f'unknown event type: {message["event_type"]}')
 
 
 @dataclass(frozen=False, repr=False)
@@ -94,7 +99,7 @@ class PublicMarketOrderBookCache(BaseMarketOrderBook):
         if validate:
             self.validate()
 
-    def update_from_ws_message_list(self, ws_message_list: list[dict], validate: bool = True):
+    def update_from_ws_message_list(self, ws_message_list: list[WsMessage], validate: bool = True):
         for ws_message in ws_message_list:
             self._update_from_ws_message(ws_message=ws_message)
         if validate:
@@ -112,7 +117,7 @@ class PublicMarketOrderBookCache(BaseMarketOrderBook):
         else:
             raise ValueError(f'unknown asset_id: {clob_mob["asset_id"]}')
 
-    def _update_from_ws_message(self, ws_message: dict):
+    def _update_from_ws_message(self, ws_message: WsMessage):
         assert 'event_type' in ws_message, (
             f'message does not have `event_type`. It is not stream message: {ws_message}'
         )
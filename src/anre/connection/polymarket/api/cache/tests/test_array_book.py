@@ -0,0 +1,79 @@
+import random
+
+import pytest
+
+from anre.config.config import config as anre_config
+from anre.connection.polymarket.api.cache.array_book import ArrayBook1000
+from anre.connection.polymarket.api.cache.base import Book1000
+from anre.utils import testutil
+from anre.utils.Json.Json import Json
+
+
+class TestArrayBook1000(testutil.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        _file_path = anre_config.path.get_path_to_root_dir(
+            'src/anre/connection/polymarket/api/cache/tests/resources/book_change_step_list.json'
+        )
+        book_change_step_list = Json.load(path=_file_path)
+        cls.book_change_step_list = book_change_step_list
+
+    def test_new_from_native_prices(self) -> None:
+        for clob_mob in self.book_change_step_list[1]['clob_mob_list']:
+            book1000 = Book1000.new_from_native_prices(bids=clob_mob['bids'], asks=clob_mob['asks'])
+            array_book1000 = ArrayBook1000.new_from_native_prices(
+                bids=clob_mob['bids'], asks=clob_mob['asks']
+            )
+            assert array_book1000.to_book1000() == book1000
+            assert ArrayBook1000.new_from_book1000(book1000) == array_book1000
+
+            best_bid = book1000.bids.keys()[-1] if book1000.bids else 0
+            best_ask = book1000.asks.keys()[0] if book1000.asks else 1000
+            assert array_book1000.get_best_price1000s() == (best_bid, best_ask)
+
+    def test_random_updates_match_book1000(self) -> None:
+        rng = random.Random(7)
+        book1000 = Book1000()
+        array_book1000 = ArrayBook1000()
+        for _ in range(3000):
+            side = rng.choice(['BUY', 'SELL'])
+            price = rng.randint(1, 999) / 1000
+            size = rng.choice([0, 0, rng.randint(1, 5000) / 100])
+            if rng.random() < 0.7:
+                book1000.update_overwrite(price=price, size=size, side=side)
+                array_book1000.update_overwrite(price=price, size=size, side=side)
+            else:
+                book1000.update_add(price=price, size=size, side=side)
+                array_book1000.update_add(price=price, size=size, side=side)
+            book1000.remove_zero_size_records()
+
+            best_bid = book1000.bids.keys()[-1] if book1000.bids else 0
+            best_ask = book1000.asks.keys()[0] if book1000.asks else 1000
+            assert array_book1000.get_best_price1000s() == (best_bid, best_ask)
+
+        assert array_book1000.to_book1000() == book1000
+        assert array_book1000.get_depth_size1000('BUY') == sum(book1000.bids.values())
+        assert array_book1000.get_depth_size1000('SELL', 500, 1000) == sum(
+            size1000 for price1000, size1000 in book1000.asks.items() if price1000 >= 500
+        )
+        price1000s, size1000s = array_book1000.get_levels('BUY')
+        assert price1000s.tolist() == list(reversed(book1000.bids.keys()))
+        assert size1000s.tolist() == list(reversed(book1000.bids.values()))
+
+    def test_sub(self) -> None:
+        book = ArrayBook1000()
+        book.update_overwrite1000(price1000=450, size1000=10000, side='BUY')
+        book.update_overwrite1000(price1000=460, size1000=5000, side='BUY')
+        book.update_overwrite1000(price1000=500, size1000=7000, side='SELL')
+        other = ArrayBook1000()
+        other.update_overwrite1000(price1000=460, size1000=5000, side='BUY')
+
+        diff = book.sub(other)
+        assert diff.get_best_price1000s() == (450, 500)
+        assert book.get_best_price1000s() == (460, 500)
+        assert diff.copy() == diff
+
+        with pytest.raises(ValueError):
+            book.update_add1000(price1000=-1, size1000=10, side='BUY')
+        with pytest.raises(ValueError):
+            book.update_overwrite1000(price1000=500, size1000=10, side='HOLD')
@@ -0,0 +1,88 @@
+import copy
+
+from anre.config.config import config as anre_config
+from anre.connection.polymarket.api.cache.book_registry import BookRegistry
+from anre.connection.polymarket.api.cache.public_book import PublicMarketOrderBookCache
+from anre.connection.polymarket.api.clob import ClobMarketInfoParser
+from anre.connection.polymarket.api.types import BoolMarketCred
+from anre.connection.polymarket.api.websocket.messenger import Messenger
+from anre.utils import testutil
+from anre.utils.Json.Json import Json
+
+
+class TestBookRegistry(testutil.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        _file_path = anre_config.path.get_path_to_root_dir(
+            'src/anre/connection/polymarket/api/cache/tests/resources/book_change_step_list.json'
+        )
+        book_change_step_list = Json.load(path=_file_path)
+        cls.book_change_step_list = book_change_step_list
+        cls.bool_market_cred = ClobMarketInfoParser.get_bool_market_cred(
+            market_info=book_change_step_list[0]['clob_market_info_dict']
+        )
+        # the same messages, but for the other market
+        cls.other_bool_market_cred = BoolMarketCred(
+            condition_id='other_condition_id',
+            main_asset_id='other_main_asset_id',
+            counter_asset_id='other_counter_asset_id',
+        )
+
+    def _to_other_market(self, message: dict) -> dict:
+        message = copy.deepcopy(message)
+        if 'market' in message:
+            message['market'] = self.other_bool_market_cred.condition_id
+        if message.get('asset_id') == self.bool_market_cred.main_asset_id:
+            message['asset_id'] = self.other_bool_market_cred.main_asset_id
+        elif message.get('asset_id') == self.bool_market_cred.counter_asset_id:
+            message['asset_id'] = self.other_bool_market_cred.counter_asset_id
+        return message
+
+    def test_ws_dispatch(self) -> None:
+        ws_message_list = self.book_change_step_list[2]['ws_market_message_list']
+        expected_mob = PublicMarketOrderBookCache.new_init(**self.bool_market_cred.to_dict())
+        expected_mob.update_from_ws_message_list(ws_message_list=ws_message_list)
+
+        registry = BookRegistry.new([self.bool_market_cred, self.other_bool_market_cred])
+        assert len(registry) == 2
+        assert len(registry.asset_ids) == 4
+
+        # interleaved messages of both markets, in one batch, put by two shards
+        messenger = Messenger()
+        for message in ws_message_list:
+            messenger.put(message)
+            messenger.put(self._to_other_market(message))
+        messenger.put(self._to_other_market({**ws_message_list[-1], 'asset_id': 'unknown'}))
+        updated_condition_ids = registry.update_from_messenger(messenger, validate=True)
+        assert updated_condition_ids == set(registry.condition_ids)
+        assert registry.unknown_asset_message_count == 1
+
+        for bool_market_cred in [self.bool_market_cred, self.other_bool_market_cred]:
+            mob = registry.get_mob(bool_market_cred.condition_id)
+            assert mob.equals_book_values(expected_mob)
+            assert registry.get_mob_by_asset_id(bool_market_cred.counter_asset_id) is mob
+            assert (
+                registry.get_main_asset_best_price1000s(bool_market_cred.condition_id)
+                == expected_mob.get_main_asset_best_price1000s()
+            )
+            assert registry.get_best_price1000s(bool_market_cred.counter_asset_id) == (
+                expected_mob.counter_asset_book.book1000.bids.keys()[-1],
+                expected_mob.counter_asset_book.book1000.asks.keys()[0],
+            )
+
+        registry.remove_market(self.other_bool_market_cred.condition_id)
+        assert self.other_bool_market_cred.condition_id not in registry
+        assert len(registry.asset_ids) == 2
+
+    def test_clob_dispatch(self) -> None:
+        clob_mob_list = self.book_change_step_list[3]['clob_mob_list']
+        expected_mob = PublicMarketOrderBookCache.new_init(**self.bool_market_cred.to_dict())
+        expected_mob.update_from_clob_mob_list(clob_mob_list=clob_mob_list)
+
+        registry = BookRegistry.new([self.bool_market_cred, self.other_bool_market_cred])
+        updated_condition_ids = registry.update_from_clob_mob_list(clob_mob_list=clob_mob_list)
+        assert updated_condition_ids == {self.bool_market_cred.condition_id}
+        assert registry.get_mob(self.bool_market_cred.condition_id).equals_book_values(expected_mob)
+        assert registry.get_main_asset_best_price1000s(
+            self.other_bool_market_cred.condition_id
+        ) == (0, 1000)
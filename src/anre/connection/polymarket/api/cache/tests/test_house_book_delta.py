@@ -0,0 +1,127 @@
+import copy
+
+from anre.config.config import config as anre_config
+from anre.connection.polymarket.api.cache.house_book import HouseOrderBookCache
+from anre.connection.polymarket.api.cache.net_book import IncrementalNetBoolMarketOrderBook
+from anre.connection.polymarket.api.cache.public_book import PublicMarketOrderBookCache
+from anre.connection.polymarket.api.clob import ClobMarketInfoParser
+from anre.utils import testutil
+from anre.utils.Json.Json import Json
+
+
+class TestHouseOrderBookCacheDelta(testutil.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        _file_path = anre_config.path.get_path_to_root_dir(
+            'src/anre/connection/polymarket/api/cache/tests/resources/book_change_step_list.json'
+        )
+        book_change_step_list = Json.load(path=_file_path)
+        cls.book_change_step_list = book_change_step_list
+        bool_market_cred = ClobMarketInfoParser.get_bool_market_cred(
+            market_info=book_change_step_list[0]['clob_market_info_dict']
+        )
+        cls.market_order_book_cred = bool_market_cred.to_dict()
+
+    def _get_fill_message_list(self) -> list[dict]:
+        # partial fills, full fill and a cancel of the placed orders
+        placement_list = [
+            msg
+            for msg in self.book_change_step_list[2]['ws_house_message_list']
+            if msg['event_type'] == 'order' and msg['status'] == 'LIVE'
+        ]
+        ws_message_list = []
+        for size_matched in ['5', '10.5']:
+            for placement in placement_list:
+                msg = copy.deepcopy(placement)
+                msg['size_matched'] = size_matched
+                msg['type'] = 'UPDATE'
+                ws_message_list.append(msg)
+        msg = copy.deepcopy(placement_list[0])
+        msg['size_matched'] = msg['original_size']
+        msg['status'] = 'MATCHED'
+        ws_message_list.append(msg)
+        msg = copy.deepcopy(placement_list[1])
+        msg['status'] = 'CANCELED'
+        ws_message_list.append(msg)
+        return ws_message_list
+
+    def test_deltas_match_full_rebuild(self) -> None:
+        clob_house_order_list = self.book_change_step_list[1]['clob_house_order_list']
+        house_mob = HouseOrderBookCache.new_init(**self.market_order_book_cred)
+        house_mob.full_check_period = 1
+        house_mob.update_reset_from_clob_house_order_list(
+            clob_house_order_list=clob_house_order_list
+        )
+
+        step_ws_message_list = self.book_change_step_list[2]['ws_house_message_list']
+        ws_message_list = step_ws_message_list + self._get_fill_message_list()
+        for ws_message in ws_message_list:
+            house_mob.update_iteration_from_ws_message_list(ws_message_list=[ws_message])
+
+            expected_house_mob = HouseOrderBookCache.new_init(**self.market_order_book_cred)
+            expected_house_mob.update_reset_from_clob_house_order_list(
+                clob_house_order_list=list(house_mob._house_live_order_dict.values())
+            )
+            assert house_mob == expected_house_mob
+
+        # the initial 'Yes' BUY 20 @ 0.04 and the 'No' BUY 27 @ 0.89 with 10.5 matched are left
+        assert dict(house_mob.main_asset_book.book1000.to_book1000().bids) == {40: 20000}
+        assert dict(house_mob.main_asset_book.book1000.to_book1000().asks) == {110: 16500}
+        assert dict(house_mob.counter_asset_book.book1000.to_book1000().bids) == {890: 16500}
+
+    def test_rebuild_equals_mirror_book(self) -> None:
+        for step in self.book_change_step_list:
+            house_mob = HouseOrderBookCache.new_init(**self.market_order_book_cred)
+            house_mob.update_reset_from_clob_house_order_list(
+                clob_house_order_list=step['clob_house_order_list']
+            )
+            mirror_book = house_mob.get_mirror_book()
+            assert mirror_book.equals_book_values(house_mob)
+            # both sides materialized are symmetric
+            house_mob.to_bool_market_order_book().validate()
+
+    def test_inconsistent_book_is_rebuilt(self) -> None:
+        clob_house_order_list = self.book_change_step_list[1]['clob_house_order_list']
+        house_mob = HouseOrderBookCache.new_init(**self.market_order_book_cred)
+        house_mob.full_check_period = 1
+        house_mob.update_reset_from_clob_house_order_list(
+            clob_house_order_list=clob_house_order_list
+        )
+        expected_house_mob = copy.deepcopy(house_mob)
+        main_asset_id = house_mob.main_asset_book.asset_id
+        # an incremental update gone wrong
+        house_mob.main_asset_book.book1000.bids[40] += 1000
+        house_mob.main_asset_book.book1000.asks[500] = 2000
+
+        with self.assertLogs('anre.connection.polymarket.api.cache.house_book', level='WARNING'):
+            level_delta_list = house_mob.update_iteration_from_ws_message_list(
+                ws_message_list=[{'event_type': '_internal'}]
+            )
+        assert house_mob == expected_house_mob
+        assert sorted(level_delta_list) == [
+            (main_asset_id, 40, -1000, 'BUY'),
+            (main_asset_id, 500, -2000, 'SELL'),
+        ]
+
+    def test_deltas_follow_incremental_net_book(self) -> None:
+        step = self.book_change_step_list[2]
+        public_mob = PublicMarketOrderBookCache.new_init(**self.market_order_book_cred)
+        public_mob.update_from_clob_mob_list(clob_mob_list=step['clob_mob_list'])
+        house_mob = HouseOrderBookCache.new_init(**self.market_order_book_cred)
+        house_mob.update_reset_from_clob_house_order_list(
+            clob_house_order_list=step['clob_house_order_list']
+        )
+        incremental_net_mob = IncrementalNetBoolMarketOrderBook.new(
+            public_market_order_book=public_mob, house_order_book=house_mob
+        )
+
+        level_delta_list = house_mob.update_iteration_from_ws_message_list(
+            ws_message_list=step['ws_house_message_list'] + self._get_fill_message_list()
+        )
+        assert level_delta_list
+        for asset_id, price1000, size1000_delta, side in level_delta_list:
+            incremental_net_mob.update_house_level_delta1000(
+                asset_id=asset_id, price1000=price1000, size1000_delta=size1000_delta, side=side
+            )
+        incremental_net_mob.validate()
+        assert incremental_net_mob.house_book.equals_book_values(house_mob)
@@ -0,0 +1,99 @@
+import pytest
+
+from anre.config.config import config as anre_config
+from anre.connection.polymarket.api.cache.house_book import HouseOrderBookCache
+from anre.connection.polymarket.api.cache.net_book import (
+    IncrementalNetBoolMarketOrderBook,
+    NetBoolMarketOrderBook,
+)
+from anre.connection.polymarket.api.cache.public_book import PublicMarketOrderBookCache
+from anre.connection.polymarket.api.clob import ClobMarketInfoParser
+from anre.utils import testutil
+from anre.utils.Json.Json import Json
+
+
+class TestIncrementalNetBoolMarketOrderBook(testutil.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        _file_path = anre_config.path.get_path_to_root_dir(
+            'src/anre/connection/polymarket/api/cache/tests/resources/book_change_step_list.json'
+        )
+        book_change_step_list = Json.load(path=_file_path)
+        cls.book_change_step_list = book_change_step_list
+        bool_market_cred = ClobMarketInfoParser.get_bool_market_cred(
+            market_info=book_change_step_list[0]['clob_market_info_dict']
+        )
+        cls.market_order_book_cred = bool_market_cred.to_dict()
+
+    def _get_house_mob(self, step_nr: int) -> HouseOrderBookCache:
+        house_mob = HouseOrderBookCache.new_init(**self.market_order_book_cred)
+        house_mob.update_reset_from_clob_house_order_list(
+            clob_house_order_list=self.book_change_step_list[step_nr]['clob_house_order_list']
+        )
+        return house_mob
+
+    def test_reset_matches_net_book(self) -> None:
+        for step_nr in [1, 2, 3]:
+            public_mob = PublicMarketOrderBookCache.new_init(**self.market_order_book_cred)
+            public_mob.update_from_clob_mob_list(
+                clob_mob_list=self.book_change_step_list[step_nr]['clob_mob_list']
+            )
+            house_mob = self._get_house_mob(step_nr=step_nr)
+
+            net_mob = NetBoolMarketOrderBook.new(
+                public_market_order_book=public_mob, house_order_book=house_mob, validate=True
+            )
+            incremental_net_mob = IncrementalNetBoolMarketOrderBook.new(
+                public_market_order_book=public_mob, house_order_book=house_mob, validate=True
+            )
+            assert incremental_net_mob.net_book.equals_book_values(net_mob)
+            assert (
+                incremental_net_mob.get_main_asset_best_price1000s()
+                == net_mob.get_main_asset_best_price1000s()
+            )
+
+    def test_ws_messages_and_house_deltas(self) -> None:
+        step = self.book_change_step_list[2]
+        house_mob = self._get_house_mob(step_nr=2)
+
+        ws_public_mob = PublicMarketOrderBookCache.new_init(**self.market_order_book_cred)
+        ws_public_mob.update_from_ws_message_list(ws_message_list=step['ws_market_message_list'])
+        net_mob = NetBoolMarketOrderBook.new(
+            public_market_order_book=ws_public_mob, house_order_book=house_mob, validate=True
+        )
+
+        incremental_net_mob = IncrementalNetBoolMarketOrderBook(**self.market_order_book_cred)
+        incremental_net_mob.update_reset_house_book(house_mob)
+        incremental_net_mob.update_from_public_ws_message_list(
+            ws_message_list=step['ws_market_message_list'], validate=True
+        )
+        assert incremental_net_mob.net_book.equals_book_values(net_mob)
+        assert incremental_net_mob.public_book.equals_book_values(ws_public_mob)
+
+        # old messages are rejected
+        with pytest.raises(AssertionError):
+            incremental_net_mob.update_from_public_ws_message_list(
+                ws_message_list=step['ws_market_message_list'][-1:]
+            )
+
+        # house order is removed from the counter asset side: net gets the level back
+        snapshot = incremental_net_mob.get_net_book_snapshot()
+        counter_asset_id = self.market_order_book_cred['counter_asset_id']
+        house_counter_book1000 = incremental_net_mob.house_book.get_asset_book1000(counter_asset_id)
+        price1000s, size1000s = house_counter_book1000.get_levels('BUY')
+        assert len(price1000s) > 0
+        price1000, size1000 = int(price1000s[0]), int(size1000s[0])
+        net_size1000 = incremental_net_mob.net_book.get_asset_book1000(
+            counter_asset_id
+        ).get_size1000(price1000=price1000, side='BUY')
+        incremental_net_mob.update_house_level_delta1000(
+            asset_id=counter_asset_id, price1000=price1000, size1000_delta=-size1000, side='BUY'
+        )
+        incremental_net_mob.validate()
+        assert (
+            incremental_net_mob.net_book.get_asset_book1000(counter_asset_id).get_size1000(
+                price1000=price1000, side='BUY'
+            )
+            == net_size1000 + size1000
+        )
+        assert not snapshot.equals_book_values(incremental_net_mob.net_book)
@@ -0,0 +1,74 @@
+from anre.config.config import config as anre_config
+from anre.connection.polymarket.api.cache.house_book import HouseOrderBookCache
+from anre.connection.polymarket.api.cache.mirror_book import MirrorBoolMarketOrderBook
+from anre.connection.polymarket.api.cache.public_book import PublicMarketOrderBookCache
+from anre.connection.polymarket.api.clob import ClobMarketInfoParser
+from anre.utils import testutil
+from anre.utils.Json.Json import Json
+
+
+class TestMirrorBoolMarketOrderBook(testutil.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        _file_path = anre_config.path.get_path_to_root_dir(
+            'src/anre/connection/polymarket/api/cache/tests/resources/book_change_step_list.json'
+        )
+        book_change_step_list = Json.load(path=_file_path)
+        cls.book_change_step_list = book_change_step_list
+        bool_market_cred = ClobMarketInfoParser.get_bool_market_cred(
+            market_info=book_change_step_list[0]['clob_market_info_dict']
+        )
+        cls.market_order_book_cred = bool_market_cred.to_dict()
+
+    def test_public_and_house(self) -> None:
+        step = self.book_change_step_list[2]
+
+        public_mob = PublicMarketOrderBookCache.new_init(**self.market_order_book_cred)
+        public_mob.update_from_clob_mob_list(clob_mob_list=step['clob_mob_list'], validate=True)
+        mirror_public_mob = MirrorBoolMarketOrderBook.new_from_bool_market_order_book(public_mob)
+        mirror_public_mob.validate()
+        assert mirror_public_mob.equals_book_values(public_mob)
+        assert (
+            mirror_public_mob.get_main_asset_best_price1000s()
+            == public_mob.get_main_asset_best_price1000s()
+        )
+        assert (
+            mirror_public_mob.counter_asset_book.book1000.to_book1000()
+            == public_mob.counter_asset_book.book1000
+        )
+
+        house_mob = HouseOrderBookCache.new_init(**self.market_order_book_cred)
+        house_mob.update_reset_from_clob_house_order_list(
+            clob_house_order_list=step['clob_house_order_list'], validate=True
+        )
+        mirror_house_mob = house_mob.get_mirror_book()
+        assert mirror_house_mob.equals_book_values(house_mob)
+
+        net_mob = public_mob.sub(house_mob.to_bool_market_order_book(), validate=True)
+        mirror_net_mob = mirror_public_mob.sub(mirror_house_mob, validate=True)
+        assert mirror_net_mob.equals_book_values(net_mob)
+        assert mirror_public_mob.sub(house_mob).equals_book_values(net_mob)
+
+    def test_counter_view_updates(self) -> None:
+        mob = MirrorBoolMarketOrderBook.new_init(**self.market_order_book_cred)
+        main_book1000 = mob.main_asset_book.book1000
+        counter_book1000 = mob.counter_asset_book.book1000
+
+        counter_book1000.update_overwrite(price=0.4, size=12.5, side='BUY')
+        assert main_book1000.asks[600] == 12500
+        assert counter_book1000.bids[400] == 12500
+        assert mob.get_main_asset_best_price1000s() == (0, 600)
+        assert counter_book1000.get_best_price1000s() == (400, 1000)
+
+        main_book1000.update_add1000(price1000=550, size1000=2000, side='BUY')
+        assert counter_book1000.asks[450] == 2000
+        assert counter_book1000.get_depth_size1000('SELL', 400, 500) == 2000
+        price1000s, size1000s = counter_book1000.get_levels('BUY')
+        assert price1000s.tolist() == [400] and size1000s.tolist() == [12500]
+
+        mob_copy = mob.copy()
+        mob_copy.validate()
+        assert mob_copy == mob
+        mob_copy.counter_asset_book.book1000.update_overwrite1000(400, 0, 'BUY')
+        assert mob_copy != mob
+        assert mob_copy.get_main_asset_best_price1000s() == (550, 1000)
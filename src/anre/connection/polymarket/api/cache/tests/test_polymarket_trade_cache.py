@@ -106,3 +106,78 @@ class TestPolymarketTradeCache(testutil.TestCase):
         assert position_by_outcome_tuple_2 == data_position_by_outcome_tuple_2
         assert position_by_outcome_tuple_2 == clob_position_by_outcome_tuple_2
         assert position_by_outcome_tuple_2 == ws_position_by_outcome_tuple_2
+
+    def test_incremental_after_cursor(self) -> None:
+        trade_change_step_list = self.trade_change_step_list
+        condition_id = trade_change_step_list[0]['clob_market_info_dict']['condition_id']
+
+        house_trade_cache = HouseTradeCache(condition_id=condition_id)
+        assert house_trade_cache.get_after_timestamp() is None
+        house_trade_cache.update_from_clob_trade_dict_list(
+            trade_change_step_list[0]['clob_trade_list']
+        )
+        for step in trade_change_step_list[1:]:
+            # only the trades after the cursor are fetched
+            after = house_trade_cache.get_after_timestamp()
+            clob_trade_dict_list = [
+                el for el in step['clob_trade_list'] if int(el['match_time']) > after
+            ]
+            assert len(clob_trade_dict_list) < len(step['clob_trade_list'])
+            house_trade_cache.update_from_clob_trade_dict_list(clob_trade_dict_list)
+
+            position_by_outcome_dict = {el['outcome']: el['size'] for el in step['position_list']}
+            assert house_trade_cache.get_position_by_outcome() == (
+                position_by_outcome_dict['Yes'],
+                position_by_outcome_dict['No'],
+            )
+            full_house_trade_cache = HouseTradeCache(condition_id=condition_id)
+            full_house_trade_cache.update_from_clob_trade_dict_list(step['clob_trade_list'])
+            assert (
+                house_trade_cache.get_house_trade_rec_dict()
+                == full_house_trade_cache.get_house_trade_rec_dict()
+            )
+
+        # the trade is MINED, it is not final, the cursor stays before it
+        pending_timestamp = min(
+            int(el['match_time'])
+            for el in trade_change_step_list[-1]['clob_trade_list']
+            if el['status'] not in ['CONFIRMED', 'FAILED']
+        )
+        assert house_trade_cache.get_after_timestamp() == pending_timestamp - 1
+
+    def test_matched_then_failed(self) -> None:
+        trade_change_step_list = self.trade_change_step_list
+        condition_id = trade_change_step_list[0]['clob_market_info_dict']['condition_id']
+        clob_trade_dict = [
+            el
+            for el in trade_change_step_list[0]['clob_trade_list']
+            if el['trader_side'] == 'TAKER'
+        ][0]
+
+        house_trade_cache = HouseTradeCache(condition_id=condition_id)
+        house_trade_cache.update_from_clob_trade_dict_list([
+            {**clob_trade_dict, 'status': 'MATCHED'}
+        ])
+        assert house_trade_cache.get_position_by_outcome() == (-33.0, 0.0)
+        match_time = int(clob_trade_dict['match_time'])
+        assert house_trade_cache.get_after_timestamp() == match_time - 1
+
+        # the trade fails: it is out of the position and the cursor is not held by it anymore
+        house_trade_cache.update_from_clob_trade_dict_list([
+            {**clob_trade_dict, 'status': 'FAILED'}
+        ])
+        assert house_trade_cache.get_position_by_outcome() == (0.0, 0.0)
+        assert house_trade_cache.get_house_trade_rec_dict() == {}
+        assert house_trade_cache.get_after_timestamp() == match_time - 1
+
+        # a later trade moves the cursor
+        house_trade_cache.update_from_clob_trade_dict_list([
+            {
+                **clob_trade_dict,
+                'status': 'CONFIRMED',
+                'match_time': str(match_time + 10),
+                'transaction_hash': '0x01',
+            }
+        ])
+        assert house_trade_cache.get_position_by_outcome() == (-33.0, 0.0)
+        assert house_trade_cache.get_after_timestamp() == match_time + 9
@@ -3,10 +3,16 @@ import time
 from anre.config.config import config as anre_config
 from anre.connection.polymarket.api.clob import ClobClient
 from anre.connection.polymarket.api.data import DataClient
+from anre.connection.polymarket.api.websocket.decode import to_ws_dict
 from anre.connection.polymarket.api.websocket.websocket import PolymarketWebSocket
 from anre.utils.Json.Json import Json
 
 
+def _get_peek_dict_list(ws: PolymarketWebSocket) -> list[dict]:
+    # decoded records are stored as the raw messages, so the json can be dumped and replayed
+    return [to_ws_dict(message) for message in ws.messenger.get_peek_messages()]
+
+
 def run_book_steps_and_save_to_file(overwrite: bool = False):
     condition_id = '0xae546fe6f033bb5f9f7904bff4dbb142659953229c458ec0d0726d4c0c32f65f'  # condition_id = '0xae546fe6f033bb5f9f7904bff4dbb142659953229c458ec0d0726d4c0c32f65f'
     clob_client = ClobClient()
@@ -54,8 +60,8 @@ def run_book_steps_and_save_to_file(overwrite: bool = False):
     house_ws.start()
 
     time.sleep(1)
-    ws_market_message_list_1 = market_ws.messenger.get_peek_messages()
-    ws_house_message_list_1 = house_ws.messenger.get_peek_messages()
+    ws_market_message_list_1 = _get_peek_dict_list(market_ws)
+    ws_house_message_list_1 = _get_peek_dict_list(house_ws)
 
     # sukuriam dar du orderius
     place_resp = clob_client.place_order(
@@ -92,8 +98,8 @@ def run_book_steps_and_save_to_file(overwrite: bool = False):
     # pasiimam nuotrauka
     clob_mob_list_2 = clob_client.get_mob_dict_list(token_ids=asset_ids)
     clob_house_order_list_2 = clob_client.get_house_order_dict_list(condition_id=condition_id)
-    ws_market_message_list_2 = market_ws.messenger.get_peek_messages()
-    ws_house_message_list_2 = house_ws.messenger.get_peek_messages()
+    ws_market_message_list_2 = _get_peek_dict_list(market_ws)
+    ws_house_message_list_2 = _get_peek_dict_list(house_ws)
 
     # cancel orders
     clob_client.cancel_orders_by_market(condition_id=condition_id)
@@ -104,8 +110,8 @@ def run_book_steps_and_save_to_file(overwrite: bool = False):
     # pasiimam nuotrauka
     clob_mob_list_3 = clob_client.get_mob_dict_list(token_ids=asset_ids)
     clob_house_order_list_3 = clob_client.get_house_order_dict_list(condition_id=condition_id)
-    ws_market_message_list_3 = market_ws.messenger.get_peek_messages()
-    ws_house_message_list_3 = house_ws.messenger.get_peek_messages()
+    ws_market_message_list_3 = _get_peek_dict_list(market_ws)
+    ws_house_message_list_3 = _get_peek_dict_list(house_ws)
 
     book_change_step_list = [
         {
@@ -175,8 +181,8 @@ def run_trade_steps_and_save_to_file(overwrite: bool = False):
     house_ws = PolymarketWebSocket.new_house_orders(condition_ids=[condition_id])
     house_ws.start()
     time.sleep(1)
-    ws_market_message_list_0 = market_ws.messenger.get_peek_messages()
-    ws_house_message_list_0 = house_ws.messenger.get_peek_messages()
+    ws_market_message_list_0 = _get_peek_dict_list(market_ws)
+    ws_house_message_list_0 = _get_peek_dict_list(house_ws)
 
     # perkam
     place_place_resp_1 = clob_client.place_order(
@@ -194,8 +200,8 @@ def run_trade_steps_and_save_to_file(overwrite: bool = False):
     position_list_1 = data_client.get_house_position_dict_list(condition_id=condition_id)
     data_trade_list_1 = data_client.get_house_trade_dict_list(condition_id=condition_id, limit=100)
     clob_trade_list_1 = clob_client.get_house_trade_dict_list(condition_id=condition_id)
-    ws_market_message_list_1 = market_ws.messenger.get_peek_messages()
-    ws_house_message_list_1 = house_ws.messenger.get_peek_messages()
+    ws_market_message_list_1 = _get_peek_dict_list(market_ws)
+    ws_house_message_list_1 = _get_peek_dict_list(house_ws)
 
     # parduodam
     place_place_resp_2 = clob_client.place_order(
@@ -213,8 +219,8 @@ def run_trade_steps_and_save_to_file(overwrite: bool = False):
     position_list_2 = data_client.get_house_position_dict_list(condition_id=condition_id)
     data_trade_list_2 = data_client.get_house_trade_dict_list(condition_id=condition_id, limit=100)
     clob_trade_list_2 = clob_client.get_house_trade_dict_list(condition_id=condition_id)
-    ws_market_message_list_2 = market_ws.messenger.get_peek_messages()
-    ws_house_message_list_2 = house_ws.messenger.get_peek_messages()
+    ws_market_message_list_2 = _get_peek_dict_list(market_ws)
+    ws_house_message_list_2 = _get_peek_dict_list(house_ws)
 
     # clean up
     clob_client.cancel_orders_by_market(condition_id=condition_id)
@@ -0,0 +1,3 @@
+from .market_catalogue import MarketCatalogue
+
+__all__ = ["MarketCatalogue"]
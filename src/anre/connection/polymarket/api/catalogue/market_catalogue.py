@@ -0,0 +1,355 @@
+import datetime
+import json
+import os
+import sqlite3
+import threading
+from typing import Any, Iterable
+
+from anre.config.config import config as anre_config
+from anre.connection.polymarket.api.clob import ClobClient
+from anre.connection.polymarket.api.gamma import GammaClient
+
+_END_CURSOR = "LTE="
+_DATE_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS market (
+    source TEXT NOT NULL,
+    condition_id TEXT NOT NULL,
+    slug TEXT,
+    end_date TEXT,
+    active INTEGER,
+    closed INTEGER,
+    updated_at TEXT,
+    info TEXT NOT NULL,
+    PRIMARY KEY (source, condition_id)
+);
+CREATE INDEX IF NOT EXISTS market_slug_idx ON market (slug);
+CREATE INDEX IF NOT EXISTS market_end_date_idx ON market (source, end_date);
+CREATE TABLE IF NOT EXISTS market_token (
+    source TEXT NOT NULL,
+    token_id TEXT NOT NULL,
+    condition_id TEXT NOT NULL,
+    PRIMARY KEY (source, token_id)
+);
+CREATE INDEX IF NOT EXISTS market_token_condition_idx ON market_token (source, condition_id);
+CREATE TABLE IF NOT EXISTS sync_state (
+    source TEXT PRIMARY KEY,
+    cursor TEXT,
+    updated_at TEXT,
+    sync_time TEXT NOT NULL
+);
+"""
+
+
+class MarketCatalogue:
+    """Local (sqlite) copy of the market universe with incremental sync
+
+    Sources are kept separately, because the schemas differ:
+        - 'clob' - `ClobClient.get_market_info_list`. New markets are appended to the end of the
+          list, so the sync resumes from the cursor of the last page. Changes of the already stored
+          markets are picked only by `sync_clob(full=True)`.
+        - 'clob_sampling' - `ClobClient.get_sampling_market_info_list`. Small set that changes
+          as a whole, it is replaced on every sync.
+        - 'gamma' - `GammaClient.get_markets_query`. Pages are ordered by `updatedAt`
+          (descending) and the sync stops at the last seen `updatedAt`.
+
+    Markets are indexed by condition_id, token_id, slug and end date, `get_market_info_list`
+    answers filtered queries without HTTP.
+    """
+
+    SOURCES = ('clob', 'clob_sampling', 'gamma')
+
+    def __init__(
+        self,
+        path: str | None = None,
+        clob_client: ClobClient | None = None,
+        gamma_client: GammaClient | None = None,
+    ):
+        if path is None:
+            path = anre_config.path.get_path_to_cache_dir('polymarket', 'market_catalogue.sqlite')
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._path = path
+        self._clob_client = clob_client
+        self._gamma_client = gamma_client
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.row_factory = sqlite3.Row
+        with self._connection:
+            self._connection.executescript(_SCHEMA)
+
+    def __enter__(self) -> 'MarketCatalogue':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        self._connection.close()
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    def _get_clob_client(self) -> ClobClient:
+        if self._clob_client is None:
+            self._clob_client = ClobClient()
+        return self._clob_client
+
+    def _get_gamma_client(self) -> GammaClient:
+        if self._gamma_client is None:
+            self._gamma_client = GammaClient()
+        return self._gamma_client
+
+    ### sync
+
+    def sync(self, sources: Iterable[str] = SOURCES) -> dict[str, int]:
+        """Sync given sources. Returns the number of downloaded markets by source"""
+        sync_func_dict = {
+            'clob': self.sync_clob,
+            'clob_sampling': self.sync_clob_sampling,
+            'gamma': self.sync_gamma,
+        }
+        return {source: sync_func_dict[source]() for source in sources}
+
+    def sync_clob(self, full: bool = False) -> int:
+        """Pages are fetched by `ClobClient.get_market_info_chunk` (`clob_markets` rate limit)
+
+        A page that gets 429 is retried after the backoff. An interrupted sync resumes from the
+        last stored cursor.
+        """
+        client = self._get_clob_client()
+        state = self.get_sync_state('clob')
+        cursor = '' if full or state is None else state['cursor']
+        count = 0
+        while cursor != _END_CURSOR:
+            chunk = client.get_market_info_chunk(cursor=cursor)
+            market_info_list = chunk['data']
+            with self._lock, self._connection:
+                self._upsert_market_info_list('clob', market_info_list)
+                if chunk['next_cursor'] != _END_CURSOR:
+                    # interrupted sync is resumed from here
+                    self._set_sync_state('clob', cursor=chunk['next_cursor'])
+                else:
+                    # the last page is not full yet, the next sync starts from it
+                    self._set_sync_state('clob', cursor=cursor)
+            count += len(market_info_list)
+            cursor = chunk['next_cursor']
+        return count
+
+    def sync_clob_sampling(self) -> int:
+        market_info_list = self._get_clob_client().get_sampling_market_info_list()
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM market WHERE source = 'clob_sampling'")
+            self._connection.execute("DELETE FROM market_token WHERE source = 'clob_sampling'")
+            self._upsert_market_info_list('clob_sampling', market_info_list)
+            self._set_sync_state('clob_sampling')
+        return len(market_info_list)
+
+    def sync_gamma(self, full: bool = False, page_size: int = 500) -> int:
+        client = self._get_gamma_client()
+        state = self.get_sync_state('gamma')
+        last_updated_at = None if full or state is None else state['updated_at']
+        max_updated_at = last_updated_at
+        count = 0
+        offset = 0
+        while True:
+            market_info_list = client.get_markets_query({
+                'limit': page_size,
+                'offset': offset,
+                'order': 'updatedAt',
+                'ascending': False,
+            })
+            offset += len(market_info_list)
+            new_market_info_list = [
+                market_info
+                for market_info in market_info_list
+                if last_updated_at is None or market_info['updatedAt'] > last_updated_at
+            ]
+            with self._lock, self._connection:
+                self._upsert_market_info_list('gamma', new_market_info_list)
+            count += len(new_market_info_list)
+            for market_info in new_market_info_list:
+                if max_updated_at is None or market_info['updatedAt'] > max_updated_at:
+                    max_updated_at = market_info['updatedAt']
+            if len(market_info_list) < page_size or len(new_market_info_list) < len(
+                market_info_list
+            ):
+                break
+
+        # the watermark is moved only after the whole delta is stored
+        with self._lock, self._connection:
+            self._set_sync_state('gamma', updated_at=max_updated_at)
+        return count
+
+    def get_sync_state(self, source: str) -> dict | None:
+        assert source in self.SOURCES, f'unknown source: {source}'
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT cursor, updated_at, sync_time FROM sync_state WHERE source = ?", (source,)
+            ).fetchone()
+        return dict(row) if row is not None else None
+
+    def _set_sync_state(self, source: str, cursor: str = None, updated_at: str = None):
+        self._connection.execute(
+            "INSERT OR REPLACE INTO sync_state (source, cursor, updated_at, sync_time)"
+            " VALUES (?, ?, ?, ?)",
+            (
+                source,
+                cursor,
+                updated_at,
+                datetime.datetime.now(datetime.timezone.utc).strftime(_DATE_FORMAT),
+            ),
+        )
+
+    def _upsert_market_info_list(self, source: str, market_info_list: list[dict]):
+        market_row_list = []
+        token_row_list = []
+        for market_info in market_info_list:
+            row = self._get_market_row(source, market_info)
+            condition_id = row[1]
+            if not condition_id:
+                # e.g. gamma markets that are not deployed yet
+                continue
+            market_row_list.append(row)
+            for token_id in self._get_token_ids(source, market_info):
+                token_row_list.append((source, token_id, condition_id))
+        self._connection.executemany(
+            "INSERT OR REPLACE INTO market"
+            " (source, condition_id, slug, end_date, active, closed, updated_at, info)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            market_row_list,
+        )
+        self._connection.executemany(
+            "INSERT OR REPLACE INTO market_token (source, token_id, condition_id) VALUES (?, ?, ?)",
+            token_row_list,
+        )
+
+    @staticmethod
+    def _get_market_row(source: str, market_info: dict) -> tuple:
+        if source == 'gamma':
+            condition_id = market_info['conditionId']
+            slug = market_info.get('slug')
+            end_date = market_info.get('endDate')
+            updated_at = market_info.get('updatedAt')
+        elif source in ['clob', 'clob_sampling']:
+            condition_id = market_info['condition_id']
+            slug = market_info.get('market_slug')
+            end_date = market_info.get('end_date_iso')
+            updated_at = None
+        else:
+            raise ValueError(f'unknown source: {source}')
+        active = market_info.get('active')
+        closed = market_info.get('closed')
+        return (
+            source,
+            condition_id,
+            slug,
+            end_date,
+            None if active is None else int(active),
+            None if closed is None else int(closed),
+            updated_at,
+            json.dumps(market_info),
+        )
+
+    @staticmethod
+    def _get_token_ids(source: str, market_info: dict) -> list[str]:
+        if source == 'gamma':
+            token_ids = market_info.get('clobTokenIds') or []
+            if isinstance(token_ids, str):
+                token_ids = json.loads(token_ids)
+            return [str(token_id) for token_id in token_ids]
+        return [token['token_id'] for token in market_info.get('tokens', []) if token['token_id']]
+
+    ### query
+
+    def get_market_info_list(
+        self,
+        source: str = 'clob',
+        condition_ids: list[str] | None = None,
+        token_ids: list[str] | None = None,
+        slug: str | None = None,
+        active: bool | None = None,
+        closed: bool | None = None,
+        end_date_min: str | datetime.datetime | None = None,
+        end_date_max: str | datetime.datetime | None = None,
+        limit: int | None = None,
+    ) -> list[dict]:
+        """Stored market infos (as returned by the source api), ordered by end date"""
+        assert source in self.SOURCES, f'unknown source: {source}'
+        where_list = ['market.source = ?']
+        param_list: list[Any] = [source]
+        if condition_ids is not None:
+            where_list.append(f"market.condition_id IN ({', '.join('?' * len(condition_ids))})")
+            param_list.extend(condition_ids)
+        if token_ids is not None:
+            where_list.append(
+                "market.condition_id IN (SELECT condition_id FROM market_token"
+                f" WHERE source = ? AND token_id IN ({', '.join('?' * len(token_ids))}))"
+            )
+            param_list.append(source)
+            param_list.extend(token_ids)
+        if slug is not None:
+            where_list.append('market.slug = ?')
+            param_list.append(slug)
+        if active is not None:
+            where_list.append('market.active = ?')
+            param_list.append(int(active))
+        if closed is not None:
+            where_list.append('market.closed = ?')
+            param_list.append(int(closed))
+        if end_date_min is not None:
+            where_list.append('market.end_date >= ?')
+            param_list.append(self._to_date_str(end_date_min))
+        if end_date_max is not None:
+            where_list.append('market.end_date <= ?')
+            param_list.append(self._to_date_str(end_date_max))
+
+        query = (
+            f"SELECT info FROM market WHERE {' AND '.join(where_list)}"
+            " ORDER BY market.end_date, market.condition_id"
+        )
+        if limit is not None:
+            query += ' LIMIT ?'
+            param_list.append(limit)
+        with self._lock:
+            row_list = self._connection.execute(query, param_list).fetchall()
+        return [json.loads(row['info']) for row in row_list]
+
+    def get_market_info(self, condition_id: str, source: str = 'clob') -> dict | None:
+        market_info_list = self.get_market_info_list(source=source, condition_ids=[condition_id])
+        return market_info_list[0] if market_info_list else None
+
+    def get_condition_id_by_token_id(self, token_id: str, source: str = 'clob') -> str | None:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT condition_id FROM market_token WHERE source = ? AND token_id = ?",
+                (source, token_id),
+            ).fetchone()
+        return row['condition_id'] if row is not None else None
+
+    def count(self, source: str = 'clob') -> int:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT COUNT(*) AS n FROM market WHERE source = ?", (source,)
+            ).fetchone()
+        return row['n']
+
+    @staticmethod
+    def _to_date_str(value: str | datetime.datetime) -> str:
+        if isinstance(value, datetime.datetime):
+            return value.strftime(_DATE_FORMAT)
+        return value
+
+
+def __demo__():
+    catalogue = MarketCatalogue()
+    catalogue.sync(sources=['clob', 'clob_sampling'])
+    catalogue.get_sync_state('clob')
+
+    end_date_min = datetime.datetime.now() + datetime.timedelta(days=20)
+    market_info_list = catalogue.get_market_info_list(
+        source='clob', active=True, closed=False, end_date_min=end_date_min
+    )
+    len(market_info_list)
@@ -0,0 +1,151 @@
+import os
+import tempfile
+from unittest import mock
+
+from py_clob_client.client import ClobClient as ClobInternalClient
+
+from anre.connection.polymarket.api.catalogue import MarketCatalogue
+from anre.connection.polymarket.api.clob import ClobClient
+from anre.connection.polymarket.api.rate_limiter import TokenBucketRateLimiter, _rate_limiter_dict
+from anre.utils import testutil
+
+
+def _get_clob_market_info(nr: int) -> dict:
+    return {
+        'condition_id': f'0x{nr:04d}',
+        'market_slug': f'market-{nr}',
+        'end_date_iso': f'2025-01-{nr % 28 + 1:02d}T00:00:00Z',
+        'active': True,
+        'closed': nr % 2 == 0,
+        'tokens': [
+            {'token_id': f'{nr}1', 'outcome': 'Yes'},
+            {'token_id': f'{nr}2', 'outcome': 'No'},
+        ],
+    }
+
+
+class _ClobClient:
+    """Pages of `page_size` markets, cursor is the offset as in clob api"""
+
+    def __init__(self, market_info_list: list[dict], page_size: int = 3):
+        self.market_info_list = market_info_list
+        self.page_size = page_size
+        self.cursor_list = []
+
+    def get_market_info_chunk(self, cursor: str = '') -> dict:
+        self.cursor_list.append(cursor)
+        offset = int(cursor) if cursor else 0
+        data = self.market_info_list[offset : offset + self.page_size]
+        next_offset = offset + self.page_size
+        next_cursor = str(next_offset) if next_offset < len(self.market_info_list) else 'LTE='
+        return {'data': data, 'next_cursor': next_cursor, 'count': len(data), 'limit': 3}
+
+
+class _GammaClient:
+    def __init__(self, market_info_list: list[dict]):
+        self.market_info_list = market_info_list
+        self.call_count = 0
+
+    def get_markets_query(self, query_params: dict) -> list[dict]:
+        self.call_count += 1
+        market_info_list = sorted(
+            self.market_info_list, key=lambda el: el['updatedAt'], reverse=True
+        )
+        offset, limit = query_params['offset'], query_params['limit']
+        return market_info_list[offset : offset + limit]
+
+
+class TestMarketCatalogue(testutil.TestCase):
+    def setUp(self) -> None:
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self._tmp_dir.name, 'catalogue.sqlite')
+
+    def tearDown(self) -> None:
+        self._tmp_dir.cleanup()
+
+    def test_clob_sync_resumes_from_last_cursor(self) -> None:
+        clob_client = _ClobClient([_get_clob_market_info(nr) for nr in range(7)])
+        with MarketCatalogue(path=self.path, clob_client=clob_client) as catalogue:
+            assert catalogue.sync_clob() == 7
+            assert clob_client.cursor_list == ['', '3', '6']
+            assert catalogue.count('clob') == 7
+
+        # new markets are appended, only the last (not full) page and new pages are fetched
+        clob_client.market_info_list.extend(_get_clob_market_info(nr) for nr in range(7, 11))
+        clob_client.cursor_list.clear()
+        with MarketCatalogue(path=self.path, clob_client=clob_client) as catalogue:
+            assert catalogue.sync_clob() == 5
+            assert clob_client.cursor_list == ['6', '9']
+            assert catalogue.count('clob') == 11
+
+            market_info = catalogue.get_market_info(condition_id='0x0008')
+            assert market_info == _get_clob_market_info(8)
+            assert catalogue.get_condition_id_by_token_id('82') == '0x0008'
+            assert catalogue.get_market_info_list(token_ids=['82', '91']) == [
+                _get_clob_market_info(8),
+                _get_clob_market_info(9),
+            ]
+            assert catalogue.get_market_info_list(slug='market-3') == [_get_clob_market_info(3)]
+
+            market_info_list = catalogue.get_market_info_list(
+                closed=False, end_date_min='2025-01-04', end_date_max='2025-01-10T00:00:00Z'
+            )
+            assert [el['condition_id'] for el in market_info_list] == [
+                '0x0003',
+                '0x0005',
+                '0x0007',
+                '0x0009',
+            ]
+
+    def test_clob_sync_is_rate_limited(self) -> None:
+        class _TooManyRequests(Exception):
+            status_code = 429
+
+        page_client = _ClobClient([_get_clob_market_info(nr) for nr in range(7)])
+        internal_client = mock.create_autospec(ClobInternalClient, instance=True)
+        # 429 in the middle of the sync, the page is retried after the backoff
+        internal_client.get_markets.side_effect = [
+            page_client.get_market_info_chunk(''),
+            _TooManyRequests(),
+            page_client.get_market_info_chunk('3'),
+            page_client.get_market_info_chunk('6'),
+        ]
+        rate_limiter = TokenBucketRateLimiter(rate=0.001, capacity=100, min_backoff_sec=0.01)
+        with (
+            mock.patch.object(ClobClient, '_clob_internal_client', internal_client),
+            mock.patch.dict(_rate_limiter_dict, {'clob_markets': rate_limiter}),
+        ):
+            with MarketCatalogue(path=self.path, clob_client=ClobClient()) as catalogue:
+                assert catalogue.sync_clob() == 7
+                assert catalogue.count('clob') == 7
+        # every page request takes the clob markets budget
+        assert round(rate_limiter.capacity - rate_limiter._tokens) == 4
+
+    def test_gamma_sync_by_updated_at(self) -> None:
+        market_info_list = [
+            {
+                'conditionId': f'0x{nr:04d}',
+                'slug': f'market-{nr}',
+                'endDate': '2025-06-01T00:00:00Z',
+                'updatedAt': f'2025-01-01T00:00:{nr:02d}Z',
+                'clobTokenIds': f'["{nr}1", "{nr}2"]',
+            }
+            for nr in range(5)
+        ]
+        gamma_client = _GammaClient(market_info_list)
+        with MarketCatalogue(path=self.path, gamma_client=gamma_client) as catalogue:
+            assert catalogue.sync_gamma(page_size=2) == 5
+            assert catalogue.get_sync_state('gamma')['updated_at'] == '2025-01-01T00:00:04Z'
+
+            gamma_client.market_info_list[1] = {
+                **market_info_list[1],
+                'slug': 'renamed',
+                'updatedAt': '2025-01-01T00:01:00Z',
+            }
+            gamma_client.call_count = 0
+            assert catalogue.sync_gamma(page_size=2) == 1
+            assert gamma_client.call_count == 1
+            assert catalogue.count('gamma') == 5
+            assert catalogue.get_market_info_list(source='gamma', slug='market-1') == []
+            assert catalogue.get_market_info_list(source='gamma', slug='renamed')
+            assert catalogue.get_condition_id_by_token_id('12', source='gamma') == '0x0001'
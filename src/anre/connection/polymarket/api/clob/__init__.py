@@ -1,4 +1,12 @@
+from .async_client import AsyncClobClient
 from .client import ClobClient
+from .order_signer import OrderSigner
 from .parse import ClobMarketInfoParser, ClobTradeParser
 
-__all__ = ["ClobClient", "ClobTradeParser", "ClobMarketInfoParser"]
+__all__ = [
+    "AsyncClobClient",
+    "ClobClient",
+    "OrderSigner",
+    "ClobTradeParser",
+    "ClobMarketInfoParser",
+]
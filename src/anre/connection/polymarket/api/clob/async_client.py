@@ -0,0 +1,365 @@
+import asyncio
+import json
+from functools import partial
+from typing import Any, Callable, Literal, Optional
+
+import httpx
+from py_clob_client.clob_types import (
+    OpenOrderParams,
+    OrderArgs,
+    OrderType,
+    RequestArgs,
+    TradeParams,
+)
+from py_clob_client.endpoints import (
+    CANCEL_ALL,
+    CANCEL_MARKET_ORDERS,
+    CANCEL_ORDERS,
+    GET_MARKET,
+    GET_ORDER,
+    GET_ORDER_BOOK,
+    GET_ORDER_BOOKS,
+    ORDERS,
+    POST_ORDER,
+    TIME,
+    TRADES,
+)
+from py_clob_client.exceptions import PolyApiException
+from py_clob_client.headers.headers import create_level_2_headers
+from py_clob_client.http_helpers.helpers import (
+    add_query_open_orders_params,
+    add_query_trade_params,
+)
+from py_clob_client.utilities import order_to_json
+
+from anre.connection.polymarket.api.clob.client import ClobClient
+from anre.connection.polymarket.api.rate_limiter import (
+    ORDER_MAX_RETRY,
+    call_with_rate_limit_async,
+)
+from anre.connection.polymarket.api.recorder.recorder import get_market_data_recorder
+
+_END_CURSOR = "LTE="
+
+
+class AsyncClobClient:
+    """Asyncio version of `ClobClient` (same method names and arguments, but coroutines)
+
+    Requests go through one `httpx.AsyncClient` with a pool of keep-alive connections, so TLS
+    handshake is paid once per connection, not per request. The number of requests in flight is
+    limited by `max_concurrency`. Every request takes the process wide rate limit of its endpoint
+    group (shared with the sync client), 429 responses are retried after the group backoff.
+    Signing and order building are reused from the sync client.
+
+    Usage:
+        async with AsyncClobClient() as client:
+            mob_dict_list, order_dict_list = await asyncio.gather(
+                client.get_mob_dict_list(token_ids), client.get_house_order_dict_list(condition_id)
+            )
+    """
+
+    def __init__(self, max_concurrency: int = 10, max_connections: int = 20, timeout: float = 10):
+        assert max_concurrency > 0
+        assert max_connections >= max_concurrency
+        self._clob_internal_client = ClobClient()._clob_internal_client
+        self._host: str = self._clob_internal_client.host
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        # http/1.1: http2 needs the optional `h2` package, which is not a dependency
+        self._http_client = httpx.AsyncClient(
+            timeout=timeout,
+            limits=httpx.Limits(
+                max_connections=max_connections, max_keepalive_connections=max_connections
+            ),
+            headers={
+                "User-Agent": "py_clob_client",
+                "Accept": "*/*",
+                "Connection": "keep-alive",
+                "Content-Type": "application/json",
+            },
+        )
+
+    async def __aenter__(self) -> 'AsyncClobClient':
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    async def close(self):
+        await self._http_client.aclose()
+
+    ### transport
+
+    async def _request(
+        self,
+        rate_limit_group: str,
+        method: str,
+        request_path: str,
+        body: Any = None,
+        url: Optional[str] = None,
+        auth: bool = False,
+        max_retry: int = 5,
+    ) -> Any:
+        """Single request within the `rate_limit_group` budget (retried on 429)"""
+        return await call_with_rate_limit_async(
+            rate_limit_group,
+            self._request_once,
+            max_retry=max_retry,
+            method=method,
+            request_path=request_path,
+            body=body,
+            url=url,
+            auth=auth,
+        )
+
+    async def _request_once(
+        self,
+        method: str,
+        request_path: str,
+        body: Any = None,
+        url: Optional[str] = None,
+        auth: bool = False,
+    ) -> Any:
+        """Body is serialized once, the same bytes are signed and sent"""
+        url = url if url is not None else f"{self._host}{request_path}"
+        content = None
+        if body is not None:
+            content = json.dumps(body, separators=(",", ":"), ensure_ascii=False)
+        headers = {}
+        if method == 'GET':
+            headers["Accept-Encoding"] = "gzip"
+        if auth:
+            self._clob_internal_client.assert_level_2_auth()
+            request_args = RequestArgs(
+                method=method, request_path=request_path, body=body, serialized_body=content
+            )
+            headers.update(
+                create_level_2_headers(
+                    self._clob_internal_client.signer,
+                    self._clob_internal_client.creds,
+                    request_args,
+                )
+            )
+
+        async with self._semaphore:
+            try:
+                resp = await self._http_client.request(
+                    method=method,
+                    url=url,
+                    headers=headers,
+                    content=content.encode("utf-8") if content is not None else None,
+                )
+            except httpx.RequestError:
+                raise PolyApiException(error_msg="Request exception!")
+
+        if resp.status_code != 200:
+            raise PolyApiException(resp)
+        try:
+            return resp.json()
+        except ValueError:
+            return resp.text
+
+    async def _collect_chunks(
+        self,
+        fun: Callable,
+        cursor: str | int = "",
+        sleep_time: float = 0,
+        chunk_limit: int = None,
+    ) -> list[dict]:
+        """Collect all pages. Pages are fetched as fast as the rate limit of the chunk allows
+
+        `sleep_time` is an extra pause between pages (it is not needed for the rate limit).
+        """
+        assert sleep_time >= 0
+        data = []
+        count = 0
+        while cursor != _END_CURSOR:
+            count += 1
+            result = await fun(cursor=cursor)
+            data.extend(result['data'])
+            cursor = result['next_cursor']
+            if chunk_limit is not None and count >= chunk_limit:
+                break
+            if cursor != _END_CURSOR and sleep_time > 0:
+                await asyncio.sleep(sleep_time)
+        return data
+
+    ### public
+
+    async def get_server_time(self) -> int:
+        return await self._request('clob_public', 'GET', TIME)
+
+    async def get_single_market_info(self, condition_id: str) -> dict:
+        return await self._request('clob_public', 'GET', f"{GET_MARKET}{condition_id}")
+
+    async def get_single_mob_dict(self, token_id: str) -> dict:
+        return await self._request(
+            'clob_public',
+            'GET',
+            GET_ORDER_BOOK,
+            url=f"{self._host}{GET_ORDER_BOOK}?token_id={token_id}",
+        )
+
+    async def get_mob_dict_list(self, token_ids: list[str] | tuple[str, ...]) -> list[dict]:
+        body = [{"token_id": token_id} for token_id in token_ids]
+        mob_dict_list = await self._request('clob_public', 'POST', GET_ORDER_BOOKS, body=body)
+        recorder = get_market_data_recorder()
+        if recorder is not None:
+            recorder.record_rest_books(mob_dict_list)
+        return mob_dict_list
+
+    ### house
+
+    async def get_single_house_order_dict(self, order_id: str = None) -> dict:
+        return await self._request('clob_house', 'GET', f"{GET_ORDER}{order_id}", auth=True)
+
+    async def get_house_order_dict_chunk(
+        self,
+        order_id: str = None,
+        condition_id: str = None,
+        asset_id: str = None,
+        cursor: str | int = "",
+    ) -> dict:
+        if isinstance(cursor, int):
+            cursor = ClobClient.number_to_cursor(cursor)
+        params = OpenOrderParams(id=order_id, market=condition_id, asset_id=asset_id)
+        url = add_query_open_orders_params(f"{self._host}{ORDERS}", params, cursor)
+        return await self._request('clob_house', 'GET', ORDERS, url=url, auth=True)
+
+    async def get_house_order_dict_list(
+        self,
+        order_id: str = None,
+        condition_id: str = None,
+        asset_id: str = None,
+        cursor: str | int = "",
+        sleep_time: float = 0,
+        chunk_limit: int = None,
+    ) -> list[dict]:
+        return await self._collect_chunks(
+            fun=partial(
+                self.get_house_order_dict_chunk,
+                order_id=order_id,
+                condition_id=condition_id,
+                asset_id=asset_id,
+            ),
+            cursor=cursor,
+            sleep_time=sleep_time,
+            chunk_limit=chunk_limit,
+        )
+
+    async def get_house_trade_dict_chunk(
+        self,
+        id: str = None,
+        maker_address: str = None,
+        market: str = None,
+        asset_id: str = None,
+        before: int = None,
+        after: int = None,
+        cursor: str | int = "",
+    ) -> dict:
+        if isinstance(cursor, int):
+            cursor = ClobClient.number_to_cursor(cursor)
+        params = TradeParams(
+            id=id,
+            maker_address=maker_address,
+            market=market,
+            asset_id=asset_id,
+            before=before,
+            after=after,
+        )
+        url = add_query_trade_params(f"{self._host}{TRADES}", params, cursor)
+        return await self._request('clob_house', 'GET', TRADES, url=url, auth=True)
+
+    async def get_house_trade_dict_list(
+        self,
+        id: str = None,
+        maker_address: str = None,
+        condition_id: str = None,
+        asset_id: str = None,
+        before: int = None,
+        after: int = None,
+        cursor: str | int = "",
+        sleep_time: float = 0,
+        chunk_limit: int = None,
+    ) -> list[dict]:
+        return await self._collect_chunks(
+            fun=partial(
+                self.get_house_trade_dict_chunk,
+                id=id,
+                maker_address=maker_address,
+                market=condition_id,
+                asset_id=asset_id,
+                before=before,
+                after=after,
+            ),
+            cursor=cursor,
+            sleep_time=sleep_time,
+            chunk_limit=chunk_limit,
+        )
+
+    ### orders
+
+    async def place_order(
+        self,
+        token_id: str,
+        price: float,
+        size: float,
+        side: Literal["BUY", "SELL"],
+        order_type: str = "GTC",
+    ):
+        assert side in ['BUY', 'SELL']
+        assert order_type in OrderType.__dict__
+        params = OrderArgs(
+            price=price,
+            size=size,
+            side=side,
+            token_id=token_id,
+        )
+        # signing is cpu bound, keep the event loop free
+        signed_order = await asyncio.to_thread(self._clob_internal_client.create_order, params)
+        body = order_to_json(signed_order, self._clob_internal_client.creds.api_key, order_type)
+        return await self._request(
+            'clob_order', 'POST', POST_ORDER, body=body, auth=True, max_retry=ORDER_MAX_RETRY
+        )
+
+    async def cancel_orders_all(self):
+        return await self._request(
+            'clob_order', 'DELETE', CANCEL_ALL, auth=True, max_retry=ORDER_MAX_RETRY
+        )
+
+    async def cancel_orders_by_ids(self, order_ids: list[str]):
+        return await self._request(
+            'clob_order',
+            'DELETE',
+            CANCEL_ORDERS,
+            body=order_ids,
+            auth=True,
+            max_retry=ORDER_MAX_RETRY,
+        )
+
+    async def cancel_orders_by_market(self, condition_id: str = "", asset_id: str = ""):
+        body = {"market": condition_id, "asset_id": asset_id}
+        return await self._request(
+            'clob_order',
+            'DELETE',
+            CANCEL_MARKET_ORDERS,
+            body=body,
+            auth=True,
+            max_retry=ORDER_MAX_RETRY,
+        )
+
+
+def __demo__():
+    token_ids = [
+        '75808883562514695201169204487787555859570951708948163798444132865757266366758',
+        '79733714773966769289571596081594645290144843853077301462790845252981871229351',
+    ]
+
+    async def _main():
+        async with AsyncClobClient() as client:
+            return await asyncio.gather(
+                client.get_server_time(),
+                client.get_mob_dict_list(token_ids),
+                client.get_house_order_dict_list(),
+            )
+
+    server_time, mob_dict_list, house_order_dict_list = asyncio.run(_main())
@@ -11,13 +11,17 @@ from py_clob_client.clob_types import (
     OrderArgs,
     OrderScoringParams,
     OrderType,
+    PostOrdersArgs,
     PriceHistoryArgs,
     TradeParams,
 )
 from py_clob_client.constants import POLYGON
+from py_clob_client.order_builder.builder import SignedOrder
 from py_clob_client.order_builder.constants import BUY, SELL
 
 from anre.config.config import config as anre_config
+from anre.connection.polymarket.api.rate_limiter import ORDER_MAX_RETRY, call_with_rate_limit
+from anre.connection.polymarket.api.recorder.recorder import get_market_data_recorder
 
 assert BUY == 'BUY'
 assert SELL == 'SELL'
@@ -26,6 +30,8 @@ assert SELL == 'SELL'
 class ClobClient:
     _clob_internal_client: Optional[ClobInternalClient] = None
     _house_address = anre_config.cred.get_polymarket_creds()['address']
+    # clob api accepts at most 15 orders per POST /orders
+    POST_ORDERS_MAX_BATCH_SIZE = 15
 
     def __init__(self):
         if self._clob_internal_client is None:
@@ -55,10 +61,14 @@ class ClobClient:
         self,
         fun: Callable,
         cursor: str | int = "",
-        sleep_time: float = 0.5,
+        sleep_time: float = 0,
         chunk_limit: int = None,
     ) -> list[dict]:
-        assert sleep_time >= 0.01
+        """Collect all pages. Pages are fetched as fast as the rate limit of the chunk allows
+
+        `sleep_time` is an extra pause between pages (it is not needed for the rate limit).
+        """
+        assert sleep_time >= 0
         data = []
         count = 0
         while cursor != "LTE=":
@@ -69,17 +79,21 @@ class ClobClient:
             cursor = result['next_cursor']
             if chunk_limit is not None and count >= chunk_limit:
                 break
-            if cursor != "LTE=":
+            if cursor != "LTE=" and sleep_time > 0:
                 time.sleep(sleep_time)
         return data
 
     def get_tick1000(self, token_id: str) -> int:
-        _tick_size = self._clob_internal_client.get_tick_size(token_id=token_id)
+        _tick_size = call_with_rate_limit(
+            'clob_public', self._clob_internal_client.get_tick_size, token_id=token_id
+        )
         tick1000 = int(round(1000 * float(_tick_size)))
         return min(tick1000, 1)
 
     def get_single_market_info(self, condition_id: str) -> dict:
-        return self._clob_internal_client.get_market(condition_id=condition_id)
+        return call_with_rate_limit(
+            'clob_public', self._clob_internal_client.get_market, condition_id=condition_id
+        )
 
     def get_market_info_chunk(self, cursor: str | int = "") -> dict:
         """Get available CLOB markets
@@ -91,10 +105,12 @@ class ClobClient:
         """
         if isinstance(cursor, int):
             cursor = self.number_to_cursor(cursor)
-        return self._clob_internal_client.get_markets(next_cursor=cursor)
+        return call_with_rate_limit(
+            'clob_markets', self._clob_internal_client.get_markets, next_cursor=cursor
+        )
 
     def get_market_info_list(
-        self, cursor: str | int = "", sleep_time=0.5, chunk_limit: int = None
+        self, cursor: str | int = "", sleep_time: float = 0, chunk_limit: int = None
     ) -> list[dict]:
         return self._collect_chunks(
             fun=partial(
@@ -115,10 +131,12 @@ class ClobClient:
         """
         if isinstance(cursor, int):
             cursor = self.number_to_cursor(cursor)
-        return self._clob_internal_client.get_sampling_markets(next_cursor=cursor)
+        return call_with_rate_limit(
+            'clob_markets', self._clob_internal_client.get_sampling_markets, next_cursor=cursor
+        )
 
     def get_sampling_market_info_list(
-        self, cursor: str | int = "", sleep_time=0.5, chunk_limit: int = None
+        self, cursor: str | int = "", sleep_time: float = 0, chunk_limit: int = None
     ) -> list[dict]:
         return self._collect_chunks(
             fun=partial(
@@ -133,10 +151,12 @@ class ClobClient:
         """Get available CLOB markets expressed in a simplified schema. Single chunk."""
         if isinstance(cursor, int):
             cursor = self.number_to_cursor(cursor)
-        return self._clob_internal_client.get_simplified_markets(next_cursor=cursor)
+        return call_with_rate_limit(
+            'clob_markets', self._clob_internal_client.get_simplified_markets, next_cursor=cursor
+        )
 
     def get_simplified_markets_info_list(
-        self, cursor: str | int = "", sleep_time=0.5, chunk_limit: int = None
+        self, cursor: str | int = "", sleep_time: float = 0, chunk_limit: int = None
     ) -> list[dict]:
         return self._collect_chunks(
             fun=partial(
@@ -151,10 +171,14 @@ class ClobClient:
         """Get available CLOB markets expressed in a simplified schema. That have rewards enabled. Single chunk."""
         if isinstance(cursor, int):
             cursor = self.number_to_cursor(cursor)
-        return self._clob_internal_client.get_sampling_simplified_markets(next_cursor=cursor)
+        return call_with_rate_limit(
+            'clob_markets',
+            self._clob_internal_client.get_sampling_simplified_markets,
+            next_cursor=cursor,
+        )
 
     def get_sampling_simplified_markets_info_list(
-        self, cursor: str | int = "", sleep_time=0.5, chunk_limit: int = None
+        self, cursor: str | int = "", sleep_time: float = 0, chunk_limit: int = None
     ) -> list[dict]:
         return self._collect_chunks(
             fun=partial(
@@ -185,7 +209,9 @@ class ClobClient:
             before=before,
             after=after,
         )
-        trades = self._clob_internal_client.get_trades(
+        trades = call_with_rate_limit(
+            'clob_house',
+            self._clob_internal_client.get_trades,
             params=params,
             next_cursor=cursor,
         )
@@ -200,7 +226,7 @@ class ClobClient:
         before: int = None,
         after: int = None,
         cursor: str | int = "",
-        sleep_time=0.5,
+        sleep_time: float = 0,
         chunk_limit: int = None,
     ) -> list[dict]:
         return self._collect_chunks(
@@ -219,7 +245,9 @@ class ClobClient:
         )
 
     def get_single_house_order_dict(self, order_id: str = None) -> dict:
-        return self._clob_internal_client.get_order(order_id=order_id)
+        return call_with_rate_limit(
+            'clob_house', self._clob_internal_client.get_order, order_id=order_id
+        )
 
     def get_house_order_dict_chunk(
         self,
@@ -231,7 +259,9 @@ class ClobClient:
         if isinstance(cursor, int):
             cursor = self.number_to_cursor(cursor)
         params = OpenOrderParams(id=order_id, market=condition_id, asset_id=asset_id)
-        return self._clob_internal_client.get_orders(params, next_cursor=cursor)
+        return call_with_rate_limit(
+            'clob_house', self._clob_internal_client.get_orders, params, next_cursor=cursor
+        )
 
     def get_house_order_dict_list(
         self,
@@ -239,7 +269,7 @@ class ClobClient:
         condition_id: str = None,
         asset_id: str = None,
         cursor: str | int = "",
-        sleep_time=0.5,
+        sleep_time: float = 0,
         chunk_limit: int = None,
     ) -> list[dict]:
         return self._collect_chunks(
@@ -255,19 +285,31 @@ class ClobClient:
         )
 
     def get_single_mob_dict(self, token_id: str) -> dict:
-        return self._clob_internal_client.get_order_book(token_id=token_id)
+        mob_dict = call_with_rate_limit(
+            'clob_public', self._clob_internal_client.get_order_book, token_id=token_id
+        )
+        recorder = get_market_data_recorder()
+        if recorder is not None:
+            recorder.record_rest_books([mob_dict])
+        return mob_dict
 
     def get_mob_dict_list(self, token_ids: list[str] | tuple[str, ...]) -> list[dict]:
-        return self._clob_internal_client.get_order_books(token_ids=token_ids)
+        mob_dict_list = call_with_rate_limit(
+            'clob_public', self._clob_internal_client.get_order_books, token_ids=token_ids
+        )
+        recorder = get_market_data_recorder()
+        if recorder is not None:
+            recorder.record_rest_books(mob_dict_list)
+        return mob_dict_list
 
-    def place_order(
+    def create_signed_order(
         self,
         token_id: str,
         price: float,
         size: float,
         side: Literal["BUY", "SELL"],
-        order_type: str = "GTC",
-    ):
+    ) -> SignedOrder:
+        """Build and sign the order locally (no request), so it can be posted later or in bulk"""
         assert side in ['BUY', 'SELL']
         params = OrderArgs(
             price=price,
@@ -275,20 +317,82 @@ class ClobClient:
             side=side,
             token_id=token_id,
         )
-        signed_order = self._clob_internal_client.create_order(params)
+        return self._clob_internal_client.create_order(params)
+
+    def place_order(
+        self,
+        token_id: str,
+        price: float,
+        size: float,
+        side: Literal["BUY", "SELL"],
+        order_type: str = "GTC",
+    ):
+        signed_order = self.create_signed_order(
+            token_id=token_id, price=price, size=size, side=side
+        )
+        return self.post_order(signed_order=signed_order, order_type=order_type)
+
+    def post_order(self, signed_order: SignedOrder, order_type: str = "GTC") -> dict:
         assert order_type in OrderType.__dict__
-        resp = self._clob_internal_client.post_order(signed_order, order_type)
+        resp = call_with_rate_limit(
+            'clob_order',
+            self._clob_internal_client.post_order,
+            signed_order,
+            order_type,
+            max_retry=ORDER_MAX_RETRY,
+        )
         return resp
 
+    def post_orders(
+        self, signed_order_list: list[SignedOrder], order_type_list: list[str]
+    ) -> list[dict]:
+        """Post many signed orders in bulk requests of at most `POST_ORDERS_MAX_BATCH_SIZE`
+
+        Returns a response per order, in the same order as `signed_order_list`.
+        """
+        assert len(signed_order_list) == len(order_type_list)
+        assert all(order_type in OrderType.__dict__ for order_type in order_type_list)
+        resp_list = []
+        for i in range(0, len(signed_order_list), self.POST_ORDERS_MAX_BATCH_SIZE):
+            args = [
+                PostOrdersArgs(order=signed_order, orderType=order_type)
+                for signed_order, order_type in zip(
+                    signed_order_list[i : i + self.POST_ORDERS_MAX_BATCH_SIZE],
+                    order_type_list[i : i + self.POST_ORDERS_MAX_BATCH_SIZE],
+                )
+            ]
+            resp = call_with_rate_limit(
+                'clob_order',
+                self._clob_internal_client.post_orders,
+                args,
+                max_retry=ORDER_MAX_RETRY,
+            )
+            assert isinstance(resp, list) and len(resp) == len(args), (
+                f'unexpected post_orders response: {resp}'
+            )
+            resp_list.extend(resp)
+        return resp_list
+
     def cancel_orders_all(self):
-        return self._clob_internal_client.cancel_all()
+        return call_with_rate_limit(
+            'clob_order', self._clob_internal_client.cancel_all, max_retry=ORDER_MAX_RETRY
+        )
 
     def cancel_orders_by_ids(self, order_ids: list[str]):
-        return self._clob_internal_client.cancel_orders(order_ids=order_ids)
+        return call_with_rate_limit(
+            'clob_order',
+            self._clob_internal_client.cancel_orders,
+            order_ids=order_ids,
+            max_retry=ORDER_MAX_RETRY,
+        )
 
     def cancel_orders_by_market(self, condition_id: str = "", asset_id: str = ""):
-        return self._clob_internal_client.cancel_market_orders(
-            market=condition_id, asset_id=asset_id
+        return call_with_rate_limit(
+            'clob_order',
+            self._clob_internal_client.cancel_market_orders,
+            market=condition_id,
+            asset_id=asset_id,
+            max_retry=ORDER_MAX_RETRY,
         )
 
     def get_price_history(
@@ -0,0 +1,204 @@
+import logging
+import queue
+import threading
+import time
+from collections import deque
+from typing import Literal
+
+from py_clob_client.order_builder.builder import SignedOrder
+
+from anre.connection.polymarket.api.clob.client import ClobClient
+
+OrderKey = tuple[str, int, int, str]  # token_id, price1000, size1000, side
+
+
+class OrderSigner:
+    """Signs likely orders ahead of time on a background thread
+
+    After an order (token_id, price1000, size1000, side) is taken, the same order and its
+    neighbours (price ±`neighbour_level` steps) are queued for signing, so the next requote
+    around the same level only needs to post. Every signed order has its own salt, so a cached
+    order is used once. Orders older than `max_age_sec` are dropped (tick size and fee rate are
+    resolved at signing time).
+    """
+
+    def __init__(
+        self,
+        clob_client: ClobClient | None = None,
+        step1000: int = 10,
+        neighbour_level: int = 2,
+        depth: int = 1,
+        max_age_sec: float = 60,
+        start: bool = True,
+    ):
+        assert step1000 > 0
+        assert neighbour_level >= 0
+        assert depth >= 1
+        assert max_age_sec > 0
+        self._clob_client: ClobClient = clob_client if clob_client is not None else ClobClient()
+        self._step1000 = step1000
+        self._neighbour_level = neighbour_level
+        self._depth = depth
+        self._max_age_sec = max_age_sec
+        self._cache: dict[OrderKey, deque[tuple[float, SignedOrder]]] = {}
+        self._pending_key_set: set[OrderKey] = set()
+        self._queue: queue.Queue[OrderKey] = queue.Queue()
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._hit_count = 0
+        self._miss_count = 0
+        self._logger = logging.getLogger(__name__)
+        if start:
+            self.start()
+
+    def start(self):
+        assert self._thread is None, 'OrderSigner is already started'
+        self._stop_event.clear()
+        self._thread = threading.Thread(name='OrderSigner', target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def get_stats_dict(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                'hit_count': self._hit_count,
+                'miss_count': self._miss_count,
+                'cached_count': sum(len(el) for el in self._cache.values()),
+                'pending_count': len(self._pending_key_set),
+            }
+
+    def get_signed_order(
+        self,
+        token_id: str,
+        price1000: int,
+        size1000: int,
+        side: Literal["BUY", "SELL"],
+        step1000: int | None = None,
+    ) -> SignedOrder:
+        """Pre-signed order if there is a fresh one, otherwise the order is signed now"""
+        key = (token_id, price1000, size1000, side)
+        signed_order = self._pop_fresh(key)
+        if signed_order is None:
+            signed_order = self._sign(key)
+        self.prefetch(
+            token_id=token_id, price1000=price1000, size1000=size1000, side=side, step1000=step1000
+        )
+        return signed_order
+
+    def prefetch(
+        self,
+        token_id: str,
+        price1000: int,
+        size1000: int,
+        side: Literal["BUY", "SELL"],
+        step1000: int | None = None,
+    ):
+        """Queue the order and its price neighbours for signing"""
+        assert side in ['BUY', 'SELL']
+        step1000 = step1000 if step1000 is not None else self._step1000
+        # the level itself first, it is the most likely to be placed again
+        level_list = sorted(
+            range(-self._neighbour_level, self._neighbour_level + 1), key=lambda el: abs(el)
+        )
+        for level in level_list:
+            _price1000 = price1000 + level * step1000
+            if 0 < _price1000 < 1000:
+                self._put((token_id, _price1000, size1000, side))
+
+    def sign_pending(self) -> int:
+        """Sign all queued orders in the calling thread. Returns the number of signed orders"""
+        count = 0
+        while True:
+            try:
+                key = self._queue.get_nowait()
+            except queue.Empty:
+                return count
+            count += self._sign_and_store(key)
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            try:
+                key = self._queue.get(timeout=0.5)
+            except queue.Empty:
+                self._drop_expired()
+                continue
+            self._sign_and_store(key)
+
+    def _put(self, key: OrderKey):
+        with self._lock:
+            if key in self._pending_key_set or self._get_fresh_count(key) >= self._depth:
+                return
+            self._pending_key_set.add(key)
+        self._queue.put(key)
+
+    def _sign_and_store(self, key: OrderKey) -> int:
+        try:
+            with self._lock:
+                if self._get_fresh_count(key) >= self._depth:
+                    return 0
+            try:
+                signed_order = self._sign(key)
+            except Exception as error:
+                # e.g. the price is not valid for the tick size
+                self._logger.debug(f'Failed to pre-sign order {key}: {error}')
+                return 0
+            with self._lock:
+                self._cache.setdefault(key, deque()).append((time.monotonic(), signed_order))
+            return 1
+        finally:
+            with self._lock:
+                self._pending_key_set.discard(key)
+
+    def _sign(self, key: OrderKey) -> SignedOrder:
+        token_id, price1000, size1000, side = key
+        return self._clob_client.create_signed_order(
+            token_id=token_id, price=price1000 / 1000, size=size1000 / 1000, side=side
+        )
+
+    def _pop_fresh(self, key: OrderKey) -> SignedOrder | None:
+        with self._lock:
+            signed_order_deque = self._cache.get(key)
+            min_time = time.monotonic() - self._max_age_sec
+            while signed_order_deque:
+                created_time, signed_order = signed_order_deque.popleft()
+                if created_time >= min_time:
+                    self._hit_count += 1
+                    return signed_order
+            self._miss_count += 1
+            return None
+
+    def _get_fresh_count(self, key: OrderKey) -> int:
+        signed_order_deque = self._cache.get(key)
+        if not signed_order_deque:
+            return 0
+        min_time = time.monotonic() - self._max_age_sec
+        return sum(created_time >= min_time for created_time, _ in signed_order_deque)
+
+    def _drop_expired(self):
+        with self._lock:
+            min_time = time.monotonic() - self._max_age_sec
+            for key in list(self._cache):
+                signed_order_deque = self._cache[key]
+                while signed_order_deque and signed_order_deque[0][0] < min_time:
+                    signed_order_deque.popleft()
+                if not signed_order_deque:
+                    del self._cache[key]
+
+
+def __demo__():
+    token_id = '75808883562514695201169204487787555859570951708948163798444132865757266366758'
+    order_signer = OrderSigner(step1000=10, neighbour_level=2)
+    order_signer.prefetch(token_id=token_id, price1000=400, size1000=10000, side='BUY')
+    time.sleep(2)
+    signed_order = order_signer.get_signed_order(
+        token_id=token_id, price1000=410, size1000=10000, side='BUY'
+    )
+    order_signer.get_stats_dict()
+    ClobClient().post_order(signed_order=signed_order)
+    order_signer.stop()
@@ -98,10 +98,18 @@ class ClobTradeParser:
     _house_address = anre_config.cred.get_polymarket_creds()['address']
 
     @classmethod
-    def parse_house_trade_dict_list(cls, trade_dict_list: list[dict]) -> dict[str, HouseTradeRec]:
+    def get_house_address(cls) -> str:
+        """Maker address of the house orders (trades of other makers are skipped)"""
+        return cls._house_address
+
+    @classmethod
+    def parse_house_trade_dict_list(
+        cls, trade_dict_list: list[dict], with_failed: bool = False
+    ) -> dict[str, HouseTradeRec]:
+        """FAILED trades are skipped, unless `with_failed` (a status update of a known trade)"""
         rec_dict = {}
         for trade_dict in trade_dict_list:
-            if trade_dict['status'] != 'FAILED':
+            if with_failed or trade_dict['status'] != 'FAILED':
                 if trade_dict['trader_side'] == 'MAKER':
                     assert trade_dict['maker_address'] != cls._house_address
                     for sub_dict in trade_dict['maker_orders']:
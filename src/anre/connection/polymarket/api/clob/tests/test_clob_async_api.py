@@ -0,0 +1,33 @@
+import asyncio
+
+from anre.connection.polymarket.api.clob import AsyncClobClient, ClobClient
+from anre.utils import testutil
+
+
+@testutil.api
+class TestAsyncClobApi(testutil.TestCase):
+    def test_same_as_sync(self) -> None:
+        client = ClobClient()
+        simplified_markets_info_list = client.get_sampling_simplified_markets_info_list(
+            chunk_limit=1
+        )
+        market_info = simplified_markets_info_list[0]
+        condition_id = market_info['condition_id']
+        token_ids = [item['token_id'] for item in market_info['tokens']]
+
+        async def _main():
+            async with AsyncClobClient(max_concurrency=4) as async_client:
+                return await asyncio.gather(
+                    async_client.get_single_market_info(condition_id=condition_id),
+                    async_client.get_mob_dict_list(token_ids=token_ids),
+                    async_client.get_house_order_dict_list(),
+                    async_client.get_house_trade_dict_list(chunk_limit=1),
+                )
+
+        market_info, mob_dict_list, house_order_dict_list, house_trade_dict_list = asyncio.run(
+            _main()
+        )
+        assert market_info == client.get_single_market_info(condition_id=condition_id)
+        assert {el['asset_id'] for el in mob_dict_list} == set(token_ids)
+        assert isinstance(house_order_dict_list, list)
+        assert isinstance(house_trade_dict_list, list)
@@ -0,0 +1,76 @@
+import itertools
+import time
+
+from anre.connection.polymarket.api.clob import OrderSigner
+from anre.utils import testutil
+
+
+class _ClobClient:
+    def __init__(self):
+        self._counter = itertools.count()
+        self.sign_list = []
+
+    def create_signed_order(self, token_id, price, size, side):
+        self.sign_list.append((token_id, round(price * 1000), round(size * 1000), side))
+        return (token_id, price, size, side, next(self._counter))
+
+
+class TestOrderSigner(testutil.TestCase):
+    def test_pre_signed_orders(self) -> None:
+        clob_client = _ClobClient()
+        order_signer = OrderSigner(
+            clob_client=clob_client, step1000=10, neighbour_level=1, start=False
+        )
+
+        # miss: signed inline, the level and its neighbours are queued
+        signed_order = order_signer.get_signed_order('AAA', 500, 10000, 'BUY')
+        assert signed_order == ('AAA', 0.5, 10.0, 'BUY', 0)
+        assert order_signer.sign_pending() == 3
+        assert clob_client.sign_list[1:] == [
+            ('AAA', 500, 10000, 'BUY'),
+            ('AAA', 490, 10000, 'BUY'),
+            ('AAA', 510, 10000, 'BUY'),
+        ]
+
+        # hit: no signing on the hot path, the consumed level is queued again
+        clob_client.sign_list.clear()
+        signed_order = order_signer.get_signed_order('AAA', 510, 10000, 'BUY')
+        assert signed_order == ('AAA', 0.51, 10.0, 'BUY', 3)
+        assert clob_client.sign_list == []
+        assert order_signer.sign_pending() == 2
+        assert clob_client.sign_list == [('AAA', 510, 10000, 'BUY'), ('AAA', 520, 10000, 'BUY')]
+
+        stats_dict = order_signer.get_stats_dict()
+        assert stats_dict['hit_count'] == 1
+        assert stats_dict['miss_count'] == 1
+        assert stats_dict['cached_count'] == 4
+
+        # a signed order is used once
+        order_1 = order_signer.get_signed_order('AAA', 490, 10000, 'BUY')
+        order_2 = order_signer.get_signed_order('AAA', 490, 10000, 'BUY')
+        assert order_1 != order_2
+
+    def test_expired_orders_are_not_used(self) -> None:
+        clob_client = _ClobClient()
+        order_signer = OrderSigner(
+            clob_client=clob_client, neighbour_level=0, max_age_sec=0.05, start=False
+        )
+        order_signer.prefetch('AAA', 500, 10000, 'SELL')
+        assert order_signer.sign_pending() == 1
+        time.sleep(0.1)
+        order_signer.get_signed_order('AAA', 500, 10000, 'SELL')
+        assert len(clob_client.sign_list) == 2
+        assert order_signer.get_stats_dict()['miss_count'] == 1
+
+    def test_background_thread(self) -> None:
+        clob_client = _ClobClient()
+        order_signer = OrderSigner(clob_client=clob_client, neighbour_level=2)
+        try:
+            order_signer.prefetch('AAA', 500, 10000, 'BUY')
+            for _ in range(100):
+                if order_signer.get_stats_dict()['cached_count'] == 5:
+                    break
+                time.sleep(0.01)
+            assert order_signer.get_stats_dict()['cached_count'] == 5
+        finally:
+            order_signer.stop()
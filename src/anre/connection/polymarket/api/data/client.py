@@ -4,6 +4,7 @@ import requests
 from requests import Response
 
 from anre.config.config import config as anre_config
+from anre.connection.polymarket.api.rate_limiter import call_with_rate_limit
 from anre.connection.polymarket.api.types import HouseTradeRec
 
 
@@ -100,7 +101,7 @@ class DataClient:
         params = PositionsArgs(user=user, limit=limit, market=condition_id, **kwargs)
         params = {key: value for key, value in params.__dict__.items() if value is not None}
         url = self._url + "/positions"
-        return get(url, params=params)
+        return call_with_rate_limit('data', get, url, params=params)
 
     def get_house_position_dict_list(self, **kwargs) -> list[dict]:
         return self.get_user_position_dict_list(user=self._house_address, **kwargs)
@@ -112,7 +113,7 @@ class DataClient:
         params = TradesArgs(user=user, limit=limit, market=condition_id, **kwargs)
         params = {key: value for key, value in params.__dict__.items() if value is not None}
         url = self._url + "/trades"
-        return get(url, params=params)
+        return call_with_rate_limit('data', get, url, params=params)
 
     def get_house_trade_dict_list(self, **kwargs) -> list[dict]:
         return self.get_user_trade_dict_list(user=self._house_address, **kwargs)
@@ -3,6 +3,11 @@ from typing import Any
 
 import httpx
 
+from anre.connection.polymarket.api.rate_limiter import (
+    TOO_MANY_REQUESTS_STATUS_CODE,
+    call_with_rate_limit,
+)
+
 
 class GammaClient:
     BASE_URL = "https://gamma-api.polymarket.com"
@@ -23,11 +28,18 @@ class GammaClient:
         """Handles HTTP GET requests and ensures successful responses."""
         if not isinstance(query_params, (dict, type(None))):
             raise TypeError("query_params must be a dictionary")
-        response = httpx.get(url, params=query_params or {})
+        response = call_with_rate_limit('gamma', self._get, url, query_params or {})
         if response.status_code == 200:
             return response.json()
         raise Exception(f"Error response from API: HTTP {response.status_code}")
 
+    @staticmethod
+    def _get(url: str, query_params: dict[str, Any]) -> httpx.Response:
+        response = httpx.get(url, params=query_params)
+        if response.status_code == TOO_MANY_REQUESTS_STATUS_CODE:
+            response.raise_for_status()
+        return response
+
     def get_markets_query(self, query_params: dict[str, Any] | None = None) -> list[dict]:
         return self._perform_get_request(self._markets_endpoint, query_params)
 
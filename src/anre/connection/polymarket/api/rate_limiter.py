@@ -0,0 +1,157 @@
+import asyncio
+import logging
+import threading
+import time
+from typing import Awaitable, Callable
+
+# (max_calls, period_sec) per endpoint group. The limit is shared by all client instances
+# in the process. clob markets: "Please limit 50 request per 10 seconds" (clob docs)
+RATE_LIMIT_CONFIG_DICT: dict[str, tuple[int, float]] = {
+    'clob_markets': (50, 10),
+    'clob_public': (100, 10),
+    'clob_house': (100, 10),
+    'clob_order': (250, 10),
+    'data': (100, 10),
+    'gamma': (100, 10),
+}
+
+TOO_MANY_REQUESTS_STATUS_CODE = 429
+
+# order and cancel requests fail fast on 429 (no retry): after the backoff the quote is stale, the
+# strategy decides again on the next iteration. Read and pagination requests are retried
+ORDER_MAX_RETRY = 0
+
+
+class TokenBucketRateLimiter:
+    """Thread safe token bucket
+
+    Up to `capacity` calls go through without waiting, after that calls are spaced by the refill
+    rate. After 429 response `backoff` blocks the bucket for a while (doubles on repeated 429s).
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: float,
+        min_backoff_sec: float = 1.0,
+        max_backoff_sec: float = 60.0,
+    ):
+        assert rate > 0
+        assert capacity >= 1
+        assert 0 < min_backoff_sec <= max_backoff_sec
+        self.rate = rate
+        self.capacity = capacity
+        self._min_backoff_sec = min_backoff_sec
+        self._max_backoff_sec = max_backoff_sec
+        self._tokens = float(capacity)
+        self._last_time = time.monotonic()
+        self._blocked_until = float(0)
+        self._backoff_sec = min_backoff_sec
+        self._lock = threading.Lock()
+
+    @classmethod
+    def new_from_limit(cls, max_calls: int, period_sec: float) -> 'TokenBucketRateLimiter':
+        # small burst, so that any `period_sec` window is close to the limit
+        rate = max_calls / period_sec
+        return cls(rate=rate, capacity=max(1.0, min(max_calls, rate)))
+
+    def reserve(self, tokens: float = 1) -> float:
+        """Take tokens (the balance can go negative). Returns seconds to wait before the call"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._last_time) * self.rate)
+            self._last_time = now
+            self._tokens -= tokens
+            wait_sec = max(-self._tokens / self.rate, float(0))
+            return max(wait_sec, self._blocked_until - now)
+
+    def acquire(self, tokens: float = 1) -> float:
+        wait_sec = self.reserve(tokens=tokens)
+        if wait_sec > 0:
+            time.sleep(wait_sec)
+        return wait_sec
+
+    async def acquire_async(self, tokens: float = 1) -> float:
+        """`acquire` for asyncio, the event loop is not blocked while waiting"""
+        wait_sec = self.reserve(tokens=tokens)
+        if wait_sec > 0:
+            await asyncio.sleep(wait_sec)
+        return wait_sec
+
+    def backoff(self) -> float:
+        """Block the bucket after 429 response. Returns the backoff in seconds"""
+        with self._lock:
+            now = time.monotonic()
+            backoff_sec = self._backoff_sec
+            self._blocked_until = max(self._blocked_until, now + backoff_sec)
+            self._backoff_sec = min(self._backoff_sec * 2, self._max_backoff_sec)
+            return backoff_sec
+
+    def reset_backoff(self):
+        with self._lock:
+            self._backoff_sec = self._min_backoff_sec
+
+
+_rate_limiter_dict: dict[str, TokenBucketRateLimiter] = {}
+_rate_limiter_dict_lock = threading.Lock()
+
+
+def get_rate_limiter(group: str) -> TokenBucketRateLimiter:
+    """Process wide rate limiter of the endpoint group"""
+    with _rate_limiter_dict_lock:
+        if group not in _rate_limiter_dict:
+            max_calls, period_sec = RATE_LIMIT_CONFIG_DICT[group]
+            _rate_limiter_dict[group] = TokenBucketRateLimiter.new_from_limit(
+                max_calls=max_calls, period_sec=period_sec
+            )
+        return _rate_limiter_dict[group]
+
+
+def is_too_many_requests_error(error: BaseException) -> bool:
+    # PolyApiException has `status_code`, httpx.HTTPStatusError has `response.status_code`
+    status_code = getattr(error, 'status_code', None)
+    if status_code is None:
+        status_code = getattr(getattr(error, 'response', None), 'status_code', None)
+    return status_code == TOO_MANY_REQUESTS_STATUS_CODE
+
+
+def call_with_rate_limit(group: str, fun: Callable, *args, max_retry: int = 5, **kwargs):
+    """Call `fun` within the group budget. On 429 the group backs off and the call is retried"""
+    rate_limiter = get_rate_limiter(group)
+    for retry_nr in range(max_retry + 1):
+        rate_limiter.acquire()
+        try:
+            result = fun(*args, **kwargs)
+        except Exception as error:
+            if not is_too_many_requests_error(error) or retry_nr >= max_retry:
+                raise
+            backoff_sec = rate_limiter.backoff()
+            logging.getLogger(__name__).warning(
+                f'Too many requests ({group}). Backoff {backoff_sec} sec, retry {retry_nr + 1}.'
+            )
+        else:
+            if retry_nr:
+                rate_limiter.reset_backoff()
+            return result
+
+
+async def call_with_rate_limit_async(
+    group: str, fun: Callable[..., Awaitable], *args, max_retry: int = 5, **kwargs
+):
+    """`call_with_rate_limit` for coroutine functions, the same process wide group budget"""
+    rate_limiter = get_rate_limiter(group)
+    for retry_nr in range(max_retry + 1):
+        await rate_limiter.acquire_async()
+        try:
+            result = await fun(*args, **kwargs)
+        except Exception as error:
+            if not is_too_many_requests_error(error) or retry_nr >= max_retry:
+                raise
+            backoff_sec = rate_limiter.backoff()
+            logging.getLogger(__name__).warning(
+                f'Too many requests ({group}). Backoff {backoff_sec} sec, retry {retry_nr + 1}.'
+            )
+        else:
+            if retry_nr:
+                rate_limiter.reset_backoff()
+            return result
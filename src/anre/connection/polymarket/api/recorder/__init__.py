@@ -0,0 +1,16 @@
+from .recorder import (
+    MarketDataRecorder,
+    get_market_data_recorder,
+    iter_recorded_records,
+    set_market_data_recorder,
+)
+from .segment import SegmentReader, SegmentWriter
+
+__all__ = [
+    "MarketDataRecorder",
+    "SegmentReader",
+    "SegmentWriter",
+    "get_market_data_recorder",
+    "iter_recorded_records",
+    "set_market_data_recorder",
+]
@@ -0,0 +1,267 @@
+import logging
+import os
+import threading
+import time
+from typing import Iterator, Optional
+
+import orjson
+
+from anre.connection.polymarket.api.recorder.segment import (
+    CODEC_ZSTD,
+    CODECS,
+    KIND_REST_BOOK,
+    KIND_WS_MARKET,
+    KIND_WS_USER,
+    SEGMENT_SUFFIX,
+    SegmentReader,
+    SegmentWriter,
+    get_segment_path_list,
+)
+
+_channel_kind_map = {
+    'market': KIND_WS_MARKET,
+    'user': KIND_WS_USER,
+}
+
+
+class MarketDataRecorder:
+    """Records websocket frames and REST book snapshots into rotating segment files
+
+    Producers (websocket decode threads, REST callers) only append to an in memory list, the
+    flush thread encodes the records into compressed blocks and appends them to the current
+    segment (`segment.SegmentWriter`). A segment is closed (and its index written) when it
+    reaches `segment_max_bytes` or `segment_max_sec`. Raw websocket frames are stored as they
+    were received, so a replay decodes them with the same code as the live path.
+
+    Recording never blocks the market data path: if the flush thread falls behind by more than
+    `max_pending_count` records, new ones are dropped and counted (`get_stats_dict`).
+    """
+
+    def __init__(
+        self,
+        dir_path: str,
+        name: str = 'market',
+        codec: str = CODEC_ZSTD,
+        segment_max_bytes: int = 256 * 1024 * 1024,
+        segment_max_sec: float = 3600,
+        flush_sec: float = 1.0,
+        block_max_bytes: int = 1024 * 1024,
+        max_pending_count: int = 1_000_000,
+    ):
+        assert codec in CODECS, f'unknown codec: {codec}'
+        assert '-' not in name, 'name is the segment file prefix, it can not contain "-"'
+        assert segment_max_bytes > 0
+        assert segment_max_sec > 0
+        assert flush_sec > 0
+        assert block_max_bytes > 0
+        assert max_pending_count > 0
+        self.dir_path = dir_path
+        self.name = name
+        self._codec = codec
+        self._segment_max_bytes = segment_max_bytes
+        self._segment_max_sec = segment_max_sec
+        self._flush_sec = flush_sec
+        self._block_max_bytes = block_max_bytes
+        self._max_pending_count = max_pending_count
+        self._logger = logging.getLogger(__name__)
+
+        self._pending_list: list[tuple[float, int, bytes]] = []
+        self._pending_lock = threading.Lock()
+        # one writer at a time (flush thread, `flush`, `stop`)
+        self._write_lock = threading.Lock()
+        self._segment_writer: Optional[SegmentWriter] = None
+        self._segment_seq = 0
+        self._stop_event = threading.Event()
+        self._flush_thread: Optional[threading.Thread] = None
+
+        self._record_count = 0
+        self._dropped_count = 0
+        self._written_count = 0
+        self._written_bytes = 0
+        self._segment_count = 0
+
+    ### record
+
+    def record_ws_frame(self, channel_type: str, receive_time: float, frame: str | bytes | dict):
+        """Raw websocket frame (or internal event dict) of the channel"""
+        kind = _channel_kind_map[channel_type]
+        if isinstance(frame, dict):
+            # internal events can hold not serializable values (e.g. the exception of an error)
+            body = orjson.dumps(frame, default=str)
+        elif isinstance(frame, str):
+            body = frame.encode()
+        else:
+            body = bytes(frame)
+        self._append(receive_time, kind, body)
+
+    def record_rest_books(self, mob_dict_list: list[dict], receive_time: Optional[float] = None):
+        """REST book snapshot (`ClobClient.get_mob_dict_list` response)"""
+        receive_time = time.time() if receive_time is None else receive_time
+        self._append(receive_time, KIND_REST_BOOK, orjson.dumps(mob_dict_list))
+
+    def _append(self, receive_time: float, kind: int, body: bytes):
+        with self._pending_lock:
+            self._record_count += 1
+            if len(self._pending_list) >= self._max_pending_count:
+                self._dropped_count += 1
+                if self._dropped_count == 1 or self._dropped_count % 10000 == 0:
+                    self._logger.warning(
+                        f'Recorder is behind, dropped records: {self._dropped_count}'
+                    )
+                return
+            self._pending_list.append((receive_time, kind, body))
+
+    ### write
+
+    def start(self):
+        if self._flush_thread is not None and self._flush_thread.is_alive():
+            return
+        os.makedirs(self.dir_path, exist_ok=True)
+        self._stop_event.clear()
+        self._flush_thread = threading.Thread(
+            name=f'{self.__class__.__name__}._flush_loop', target=self._flush_loop, daemon=True
+        )
+        self._flush_thread.start()
+
+    def stop(self, timeout: Optional[float] = None):
+        """Stop the flush thread, write what is pending and close the segment"""
+        self._stop_event.set()
+        if self._flush_thread is not None:
+            self._flush_thread.join(timeout=timeout)
+        self.flush()
+        with self._write_lock:
+            self._close_segment()
+
+    def _flush_loop(self):
+        while not self._stop_event.wait(timeout=self._flush_sec):
+            try:
+                self.flush()
+            except BaseException as e:
+                self._logger.exception(f'Recorder flush failed: {e}')
+
+    def flush(self):
+        """Write pending records. Called by the flush thread, can be called directly"""
+        with self._pending_lock:
+            record_list, self._pending_list = self._pending_list, []
+        with self._write_lock:
+            if self._segment_writer is not None and self._is_segment_full(self._segment_writer):
+                self._close_segment()
+            if not record_list:
+                return
+            # producers of different threads append with their own receive time
+            record_list.sort(key=lambda el: el[0])
+            block_list = []
+            block_size = 0
+            for record in record_list:
+                block_list.append(record)
+                block_size += len(record[2])
+                if block_size >= self._block_max_bytes:
+                    self._write_block(block_list)
+                    block_list = []
+                    block_size = 0
+            if block_list:
+                self._write_block(block_list)
+
+    def _write_block(self, record_list: list[tuple[float, int, bytes]]):
+        if self._segment_writer is None:
+            self._open_segment()
+        segment_writer = self._segment_writer
+        assert segment_writer is not None
+        size = segment_writer.size
+        segment_writer.write_block(record_list)
+        self._written_count += len(record_list)
+        self._written_bytes += segment_writer.size - size
+        if self._is_segment_full(segment_writer):
+            self._close_segment()
+
+    def _is_segment_full(self, segment_writer: SegmentWriter) -> bool:
+        return (
+            segment_writer.size >= self._segment_max_bytes
+            or time.time() - segment_writer.created_time >= self._segment_max_sec
+        )
+
+    def _open_segment(self):
+        os.makedirs(self.dir_path, exist_ok=True)
+        now = time.time()
+        time_str = time.strftime('%Y%m%dT%H%M%S', time.gmtime(now))
+        while True:
+            self._segment_seq += 1
+            file_name = f'{self.name}-{time_str}-{self._segment_seq:06d}{SEGMENT_SUFFIX}'
+            path = os.path.join(self.dir_path, file_name)
+            if not os.path.exists(path):
+                break
+        self._segment_writer = SegmentWriter(path=path, codec=self._codec, created_time=now)
+        self._segment_count += 1
+
+    def _close_segment(self):
+        if self._segment_writer is not None:
+            self._segment_writer.close()
+            self._segment_writer = None
+
+    def get_stats_dict(self) -> dict:
+        with self._pending_lock:
+            pending_count = len(self._pending_list)
+        segment_writer = self._segment_writer
+        return {
+            'record_count': self._record_count,
+            'pending_count': pending_count,
+            'dropped_count': self._dropped_count,
+            'written_count': self._written_count,
+            'written_bytes': self._written_bytes,
+            'segment_count': self._segment_count,
+            'segment_path': None if segment_writer is None else segment_writer.path,
+        }
+
+
+def iter_recorded_records(
+    dir_path: str,
+    name: Optional[str] = None,
+    start_time: Optional[float] = None,
+    end_time: Optional[float] = None,
+    kind_list: Optional[list[int]] = None,
+) -> Iterator[tuple[float, int, bytes]]:
+    """(receive_time, kind, body) records of all segments in the write order"""
+    for path in get_segment_path_list(dir_path, name=name):
+        with SegmentReader(path) as segment_reader:
+            time_range = segment_reader.get_time_range()
+            if time_range is None:
+                continue
+            if start_time is not None and time_range[1] < start_time:
+                continue
+            if end_time is not None and time_range[0] >= end_time:
+                continue
+            yield from segment_reader.iter_records(
+                start_time=start_time, end_time=end_time, kind_list=kind_list
+            )
+
+
+_market_data_recorder: Optional[MarketDataRecorder] = None
+
+
+def set_market_data_recorder(recorder: Optional[MarketDataRecorder]):
+    """Install the process wide recorder (None to turn recording off)
+
+    `PolymarketWebSocket` and `ClobClient.get_mob_dict_list` record into it.
+    """
+    global _market_data_recorder
+    _market_data_recorder = recorder
+
+
+def get_market_data_recorder() -> Optional[MarketDataRecorder]:
+    return _market_data_recorder
+
+
+def __dummy__():
+    from anre.config.config import config as anre_config
+    from anre.connection.polymarket.api.websocket.websocket import PolymarketWebSocket
+
+    recorder = MarketDataRecorder(dir_path=anre_config.path.get_path_to_data_dir('recorder'))
+    recorder.start()
+    set_market_data_recorder(recorder)
+    market_ws = PolymarketWebSocket.new_markets(asset_ids=['...'])
+    market_ws.start()
+
+    market_ws.stop()
+    recorder.stop()
+    set_market_data_recorder(None)
+    _ = list(iter_recorded_records(recorder.dir_path, kind_list=[KIND_WS_MARKET]))
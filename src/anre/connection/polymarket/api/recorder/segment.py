@@ -0,0 +1,265 @@
+import mmap
+import os
+import struct
+import zlib
+from typing import Iterator, Optional
+
+import numpy as np
+import pyarrow as pa
+
+# segment file: header, then blocks appended one after another
+#   header: magic, codec name (8 bytes, zero padded), created time
+#   block: magic, raw size, compressed size, record count, first and last receive time, payload
+#   payload (after decompression): records, each is receive time, kind, body size, body
+SEGMENT_MAGIC = b'ANRSEG01'
+_HEADER_STRUCT = struct.Struct('<8s8sd')
+BLOCK_MAGIC = b'BLK1'
+_BLOCK_STRUCT = struct.Struct('<4sIIIdd')
+_RECORD_STRUCT = struct.Struct('<dBI')
+
+SEGMENT_SUFFIX = '.seg'
+INDEX_SUFFIX = '.idx.npy'
+
+# record kinds
+KIND_WS_MARKET = 1  # raw market channel frame (json list) or internal event (json dict)
+KIND_WS_USER = 2  # raw user channel frame or internal event
+KIND_REST_BOOK = 3  # REST book snapshot (json list of mob dicts)
+KIND_LIST = [KIND_WS_MARKET, KIND_WS_USER, KIND_REST_BOOK]
+
+CODEC_NONE = 'none'
+CODEC_ZLIB = 'zlib'
+CODEC_ZSTD = 'zstd'
+CODEC_LZ4 = 'lz4'
+CODECS = (CODEC_NONE, CODEC_ZLIB, CODEC_ZSTD, CODEC_LZ4)
+
+# one row per block, written when the segment is closed (rebuilt from block headers otherwise)
+INDEX_DTYPE = np.dtype([
+    ('offset', '<u8'),
+    ('size', '<u4'),
+    ('record_count', '<u4'),
+    ('first_rt', '<f8'),
+    ('last_rt', '<f8'),
+])
+
+
+def compress(data: bytes, codec: str) -> bytes:
+    if codec == CODEC_NONE:
+        return data
+    if codec == CODEC_ZLIB:
+        return zlib.compress(data, 1)
+    if codec in [CODEC_ZSTD, CODEC_LZ4]:
+        return pa.compress(data, codec=codec, asbytes=True)
+    raise ValueError(f'unknown codec: {codec}')
+
+
+def decompress(data: bytes | memoryview, raw_size: int, codec: str) -> bytes:
+    if codec == CODEC_NONE:
+        return bytes(data)
+    if codec == CODEC_ZLIB:
+        return zlib.decompress(data)
+    if codec in [CODEC_ZSTD, CODEC_LZ4]:
+        return pa.decompress(data, decompressed_size=raw_size, codec=codec, asbytes=True)
+    raise ValueError(f'unknown codec: {codec}')
+
+
+def encode_block(record_list: list[tuple[float, int, bytes]], codec: str) -> bytes:
+    """Block (header and payload) of (receive_time, kind, body) records"""
+    assert record_list
+    part_list = []
+    for receive_time, kind, body in record_list:
+        part_list.append(_RECORD_STRUCT.pack(receive_time, kind, len(body)))
+        part_list.append(body)
+    raw = b''.join(part_list)
+    payload = compress(raw, codec=codec)
+    header = _BLOCK_STRUCT.pack(
+        BLOCK_MAGIC,
+        len(raw),
+        len(payload),
+        len(record_list),
+        record_list[0][0],
+        record_list[-1][0],
+    )
+    return header + payload
+
+
+def decode_block_payload(raw: bytes) -> Iterator[tuple[float, int, bytes]]:
+    offset = 0
+    raw_size = len(raw)
+    while offset < raw_size:
+        receive_time, kind, body_size = _RECORD_STRUCT.unpack_from(raw, offset)
+        offset += _RECORD_STRUCT.size
+        yield receive_time, kind, raw[offset : offset + body_size]
+        offset += body_size
+
+
+class SegmentWriter:
+    """Append only segment file
+
+    Blocks are appended and flushed to the OS, a crash loses at most the block being written
+    (the reader stops at a torn block). `close` writes the index next to the segment.
+    """
+
+    def __init__(self, path: str, codec: str = CODEC_ZSTD, created_time: float = float(0)):
+        assert codec in CODECS, f'unknown codec: {codec}'
+        assert not os.path.exists(path), f'segment exists: {path}'
+        self.path = path
+        self.codec = codec
+        self.created_time = created_time
+        self._file = open(path, 'ab')
+        self._file.write(_HEADER_STRUCT.pack(SEGMENT_MAGIC, codec.encode(), created_time))
+        self._size = _HEADER_STRUCT.size
+        self._index_row_list: list[tuple] = []
+        self._record_count = 0
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    @property
+    def record_count(self) -> int:
+        return self._record_count
+
+    @property
+    def closed(self) -> bool:
+        return self._file.closed
+
+    def write_block(self, record_list: list[tuple[float, int, bytes]]):
+        assert not self._file.closed
+        if not record_list:
+            return
+        block = encode_block(record_list, codec=self.codec)
+        self._file.write(block)
+        self._file.flush()
+        self._index_row_list.append((
+            self._size,
+            len(block),
+            len(record_list),
+            record_list[0][0],
+            record_list[-1][0],
+        ))
+        self._size += len(block)
+        self._record_count += len(record_list)
+
+    def get_index_array(self) -> np.ndarray:
+        return np.array(self._index_row_list, dtype=INDEX_DTYPE)
+
+    def close(self, fsync: bool = True):
+        if self._file.closed:
+            return
+        self._file.flush()
+        if fsync:
+            os.fsync(self._file.fileno())
+        self._file.close()
+        np.save(get_index_path(self.path), self.get_index_array())
+
+
+class SegmentReader:
+    """Memory mapped segment file
+
+    Uses the index file if there is one (closed segment), otherwise the block headers are
+    scanned, so the segment being written (or left by a crash) can be read too.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, 'rb')
+        self._size = os.fstat(self._file.fileno()).st_size
+        assert self._size >= _HEADER_STRUCT.size, f'not a segment: {path}'
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, codec, created_time = _HEADER_STRUCT.unpack_from(self._mmap, 0)
+        assert magic == SEGMENT_MAGIC, f'not a segment: {path}'
+        self.codec = codec.rstrip(b'\0').decode()
+        self.created_time = created_time
+        self._index_array: Optional[np.ndarray] = None
+
+    def __enter__(self) -> 'SegmentReader':
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        if not self._mmap.closed:
+            self._mmap.close()
+        self._file.close()
+
+    def get_index_array(self) -> np.ndarray:
+        if self._index_array is None:
+            index_path = get_index_path(self.path)
+            if os.path.exists(index_path):
+                self._index_array = np.load(index_path)
+            else:
+                self._index_array = self._scan_index_array()
+        return self._index_array
+
+    def _scan_index_array(self) -> np.ndarray:
+        row_list = []
+        offset = _HEADER_STRUCT.size
+        while offset + _BLOCK_STRUCT.size <= self._size:
+            magic, _, payload_size, record_count, first_rt, last_rt = _BLOCK_STRUCT.unpack_from(
+                self._mmap, offset
+            )
+            block_size = _BLOCK_STRUCT.size + payload_size
+            if magic != BLOCK_MAGIC or offset + block_size > self._size:
+                # torn block at the end
+                break
+            row_list.append((offset, block_size, record_count, first_rt, last_rt))
+            offset += block_size
+        return np.array(row_list, dtype=INDEX_DTYPE)
+
+    def get_record_count(self) -> int:
+        return int(self.get_index_array()['record_count'].sum())
+
+    def get_time_range(self) -> tuple[float, float] | None:
+        index_array = self.get_index_array()
+        if not len(index_array):
+            return None
+        return float(index_array['first_rt'][0]), float(index_array['last_rt'][-1])
+
+    def iter_records(
+        self,
+        start_time: Optional[float] = None,
+        end_time: Optional[float] = None,
+        kind_list: Optional[list[int]] = None,
+    ) -> Iterator[tuple[float, int, bytes]]:
+        """(receive_time, kind, body) records with start_time <= receive_time < end_time"""
+        index_array = self.get_index_array()
+        mask = np.ones(len(index_array), dtype=bool)
+        if start_time is not None:
+            mask &= index_array['last_rt'] >= start_time
+        if end_time is not None:
+            mask &= index_array['first_rt'] < end_time
+        for row in index_array[mask]:
+            offset = int(row['offset'])
+            _, raw_size, payload_size, _, _, _ = _BLOCK_STRUCT.unpack_from(self._mmap, offset)
+            payload_offset = offset + _BLOCK_STRUCT.size
+            payload = memoryview(self._mmap)[payload_offset : payload_offset + payload_size]
+            try:
+                raw = decompress(payload, raw_size=raw_size, codec=self.codec)
+            finally:
+                payload.release()
+            for receive_time, kind, body in decode_block_payload(raw):
+                if start_time is not None and receive_time < start_time:
+                    continue
+                if end_time is not None and receive_time >= end_time:
+                    continue
+                if kind_list is not None and kind not in kind_list:
+                    continue
+                yield receive_time, kind, body
+
+
+def get_index_path(segment_path: str) -> str:
+    assert segment_path.endswith(SEGMENT_SUFFIX)
+    return segment_path[: -len(SEGMENT_SUFFIX)] + INDEX_SUFFIX
+
+
+def get_segment_path_list(dir_path: str, name: Optional[str] = None) -> list[str]:
+    """Segment files in the write order (names are `<name>-<utc time>-<seq>.seg`)"""
+    if not os.path.isdir(dir_path):
+        return []
+    path_list = [
+        os.path.join(dir_path, file_name)
+        for file_name in os.listdir(dir_path)
+        if file_name.endswith(SEGMENT_SUFFIX) and (name is None or file_name.startswith(f'{name}-'))
+    ]
+    return sorted(path_list, key=os.path.basename)
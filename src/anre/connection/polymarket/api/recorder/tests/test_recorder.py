@@ -0,0 +1,116 @@
+import os
+import tempfile
+
+import orjson
+
+from anre.connection.polymarket.api.recorder.recorder import (
+    MarketDataRecorder,
+    iter_recorded_records,
+)
+from anre.connection.polymarket.api.recorder.segment import (
+    CODEC_ZLIB,
+    KIND_REST_BOOK,
+    KIND_WS_MARKET,
+    KIND_WS_USER,
+    SegmentReader,
+    get_index_path,
+    get_segment_path_list,
+)
+from anre.utils import testutil
+
+
+def _frame(asset_id: str, nr: int) -> str:
+    message = {
+        'event_type': 'price_change',
+        'asset_id': asset_id,
+        'market': '0xm',
+        'timestamp': str(1_700_000_000_000 + nr),
+        'hash': f'h{nr}',
+        'changes': [{'price': '0.41', 'size': str(nr), 'side': 'BUY'}],
+    }
+    return orjson.dumps([message]).decode()
+
+
+class TestMarketDataRecorder(testutil.TestCase):
+    def test_rotation_and_round_trip(self) -> None:
+        with tempfile.TemporaryDirectory() as dir_path:
+            recorder = MarketDataRecorder(
+                dir_path=dir_path, segment_max_bytes=2000, flush_sec=0.01, block_max_bytes=500
+            )
+            recorder.start()
+            frame_list = [_frame('A', nr) for nr in range(200)]
+            for nr, frame in enumerate(frame_list):
+                recorder.record_ws_frame('market', 1000.0 + nr, frame)
+            internal = {'event_type': '_internal', 'event': 'reconnect', 'timestamp': 1.0}
+            recorder.record_ws_frame('user', 1200.0, internal)
+            error = {'event_type': '_internal', 'event': 'error', 'error': ConnectionResetError()}
+            recorder.record_ws_frame('user', 1200.5, error)
+            recorder.record_rest_books([{'asset_id': 'A', 'bids': [], 'asks': []}], 1201.0)
+            recorder.stop()
+
+            stats_dict = recorder.get_stats_dict()
+            assert stats_dict['written_count'] == 203
+            assert stats_dict['dropped_count'] == 0
+            assert stats_dict['segment_path'] is None
+
+            segment_path_list = get_segment_path_list(dir_path, name='market')
+            assert len(segment_path_list) == stats_dict['segment_count'] > 1
+            for segment_path in segment_path_list:
+                assert os.path.exists(get_index_path(segment_path))
+            # compressed, repeated json compresses well
+            raw_size = sum(len(frame) for frame in frame_list)
+            assert stats_dict['written_bytes'] < raw_size / 2
+
+            record_list = list(iter_recorded_records(dir_path))
+            assert [el[0] for el in record_list] == [1000.0 + nr for nr in range(201)] + [
+                1200.5,
+                1201.0,
+            ]
+            assert [el[2].decode() for el in record_list[:200]] == frame_list
+            assert record_list[200][1] == KIND_WS_USER
+            assert orjson.loads(record_list[200][2]) == internal
+            # the exception is recorded as its str
+            assert orjson.loads(record_list[201][2])['error'] == str(ConnectionResetError())
+            assert record_list[202][1] == KIND_REST_BOOK
+
+            record_list = list(
+                iter_recorded_records(
+                    dir_path, start_time=1050.0, end_time=1060.0, kind_list=[KIND_WS_MARKET]
+                )
+            )
+            assert [el[0] for el in record_list] == [1050.0 + nr for nr in range(10)]
+
+    def test_unclosed_segment_is_readable(self) -> None:
+        with tempfile.TemporaryDirectory() as dir_path:
+            recorder = MarketDataRecorder(dir_path=dir_path, codec=CODEC_ZLIB)
+            for nr in range(10):
+                recorder.record_ws_frame('market', 1000.0 + nr, _frame('B', nr))
+            recorder.flush()
+            recorder.record_ws_frame('market', 1010.0, _frame('B', 10))
+            recorder.flush()
+            segment_path = recorder.get_stats_dict()['segment_path']
+            assert not os.path.exists(get_index_path(segment_path))
+
+            # torn block at the end, as after a crash in the middle of a write
+            with open(segment_path, 'ab') as file:
+                file.write(b'BLK1\x00\x01')
+
+            with SegmentReader(segment_path) as segment_reader:
+                assert segment_reader.codec == CODEC_ZLIB
+                assert len(segment_reader.get_index_array()) == 2
+                assert segment_reader.get_record_count() == 11
+                assert segment_reader.get_time_range() == (1000.0, 1010.0)
+                body_list = [el[2] for el in segment_reader.iter_records(start_time=1009.0)]
+            assert [orjson.loads(body)[0]['hash'] for body in body_list] == ['h9', 'h10']
+            recorder.stop()
+
+    def test_drops_when_behind(self) -> None:
+        with tempfile.TemporaryDirectory() as dir_path:
+            recorder = MarketDataRecorder(dir_path=dir_path, max_pending_count=3)
+            for nr in range(5):
+                recorder.record_ws_frame('market', 1000.0 + nr, _frame('C', nr))
+            stats_dict = recorder.get_stats_dict()
+            assert stats_dict['pending_count'] == 3
+            assert stats_dict['dropped_count'] == 2
+            recorder.stop()
+            assert len(list(iter_recorded_records(dir_path))) == 3
@@ -0,0 +1,180 @@
+import asyncio
+import time
+from unittest import mock
+
+import pytest
+from py_clob_client.client import ClobClient as ClobInternalClient
+
+from anre.connection.polymarket.api.clob import AsyncClobClient, ClobClient
+from anre.connection.polymarket.api.rate_limiter import (
+    RATE_LIMIT_CONFIG_DICT,
+    TokenBucketRateLimiter,
+    _rate_limiter_dict,
+    call_with_rate_limit,
+    call_with_rate_limit_async,
+    get_rate_limiter,
+    is_too_many_requests_error,
+)
+from anre.utils import testutil
+
+
+class _TooManyRequests(Exception):
+    status_code = 429
+
+
+class TestRateLimiter(testutil.TestCase):
+    def test_token_bucket(self) -> None:
+        rate_limiter = TokenBucketRateLimiter(rate=100, capacity=5)
+        start_time = time.monotonic()
+        wait_sec_list = [rate_limiter.acquire() for _ in range(5)]
+        assert wait_sec_list == [0] * 5
+        assert time.monotonic() - start_time < 0.05
+
+        # burst is used, the next calls are spaced by the rate
+        for _ in range(10):
+            rate_limiter.acquire()
+        assert time.monotonic() - start_time >= 0.09
+
+        backoff_sec = rate_limiter.backoff()
+        assert rate_limiter.reserve() >= backoff_sec - 0.01
+        assert rate_limiter.backoff() == 2 * backoff_sec
+        rate_limiter.reset_backoff()
+        assert rate_limiter.backoff() == backoff_sec
+
+    def test_new_from_limit(self) -> None:
+        rate_limiter = TokenBucketRateLimiter.new_from_limit(max_calls=50, period_sec=10)
+        assert rate_limiter.rate == 5
+        assert rate_limiter.capacity == 5
+        assert get_rate_limiter('clob_markets') is get_rate_limiter('clob_markets')
+        with pytest.raises(KeyError):
+            get_rate_limiter('unknown')
+
+    @mock.patch.dict(RATE_LIMIT_CONFIG_DICT, {'_test': (1000, 1)})
+    def test_call_with_rate_limit_retries_too_many_requests(self) -> None:
+        rate_limiter = get_rate_limiter('_test')
+        rate_limiter._min_backoff_sec = rate_limiter._backoff_sec = 0.01
+        call_count = 0
+
+        def _fun(value):
+            nonlocal call_count
+            call_count += 1
+            if call_count < 3:
+                raise _TooManyRequests()
+            return value
+
+        assert call_with_rate_limit('_test', _fun, value=7) == 7
+        assert call_count == 3
+        assert is_too_many_requests_error(_TooManyRequests())
+        assert not is_too_many_requests_error(ValueError())
+
+        def _fun_always_limited():
+            raise _TooManyRequests()
+
+        with pytest.raises(_TooManyRequests):
+            call_with_rate_limit('_test', _fun_always_limited, max_retry=1)
+
+    @mock.patch.dict(RATE_LIMIT_CONFIG_DICT, {'_test': (1000, 1)})
+    def test_call_with_rate_limit_async(self) -> None:
+        rate_limiter = get_rate_limiter('_test')
+        rate_limiter._min_backoff_sec = rate_limiter._backoff_sec = 0.01
+        call_count = 0
+
+        async def _fun(value):
+            nonlocal call_count
+            call_count += 1
+            if call_count < 2:
+                raise _TooManyRequests()
+            return value
+
+        assert asyncio.run(call_with_rate_limit_async('_test', _fun, value=7)) == 7
+        assert call_count == 2
+
+
+def _new_test_rate_limiter() -> TokenBucketRateLimiter:
+    # no refill during the test, used tokens are the number of requests
+    return TokenBucketRateLimiter(rate=0.001, capacity=1000, min_backoff_sec=0.01)
+
+
+def _get_used_tokens(rate_limiter: TokenBucketRateLimiter) -> int:
+    return round(rate_limiter.capacity - rate_limiter._tokens)
+
+
+class TestClientRateLimit(testutil.TestCase):
+    def test_clob_chunks_are_limited(self) -> None:
+        internal_client = mock.create_autospec(ClobInternalClient, instance=True)
+        internal_client.get_markets.side_effect = [
+            _TooManyRequests(),
+            {'data': [1], 'next_cursor': 'MQ=='},
+            {'data': [2], 'next_cursor': 'LTE='},
+        ]
+        rate_limiter = _new_test_rate_limiter()
+        with (
+            mock.patch.object(ClobClient, '_clob_internal_client', internal_client),
+            mock.patch.dict(_rate_limiter_dict, {'clob_markets': rate_limiter}),
+        ):
+            client = ClobClient()
+            # a single chunk is retried after 429
+            assert client.get_market_info_chunk()['data'] == [1]
+            assert client.get_market_info_chunk(cursor='MQ==')['data'] == [2]
+            assert _get_used_tokens(rate_limiter) == 3
+            # pages of the collected list are limited too
+            internal_client.get_markets.side_effect = None
+            internal_client.get_markets.return_value = {'data': [3], 'next_cursor': 'LTE='}
+            assert client.get_market_info_list() == [3]
+            assert _get_used_tokens(rate_limiter) == 4
+
+    def test_async_clob_requests_are_limited(self) -> None:
+        internal_client = mock.create_autospec(ClobInternalClient, instance=True)
+        internal_client.host = 'http://localhost'
+        rate_limiter_dict = {
+            group: _new_test_rate_limiter() for group in ['clob_public', 'clob_house']
+        }
+
+        async def _main():
+            async with AsyncClobClient() as client:
+                with mock.patch.object(
+                    client,
+                    '_request_once',
+                    side_effect=[
+                        _TooManyRequests(),
+                        {'data': [1], 'next_cursor': 'MQ=='},
+                        {'data': [2], 'next_cursor': 'LTE='},
+                        1700000000,
+                    ],
+                ) as request_once:
+                    order_dict_list = await client.get_house_order_dict_list()
+                    server_time = await client.get_server_time()
+                return order_dict_list, server_time, request_once.call_count
+
+        with (
+            mock.patch.object(ClobClient, '_clob_internal_client', internal_client),
+            mock.patch.dict(_rate_limiter_dict, rate_limiter_dict),
+        ):
+            order_dict_list, server_time, call_count = asyncio.run(_main())
+        assert order_dict_list == [1, 2]
+        assert server_time == 1700000000
+        assert call_count == 4
+        # 3 house requests (one is retried), 1 public
+        assert _get_used_tokens(rate_limiter_dict['clob_house']) == 3
+        assert _get_used_tokens(rate_limiter_dict['clob_public']) == 1
+
+    def test_clob_orders_fail_fast(self) -> None:
+        internal_client = mock.create_autospec(ClobInternalClient, instance=True)
+        internal_client.cancel_orders.side_effect = _TooManyRequests()
+        internal_client.post_order.side_effect = _TooManyRequests()
+        rate_limiter = _new_test_rate_limiter()
+        with (
+            mock.patch.object(ClobClient, '_clob_internal_client', internal_client),
+            mock.patch.dict(_rate_limiter_dict, {'clob_order': rate_limiter}),
+        ):
+            client = ClobClient()
+            start_time = time.monotonic()
+            # not retried after the backoff, the strategy decides again on the next iteration
+            with pytest.raises(_TooManyRequests):
+                client.cancel_orders_by_ids(order_ids=['o1'])
+            with pytest.raises(_TooManyRequests):
+                client.post_order(signed_order=mock.Mock(), order_type='GTC')
+            assert time.monotonic() - start_time < 0.5
+            assert internal_client.cancel_orders.call_count == 1
+            assert internal_client.post_order.call_count == 1
+            assert _get_used_tokens(rate_limiter) == 2
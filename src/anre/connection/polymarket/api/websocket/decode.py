@@ -0,0 +1,154 @@
+from typing import Any, Union
+
+import orjson
+
+# price strings repeat a lot (at most 1001 levels), so they are parsed once
+_PRICE1000_CACHE_MAX_SIZE = 100_000
+_price1000_cache: dict[str, int] = {}
+
+
+class WsRecord:
+    """Decoded market channel message with typed fields
+
+    Read only dict-like access (`record['asset_id']`, `'hash' in record`, `record.get(...)`) is
+    kept, so dispatch code works with raw dict messages (e.g. other event types) and records
+    alike. `timestamp` is float ms, `_rt` is the receive time (`time.time()`).
+    """
+
+    __slots__ = ('event_type', 'asset_id', 'market', 'timestamp', 'hash', '_rt')
+
+    def __getitem__(self, key: str) -> Any:
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def __contains__(self, key: str) -> bool:
+        return hasattr(self, key)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return getattr(self, key, default)
+
+    def to_dict(self) -> dict:
+        """Raw message (as received, with `_rt`), e.g. to store it as json"""
+        message = {
+            name: getattr(self, name)
+            for name in WsRecord.__slots__
+            if name != 'timestamp' and hasattr(self, name)
+        }
+        if hasattr(self, 'timestamp'):
+            message['timestamp'] = str(int(self.timestamp))
+        return message
+
+    def __repr__(self) -> str:
+        field_str = ', '.join(
+            f'{name}={getattr(self, name)!r}'
+            for cls in type(self).__mro__
+            for name in getattr(cls, '__slots__', ())
+            if hasattr(self, name)
+        )
+        return f'{self.__class__.__name__}({field_str})'
+
+
+class BookRecord(WsRecord):
+    """`book` snapshot, levels are (price1000, size1000)"""
+
+    __slots__ = ('bid_level1000_list', 'ask_level1000_list')
+
+    def to_dict(self) -> dict:
+        message = super().to_dict()
+        message['bids'] = [
+            {'price': from_value1000(price1000), 'size': from_value1000(size1000)}
+            for price1000, size1000 in self.bid_level1000_list
+        ]
+        message['asks'] = [
+            {'price': from_value1000(price1000), 'size': from_value1000(size1000)}
+            for price1000, size1000 in self.ask_level1000_list
+        ]
+        return message
+
+
+class PriceChangeRecord(WsRecord):
+    """`price_change`, changes are (price1000, size1000, side)"""
+
+    __slots__ = ('change1000_list',)
+
+    def to_dict(self) -> dict:
+        message = super().to_dict()
+        message['changes'] = [
+            {'price': from_value1000(price1000), 'size': from_value1000(size1000), 'side': side}
+            for price1000, size1000, side in self.change1000_list
+        ]
+        return message
+
+
+WsMessage = Union[WsRecord, dict]
+
+
+def to_price1000(price: str | float) -> int:
+    price1000 = _price1000_cache.get(price)  # type: ignore[arg-type]
+    if price1000 is None:
+        price1000 = int(round(float(price) * 1000))
+        if isinstance(price, str) and len(_price1000_cache) < _PRICE1000_CACHE_MAX_SIZE:
+            _price1000_cache[price] = price1000
+    return price1000
+
+
+def to_size1000(size: str | float) -> int:
+    return int(round(float(size) * 1000))
+
+
+def from_value1000(value1000: int) -> str:
+    """Exact decimal string of a x1000 value (as in the raw messages, e.g. 12500 -> '12.5')"""
+    return f'{value1000 // 1000}.{value1000 % 1000:03d}'.rstrip('0').rstrip('.')
+
+
+def decode_frame(raw_frame: str | bytes, receive_time: float) -> list[WsMessage]:
+    """All messages of one websocket frame"""
+    message_list = orjson.loads(raw_frame)
+    assert isinstance(message_list, list)
+    return [decode_message(message, receive_time) for message in message_list]
+
+
+def decode_message(message: dict, receive_time: float) -> WsMessage:
+    """`book` and `price_change` become records, other messages stay dicts (with `_rt`)"""
+    event_type = message.get('event_type')
+    if event_type == 'book':
+        record: WsRecord = BookRecord()
+        record.bid_level1000_list = [
+            (to_price1000(level['price']), to_size1000(level['size'])) for level in message['bids']
+        ]
+        record.ask_level1000_list = [
+            (to_price1000(level['price']), to_size1000(level['size'])) for level in message['asks']
+        ]
+    elif event_type == 'price_change':
+        record = PriceChangeRecord()
+        record.change1000_list = [
+            (to_price1000(change['price']), to_size1000(change['size']), change['side'])
+            for change in message['changes']
+        ]
+    else:
+        message['_rt'] = receive_time
+        return message
+
+    record.event_type = event_type
+    record.asset_id = message['asset_id']
+    record.market = message['market']
+    record.timestamp = float(message['timestamp'])
+    record.hash = message['hash']
+    record._rt = receive_time
+    return record
+
+
+def to_ws_record(message: WsMessage) -> WsMessage:
+    """Decode a raw dict message (e.g. recorded), records are returned as they are"""
+    if isinstance(message, WsRecord):
+        return message
+    return decode_message(dict(message), message.get('_rt', float(0)))
+
+
+def to_ws_dict(message: WsMessage) -> dict:
+    """Raw dict of a message, the inverse of `to_ws_record`"""
+    if isinstance(message, WsRecord):
+        return message.to_dict()
+    return message
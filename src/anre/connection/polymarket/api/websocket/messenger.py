@@ -1,17 +1,243 @@
+import threading
+import time
 from collections import deque
+from typing import Optional
 
-from anre.utils.functions import yield_popleft
+from anre.connection.polymarket.api.websocket.decode import (
+    BookRecord,
+    PriceChangeRecord,
+    WsMessage,
+    to_ws_record,
+)
+
+POLICY_BLOCK = 'block'
+POLICY_DROP_OLDEST = 'drop_oldest'
+POLICY_COALESCE = 'coalesce'
+POLICIES = (POLICY_BLOCK, POLICY_DROP_OLDEST, POLICY_COALESCE)
+
+# put after dropped messages, the consumer has to resync (same as after reconnect)
+OVERFLOW_EVENT = 'overflow'
+
+
+class _CoalesceSlot:
+    __slots__ = ('message',)
+
+    def __init__(self, message: WsMessage):
+        self.message = message
 
 
 class Messenger:
-    def __init__(self):
+    """Bounded message queue between the websocket and the consumer
+
+    Policies when `max_size` messages are queued:
+        block: `put` waits for the consumer (backpressure to the websocket).
+        drop_oldest: the oldest message is dropped and an `_internal` `overflow` event is queued,
+            the consumer has to resync the state.
+        coalesce: `book`/`price_change` of an asset are merged into one queued message (the last
+            snapshot with later changes applied, or merged changes), so the queue depth is bounded
+            by the number of assets. Other messages block when full. Nothing is merged across an
+            `_internal` event.
+
+    Consumers can sleep in `wait` (condition variable) or pass `wakeup_event`.
+    `get_stats_dict` reports depth, lag (age of the oldest queued message) and drop counters.
+    """
+
+    def __init__(
+        self,
+        wakeup_event: threading.Event | None = None,
+        max_size: int = 100_000,
+        policy: str = POLICY_BLOCK,
+    ):
+        assert policy in POLICIES, f'unknown policy: {policy}'
+        # drop_oldest needs a place for the overflow event
+        assert max_size > (1 if policy == POLICY_DROP_OLDEST else 0)
         self._deque: deque = deque()
+        self._max_size = max_size
+        self._policy = policy
+        self._condition = threading.Condition()
+        # set on every message, so the consumer can sleep until something arrives
+        self._wakeup_event: threading.Event | None = wakeup_event
+        self._coalesce_slot_dict: dict[str, _CoalesceSlot] = {}
+        # queued overflow event (one is enough until the consumer takes it)
+        self._overflow_message: dict | None = None
+        self._put_count = 0
+        self._pop_count = 0
+        self._dropped_count = 0
+        self._coalesced_count = 0
+        self._blocked_count = 0
+        self._max_depth = 0
+
+    @property
+    def policy(self) -> str:
+        return self._policy
+
+    def put(self, message: WsMessage):
+        with self._condition:
+            self._put_count += 1
+            if self._policy == POLICY_COALESCE and self._coalesce(message):
+                self._coalesced_count += 1
+            else:
+                if len(self._deque) >= self._max_size:
+                    if self._policy == POLICY_DROP_OLDEST:
+                        while len(self._deque) >= self._max_size:
+                            self._drop_oldest()
+                    else:
+                        self._blocked_count += 1
+                        while len(self._deque) >= self._max_size:
+                            self._condition.wait(timeout=1)
+                self._append(message)
+            self._max_depth = max(self._max_depth, len(self._deque))
+            self._condition.notify_all()
+        if self._wakeup_event is not None:
+            self._wakeup_event.set()
+
+    def get_pop_messages(self, max_count: Optional[int] = None) -> list[WsMessage]:
+        with self._condition:
+            if max_count is None or max_count >= len(self._deque):
+                item_list = list(self._deque)
+                self._deque.clear()
+                self._coalesce_slot_dict.clear()
+            else:
+                item_list = [self._deque.popleft() for _ in range(max_count)]
+                for item in item_list:
+                    self._forget_slot(item)
+            self._pop_count += len(item_list)
+            if any(item is self._overflow_message for item in item_list):
+                self._overflow_message = None
+            self._condition.notify_all()
+        return [self._unwrap(item) for item in item_list]
+
+    def get_peek_messages(self, max_count: Optional[int] = None) -> list[WsMessage]:
+        with self._condition:
+            if max_count is None:
+                item_list = list(self._deque)
+            else:
+                item_list = [item for item, _ in zip(self._deque, range(max_count))]
+        return [self._unwrap(item) for item in item_list]
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Wait until there is a message. Returns False on timeout"""
+        with self._condition:
+            return self._condition.wait_for(lambda: len(self._deque) > 0, timeout=timeout)
+
+    def __len__(self) -> int:
+        return len(self._deque)
+
+    def get_lag_sec(self) -> float:
+        """Age of the oldest queued message (by receive time)"""
+        with self._condition:
+            if not self._deque:
+                return float(0)
+            receive_time = self._unwrap(self._deque[0]).get('_rt')
+        return max(time.time() - receive_time, float(0)) if receive_time else float(0)
+
+    def get_stats_dict(self) -> dict:
+        lag_sec = self.get_lag_sec()
+        with self._condition:
+            return {
+                'policy': self._policy,
+                'depth': len(self._deque),
+                'max_depth': self._max_depth,
+                'max_size': self._max_size,
+                'lag_sec': lag_sec,
+                'put_count': self._put_count,
+                'pop_count': self._pop_count,
+                'dropped_count': self._dropped_count,
+                'coalesced_count': self._coalesced_count,
+                'blocked_count': self._blocked_count,
+            }
+
+    def _append(self, message: WsMessage):
+        if self._policy == POLICY_COALESCE and message['event_type'] in ['book', 'price_change']:
+            slot = _CoalesceSlot(message)
+            self._coalesce_slot_dict[message['asset_id']] = slot
+            self._deque.append(slot)
+        else:
+            if message['event_type'] == '_internal':
+                # later messages are not merged into the ones before the event
+                self._coalesce_slot_dict.clear()
+            self._deque.append(message)
+
+    def _drop_oldest(self):
+        """Drop the oldest message. The overflow event is kept in front of the queue"""
+        if self._overflow_message is None:
+            self._forget_slot(self._deque.popleft())
+            now = time.time()
+            self._overflow_message = {
+                'event_type': '_internal',
+                'event': OVERFLOW_EVENT,
+                'timestamp': now,
+                '_rt': now,
+            }
+            self._deque.appendleft(self._overflow_message)
+        else:
+            assert self._deque[0] is self._overflow_message
+            self._forget_slot(self._deque[1])
+            del self._deque[1]
+        self._dropped_count += 1
+
+    def _coalesce(self, message: WsMessage) -> bool:
+        """Merge into the queued message of the same asset. Returns False if there is none"""
+        if message['event_type'] not in ['book', 'price_change']:
+            return False
+        slot = self._coalesce_slot_dict.get(message['asset_id'])
+        if slot is None:
+            return False
+        slot.message = _merge(to_ws_record(slot.message), to_ws_record(message))
+        return True
+
+    def _forget_slot(self, item):
+        if isinstance(item, _CoalesceSlot):
+            asset_id = item.message['asset_id']
+            if self._coalesce_slot_dict.get(asset_id) is item:
+                del self._coalesce_slot_dict[asset_id]
+
+    @staticmethod
+    def _unwrap(item) -> WsMessage:
+        return item.message if isinstance(item, _CoalesceSlot) else item
 
-    def put(self, message: dict):
-        self._deque.append(message)
 
-    def get_pop_messages(self) -> list[dict]:
-        return list(yield_popleft(self._deque))
+def _merge(old: WsMessage, new: WsMessage) -> WsMessage:
+    """One message with the same effect on the book as `old` followed by `new`
 
-    def get_peek_messages(self) -> list[dict]:
-        return list(self._deque)
+    `_rt` is the receive time of the oldest merged message, so the lag and the latency of the
+    merged message show how long the data waited in the queue.
+    """
+    if isinstance(new, BookRecord):
+        # the snapshot replaces everything before it
+        merged: BookRecord | PriceChangeRecord = new
+    elif isinstance(old, BookRecord):
+        assert isinstance(new, PriceChangeRecord)
+        level1000_dict_dict = {
+            'BUY': dict(old.bid_level1000_list),
+            'SELL': dict(old.ask_level1000_list),
+        }
+        for price1000, size1000, side in new.change1000_list:
+            # as `Book1000.update_overwrite1000`
+            if size1000 > 0:
+                level1000_dict_dict[side][price1000] = size1000
+            else:
+                level1000_dict_dict[side].pop(price1000, None)
+        merged = BookRecord()
+        merged.bid_level1000_list = list(level1000_dict_dict['BUY'].items())
+        merged.ask_level1000_list = list(level1000_dict_dict['SELL'].items())
+        merged.event_type = 'book'
+    else:
+        assert isinstance(new, PriceChangeRecord)
+        assert isinstance(old, PriceChangeRecord)
+        # overwrite semantics: the last change of a level wins
+        change1000_dict = {
+            (price1000, side): size1000
+            for price1000, size1000, side in old.change1000_list + new.change1000_list
+        }
+        merged = PriceChangeRecord()
+        merged.change1000_list = [
+            (price1000, size1000, side) for (price1000, side), size1000 in change1000_dict.items()
+        ]
+        merged.event_type = 'price_change'
+    merged.asset_id = new.asset_id
+    merged.market = new.market
+    merged.timestamp = new.timestamp
+    merged.hash = new.hash
+    merged._rt = old._rt
+    return merged
@@ -0,0 +1,85 @@
+import orjson
+
+from anre.connection.polymarket.api.cache.public_book import PublicAssetBook
+from anre.connection.polymarket.api.websocket.decode import (
+    BookRecord,
+    PriceChangeRecord,
+    decode_frame,
+    to_ws_dict,
+    to_ws_record,
+)
+from anre.utils import testutil
+from anre.utils.Json.Json import Json
+
+_BOOK_MESSAGE = {
+    'event_type': 'book',
+    'asset_id': 'AAA',
+    'market': '0xm',
+    'timestamp': '1750108148081',
+    'hash': 'h1',
+    'bids': [{'price': '0.48', 'size': '100'}, {'price': '0.47', 'size': '12.5'}],
+    'asks': [{'price': '0.52', 'size': '30'}],
+}
+_PRICE_CHANGE_MESSAGE = {
+    'event_type': 'price_change',
+    'asset_id': 'AAA',
+    'market': '0xm',
+    'timestamp': '1750108148090',
+    'hash': 'h2',
+    'changes': [
+        {'price': '0.48', 'size': '0', 'side': 'BUY'},
+        {'price': '0.51', 'size': '7.25', 'side': 'SELL'},
+    ],
+}
+
+
+class TestDecode(testutil.TestCase):
+    def test_decode_frame(self) -> None:
+        tick_message = {'event_type': 'tick_size_change', 'asset_id': 'AAA'}
+        raw_frame = orjson.dumps([_BOOK_MESSAGE, _PRICE_CHANGE_MESSAGE, tick_message])
+        book, price_change, tick = decode_frame(raw_frame, receive_time=10.0)
+
+        assert isinstance(book, BookRecord)
+        assert book.bid_level1000_list == [(480, 100000), (470, 12500)]
+        assert book.ask_level1000_list == [(520, 30000)]
+        assert book.timestamp == 1750108148081.0
+        # dict like access for dispatch code
+        assert book['event_type'] == 'book' and book['_rt'] == 10.0
+        assert 'hash' in book and 'changes' not in book
+        assert book.get('changes') is None
+
+        assert isinstance(price_change, PriceChangeRecord)
+        assert price_change.change1000_list == [(480, 0, 'BUY'), (510, 7250, 'SELL')]
+
+        assert tick == {**tick_message, '_rt': 10.0}
+
+    def test_record_and_dict_update_the_same(self) -> None:
+        record_book = PublicAssetBook(asset_id='AAA')
+        dict_book = PublicAssetBook(asset_id='AAA')
+        for message in [_BOOK_MESSAGE, _PRICE_CHANGE_MESSAGE]:
+            record_book.update_from_ws_message(to_ws_record(message))
+            dict_book.update_from_ws_message(message)
+
+        assert record_book.book1000 == dict_book.book1000
+        assert dict(record_book.book1000.bids) == {470: 12500}
+        assert dict(record_book.book1000.asks) == {510: 7250, 520: 30000}
+        assert record_book.timestamp == 1750108148090.0
+        # raw messages are not changed
+        assert '_rt' not in _BOOK_MESSAGE
+
+    def test_to_dict_is_the_raw_message(self) -> None:
+        tick_message = {'event_type': 'tick_size_change', 'asset_id': 'AAA'}
+        raw_frame = orjson.dumps([_BOOK_MESSAGE, _PRICE_CHANGE_MESSAGE, tick_message])
+        message_list = decode_frame(raw_frame, receive_time=10.0)
+
+        dict_list = [to_ws_dict(message) for message in message_list]
+        assert dict_list == [
+            {**_BOOK_MESSAGE, '_rt': 10.0},
+            {**_PRICE_CHANGE_MESSAGE, '_rt': 10.0},
+            {**tick_message, '_rt': 10.0},
+        ]
+        # e.g. the test resources are dumped as json and decoded again
+        Json.dumps(dict_list)
+        assert [to_ws_record(message) for message in dict_list][0].bid_level1000_list == (
+            message_list[0].bid_level1000_list
+        )
@@ -0,0 +1,157 @@
+import threading
+import time
+
+from anre.connection.polymarket.api.cache.public_book import PublicAssetBook
+from anre.connection.polymarket.api.websocket.decode import (
+    BookRecord,
+    PriceChangeRecord,
+    decode_message,
+)
+from anre.connection.polymarket.api.websocket.messenger import (
+    OVERFLOW_EVENT,
+    POLICY_COALESCE,
+    POLICY_DROP_OLDEST,
+    Messenger,
+)
+from anre.utils import testutil
+
+
+def _book(asset_id: str, timestamp: int, bids: list, asks: list) -> BookRecord:
+    message = {
+        'event_type': 'book',
+        'asset_id': asset_id,
+        'market': '0xm',
+        'timestamp': str(timestamp),
+        'hash': f'h{timestamp}',
+        'bids': [{'price': price, 'size': size} for price, size in bids],
+        'asks': [{'price': price, 'size': size} for price, size in asks],
+    }
+    return decode_message(message, receive_time=time.time())
+
+
+def _price_change(asset_id: str, timestamp: int, changes: list) -> PriceChangeRecord:
+    message = {
+        'event_type': 'price_change',
+        'asset_id': asset_id,
+        'market': '0xm',
+        'timestamp': str(timestamp),
+        'hash': f'h{timestamp}',
+        'changes': [{'price': price, 'size': size, 'side': side} for price, size, side in changes],
+    }
+    return decode_message(message, receive_time=time.time())
+
+
+class TestMessenger(testutil.TestCase):
+    def test_block_until_consumed(self) -> None:
+        messenger = Messenger(max_size=2)
+        messenger.put({'event_type': 'order', 'id': 1})
+        messenger.put({'event_type': 'order', 'id': 2})
+
+        thread = threading.Thread(target=messenger.put, args=({'event_type': 'order', 'id': 3},))
+        thread.start()
+        thread.join(timeout=0.2)
+        assert thread.is_alive()
+
+        assert [el['id'] for el in messenger.get_pop_messages(max_count=1)] == [1]
+        thread.join(timeout=5)
+        assert not thread.is_alive()
+        assert [el['id'] for el in messenger.get_peek_messages()] == [2, 3]
+        assert messenger.get_stats_dict()['blocked_count'] == 1
+        assert messenger.wait(timeout=0)
+
+    def test_drop_oldest_queues_overflow_event(self) -> None:
+        messenger = Messenger(max_size=3, policy=POLICY_DROP_OLDEST)
+        for nr in range(6):
+            messenger.put({'event_type': 'order', 'id': nr})
+
+        message_list = messenger.get_pop_messages()
+        assert [el.get('id', el.get('event')) for el in message_list] == [
+            OVERFLOW_EVENT,
+            4,
+            5,
+        ]
+        stats_dict = messenger.get_stats_dict()
+        assert stats_dict['dropped_count'] == 4
+        assert stats_dict['depth'] == 0
+        assert not messenger.wait(timeout=0.01)
+
+    def test_coalesce_keeps_the_book_result(self) -> None:
+        message_list = [
+            _book('A', 1, bids=[('0.40', '10'), ('0.39', '5')], asks=[('0.60', '7')]),
+            _price_change('B', 2, [('0.30', '1', 'BUY')]),
+            _price_change('A', 3, [('0.40', '0', 'BUY'), ('0.41', '2', 'BUY')]),
+            _price_change('A', 4, [('0.41', '3', 'BUY'), ('0.59', '1', 'SELL')]),
+            {'event_type': '_internal', 'event': 'reconnect', 'timestamp': 5.0},
+            _price_change('A', 6, [('0.60', '0', 'SELL')]),
+            _price_change('B', 7, [('0.30', '2', 'BUY'), ('0.31', '1', 'SELL')]),
+            _price_change('B', 8, [('0.30', '4', 'BUY')]),
+        ]
+        messenger = Messenger(policy=POLICY_COALESCE)
+        for message in message_list:
+            messenger.put(message)
+
+        coalesced_message_list = messenger.get_pop_messages()
+        assert [(el['asset_id'] if 'asset_id' in el else '_') for el in coalesced_message_list] == [
+            'A',
+            'B',
+            '_',
+            'A',
+            'B',
+        ]
+        assert messenger.get_stats_dict()['coalesced_count'] == 3
+        assert coalesced_message_list[0]['event_type'] == 'book'
+        assert coalesced_message_list[0].timestamp == 4.0
+        assert sorted(coalesced_message_list[4].change1000_list) == [
+            (300, 4000, 'BUY'),
+            (310, 1000, 'SELL'),
+        ]
+
+        for asset_id in ['A', 'B']:
+            book = PublicAssetBook(asset_id=asset_id)
+            coalesced_book = PublicAssetBook(asset_id=asset_id)
+            for message in message_list:
+                if message.get('asset_id') == asset_id:
+                    book.update_from_ws_message(message)
+            for message in coalesced_message_list:
+                if message.get('asset_id') == asset_id:
+                    coalesced_book.update_from_ws_message(message)
+            assert book.book1000 == coalesced_book.book1000
+            assert book.timestamp == coalesced_book.timestamp
+            assert book.hash == coalesced_book.hash
+
+    def test_coalesce_keeps_the_oldest_receive_time(self) -> None:
+        message_list = [
+            _price_change('A', 1, [('0.40', '1', 'BUY')]),
+            _price_change('A', 2, [('0.41', '1', 'BUY')]),
+            _book('A', 3, bids=[('0.40', '10')], asks=[('0.60', '7')]),
+            _price_change('A', 4, [('0.59', '1', 'SELL')]),
+        ]
+        for nr, message in enumerate(message_list):
+            message._rt = 100.0 + nr
+        messenger = Messenger(policy=POLICY_COALESCE)
+        for message in message_list:
+            messenger.put(message)
+
+        assert messenger.get_lag_sec() > time.time() - 101.0
+        (coalesced_message,) = messenger.get_pop_messages()
+        # the data waited since the first merged message
+        assert coalesced_message['_rt'] == 100.0
+        assert coalesced_message.timestamp == 4.0
+
+    def test_wakeup_event_is_set_on_put(self) -> None:
+        wakeup_event = threading.Event()
+        messenger = Messenger(wakeup_event=wakeup_event, policy=POLICY_COALESCE)
+        assert not wakeup_event.is_set()
+
+        messenger.put(_book('A', 1, bids=[('0.40', '10')], asks=[('0.60', '7')]))
+        assert wakeup_event.is_set()
+        wakeup_event.clear()
+
+        # merged into the queued message, the consumer is woken up anyway
+        messenger.put(_price_change('A', 2, [('0.41', '1', 'BUY')]))
+        assert wakeup_event.is_set()
+        assert len(messenger) == 1
+
+        wakeup_event.clear()
+        messenger.get_pop_messages()
+        assert not wakeup_event.is_set()
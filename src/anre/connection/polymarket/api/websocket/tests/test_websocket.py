@@ -0,0 +1,39 @@
+import tempfile
+
+from anre.connection.polymarket.api.recorder.recorder import (
+    MarketDataRecorder,
+    iter_recorded_records,
+    set_market_data_recorder,
+)
+from anre.connection.polymarket.api.recorder.segment import KIND_WS_MARKET
+from anre.connection.polymarket.api.websocket.websocket import PolymarketWebSocket
+from anre.utils import testutil
+
+
+class TestPolymarketWebSocket(testutil.TestCase):
+    def test_error_event_with_recorder(self) -> None:
+        with tempfile.TemporaryDirectory() as dir_path:
+            recorder = MarketDataRecorder(dir_path=dir_path)
+            set_market_data_recorder(recorder)
+            ws = PolymarketWebSocket.new_markets(asset_ids=['A'])
+            try:
+                ws._start_decode_thread()
+                ws._on_error(None, ConnectionResetError())
+                assert ws.messenger.wait(timeout=5)
+                message_list = ws.messenger.get_pop_messages()
+                assert [el['event'] for el in message_list] == ['error']
+                assert isinstance(message_list[0]['error'], ConnectionResetError)
+
+                # the decode thread is alive, the next frames go through
+                ws._on_close(None)
+                assert ws.messenger.wait(timeout=5)
+                assert [el['event'] for el in ws.messenger.get_pop_messages()] == ['close']
+                assert ws._decode_thread.is_alive()
+            finally:
+                set_market_data_recorder(None)
+                ws.stop()
+                ws._decode_thread.join(timeout=5)
+                recorder.stop()
+
+            record_list = list(iter_recorded_records(dir_path, kind_list=[KIND_WS_MARKET]))
+            assert len(record_list) == 2
@@ -4,11 +4,14 @@ import threading
 import time
 from typing import Optional, Tuple
 
-import orjson
 from websocket import WebSocketApp, WebSocketException
 
 from anre.config.config import config as anre_config
+from anre.connection.polymarket.api.recorder.recorder import get_market_data_recorder
+from anre.connection.polymarket.api.websocket.decode import decode_frame
 from anre.connection.polymarket.api.websocket.messenger import Messenger
+from anre.utils.dataStructure.ring_buffer import SpscRingBuffer
+from anre.utils.latency.tracer import STAGE_WS_RECEIVE, get_latency_tracer
 
 MARKET_CHANNEL = 'market'
 USER_CHANNEL = 'user'
@@ -27,7 +30,17 @@ _channel_uri_map = {
 
 
 class PolymarketWebSocket:
+    """Polymarket websocket channel, messages are put into the messenger
+
+    The websocket thread only puts raw frames into a lock free ring buffer. The decode thread
+    parses them (one frame at a time) into typed records (`decode.BookRecord`,
+    `decode.PriceChangeRecord`, other events stay dicts) and puts them into the messenger.
+    Internal events go through the same buffer, so the order is kept. Raw frames are recorded
+    by the decode thread into the process wide `recorder.MarketDataRecorder`, if one is set.
+    """
+
     _url = "wss://ws-subscriptions-clob.polymarket.com"
+    _frame_buffer_capacity = 65536
 
     @classmethod
     def new_markets(cls, asset_ids: list[str], messenger: Messenger = None):
@@ -75,6 +88,14 @@ class PolymarketWebSocket:
         self._ping_interval = 10
         self._ws: Optional[WebSocketApp] = None
         self._messanger = messenger
+        # (receive_time, raw frame or internal message dict), filled by the websocket thread
+        self._frame_buffer = SpscRingBuffer(capacity=self._frame_buffer_capacity)
+        # during reconnect the old and the new websocket threads can both put (the decode side
+        # takes no lock)
+        self._frame_put_lock = threading.Lock()
+        self._frame_event = threading.Event()
+        self._decode_stop_event = threading.Event()
+        self._decode_thread: Optional[threading.Thread] = None
 
         assert self._ping_interval > 5
 
@@ -101,7 +122,7 @@ class PolymarketWebSocket:
     def _proc_message(self, message: dict):
         assert isinstance(message, dict)
         assert 'event_type' in message
-        self._messanger.put(message)
+        self._put_frame(time.time(), message)
 
     def _on_message(self, ws, message):
         self._last_receive_time = receive_time = time.time()
@@ -109,12 +130,54 @@ class PolymarketWebSocket:
             self._pong_event.set()
             self._logger.debug("pong")
         else:
-            parsed_message = orjson.loads(message)
-            assert isinstance(parsed_message, list)
-            self._last_receive_time = receive_time
-            for submessage in parsed_message:
-                submessage['_rt'] = receive_time
-                self._proc_message(submessage)
+            self._put_frame(receive_time, message)
+
+    def _put_frame(self, receive_time: float, frame: str | bytes | dict):
+        """Websocket thread side of the frame buffer"""
+        with self._frame_put_lock:
+            if not self._frame_buffer.put((receive_time, frame)):
+                self._logger.warning('Websocket frame buffer is full. Waiting for decoding.')
+                while not self._frame_buffer.put((receive_time, frame)):
+                    self._frame_event.set()
+                    time.sleep(0.001)
+        self._frame_event.set()
+
+    def _decode_loop(self):
+        latency_tracer = get_latency_tracer()
+        while not self._decode_stop_event.is_set():
+            self._frame_event.wait(timeout=0.5)
+            self._frame_event.clear()
+            recorder = get_market_data_recorder()
+            for receive_time, frame in self._frame_buffer.pop_all():
+                if recorder is not None:
+                    # recording must not break the live path
+                    try:
+                        recorder.record_ws_frame(self.channel_type, receive_time, frame)
+                    except Exception as e:
+                        self._logger.exception(f'Failed to record websocket frame: {e}')
+                if isinstance(frame, dict):
+                    self._messanger.put(frame)
+                    continue
+                try:
+                    message_list = decode_frame(frame, receive_time=receive_time)
+                except Exception as e:
+                    self._logger.exception(f'Failed to decode websocket frame: {e}; {frame!r}')
+                    continue
+                for message in message_list:
+                    self._messanger.put(message)
+                if message_list and 'timestamp' in message_list[0]:
+                    # one per frame, messages of a frame are sent together (timestamp is in ms)
+                    server_time = float(message_list[0]['timestamp']) / 1000
+                    latency_tracer.record(STAGE_WS_RECEIVE, receive_time - server_time)
+
+    def _start_decode_thread(self):
+        if self._decode_thread is not None and self._decode_thread.is_alive():
+            return
+        self._decode_stop_event.clear()
+        self._decode_thread = threading.Thread(
+            name=f'{self.__class__.__name__}._decode_loop', target=self._decode_loop, daemon=True
+        )
+        self._decode_thread.start()
 
     def _on_reconnect(self, ws):
         print('_on_reconnect')
@@ -185,11 +248,14 @@ class PolymarketWebSocket:
             raise WebSocketException('Couldn\'t connect to WS! Exiting.')
 
     def start(self):
+        self._start_decode_thread()
         self._connect(reconnect=False)
 
     def stop(self):
         if self._ws:
             self._ws.close()
+        self._decode_stop_event.set()
+        self._frame_event.set()
 
     def _send_subscribe(self):
         if self.channel_type == MARKET_CHANNEL:
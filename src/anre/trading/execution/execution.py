@@ -16,9 +16,27 @@ from anre.utils.time.timer.timerReal import TimerReal
 
 
 class Execution:
-    def __init__(self, monitor: BaseMonitor, strategy_box: StrategyBox, timer: TimerReal):
+    """Runs monitor and strategy iterations in a loop
+
+    By default an iteration starts every `wait_sec`. With `event_driven=True` the loop sleeps
+    until the monitor reports a change (`BaseMonitor.wait_for_change`), at most `wait_sec`. Changes
+    arriving during an iteration or within `min_iteration_gap_sec` after its start are coalesced
+    into the next iteration.
+    """
+
+    def __init__(
+        self,
+        monitor: BaseMonitor,
+        strategy_box: StrategyBox,
+        timer: TimerReal,
+        wait_sec: float = 5,
+        event_driven: bool = False,
+        min_iteration_gap_sec: float = 0.1,
+    ):
         assert isinstance(monitor, BaseMonitor)
         assert isinstance(strategy_box, StrategyBox)
+        assert wait_sec > 0
+        assert min_iteration_gap_sec >= 0
 
         self._monitor: BaseMonitor = monitor
         self._strategy_box = strategy_box
@@ -27,6 +45,9 @@ class Execution:
         self._finishEvent = Event()
         self._logger = logging.getLogger(__name__)
         self._runThread = None
+        self._wait_sec: float = wait_sec
+        self._event_driven: bool = event_driven
+        self._min_iteration_gap_sec: float = min_iteration_gap_sec
 
     def run(self, join: bool = False):
         assert not self._finishEvent.is_set()
@@ -58,17 +79,10 @@ class Execution:
         return self._runThread is not None and self._runThread.is_alive()
 
     def _iteration(self):
-        waitParam = 5
-
-        # check time and wait as needed
-        takesTime = self._timer.nowS() - self._lastIterationStartTime
-        if takesTime > waitParam:
-            if self._lastIterationStartTime > 0:
-                self._logger.warning(
-                    f'A single iteration of Execution is bigger then waitParam(`{waitParam}`): {takesTime=}'
-                )
-        waitInstanceSec = max(0.0, waitParam - takesTime)
-        self._wait(waitSec=waitInstanceSec)
+        if self._event_driven:
+            self._wait_for_change()
+        else:
+            self._wait_for_period()
 
         if self._finishEvent.is_set():
             return None
@@ -92,6 +106,27 @@ class Execution:
         if not keepRunning:
             self.finish(isInternalFinish=True)
 
+    def _wait_for_period(self):
+        waitParam = self._wait_sec
+
+        # check time and wait as needed
+        takesTime = self._timer.nowS() - self._lastIterationStartTime
+        if takesTime > waitParam:
+            if self._lastIterationStartTime > 0:
+                self._logger.warning(
+                    f'A single iteration of Execution is bigger then waitParam(`{waitParam}`): {takesTime=}'
+                )
+        waitInstanceSec = max(0.0, waitParam - takesTime)
+        self._wait(waitSec=waitInstanceSec)
+
+    def _wait_for_change(self):
+        # bursts of changes are handled by a single iteration
+        takesTime = self._timer.nowS() - self._lastIterationStartTime
+        if takesTime < self._min_iteration_gap_sec:
+            self._wait(waitSec=self._min_iteration_gap_sec - takesTime)
+        # without changes the iteration still runs every wait_sec (reconciliation, timeouts)
+        self._monitor.wait_for_change(timeout=self._wait_sec)
+
     def _wait(self, waitSec: float):
         time.sleep(waitSec)
 
@@ -141,8 +176,6 @@ def __dummy__():
     self = monitor = FlyBoolMarketMonitor(condition_id=condition_id, default_gtt=3600)
     monitor.iteration(gtt=1)
 
-
-
     timer = monitor._timer
     strategy_box = StrategyBox(
         monitor=monitor,
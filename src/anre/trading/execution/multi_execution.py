@@ -0,0 +1,236 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Optional
+
+from anre.trading.monitor.base import BaseMonitor
+from anre.trading.strategy.action.executor.worker import ActionWorker
+from anre.trading.strategy.strategyBox.strategyBox import StrategyBox
+from anre.utils.time.timer.timerReal import TimerReal
+
+
+@dataclass
+class _MarketSlot:
+    key: str
+    monitor: BaseMonitor
+    strategy_box: StrategyBox
+    priority: float
+    wait_sec: float
+    event_driven: bool
+    due_time: float = 0.0
+    last_start_time: float = 0.0
+    in_flight: bool = False
+    iteration_count: int = 0
+    error_count: int = 0
+
+
+class MultiExecution:
+    """Runs iterations of many (monitor, strategy_box) pairs on one shared worker pool
+
+    One scheduler thread decides which market iterates next, `max_workers` threads run the
+    iterations. A market has at most one iteration in flight. Markets that are due are started in
+    the order of `due_time - priority`, i.e. `priority` is a head start in seconds: important
+    markets go first, but the others still progress (no starvation).
+
+    A market is due every `wait_sec` after its last start. Event driven markets are also due as
+    soon as the monitor reports a change (`BaseMonitor.wait_for_change`), but not earlier than
+    `min_iteration_gap_sec` after the last start, so bursts are coalesced.
+
+    API clients (`MasterClient`) and rate limiters are process wide, so all markets share them.
+    Strategy boxes should share `action_worker` too (`StrategyBox(action_worker=...)`), so the
+    number of action threads does not grow with the number of markets.
+    An error in a market iteration is logged and the market is scheduled again.
+    """
+
+    def __init__(
+        self,
+        timer: Optional[TimerReal] = None,
+        max_workers: int = 8,
+        min_iteration_gap_sec: float = 0.1,
+        tick_sec: float = 0.01,
+        action_max_workers: int = 4,
+        action_max_queue_size: int = 256,
+    ):
+        assert max_workers > 0
+        assert min_iteration_gap_sec >= 0
+        assert tick_sec > 0
+        self._timer = timer if timer is not None else TimerReal()
+        self._max_workers = max_workers
+        self._min_iteration_gap_sec = min_iteration_gap_sec
+        self._tick_sec = tick_sec
+        self._slot_dict: dict[str, _MarketSlot] = {}
+        self._lock = threading.Lock()
+        self._wakeup_event = threading.Event()
+        self._finishEvent = threading.Event()
+        self._worker_pool: Optional[ThreadPoolExecutor] = None
+        self._runThread: Optional[threading.Thread] = None
+        self._logger = logging.getLogger(__name__)
+        self._action_worker = ActionWorker(
+            max_workers=action_max_workers,
+            max_queue_size=action_max_queue_size,
+            name=f'{self.__class__.__name__}.ActionWorker',
+        )
+
+    @property
+    def action_worker(self) -> ActionWorker:
+        return self._action_worker
+
+    def add(
+        self,
+        key: str,
+        monitor: BaseMonitor,
+        strategy_box: StrategyBox,
+        priority: float = 0,
+        wait_sec: float = 5,
+        event_driven: bool = False,
+    ):
+        assert isinstance(monitor, BaseMonitor)
+        assert isinstance(strategy_box, StrategyBox)
+        assert wait_sec > 0
+        with self._lock:
+            assert key not in self._slot_dict, f'market is already added: {key}'
+            self._slot_dict[key] = _MarketSlot(
+                key=key,
+                monitor=monitor,
+                strategy_box=strategy_box,
+                priority=priority,
+                wait_sec=wait_sec,
+                event_driven=event_driven,
+                due_time=self._timer.nowS(),
+            )
+        self._wakeup_event.set()
+
+    def remove(self, key: str):
+        """The market is not scheduled anymore (an iteration in flight is finished)"""
+        with self._lock:
+            self._slot_dict.pop(key)
+
+    def get_report_dict(self) -> dict[str, dict]:
+        with self._lock:
+            return {
+                key: {
+                    'priority': slot.priority,
+                    'in_flight': slot.in_flight,
+                    'iteration_count': slot.iteration_count,
+                    'error_count': slot.error_count,
+                    'last_start_time': slot.last_start_time,
+                }
+                for key, slot in self._slot_dict.items()
+            }
+
+    def run(self, join: bool = False):
+        assert not self._finishEvent.is_set()
+        assert self._runThread is None or not self._runThread.is_alive()
+
+        self._worker_pool = ThreadPoolExecutor(
+            max_workers=self._max_workers, thread_name_prefix=f'{self.__class__.__name__}.worker'
+        )
+        self._runThread = threading.Thread(
+            name=f'{self.__class__.__name__}._run', target=self._run, daemon=False
+        )
+        self._runThread.start()
+        if join:
+            self.join()
+
+    def join(self):
+        assert self._runThread is not None, 'Execution has not started, so it can not be joined.'
+        self._runThread.join()
+        self._runThread = None
+
+    def is_finished(self) -> bool:
+        return self._finishEvent.is_set()
+
+    def is_alive(self) -> bool:
+        return self._runThread is not None and self._runThread.is_alive()
+
+    def finish(self):
+        self._finishEvent.set()
+        self._wakeup_event.set()
+
+    def _run(self):
+        try:
+            while not self._finishEvent.is_set():
+                wait_sec = self._schedule()
+                self._wakeup_event.wait(timeout=wait_sec)
+                self._wakeup_event.clear()
+        finally:
+            # iterations in flight are finished, then their actions
+            self._worker_pool.shutdown(wait=True)
+            self._action_worker.join()
+            self._action_worker.stop()
+
+    def _schedule(self) -> float:
+        """Start due iterations. Returns seconds until the scheduler should look again"""
+        now = self._timer.nowS()
+        with self._lock:
+            idle_slot_list = [slot for slot in self._slot_dict.values() if not slot.in_flight]
+            has_event_driven = False
+            for slot in idle_slot_list:
+                if slot.event_driven:
+                    has_event_driven = True
+                    if slot.monitor.wait_for_change(timeout=0):
+                        earliest_time = slot.last_start_time + self._min_iteration_gap_sec
+                        slot.due_time = min(slot.due_time, max(now, earliest_time))
+
+            in_flight_count = len(self._slot_dict) - len(idle_slot_list)
+            free_worker_count = self._max_workers - in_flight_count
+            ready_slot_list = [slot for slot in idle_slot_list if slot.due_time <= now]
+            ready_slot_list.sort(key=lambda slot: slot.due_time - slot.priority)
+            for slot in ready_slot_list[: max(free_worker_count, 0)]:
+                slot.in_flight = True
+                slot.last_start_time = now
+                self._worker_pool.submit(self._iteration, slot)
+
+            next_due_time_list = [
+                slot.due_time for slot in self._slot_dict.values() if not slot.in_flight
+            ]
+        wait_sec = min(next_due_time_list) - now if next_due_time_list else 1.0
+        if has_event_driven:
+            wait_sec = min(wait_sec, self._tick_sec)
+        return max(wait_sec, 0.0)
+
+    def _iteration(self, slot: _MarketSlot):
+        is_failed = True
+        try:
+            slot.monitor.iteration(gtt=-1)
+            slot.monitor.assert_up_to_date(gtt=1)
+            slot.strategy_box.iteration()
+            is_failed = False
+        except Exception as e:
+            self._logger.exception(f'MultiExecution iteration of {slot.key} failed: {e}')
+        finally:
+            # slot counters are read by the scheduler and the report under the lock
+            with self._lock:
+                slot.error_count += int(is_failed)
+                slot.iteration_count += 1
+                slot.in_flight = False
+                slot.due_time = slot.last_start_time + slot.wait_sec
+            self._wakeup_event.set()
+
+
+def __dummy__():
+    from anre.trading.monitor.monitors.boolMarket.streamFlyBoolMarket import StreamFlyBoolMarket
+    from anre.trading.strategy.brain.brains.balance_market_maker.balance_market_maker import (
+        BalanceMarketMaker as BalanceMarketMakerStrategyBrain,
+    )
+
+    condition_id_list = [
+        '0x11db077700a35d7415b6198c5e5a53adcf1db1819a09831f7eaf148f88243c40',
+    ]
+    multi_execution = MultiExecution(max_workers=8)
+    for condition_id in condition_id_list:
+        monitor = StreamFlyBoolMarket(condition_id=condition_id, default_gtt=3600)
+        strategy_brain = BalanceMarketMakerStrategyBrain.new(share_size=25)
+        strategy_box = StrategyBox(
+            monitor=monitor,
+            strategy_brain=strategy_brain,
+            action_worker=multi_execution.action_worker,
+        )
+        multi_execution.add(
+            key=condition_id, monitor=monitor, strategy_box=strategy_box, event_driven=True
+        )
+
+    multi_execution.run()
+    multi_execution.get_report_dict()
+    multi_execution.finish()
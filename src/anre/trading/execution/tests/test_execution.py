@@ -0,0 +1,103 @@
+import threading
+import time
+import unittest
+
+from anre.trading.execution.execution import Execution
+from anre.trading.monitor.base import BaseMonitor
+from anre.trading.strategy.strategyBox.strategyBox import StrategyBox
+
+
+class _Monitor(BaseMonitor):
+    def __init__(self):
+        self.change_event = threading.Event()
+        self.timeout_list = []
+
+    def iteration(self, gtt=2):
+        pass
+
+    def assert_up_to_date(self, gtt=None):
+        pass
+
+    def wait_for_change(self, timeout: float) -> bool:
+        self.timeout_list.append(timeout)
+        is_changed = self.change_event.wait(timeout=timeout)
+        self.change_event.clear()
+        return is_changed
+
+
+class _StrategyBox(StrategyBox):
+    def __init__(self):
+        self.start_time_list = []
+
+    def iteration(self):
+        self.start_time_list.append(time.monotonic())
+
+
+class _Timer:
+    def nowS(self) -> float:
+        return time.monotonic()
+
+
+def _wait_until(fun, timeout=2.0):
+    start_time = time.monotonic()
+    while not fun():
+        assert time.monotonic() - start_time < timeout, 'timeout'
+        time.sleep(0.005)
+
+
+class TestExecutionEventDriven(unittest.TestCase):
+    def _run(self, wait_sec: float, min_iteration_gap_sec: float):
+        monitor = _Monitor()
+        strategy_box = _StrategyBox()
+        execution = Execution(
+            monitor=monitor,
+            strategy_box=strategy_box,
+            timer=_Timer(),
+            wait_sec=wait_sec,
+            event_driven=True,
+            min_iteration_gap_sec=min_iteration_gap_sec,
+        )
+        execution.run()
+        self.addCleanup(self._finish, execution=execution, monitor=monitor)
+        return monitor, strategy_box
+
+    @staticmethod
+    def _finish(execution: Execution, monitor: _Monitor):
+        execution.finish()
+        # wake the loop up, so it sees the finish
+        monitor.change_event.set()
+        execution.join()
+
+    def test_wakes_on_change(self):
+        monitor, strategy_box = self._run(wait_sec=60, min_iteration_gap_sec=0)
+        time.sleep(0.05)
+        assert strategy_box.start_time_list == []
+
+        for count in [1, 2]:
+            monitor.change_event.set()
+            _wait_until(lambda: len(strategy_box.start_time_list) == count)
+        time.sleep(0.05)
+        assert len(strategy_box.start_time_list) == 2
+
+    def test_waits_at_most_wait_sec(self):
+        monitor, strategy_box = self._run(wait_sec=0.05, min_iteration_gap_sec=0)
+        # no changes, the iterations still run every wait_sec
+        _wait_until(lambda: len(strategy_box.start_time_list) >= 3)
+        assert set(monitor.timeout_list) == {0.05}
+        start_time_list = strategy_box.start_time_list[:3]
+        assert start_time_list[2] - start_time_list[0] < 1.0
+
+    def test_coalesces_bursts(self):
+        monitor, strategy_box = self._run(wait_sec=60, min_iteration_gap_sec=0.2)
+        monitor.change_event.set()
+        _wait_until(lambda: len(strategy_box.start_time_list) == 1)
+
+        # a burst within the gap is handled by a single iteration after the gap
+        for _ in range(5):
+            monitor.change_event.set()
+            time.sleep(0.01)
+        _wait_until(lambda: len(strategy_box.start_time_list) == 2)
+        time.sleep(0.1)
+        assert len(strategy_box.start_time_list) == 2
+        first_start_time, second_start_time = strategy_box.start_time_list
+        assert second_start_time - first_start_time >= 0.2 - 0.01
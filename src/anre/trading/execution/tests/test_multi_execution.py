@@ -0,0 +1,100 @@
+import threading
+import time
+import unittest
+
+from anre.trading.execution.multi_execution import MultiExecution
+from anre.trading.monitor.base import BaseMonitor
+from anre.trading.strategy.strategyBox.strategyBox import StrategyBox
+
+
+class _Monitor(BaseMonitor):
+    def __init__(self):
+        self.change_event = threading.Event()
+
+    def iteration(self, gtt=2):
+        pass
+
+    def assert_up_to_date(self, gtt=None):
+        pass
+
+    def wait_for_change(self, timeout: float) -> bool:
+        is_changed = self.change_event.wait(timeout=timeout)
+        self.change_event.clear()
+        return is_changed
+
+
+class _StrategyBox(StrategyBox):
+    def __init__(self, name: str, start_list: list, fail: bool = False):
+        self.name = name
+        self.start_list = start_list
+        self.fail = fail
+        self.thread_name_set = set()
+
+    def iteration(self):
+        self.start_list.append(self.name)
+        self.thread_name_set.add(threading.current_thread().name)
+        time.sleep(0.01)
+        if self.fail:
+            raise ValueError('strategy failed')
+
+
+def _wait_until(fun, timeout=2.0):
+    start_time = time.monotonic()
+    while not fun():
+        assert time.monotonic() - start_time < timeout, 'timeout'
+        time.sleep(0.005)
+
+
+class TestMultiExecution(unittest.TestCase):
+    def test_priority_and_shared_workers(self):
+        start_list = []
+        multi_execution = MultiExecution(max_workers=1)
+        strategy_box_list = []
+        for name, priority in [('low', 0), ('high', 10), ('failing', 5)]:
+            strategy_box = _StrategyBox(name=name, start_list=start_list, fail=name == 'failing')
+            strategy_box_list.append(strategy_box)
+            multi_execution.add(
+                key=name,
+                monitor=_Monitor(),
+                strategy_box=strategy_box,
+                priority=priority,
+                wait_sec=0.2,
+            )
+        multi_execution.run()
+        try:
+            _wait_until(lambda: len(start_list) >= 9)
+        finally:
+            multi_execution.finish()
+            multi_execution.join()
+
+        # one worker, due markets are started by priority
+        assert start_list[:3] == ['high', 'failing', 'low']
+        # errors do not stop the market nor the others
+        assert start_list.count('low') >= 2
+        report_dict = multi_execution.get_report_dict()
+        assert report_dict['failing']['error_count'] >= 2
+        assert report_dict['low']['error_count'] == 0
+        thread_name_set = set.union(*[el.thread_name_set for el in strategy_box_list])
+        assert len(thread_name_set) == 1
+
+    def test_event_driven(self):
+        start_list = []
+        monitor = _Monitor()
+        multi_execution = MultiExecution(max_workers=2, min_iteration_gap_sec=0)
+        multi_execution.add(
+            key='market',
+            monitor=monitor,
+            strategy_box=_StrategyBox(name='market', start_list=start_list),
+            wait_sec=60,
+            event_driven=True,
+        )
+        multi_execution.run()
+        try:
+            _wait_until(lambda: len(start_list) == 1)
+            time.sleep(0.05)
+            assert len(start_list) == 1
+            monitor.change_event.set()
+            _wait_until(lambda: len(start_list) == 2)
+        finally:
+            multi_execution.finish()
+            multi_execution.join()
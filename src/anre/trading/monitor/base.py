@@ -1,3 +1,4 @@
+import time
 from abc import ABC, abstractmethod
 from typing import Optional
 
@@ -10,3 +11,11 @@ class BaseMonitor(ABC):
     @abstractmethod
     def assert_up_to_date(self, gtt: Optional[int | float] = None):
         pass
+
+    def wait_for_change(self, timeout: float) -> bool:
+        """Block until the monitored state may have changed or timeout. Returns True on change
+
+        Polling monitors can not know about changes, so they just wait for the timeout.
+        """
+        time.sleep(timeout)
+        return False
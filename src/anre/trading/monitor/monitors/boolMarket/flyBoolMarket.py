@@ -1,38 +1,76 @@
 import datetime
 import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from multiprocessing import Lock
-from typing import Optional
+from typing import Callable, Optional
 
 from anre.connection.polymarket.api.cache.house_book import HouseOrderBookCache
-from anre.connection.polymarket.api.cache.net_book import NetBoolMarketOrderBook
+from anre.connection.polymarket.api.cache.house_trade import HouseTradeCache
+from anre.connection.polymarket.api.cache.mirror_book import MirrorBoolMarketOrderBook
+from anre.connection.polymarket.api.cache.net_book import IncrementalNetBoolMarketOrderBook
 from anre.connection.polymarket.api.cache.public_book import PublicMarketOrderBookCache
-from anre.connection.polymarket.api.clob import ClobMarketInfoParser, ClobTradeParser
-from anre.connection.polymarket.api.types import HouseTradeRec
-from anre.connection.polymarket.api.utils import get_position_by_outcome
+from anre.connection.polymarket.api.clob import ClobMarketInfoParser
 from anre.connection.polymarket.master_client import MasterClient
 from anre.trading.monitor.base import BaseMonitor
+from anre.utils.time.timer.iTimer import ITimer
 from anre.utils.time.timer.timerReal import TimerReal
 
 
 class FlyBoolMarket(BaseMonitor):
+    # REST requests of an iteration are independent, they are sent together. The pool is shared by
+    # all monitors of the process, so many markets do not mean many threads (the api rate limit is
+    # shared anyway)
+    _fetch_executor: Optional[ThreadPoolExecutor] = None
+    _fetch_executor_max_workers = 16
+    _fetch_executor_lock = threading.Lock()
+
     def __init__(self, condition_id: str, default_gtt=60) -> None:
         assert isinstance(condition_id, str)
         assert isinstance(default_gtt, (int, float))
         self._master_client = MasterClient()
         self._condition_id = condition_id
-        self._timer = TimerReal()
+        self._init_state(
+            market_info_parser=self._fetch_clob_market_info_parser(),
+            timer=TimerReal(),
+            default_gtt=default_gtt,
+        )
+        self._fetch_executor = self._get_fetch_executor()
+
+    def _init_state(
+        self, market_info_parser: ClobMarketInfoParser, timer: ITimer, default_gtt: int | float
+    ):
+        """State of the market, without any api connection (shared with the replay monitor)"""
+        self._condition_id: str = market_info_parser.bool_market_cred.condition_id
+        self._timer = timer
         self._update_lock = Lock()
         self._last_iteration_finish_time = 0
-        self._cache: dict = {}
+        self._cache: dict = {'clob_market_info_parser': market_info_parser}
         self._default_gtt: int | float = default_gtt
-        market_info_parser = self._fetch_clob_market_info_parser()
         self._bool_market_cred = market_info_parser.bool_market_cred
         self._asset_ids = (
             self._bool_market_cred.main_asset_id,
             self._bool_market_cred.counter_asset_id,
         )
+        self._incremental_net_mob = IncrementalNetBoolMarketOrderBook(
+            **self._bool_market_cred.to_dict()
+        )
+        # trades are fetched incrementally, only after the cursor of this cache
+        self._house_trade_cache = HouseTradeCache(condition_id=self._condition_id)
         self._logger = logging.getLogger(__name__)
 
+    @staticmethod
+    def _get_fetch_executor() -> ThreadPoolExecutor:
+        # set on FlyBoolMarket, so that subclasses share the same pool
+        with FlyBoolMarket._fetch_executor_lock:
+            if FlyBoolMarket._fetch_executor is None:
+                FlyBoolMarket._fetch_executor = ThreadPoolExecutor(
+                    max_workers=FlyBoolMarket._fetch_executor_max_workers,
+                    thread_name_prefix='FlyBoolMarket',
+                )
+            return FlyBoolMarket._fetch_executor
+
     def iteration(self, gtt=2):
         # collect info amd mare sure it is valid and up to date
         if self._timer.nowS() > self._last_iteration_finish_time + gtt:
@@ -49,34 +87,67 @@ class FlyBoolMarket(BaseMonitor):
         )
 
     def _update_internal_cache(self):
-        self._cache['clob_market_info_parser'] = self._fetch_clob_market_info_parser()
-
-        public_mob = self._fetch_public_mob()
-        house_order_dict_list = self._fetch_house_order_dict_list()
+        fetch_dict, fetch_latency_dict = self._fetch_parallel({
+            'clob_market_info_parser': self._fetch_clob_market_info_parser,
+            'public_mob': self._fetch_public_mob,
+            'house_order_dict_list': self._fetch_house_order_dict_list,
+            'balance_position_slow': self._fetch_house_balance_position,
+            'house_trade_dict_list': self._fetch_house_trade_dict_list,
+        })
+        self._logger.debug(f'fetch latency: {fetch_latency_dict}')
+
+        public_mob = fetch_dict['public_mob']
+        house_order_dict_list = fetch_dict['house_order_dict_list']
         house_mob = self._calc_house_mob(house_order_dict_list=house_order_dict_list)
-        net_mob = NetBoolMarketOrderBook.new(
-            public_market_order_book=public_mob,
-            house_order_book=house_mob,
-            validate=True,
-        )
+        self._incremental_net_mob.update_reset_public_book(public_mob)
+        self._incremental_net_mob.update_reset_house_book(house_mob)
+        self._incremental_net_mob.validate()
+        net_mob = self._incremental_net_mob.get_net_book_snapshot()
         for order_dict in house_order_dict_list:
             ClobMarketInfoParser.alter_house_order_with_extra_info(order_dict)
 
-        balance_position_slow = self._fetch_house_balance_position()
-        house_trade_rec_dict = self._fetch_house_trades()
-        yes_position, no_position = get_position_by_outcome(list(house_trade_rec_dict.values()))
-        balance_position = yes_position - no_position
+        # the trade cache is updated only when all fetches succeeded (and not in a fetch thread)
+        self._house_trade_cache.update_from_clob_trade_dict_list(
+            fetch_dict['house_trade_dict_list']
+        )
+        house_trade_rec_dict = self._house_trade_cache.get_house_trade_rec_dict()
+        balance_position_slow = fetch_dict['balance_position_slow']
+        balance_position = self._house_trade_cache.get_position_consolidated()
         if abs(balance_position_slow - balance_position) > 1e-2:
             self._logger.warning(
                 f'The balance position is not consistent: {balance_position_slow} != {balance_position}'
             )
 
-        self._cache['public_mob'] = public_mob
-        self._cache['house_mob'] = house_mob
-        self._cache['net_mob'] = net_mob
-        self._cache['house_order_dict_list'] = house_order_dict_list
-        self._cache['house_trade_rec_dict'] = house_trade_rec_dict
-        self._cache['balance_position'] = balance_position
+        # new dict is assigned at once, so readers never see a half updated cache
+        self._cache = {
+            'clob_market_info_parser': fetch_dict['clob_market_info_parser'],
+            'public_mob': public_mob,
+            'house_mob': house_mob,
+            'net_mob': net_mob,
+            'house_order_dict_list': house_order_dict_list,
+            'house_trade_rec_dict': house_trade_rec_dict,
+            'balance_position': balance_position,
+            'fetch_latency_dict': fetch_latency_dict,
+        }
+
+    def _fetch_parallel(
+        self, fetch_func_dict: dict[str, Callable]
+    ) -> tuple[dict[str, object], dict[str, float]]:
+        """Call all functions concurrently. Returns results and latencies (in seconds) by name"""
+
+        def _timed_call(func: Callable):
+            start_time = time.perf_counter()
+            result = func()
+            return result, time.perf_counter() - start_time
+
+        future_dict = {
+            name: self._fetch_executor.submit(_timed_call, func)
+            for name, func in fetch_func_dict.items()
+        }
+        fetch_dict, fetch_latency_dict = {}, {}
+        for name, future in future_dict.items():
+            fetch_dict[name], fetch_latency_dict[name] = future.result()
+        return fetch_dict, fetch_latency_dict
 
     def _fetch_clob_market_info_parser(self) -> ClobMarketInfoParser:
         market_info = self._master_client.clob_client.get_single_market_info(
@@ -100,12 +171,12 @@ class FlyBoolMarket(BaseMonitor):
         )
         return house_order_dict_list
 
-    def _fetch_house_trades(self) -> dict[str, HouseTradeRec]:
-        house_order_dict_list = self._master_client.clob_client.get_house_trade_dict_list(
-            condition_id=self._condition_id
+    def _fetch_house_trade_dict_list(self) -> list[dict]:
+        """Trades after the cache timestamp, the cache is not updated here"""
+        house_trade_dict_list = self._master_client.clob_client.get_house_trade_dict_list(
+            condition_id=self._condition_id, after=self._house_trade_cache.get_after_timestamp()
         )
-        trade_rec_dict = ClobTradeParser.parse_house_trade_dict_list(house_order_dict_list)
-        return trade_rec_dict
+        return house_trade_dict_list
 
     def _fetch_house_balance_position(self) -> int | float:
         house_position_dict_list = self._master_client.data_client.get_house_position_dict_list(
@@ -150,7 +221,7 @@ class FlyBoolMarket(BaseMonitor):
 
     def get_market_order_books(
         self,
-    ) -> tuple[PublicMarketOrderBookCache, HouseOrderBookCache, NetBoolMarketOrderBook]:
+    ) -> tuple[PublicMarketOrderBookCache, HouseOrderBookCache, MirrorBoolMarketOrderBook]:
         self.assert_up_to_date()
         return self._cache['public_mob'], self._cache['house_mob'], self._cache['net_mob']
 
@@ -162,6 +233,10 @@ class FlyBoolMarket(BaseMonitor):
         self.assert_up_to_date()
         return self._cache['balance_position']
 
+    def get_fetch_latency_dict(self) -> dict[str, float]:
+        """Latency (in seconds) of every REST request of the last REST update"""
+        return dict(self._cache.get('fetch_latency_dict', {}))
+
     # def get_historical_price(self):
     #     return self._master_client.clob_client.get_price_history(
     #         token_id=self.market_info_parser.bool_market_cred.yes_asset_id,
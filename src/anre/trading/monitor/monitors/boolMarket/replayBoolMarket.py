@@ -0,0 +1,131 @@
+import orjson
+
+from anre.connection.polymarket.api.cache.house_book import HouseOrderBookCache
+from anre.connection.polymarket.api.cache.public_book import PublicMarketOrderBookCache
+from anre.connection.polymarket.api.clob import ClobMarketInfoParser
+from anre.connection.polymarket.api.types import BoolMarketCred
+from anre.connection.polymarket.api.websocket.decode import WsMessage, decode_frame
+from anre.connection.polymarket.api.websocket.messenger import POLICY_COALESCE, Messenger
+from anre.connection.polymarket.api.websocket.websocket import MARKET_CHANNEL, USER_CHANNEL
+from anre.trading.monitor.monitors.boolMarket.streamFlyBoolMarket import StreamFlyBoolMarket
+from anre.utils.time.timer.timerPseudo import TimerPseudo
+
+
+class ReplayBoolMarket(StreamFlyBoolMarket):
+    """StreamFlyBoolMarket fed from recorded data, no websocket or REST request is made
+
+    Recorded frames are decoded and put into the messengers (as the live websocket decode thread
+    does), so the books are updated by the same code as live. A REST book snapshot replaces the
+    public book (as the live reconciliation). House orders start empty and follow the user
+    channel messages: recorded ones or the ones of the simulated exchange.
+
+    Time is `TimerPseudo`, it is moved by the replay engine. `iteration` applies the queued
+    messages on every call (replay time does not move during an update).
+    """
+
+    def __init__(self, market_info: dict, timer: TimerPseudo, default_gtt=60) -> None:
+        # `FlyBoolMarket.__init__` is not called, it connects to the api
+        assert isinstance(timer, TimerPseudo)
+        assert isinstance(default_gtt, (int, float))
+        self._init_state(
+            market_info_parser=ClobMarketInfoParser(market_info=market_info),
+            timer=timer,
+            default_gtt=default_gtt,
+        )
+        self._reconcile_period = float('inf')
+        self._last_reconcile_time = float(0)
+        self._public_mob = PublicMarketOrderBookCache.new_init(**self._bool_market_cred.to_dict())
+        self._house_mob = HouseOrderBookCache.new_init(**self._bool_market_cred.to_dict())
+        self._incremental_net_mob.update_reset_public_book(self._public_mob)
+        self._incremental_net_mob.update_reset_house_book(self._house_mob)
+        # the engine drains the queues every iteration, they are not bounded
+        self._market_messenger = Messenger(max_size=2**62, policy=POLICY_COALESCE)
+        self._user_messenger = Messenger(max_size=2**62)
+        self._update_cache_from_state()
+
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
+
+    def iteration(self, gtt=0):
+        with self._update_lock:
+            self._update_internal_cache()
+            self._last_iteration_finish_time = self._timer.nowS()
+
+    @property
+    def bool_market_cred(self) -> BoolMarketCred:
+        return self._bool_market_cred
+
+    def is_ready(self) -> bool:
+        """Both public asset books are known"""
+        return bool(self._public_mob.main_asset_book.timestamp) and bool(
+            self._public_mob.counter_asset_book.timestamp
+        )
+
+    ### feed
+
+    def put_ws_frame(
+        self, channel_type: str, receive_time: float, frame: str | bytes
+    ) -> list[WsMessage]:
+        """Recorded websocket frame (json list of messages, or an internal event dict)
+
+        Returns the messages of this market (they are queued for the next iteration).
+        """
+        if frame[:1] in ('{', b'{'):
+            message = orjson.loads(frame)
+            message['_rt'] = receive_time
+            message_list: list[WsMessage] = [message]
+        else:
+            message_list = decode_frame(frame, receive_time=receive_time)
+        return [message for message in message_list if self.put_ws_message(channel_type, message)]
+
+    def put_ws_message(self, channel_type: str, message: WsMessage) -> bool:
+        """Messages of other markets are skipped (the recording can have many markets)"""
+        if message['event_type'] != '_internal' and message.get('market') != self._condition_id:
+            return False
+        if channel_type == MARKET_CHANNEL:
+            self._market_messenger.put(message)
+        elif channel_type == USER_CHANNEL:
+            self._user_messenger.put(message)
+        else:
+            raise ValueError(f'unknown channel_type: {channel_type}')
+        return True
+
+    def put_rest_books(self, clob_mob_list: list[dict]):
+        """Recorded REST book snapshot. Ignored if it does not have both assets of the market"""
+        clob_mob_list = [el for el in clob_mob_list if el['asset_id'] in self._asset_ids]
+        if {el['asset_id'] for el in clob_mob_list} != set(self._asset_ids):
+            return
+        with self._update_lock:
+            # as `_reconcile`: queued market messages are older than the snapshot
+            self._market_messenger.get_pop_messages()
+            public_mob = PublicMarketOrderBookCache.new_init(**self._bool_market_cred.to_dict())
+            public_mob.update_from_clob_mob_list(clob_mob_list=clob_mob_list, validate=True)
+            self._public_mob = public_mob
+            self._is_public_mob_changed = True
+            self._incremental_net_mob.update_reset_public_book(public_mob)
+            self._last_reconcile_time = self._timer.nowS()
+
+    ### update
+
+    def _update_internal_cache(self):
+        if self._update_from_ws_messages():
+            # live resync is recorded too (REST snapshot), nothing to fetch here
+            self._logger.debug('Recorded websocket connection event.')
+        self._update_cache_from_state()
+
+    def _record_ws_latency(self, market_message_list: list, user_message_list: list[dict]):
+        # receive times are recorded ones, latency of the replay has no meaning
+        pass
+
+
+def __dummy__():
+    from anre.connection.polymarket.api.clob import ClobClient
+
+    condition_id = '0x0de7d3a8cb29764fc91c5941a00e1cf010b9ee0f2f4b0cd82a9e0737ffed0c96'
+    market_info = ClobClient().get_single_market_info(condition_id=condition_id)
+    monitor = ReplayBoolMarket(market_info=market_info, timer=TimerPseudo(nowS=0))
+    monitor.iteration()
+    monitor.get_market_order_books()
@@ -0,0 +1,193 @@
+import threading
+import time
+
+from anre.connection.polymarket.api.cache.house_book import HouseOrderBookCache
+from anre.connection.polymarket.api.cache.public_book import PublicMarketOrderBookCache
+from anre.connection.polymarket.api.clob import ClobMarketInfoParser
+from anre.connection.polymarket.api.websocket.messenger import (
+    OVERFLOW_EVENT,
+    POLICY_COALESCE,
+    Messenger,
+)
+from anre.connection.polymarket.api.websocket.websocket import PolymarketWebSocket
+from anre.trading.monitor.monitors.boolMarket.flyBoolMarket import FlyBoolMarket
+from anre.utils.latency.tracer import STAGE_BOOK_APPLY, get_latency_tracer
+from anre.utils.time.timer.iTimer import ITimer
+
+
+class StreamFlyBoolMarket(FlyBoolMarket):
+    """FlyBoolMarket that follows the market by websockets
+
+    State is seeded from REST (same as `FlyBoolMarket`). After that public book, house orders and
+    house trades are updated from the market and user channel messages, so an iteration costs no
+    HTTP round trip. REST is used again only for reconciliation: every `reconcile_period` seconds
+    and after a websocket reconnect/error/close (messages could be lost).
+    """
+
+    _RESYNC_INTERNAL_EVENTS = ('reconnect', 'error', 'close', OVERFLOW_EVENT)
+
+    def __init__(
+        self, condition_id: str, default_gtt=60, reconcile_period=60, start: bool = True
+    ) -> None:
+        super().__init__(condition_id=condition_id, default_gtt=default_gtt)
+        assert isinstance(reconcile_period, (int, float)) and reconcile_period > 0
+        self._reconcile_period: int | float = reconcile_period
+        self._last_reconcile_time: float | None = None
+        # only the latest book state matters, so a stalled iteration does not leave a backlog
+        self._market_messenger = Messenger(
+            wakeup_event=self._change_event, max_size=10_000, policy=POLICY_COALESCE
+        )
+        self._user_messenger = Messenger(wakeup_event=self._change_event)
+        self._market_web_socket = PolymarketWebSocket.new_markets(
+            asset_ids=list(self._asset_ids), messenger=self._market_messenger
+        )
+        self._user_web_socket = PolymarketWebSocket.new_house_orders(
+            condition_ids=[self._condition_id], messenger=self._user_messenger
+        )
+        if start:
+            self.start()
+
+    def _init_state(
+        self, market_info_parser: ClobMarketInfoParser, timer: ITimer, default_gtt: int | float
+    ):
+        super()._init_state(
+            market_info_parser=market_info_parser, timer=timer, default_gtt=default_gtt
+        )
+        self._public_mob: PublicMarketOrderBookCache | None = None
+        self._house_mob: HouseOrderBookCache | None = None
+        # snapshots of the books are published to the cache only when the books changed
+        self._is_public_mob_changed = True
+        self._is_house_mob_changed = True
+        # any websocket message wakes `wait_for_change`
+        self._change_event = threading.Event()
+
+    def start(self):
+        self._market_web_socket.start()
+        self._user_web_socket.start()
+
+    def stop(self):
+        self._market_web_socket.stop()
+        self._user_web_socket.stop()
+
+    def get_messenger_stats_dict(self) -> dict[str, dict]:
+        return {
+            'market': self._market_messenger.get_stats_dict(),
+            'user': self._user_messenger.get_stats_dict(),
+        }
+
+    def wait_for_change(self, timeout: float) -> bool:
+        is_changed = self._change_event.wait(timeout=timeout)
+        # cleared before the iteration, so messages arriving during it set the event again
+        self._change_event.clear()
+        return is_changed
+
+    def _update_internal_cache(self):
+        if (
+            self._last_reconcile_time is None
+            or self._timer.nowS() > self._last_reconcile_time + self._reconcile_period
+        ):
+            self._reconcile()
+        need_reconcile = self._update_from_ws_messages()
+        if need_reconcile:
+            self._logger.warning('Websocket connection event. The state is reconciled from REST.')
+            self._reconcile()
+            self._update_from_ws_messages()
+        self._update_cache_from_state()
+
+    def _reconcile(self):
+        # queued messages are older than the REST state fetched bellow
+        self._market_messenger.get_pop_messages()
+        self._user_messenger.get_pop_messages()
+
+        super()._update_internal_cache()
+        self._public_mob = self._cache['public_mob']
+        self._house_mob = self._cache['house_mob']
+        self._is_public_mob_changed = self._is_house_mob_changed = True
+        self._last_reconcile_time = self._timer.nowS()
+
+    def _update_from_ws_messages(self) -> bool:
+        """Apply queued messages. Returns True if the connection was broken"""
+        need_reconcile = False
+
+        market_message_list = []
+        for message in self._market_messenger.get_pop_messages():
+            if message['event_type'] == '_internal':
+                need_reconcile |= message['event'] in self._RESYNC_INTERNAL_EVENTS
+            elif message['event_type'] in ['book', 'price_change']:
+                # messages received during REST fetch can be already included into the REST state
+                asset_book = (
+                    self._public_mob.main_asset_book
+                    if message['asset_id'] == self._public_mob.main_asset_book.asset_id
+                    else self._public_mob.counter_asset_book
+                )
+                if float(message['timestamp']) > asset_book.timestamp:
+                    market_message_list.append(message)
+        self._public_mob.update_from_ws_message_list(
+            ws_message_list=market_message_list, validate=False
+        )
+        self._incremental_net_mob.update_from_public_ws_message_list(
+            ws_message_list=market_message_list
+        )
+        self._is_public_mob_changed |= bool(market_message_list)
+
+        user_message_list = []
+        for message in self._user_messenger.get_pop_messages():
+            if message['event_type'] == '_internal':
+                need_reconcile |= message['event'] in self._RESYNC_INTERNAL_EVENTS
+            else:
+                user_message_list.append(message)
+        level_delta_list = self._house_mob.update_iteration_from_ws_message_list(
+            ws_message_list=user_message_list, validate=False
+        )
+        for asset_id, price1000, size1000_delta, side in level_delta_list:
+            self._incremental_net_mob.update_house_level_delta1000(
+                asset_id=asset_id, price1000=price1000, size1000_delta=size1000_delta, side=side
+            )
+        self._is_house_mob_changed |= bool(user_message_list)
+        self._house_trade_cache.update_from_ws_trade_dict_list(
+            ws_trade_dict_list=[el for el in user_message_list if el['event_type'] == 'trade']
+        )
+        self._record_ws_latency(market_message_list, user_message_list)
+        return need_reconcile
+
+    def _record_ws_latency(self, market_message_list: list, user_message_list: list[dict]):
+        latency_tracer = get_latency_tracer()
+        apply_time = time.time()
+        for message in market_message_list:
+            latency_tracer.record(STAGE_BOOK_APPLY, apply_time - message['_rt'])
+        for message in user_message_list:
+            if message['event_type'] == 'order' and message.get('type') == 'PLACEMENT':
+                latency_tracer.mark_order_seen(order_id=message['id'], seen_time=message['_rt'])
+
+    def _update_cache_from_state(self):
+        """Publish the state. Book snapshots (copies) are taken only of the changed books
+
+        Readers get the cached snapshots without a lock, so the live books are never handed out.
+        """
+        cache = dict(self._cache)
+        if self._is_public_mob_changed:
+            cache['public_mob'] = self._public_mob.copy()
+        if self._is_house_mob_changed:
+            house_order_dict_list = [
+                dict(order_dict) for order_dict in self._house_mob._house_live_order_dict.values()
+            ]
+            for order_dict in house_order_dict_list:
+                ClobMarketInfoParser.alter_house_order_with_extra_info(order_dict)
+            cache['house_mob'] = self._house_mob.copy()
+            cache['house_order_dict_list'] = house_order_dict_list
+        if self._is_public_mob_changed or self._is_house_mob_changed:
+            cache['net_mob'] = self._incremental_net_mob.get_net_book_snapshot()
+        cache['house_trade_rec_dict'] = self._house_trade_cache.get_house_trade_rec_dict()
+        cache['balance_position'] = self._house_trade_cache.get_position_consolidated()
+        self._cache = cache
+        self._is_public_mob_changed = self._is_house_mob_changed = False
+
+
+def __dummy__():
+    condition_id = '0x0de7d3a8cb29764fc91c5941a00e1cf010b9ee0f2f4b0cd82a9e0737ffed0c96'  # jerome-powell-out-as-fed-chair-by-august-31
+
+    monitor = StreamFlyBoolMarket(condition_id=condition_id, default_gtt=3600, reconcile_period=60)
+    monitor.iteration(gtt=0)
+    monitor.get_house_balance_position()
+    monitor.get_market_order_books()
+    monitor.stop()
@@ -0,0 +1,13 @@
+from .engine import ReplayEngine
+from .exchange import ReplayClobClient
+from .fill import FillSimulator, SimEvent
+from .sweep import ReplaySweep, SharedReplayRecords
+
+__all__ = [
+    "FillSimulator",
+    "ReplayClobClient",
+    "ReplayEngine",
+    "ReplaySweep",
+    "SharedReplayRecords",
+    "SimEvent",
+]
@@ -0,0 +1,172 @@
+import logging
+import time
+from typing import Iterable, Optional
+
+import orjson
+
+from anre.connection.polymarket.api.recorder.recorder import iter_recorded_records
+from anre.connection.polymarket.api.recorder.segment import (
+    KIND_REST_BOOK,
+    KIND_WS_MARKET,
+    KIND_WS_USER,
+)
+from anre.connection.polymarket.api.websocket.websocket import MARKET_CHANNEL, USER_CHANNEL
+from anre.trading.monitor.monitors.boolMarket.replayBoolMarket import ReplayBoolMarket
+from anre.trading.replay.exchange import ReplayClobClient
+from anre.trading.replay.fill import FillSimulator
+from anre.trading.strategy.action.executor.executor import StrategyActionExecutor
+from anre.trading.strategy.brain.brains.base.brainBase import StrategyBrain
+from anre.trading.strategy.strategyBox.strategyBox import StrategyBox
+from anre.utils.time.timer.timerPseudo import TimerPseudo
+
+Record = tuple[float, int, bytes]
+
+
+class ReplayEngine:
+    """Replays recorded market data through `ReplayBoolMarket` and a `StrategyBox`
+
+    Records (`recorder.iter_recorded_records`, segments are memory mapped) are fed in the
+    receive time order. `TimerPseudo` is moved to the receive time of every record, and every
+    `iteration_sec` of replay time the monitor applies the queued messages and the strategy box
+    makes an iteration. Actions go to the simulated exchange (`ReplayClobClient`) and the engine
+    waits for them, so the result does not depend on the speed of the machine.
+
+    With `fill_simulator` the orders of the strategy are filled by the queue position in the
+    replayed book (`fill.FillSimulator`). Recorded user channel messages are the ones of the live
+    session, they are skipped unless `use_recorded_user_channel`.
+    """
+
+    def __init__(
+        self,
+        strategy_brain: StrategyBrain,
+        market_info: dict,
+        iteration_sec: float = 1.0,
+        use_recorded_user_channel: bool = False,
+        raise_if_error: bool = True,
+        fill_simulator: Optional[FillSimulator] = None,
+    ):
+        assert iteration_sec > 0
+        assert not (use_recorded_user_channel and fill_simulator is not None), (
+            'recorded user channel and simulated fills can not be mixed'
+        )
+        self._iteration_sec = iteration_sec
+        self._use_recorded_user_channel = use_recorded_user_channel
+        self._logger = logging.getLogger(__name__)
+        self.timer = TimerPseudo(nowS=float(0))
+        self.monitor = ReplayBoolMarket(market_info=market_info, timer=self.timer)
+        self.exchange = ReplayClobClient(
+            monitor=self.monitor, timer=self.timer, fill_simulator=fill_simulator
+        )
+        self.strategy_box = StrategyBox(
+            strategy_brain=strategy_brain,
+            monitor=self.monitor,
+            quiet=True,
+            raise_if_error=raise_if_error,
+            timer=self.timer,
+            action_executor=StrategyActionExecutor(clob_client=self.exchange),  # type: ignore[arg-type]
+        )
+        self._next_iteration_time: Optional[float] = None
+        self._record_count = 0
+        self._iteration_count = 0
+        self._strategy_iteration_count = 0
+        self._run_time = float(0)
+        # house balance position after every iteration (the iterations are evenly spaced)
+        self._balance_position_list: list[float] = []
+
+    def run_dir(
+        self,
+        dir_path: str,
+        name: Optional[str] = None,
+        start_time: Optional[float] = None,
+        end_time: Optional[float] = None,
+    ) -> dict:
+        """Replay the recorded segments of the directory"""
+        kind_list = [KIND_WS_MARKET, KIND_REST_BOOK]
+        if self._use_recorded_user_channel:
+            kind_list.append(KIND_WS_USER)
+        record_iter = iter_recorded_records(
+            dir_path, name=name, start_time=start_time, end_time=end_time, kind_list=kind_list
+        )
+        return self.run(record_iter)
+
+    def run(self, record_iter: Iterable[Record], end_time: Optional[float] = None) -> dict:
+        """Replay (receive_time, kind, body) records. Returns `get_stats_dict`"""
+        start_perf_time = time.perf_counter()
+        for receive_time, kind, body in record_iter:
+            self._move_time(receive_time)
+            self._feed(kind, body, receive_time)
+            self._record_count += 1
+        if end_time is not None:
+            self._move_time(end_time)
+        # the last records are applied too
+        self.iteration()
+        self._run_time += time.perf_counter() - start_perf_time
+        return self.get_stats_dict()
+
+    def _move_time(self, receive_time: float):
+        if self._next_iteration_time is None:
+            self.timer.set_currentTime(nowS=receive_time, isBackwardsOk=True)
+            self._next_iteration_time = receive_time + self._iteration_sec
+            return
+        while self._next_iteration_time <= receive_time:
+            self.timer.set_currentTime(nowS=self._next_iteration_time)
+            self.iteration()
+            self._next_iteration_time += self._iteration_sec
+        # receive times of different threads can be a bit out of order, time does not go back
+        if receive_time > self.timer.nowS():
+            self.timer.set_currentTime(nowS=receive_time)
+
+    def _feed(self, kind: int, body: bytes, receive_time: float):
+        if kind == KIND_WS_MARKET:
+            message_list = self.monitor.put_ws_frame(MARKET_CHANNEL, receive_time, body)
+            self.exchange.on_market_message_list(message_list, receive_time=receive_time)
+        elif kind == KIND_WS_USER:
+            if self._use_recorded_user_channel:
+                self.monitor.put_ws_frame(USER_CHANNEL, receive_time, body)
+        elif kind == KIND_REST_BOOK:
+            clob_mob_list = orjson.loads(body)
+            self.monitor.put_rest_books(clob_mob_list)
+            self.exchange.on_rest_books(clob_mob_list, receive_time=receive_time)
+        else:
+            raise ValueError(f'unknown record kind: {kind}')
+
+    def iteration(self):
+        self.exchange.advance()
+        self.monitor.iteration()
+        self._iteration_count += 1
+        self._balance_position_list.append(self.monitor.get_house_balance_position())
+        if self.monitor.is_ready():
+            self.strategy_box.iteration()
+            self.strategy_box.join_actions()
+            self._strategy_iteration_count += 1
+
+    def stop(self):
+        """Stop the action threads of the strategy box, the engine can not run after it"""
+        self.strategy_box.stop_actions()
+
+    def get_balance_position_list(self) -> list[float]:
+        return list(self._balance_position_list)
+
+    def get_stats_dict(self) -> dict:
+        return {
+            'record_count': self._record_count,
+            'iteration_count': self._iteration_count,
+            'strategy_iteration_count': self._strategy_iteration_count,
+            'replay_time': self.timer.nowS(),
+            'run_time': self._run_time,
+        }
+
+
+def __dummy__():
+    from anre.config.config import config as anre_config
+    from anre.connection.polymarket.api.clob import ClobClient
+    from anre.trading.strategy.brain.brains.fixed_market_maker.fixed_market_maker import (
+        FixedMarketMaker,
+    )
+
+    condition_id = '0x0de7d3a8cb29764fc91c5941a00e1cf010b9ee0f2f4b0cd82a9e0737ffed0c96'
+    market_info = ClobClient().get_single_market_info(condition_id=condition_id)
+    engine = ReplayEngine(strategy_brain=FixedMarketMaker.new(), market_info=market_info)
+    engine.run_dir(anre_config.path.get_path_to_data_dir('recorder'))
+    engine.monitor.get_house_order_dict_list()
+    engine.stop()
@@ -0,0 +1,300 @@
+import threading
+from typing import Literal, Optional
+
+from anre.connection.polymarket.api.clob.parse import ClobTradeParser
+from anre.connection.polymarket.api.types import HouseTradeRec
+from anre.connection.polymarket.api.websocket.decode import WsMessage, to_price1000, to_size1000
+from anre.connection.polymarket.api.websocket.websocket import USER_CHANNEL
+from anre.trading.monitor.monitors.boolMarket.replayBoolMarket import ReplayBoolMarket
+from anre.trading.replay.fill import FillSimulator, SimEvent
+from anre.utils.time.timer.timerPseudo import TimerPseudo
+
+
+class ReplayClobClient:
+    """Simulated exchange with the `ClobClient` methods used by `StrategyActionExecutor`
+
+    Orders are accepted at once and reported to the monitor as user channel `order` messages
+    (PLACEMENT / CANCELLATION), so the house book of the replay follows the same path as live.
+    Order ids are sequential, so a replay is repeatable.
+
+    Without `fill_simulator` orders are not filled. With it, orders get on the book and are
+    canceled after its latencies, and its fills are reported as user channel `trade` messages
+    (as live, so `HouseTradeCache` makes `HouseTradeRec` of them) and order `UPDATE` messages.
+    The simulator follows the market data given to `on_market_message_list`/`on_rest_books`.
+    """
+
+    def __init__(
+        self,
+        monitor: ReplayBoolMarket,
+        timer: TimerPseudo,
+        owner: str = 'replay',
+        fill_simulator: Optional[FillSimulator] = None,
+        house_address: Optional[str] = None,
+    ):
+        assert isinstance(monitor, ReplayBoolMarket)
+        self._monitor = monitor
+        self._timer = timer
+        self._owner = owner
+        # maker address of our orders in the trades, the trade parser takes only the house ones
+        self._house_address: str = (
+            house_address if house_address is not None else ClobTradeParser.get_house_address()
+        )
+        self._fill_simulator = fill_simulator
+        bool_market_cred = monitor.bool_market_cred
+        self._condition_id = bool_market_cred.condition_id
+        self._outcome_by_asset_id = {
+            bool_market_cred.main_asset_id: 'Yes',
+            bool_market_cred.counter_asset_id: 'No',
+        }
+        self._lock = threading.Lock()
+        self._order_nr = 0
+        self._trade_nr = 0
+        # accepted orders that are not on the book yet (place latency of the simulator)
+        self._pending_order_dict: dict[str, dict] = {}
+        self._live_order_dict: dict[str, dict] = {}
+        self._trade_message_list: list[dict] = []
+        self._placed_size1000 = 0
+        self._filled_size1000 = 0
+        self._cancel_request_count = 0
+
+    def get_live_order_dict(self) -> dict[str, dict]:
+        with self._lock:
+            return {order_id: dict(order) for order_id, order in self._live_order_dict.items()}
+
+    def get_house_trade_rec_list(self) -> list[HouseTradeRec]:
+        """Simulated fills, parsed as the live user channel trades"""
+        with self._lock:
+            trade_message_list = list(self._trade_message_list)
+        trade_rec_dict = ClobTradeParser.parse_house_trade_dict_list(trade_message_list)
+        return list(trade_rec_dict.values())
+
+    def get_stats_dict(self) -> dict:
+        with self._lock:
+            return {
+                'order_count': self._order_nr,
+                'placed_size': self._placed_size1000 / 1000,
+                'cancel_request_count': self._cancel_request_count,
+                'fill_count': len(self._trade_message_list),
+                'filled_size': self._filled_size1000 / 1000,
+            }
+
+    def create_signed_order(
+        self,
+        token_id: str,
+        price: float,
+        size: float,
+        side: Literal["BUY", "SELL"],
+    ) -> dict:
+        assert side in ['BUY', 'SELL']
+        assert token_id in self._outcome_by_asset_id, f'unknown token_id: {token_id}'
+        return {'token_id': token_id, 'price': price, 'size': size, 'side': side}
+
+    def post_orders(self, signed_order_list: list[dict], order_type_list: list[str]) -> list[dict]:
+        assert len(signed_order_list) == len(order_type_list)
+        resp_list = []
+        with self._lock:
+            for signed_order, order_type in zip(signed_order_list, order_type_list):
+                self._order_nr += 1
+                order_id = f'0x{self._order_nr:064x}'
+                order = self._new_order_message(order_id, signed_order, order_type)
+                self._placed_size1000 += to_size1000(order['original_size'])
+                if self._fill_simulator is None:
+                    self._live_order_dict[order_id] = order
+                    self._monitor.put_ws_message(USER_CHANNEL, dict(order))
+                else:
+                    self._pending_order_dict[order_id] = order
+                    self._fill_simulator.place(
+                        order_id=order_id,
+                        asset_id=order['asset_id'],
+                        side=order['side'],
+                        price1000=to_price1000(order['price']),
+                        size1000=to_size1000(order['original_size']),
+                        now=self._timer.nowS(),
+                    )
+                resp_list.append({
+                    'errorMsg': '',
+                    'orderID': order_id,
+                    'takingAmount': '',
+                    'makingAmount': '',
+                    'status': 'live',
+                    'success': True,
+                })
+            if self._fill_simulator is not None:
+                self._apply_sim_events(self._fill_simulator.advance(self._timer.nowS()))
+        return resp_list
+
+    def cancel_orders_by_ids(self, order_ids: list[str]) -> dict:
+        with self._lock:
+            return self._cancel(order_ids)
+
+    def cancel_orders_by_market(self, condition_id: str = "", asset_id: str = "") -> dict:
+        with self._lock:
+            order_ids = [
+                order_id
+                for order_id, order in [
+                    *self._pending_order_dict.items(),
+                    *self._live_order_dict.items(),
+                ]
+                if (not condition_id or order['market'] == condition_id)
+                and (not asset_id or order['asset_id'] == asset_id)
+            ]
+            return self._cancel(order_ids)
+
+    def _cancel(self, order_ids: list[str]) -> dict:
+        self._cancel_request_count += len(order_ids)
+        canceled, not_canceled = [], {}
+        for order_id in order_ids:
+            if self._fill_simulator is None:
+                is_canceled = self._cancel_live_order(order_id)
+            else:
+                is_canceled = self._fill_simulator.cancel(order_id, now=self._timer.nowS())
+            if is_canceled:
+                canceled.append(order_id)
+            else:
+                not_canceled[order_id] = 'order already canceled'
+        if self._fill_simulator is not None:
+            self._apply_sim_events(self._fill_simulator.advance(self._timer.nowS()))
+        return {'not_canceled': not_canceled, 'canceled': canceled}
+
+    def _cancel_live_order(self, order_id: str) -> bool:
+        order = self._live_order_dict.pop(order_id, None)
+        if order is None:
+            return False
+        now = self._timer.nowS()
+        order.update(
+            status='CANCELED', type='CANCELLATION', timestamp=str(int(now * 1000)), _rt=now
+        )
+        self._monitor.put_ws_message(USER_CHANNEL, dict(order))
+        return True
+
+    ### fill simulator
+
+    def advance(self):
+        """Places and cancels of the simulator that are due by now"""
+        if self._fill_simulator is None:
+            return
+        with self._lock:
+            self._apply_sim_events(self._fill_simulator.advance(self._timer.nowS()))
+
+    def on_market_message_list(self, message_list: list[WsMessage], receive_time: float):
+        """Replayed market channel messages (of this market)"""
+        if self._fill_simulator is None:
+            return
+        with self._lock:
+            for message in message_list:
+                self._apply_sim_events(self._fill_simulator.on_message(message, now=receive_time))
+
+    def on_rest_books(self, clob_mob_list: list[dict], receive_time: float):
+        """Replayed REST book snapshot, books of other markets are skipped"""
+        if self._fill_simulator is None:
+            return
+        clob_mob_list = [el for el in clob_mob_list if el['asset_id'] in self._outcome_by_asset_id]
+        with self._lock:
+            self._apply_sim_events(
+                self._fill_simulator.on_rest_books(clob_mob_list, now=receive_time)
+            )
+
+    def _apply_sim_events(self, event_list: list[SimEvent]):
+        for event in event_list:
+            if event.kind == 'placed':
+                order = self._pending_order_dict.pop(event.order_id)
+                order.update(timestamp=str(int(event.time * 1000)), _rt=event.time)
+                self._live_order_dict[event.order_id] = order
+                self._monitor.put_ws_message(USER_CHANNEL, dict(order))
+            elif event.kind == 'canceled':
+                # an order canceled before it got on the book was never seen
+                if self._pending_order_dict.pop(event.order_id, None) is None:
+                    self._cancel_live_order(event.order_id)
+            elif event.kind == 'fill':
+                self._fill(event)
+            else:
+                raise ValueError(f'unknown event kind: {event.kind}')
+
+    def _fill(self, event: SimEvent):
+        order = self._live_order_dict[event.order_id]
+        self._trade_nr += 1
+        trade = self._new_trade_message(order, event)
+        self._trade_message_list.append(trade)
+        self._filled_size1000 += event.size1000
+        self._monitor.put_ws_message(USER_CHANNEL, dict(trade))
+
+        size_matched1000 = to_size1000(order['size_matched']) + event.size1000
+        order.update(
+            size_matched=str(size_matched1000 / 1000),
+            type='UPDATE',
+            timestamp=str(int(event.time * 1000)),
+            _rt=event.time,
+        )
+        if size_matched1000 >= to_size1000(order['original_size']):
+            order['status'] = 'MATCHED'
+            del self._live_order_dict[event.order_id]
+        self._monitor.put_ws_message(USER_CHANNEL, dict(order))
+
+    def _new_trade_message(self, order: dict, event: SimEvent) -> dict:
+        price, size = str(event.price1000 / 1000), str(event.size1000 / 1000)
+        trade = {
+            'asset_id': order['asset_id'],
+            'event_type': 'trade',
+            'id': f'replay-{self._trade_nr}',
+            'maker_orders': [],
+            'market': self._condition_id,
+            'match_time': str(int(event.time)),
+            'outcome': order['outcome'],
+            'owner': self._owner,
+            'price': price,
+            'side': order['side'],
+            'size': size,
+            'status': 'CONFIRMED',
+            'taker_order_id': order['id'],
+            'timestamp': str(int(event.time * 1000)),
+            'trade_owner': self._owner,
+            'trader_side': 'TAKER',
+            'transaction_hash': f'0x{self._trade_nr:064x}',
+            'type': 'TRADE',
+            '_rt': event.time,
+        }
+        if not event.is_taker:
+            # the other side is the taker, our order is one of its maker orders
+            trade.update(
+                maker_address='0x0000000000000000000000000000000000000000',
+                maker_orders=[
+                    {
+                        'asset_id': order['asset_id'],
+                        'maker_address': self._house_address,
+                        'matched_amount': size,
+                        'order_id': order['id'],
+                        'outcome': order['outcome'],
+                        'owner': self._owner,
+                        'price': price,
+                        'side': order['side'],
+                    }
+                ],
+                side='SELL' if order['side'] == 'BUY' else 'BUY',
+                taker_order_id='',
+                trader_side='MAKER',
+            )
+        return trade
+
+    def _new_order_message(self, order_id: str, signed_order: dict, order_type: str) -> dict:
+        now = self._timer.nowS()
+        return {
+            'asset_id': signed_order['token_id'],
+            'associate_trades': None,
+            'created_at': str(int(now)),
+            'event_type': 'order',
+            'expiration': '0',
+            'id': order_id,
+            'market': self._condition_id,
+            'order_owner': self._owner,
+            'order_type': order_type,
+            'original_size': str(signed_order['size']),
+            'outcome': self._outcome_by_asset_id[signed_order['token_id']],
+            'owner': self._owner,
+            'price': str(signed_order['price']),
+            'side': signed_order['side'],
+            'size_matched': '0',
+            'status': 'LIVE',
+            'timestamp': str(int(now * 1000)),
+            'type': 'PLACEMENT',
+            '_rt': now,
+        }
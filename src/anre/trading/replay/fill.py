@@ -0,0 +1,410 @@
+from collections import defaultdict
+from typing import Literal, NamedTuple
+
+import numpy as np
+
+from anre.connection.polymarket.api.cache.base import Book1000
+from anre.connection.polymarket.api.websocket.decode import (
+    WsMessage,
+    to_price1000,
+    to_size1000,
+    to_ws_record,
+)
+
+_SIDE_SIGN = {'BUY': 1, 'SELL': -1}
+
+# order slot states
+_FREE = 0
+_PENDING = 1  # placed, not on the book yet (place latency)
+_ACTIVE = 2
+
+
+class SimEvent(NamedTuple):
+    """`kind` is 'placed', 'canceled' or 'fill' (with the price1000/size1000 of the fill)"""
+
+    kind: Literal['placed', 'canceled', 'fill']
+    order_id: str
+    time: float
+    price1000: int = 0
+    size1000: int = 0
+    is_taker: bool = False
+
+
+class FillSimulator:
+    """Fills of our orders from the replayed public book, by the queue position of the order
+
+    Public books (`Book1000` per asset) follow the replayed `book`/`price_change` messages, our
+    orders are not in them and do not change them (no market impact). An order gets on the book
+    `place_latency_sec` after the place, behind the size of its price level at that time. An
+    order that crosses the book is filled at once against the visible levels (taker), the rest
+    stays on the book. A cancel is done `cancel_latency_sec` after the request, the order can be
+    filled meanwhile.
+
+    The queue ahead of an order goes down by:
+        trades (`last_trade_price`) at the order price, the rest of the trade fills the order
+            (orders priced better than the trade were in front of it, they are filled first),
+        depletion of the level that is not explained by the trades: `depletion_fill_share` of it
+            is taken as (not reported) trades, the rest as cancels spread evenly over the queue.
+    Size added on the other side at a price that crosses the order is taken as an incoming
+    order that would have matched ours.
+
+    Order state is in numpy arrays (one slot per order), so a book event is a few vector
+    operations over the orders. The simulator is plain data, it can be pickled into the
+    processes of a parameter sweep.
+    """
+
+    def __init__(
+        self,
+        place_latency_sec: float = 0.0,
+        cancel_latency_sec: float = 0.0,
+        depletion_fill_share: float = 0.0,
+        max_order_count: int = 64,
+    ):
+        assert place_latency_sec >= 0
+        assert cancel_latency_sec >= 0
+        assert 0 <= depletion_fill_share <= 1
+        assert max_order_count > 0
+        self.place_latency_sec = place_latency_sec
+        self.cancel_latency_sec = cancel_latency_sec
+        self.depletion_fill_share = depletion_fill_share
+
+        self._book_dict: dict[str, Book1000] = {}
+        # traded size by (asset_id, maker side sign, price1000), the level depletion that follows
+        # the trade is not counted again
+        self._traded1000_dict: dict[tuple[str, int, int], int] = defaultdict(int)
+        self._asset_id_list: list[str] = []
+        self._order_id_list: list[str | None] = [None] * max_order_count
+        self._slot_dict: dict[str, int] = {}
+        self._state = np.zeros(max_order_count, dtype=np.int8)
+        self._asset_nr = np.full(max_order_count, -1, dtype=np.int32)
+        self._side = np.zeros(max_order_count, dtype=np.int8)
+        self._price1000 = np.zeros(max_order_count, dtype=np.int64)
+        self._remaining1000 = np.zeros(max_order_count, dtype=np.int64)
+        self._queue_ahead1000 = np.zeros(max_order_count, dtype=np.float64)
+        self._active_time = np.zeros(max_order_count, dtype=np.float64)
+        self._cancel_time = np.full(max_order_count, np.inf, dtype=np.float64)
+
+    ### orders
+
+    def place(
+        self,
+        order_id: str,
+        asset_id: str,
+        side: Literal['BUY', 'SELL'],
+        price1000: int,
+        size1000: int,
+        now: float,
+    ):
+        """The order gets on the book by `advance` (or any market data call) after the latency"""
+        assert order_id not in self._slot_dict, f'order exists: {order_id}'
+        assert size1000 > 0
+        free_slot_array = np.flatnonzero(self._state == _FREE)
+        if not len(free_slot_array):
+            self._grow()
+            free_slot_array = np.flatnonzero(self._state == _FREE)
+        slot = int(free_slot_array[0])
+        if asset_id not in self._asset_id_list:
+            self._asset_id_list.append(asset_id)
+        self._order_id_list[slot] = order_id
+        self._slot_dict[order_id] = slot
+        self._state[slot] = _PENDING
+        self._asset_nr[slot] = self._asset_id_list.index(asset_id)
+        self._side[slot] = _SIDE_SIGN[side]
+        self._price1000[slot] = price1000
+        self._remaining1000[slot] = size1000
+        self._queue_ahead1000[slot] = 0
+        self._active_time[slot] = now + self.place_latency_sec
+        self._cancel_time[slot] = np.inf
+
+    def cancel(self, order_id: str, now: float) -> bool:
+        """Returns False if the order is not known (filled or canceled)"""
+        slot = self._slot_dict.get(order_id)
+        if slot is None:
+            return False
+        self._cancel_time[slot] = min(self._cancel_time[slot], now + self.cancel_latency_sec)
+        return True
+
+    def get_remaining1000(self, order_id: str) -> int:
+        slot = self._slot_dict.get(order_id)
+        return 0 if slot is None else int(self._remaining1000[slot])
+
+    def get_queue_ahead1000(self, order_id: str) -> int:
+        slot = self._slot_dict.get(order_id)
+        return 0 if slot is None else int(round(self._queue_ahead1000[slot]))
+
+    def advance(self, now: float) -> list[SimEvent]:
+        """Places and cancels that are due by `now`, in the time order"""
+        event_list: list[SimEvent] = []
+        in_use_mask = self._state != _FREE
+        if not in_use_mask.any():
+            return event_list
+        place_slot_array = np.flatnonzero((self._state == _PENDING) & (self._active_time <= now))
+        cancel_slot_array = np.flatnonzero(in_use_mask & (self._cancel_time <= now))
+        due_list = sorted(
+            [(float(self._active_time[slot]), 0, slot) for slot in place_slot_array.tolist()]
+            + [(float(self._cancel_time[slot]), 1, slot) for slot in cancel_slot_array.tolist()]
+        )
+        for event_time, is_cancel, slot in due_list:
+            if self._state[slot] == _FREE:
+                continue
+            if is_cancel:
+                event_list.append(SimEvent('canceled', self._order_id_list[slot], event_time))
+                self._free(slot)
+            else:
+                event_list.extend(self._activate(slot, event_time))
+        return event_list
+
+    ### market data
+
+    def on_message(self, message: WsMessage, now: float) -> list[SimEvent]:
+        """Market channel message (record or raw dict), other event types only advance time"""
+        event_type = message['event_type']
+        if event_type == 'book':
+            message = to_ws_record(message)
+            return self.on_book(
+                asset_id=message['asset_id'],
+                bid_level1000_list=message['bid_level1000_list'],
+                ask_level1000_list=message['ask_level1000_list'],
+                now=now,
+            )
+        if event_type == 'price_change':
+            message = to_ws_record(message)
+            return self.on_price_change(
+                asset_id=message['asset_id'], change1000_list=message['change1000_list'], now=now
+            )
+        if event_type == 'last_trade_price':
+            return self.on_trade(
+                asset_id=message['asset_id'],
+                price1000=to_price1000(message['price']),
+                size1000=to_size1000(message['size']),
+                taker_side=message['side'],
+                now=now,
+            )
+        return self.advance(now)
+
+    def on_rest_books(self, clob_mob_list: list[dict], now: float) -> list[SimEvent]:
+        """REST book snapshot (`ClobClient.get_mob_dict_list` response)"""
+        event_list = []
+        for clob_mob in clob_mob_list:
+            book1000 = Book1000.new_from_native_prices(bids=clob_mob['bids'], asks=clob_mob['asks'])
+            event_list.extend(
+                self.on_book(
+                    asset_id=clob_mob['asset_id'],
+                    bid_level1000_list=list(book1000.bids.items()),
+                    ask_level1000_list=list(book1000.asks.items()),
+                    now=now,
+                )
+            )
+        return event_list
+
+    def on_book(
+        self,
+        asset_id: str,
+        bid_level1000_list: list[tuple[int, int]],
+        ask_level1000_list: list[tuple[int, int]],
+        now: float,
+    ) -> list[SimEvent]:
+        """Book snapshot, applied as the level changes against the previous book"""
+        event_list = self.advance(now)
+        for key in [key for key in self._traded1000_dict if key[0] == asset_id]:
+            del self._traded1000_dict[key]
+        new_book1000 = Book1000.new_from_level1000_list(
+            bid_level1000_list=bid_level1000_list, ask_level1000_list=ask_level1000_list
+        )
+        old_book1000 = self._book_dict.get(asset_id)
+        if old_book1000 is None:
+            self._book_dict[asset_id] = new_book1000
+            return event_list
+        change1000_list = []
+        for side, old_levels, new_levels in (
+            ('BUY', old_book1000.bids, new_book1000.bids),
+            ('SELL', old_book1000.asks, new_book1000.asks),
+        ):
+            for price1000 in sorted(set(old_levels) | set(new_levels)):
+                size1000 = new_levels.get(price1000, 0)
+                if size1000 != old_levels.get(price1000, 0):
+                    change1000_list.append((price1000, size1000, side))
+        event_list.extend(self._apply_change1000_list(asset_id, change1000_list, now))
+        return event_list
+
+    def on_price_change(
+        self, asset_id: str, change1000_list: list[tuple[int, int, str]], now: float
+    ) -> list[SimEvent]:
+        """Changes are (price1000, size1000, side), size is the new level size"""
+        event_list = self.advance(now)
+        event_list.extend(self._apply_change1000_list(asset_id, change1000_list, now))
+        return event_list
+
+    def on_trade(
+        self,
+        asset_id: str,
+        price1000: int,
+        size1000: int,
+        taker_side: Literal['BUY', 'SELL'],
+        now: float,
+    ) -> list[SimEvent]:
+        """Public trade, it is matched against our orders of the other (maker) side"""
+        event_list = self.advance(now)
+        maker_side_sign = -_SIDE_SIGN[taker_side]
+        self._traded1000_dict[(asset_id, maker_side_sign, price1000)] += size1000
+        side_mask = self._get_active_mask(asset_id) & (self._side == maker_side_sign)
+        if not side_mask.any():
+            return event_list
+        # orders priced better than the trade were in front of it
+        better_mask = side_mask & (maker_side_sign * (self._price1000 - price1000) > 0)
+        fill_event_list = self._fill_in_order(better_mask, size1000, now)
+        size1000 -= sum(event.size1000 for event in fill_event_list)
+        event_list.extend(fill_event_list)
+        at_mask = side_mask & (self._price1000 == price1000)
+        event_list.extend(self._consume_queue(at_mask, size1000, now))
+        return event_list
+
+    ### matching
+
+    def _apply_change1000_list(
+        self, asset_id: str, change1000_list: list[tuple[int, int, str]], now: float
+    ) -> list[SimEvent]:
+        book1000 = self._book_dict.get(asset_id)
+        if book1000 is None:
+            book1000 = self._book_dict[asset_id] = Book1000()
+        event_list = []
+        for price1000, size1000, side in change1000_list:
+            side_sign = _SIDE_SIGN[side]
+            levels = book1000.bids if side_sign > 0 else book1000.asks
+            level_size1000 = levels.get(price1000, 0)
+            delta1000 = size1000 - level_size1000
+            if delta1000 < 0:
+                traded_key = (asset_id, side_sign, price1000)
+                traded1000 = self._traded1000_dict.pop(traded_key, 0)
+                explained1000 = min(traded1000, -delta1000)
+                if traded1000 > explained1000:
+                    self._traded1000_dict[traded_key] = traded1000 - explained1000
+                depletion1000 = -delta1000 - explained1000
+                if depletion1000 > 0:
+                    event_list.extend(
+                        self._deplete(
+                            asset_id, side_sign, price1000, depletion1000, level_size1000, now
+                        )
+                    )
+            elif delta1000 > 0:
+                # an incoming order at this price would have matched our crossed orders first
+                cross_mask = (
+                    self._get_active_mask(asset_id)
+                    & (self._side == -side_sign)
+                    & (side_sign * (price1000 - self._price1000) >= 0)
+                )
+                event_list.extend(self._fill_in_order(cross_mask, delta1000, now))
+            book1000.update_overwrite1000(price1000=price1000, size1000=size1000, side=side)
+        return event_list
+
+    def _activate(self, slot: int, now: float) -> list[SimEvent]:
+        self._state[slot] = _ACTIVE
+        order_id = self._order_id_list[slot]
+        event_list = [SimEvent('placed', order_id, now)]
+        book1000 = self._book_dict.get(self._asset_id_list[self._asset_nr[slot]])
+        if book1000 is None:
+            return event_list
+        price1000 = int(self._price1000[slot])
+        if self._side[slot] > 0:
+            own_levels = book1000.bids
+            cross_level_list = [el for el in book1000.asks.items() if el[0] <= price1000]
+        else:
+            own_levels = book1000.asks
+            cross_level_list = [el for el in reversed(book1000.bids.items()) if el[0] >= price1000]
+        for level_price1000, level_size1000 in cross_level_list:
+            fill1000 = min(int(self._remaining1000[slot]), level_size1000)
+            event_list.append(SimEvent('fill', order_id, now, level_price1000, fill1000, True))
+            self._remaining1000[slot] -= fill1000
+            if self._remaining1000[slot] <= 0:
+                self._free(slot)
+                return event_list
+        self._queue_ahead1000[slot] = 0 if cross_level_list else own_levels.get(price1000, 0)
+        return event_list
+
+    def _deplete(
+        self,
+        asset_id: str,
+        side_sign: int,
+        price1000: int,
+        depletion1000: int,
+        level_size1000: int,
+        now: float,
+    ) -> list[SimEvent]:
+        mask = (
+            self._get_active_mask(asset_id)
+            & (self._side == side_sign)
+            & (self._price1000 == price1000)
+        )
+        if not mask.any():
+            return []
+        trade1000 = int(round(depletion1000 * self.depletion_fill_share))
+        cancel1000 = depletion1000 - trade1000
+        if cancel1000:
+            self._queue_ahead1000[mask] *= 1 - cancel1000 / level_size1000
+        return self._consume_queue(mask, trade1000, now)
+
+    def _consume_queue(self, mask: np.ndarray, trade1000: int, now: float) -> list[SimEvent]:
+        """The trade takes the queue ahead of every order, the rest of it fills the order"""
+        if trade1000 <= 0 or not mask.any():
+            return []
+        slot_array = np.flatnonzero(mask)
+        queue_ahead1000 = self._queue_ahead1000[slot_array]
+        fill1000 = np.minimum(
+            np.maximum(trade1000 - queue_ahead1000, 0), self._remaining1000[slot_array]
+        ).astype(np.int64)
+        self._queue_ahead1000[slot_array] = np.maximum(queue_ahead1000 - trade1000, 0)
+        return self._apply_fills(slot_array, fill1000, now)
+
+    def _fill_in_order(self, mask: np.ndarray, trade1000: int, now: float) -> list[SimEvent]:
+        """The trade fills the orders one after another, in the time they got on the book"""
+        if trade1000 <= 0 or not mask.any():
+            return []
+        slot_array = np.flatnonzero(mask)
+        slot_array = slot_array[np.argsort(self._active_time[slot_array], kind='stable')]
+        remaining1000 = self._remaining1000[slot_array]
+        filled_before1000 = np.cumsum(remaining1000) - remaining1000
+        fill1000 = np.clip(trade1000 - filled_before1000, 0, remaining1000)
+        return self._apply_fills(slot_array, fill1000, now)
+
+    def _apply_fills(
+        self, slot_array: np.ndarray, fill1000: np.ndarray, now: float
+    ) -> list[SimEvent]:
+        event_list = []
+        for slot, size1000 in zip(slot_array.tolist(), fill1000.tolist()):
+            if size1000 <= 0:
+                continue
+            order_id = self._order_id_list[slot]
+            event_list.append(
+                SimEvent('fill', order_id, now, int(self._price1000[slot]), int(size1000))
+            )
+            self._remaining1000[slot] -= size1000
+            if self._remaining1000[slot] <= 0:
+                self._free(slot)
+        return event_list
+
+    ### slots
+
+    def _get_active_mask(self, asset_id: str) -> np.ndarray:
+        if asset_id not in self._asset_id_list:
+            return np.zeros(len(self._state), dtype=bool)
+        return (self._state == _ACTIVE) & (self._asset_nr == self._asset_id_list.index(asset_id))
+
+    def _free(self, slot: int):
+        self._slot_dict.pop(self._order_id_list[slot], None)  # type: ignore[arg-type]
+        self._order_id_list[slot] = None
+        self._state[slot] = _FREE
+        self._asset_nr[slot] = -1
+        self._remaining1000[slot] = 0
+        self._cancel_time[slot] = np.inf
+
+    def _grow(self):
+        size = len(self._state)
+        self._order_id_list.extend([None] * size)
+        self._state = np.concatenate([self._state, np.zeros(size, dtype=np.int8)])
+        self._asset_nr = np.concatenate([self._asset_nr, np.full(size, -1, dtype=np.int32)])
+        self._side = np.concatenate([self._side, np.zeros(size, dtype=np.int8)])
+        self._price1000 = np.concatenate([self._price1000, np.zeros(size, dtype=np.int64)])
+        self._remaining1000 = np.concatenate([self._remaining1000, np.zeros(size, dtype=np.int64)])
+        self._queue_ahead1000 = np.concatenate([self._queue_ahead1000, np.zeros(size)])
+        self._active_time = np.concatenate([self._active_time, np.zeros(size)])
+        self._cancel_time = np.concatenate([self._cancel_time, np.full(size, np.inf)])
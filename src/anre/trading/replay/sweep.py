@@ -0,0 +1,296 @@
+import datetime
+from itertools import product
+from multiprocessing.shared_memory import SharedMemory
+from typing import Iterable, Iterator, NamedTuple, Optional, Type
+
+import numpy as np
+import pandas as pd
+
+from anre.connection.polymarket.api.recorder.recorder import iter_recorded_records
+from anre.connection.polymarket.api.recorder.segment import KIND_REST_BOOK, KIND_WS_MARKET
+from anre.trading.replay.engine import Record, ReplayEngine
+from anre.trading.replay.fill import FillSimulator
+from anre.trading.strategy.brain.brains.base.brainBase import StrategyBrain
+from anre.trading.strategy.parameter.parameter import Parameter
+from anre.utils.dotNest.dotNest import DotNest
+from anre.utils.worker.worker import Worker
+
+# record index of the shared memory block, the record bodies follow it
+INDEX_DTYPE = np.dtype([
+    ('receive_time', '<f8'),
+    ('kind', 'u1'),
+    ('offset', '<u8'),
+    ('size', '<u4'),
+])
+
+
+class SharedReplayHandle(NamedTuple):
+    """Picklable reference to `SharedReplayRecords` (it is sent to the worker processes)"""
+
+    name: str
+    record_count: int
+    body_size: int
+
+
+class SharedReplayRecords:
+    """Replay records of one day in one shared memory block: the index array and the bodies
+
+    The parent process loads the records once (`new_from_records`), the worker processes attach
+    by the handle (`attach`). Attached blocks are kept per process, so a process that runs many
+    jobs of the same day maps the block once and nothing is copied or reloaded.
+    """
+
+    def __init__(self, shared_memory: SharedMemory, handle: SharedReplayHandle, is_owner: bool):
+        self._shared_memory = shared_memory
+        self.handle = handle
+        self._is_owner = is_owner
+        self._index_array = np.ndarray(
+            (handle.record_count,), dtype=INDEX_DTYPE, buffer=shared_memory.buf
+        )
+        self._body_buf = shared_memory.buf[INDEX_DTYPE.itemsize * handle.record_count :]
+
+    @classmethod
+    def new_from_records(cls, record_iter: Iterable[Record]) -> 'SharedReplayRecords':
+        record_list = list(record_iter)
+        index_array = np.zeros(len(record_list), dtype=INDEX_DTYPE)
+        offset = 0
+        for nr, (receive_time, kind, body) in enumerate(record_list):
+            index_array[nr] = (receive_time, kind, offset, len(body))
+            offset += len(body)
+        index_size = index_array.nbytes
+        # zero size block is not allowed
+        shared_memory = SharedMemory(create=True, size=max(index_size + offset, 1))
+        shared_memory.buf[:index_size] = index_array.tobytes()
+        for (_, _, body), body_offset in zip(record_list, index_array['offset'].tolist()):
+            start = index_size + body_offset
+            shared_memory.buf[start : start + len(body)] = body
+        handle = SharedReplayHandle(
+            name=shared_memory.name, record_count=len(record_list), body_size=offset
+        )
+        shared_replay_records = cls(shared_memory=shared_memory, handle=handle, is_owner=True)
+        _shared_replay_records_dict[handle.name] = shared_replay_records
+        return shared_replay_records
+
+    @classmethod
+    def attach(cls, handle: SharedReplayHandle) -> 'SharedReplayRecords':
+        shared_replay_records = _shared_replay_records_dict.get(handle.name)
+        if shared_replay_records is None:
+            shared_memory = SharedMemory(name=handle.name)
+            shared_replay_records = cls(shared_memory=shared_memory, handle=handle, is_owner=False)
+            _shared_replay_records_dict[handle.name] = shared_replay_records
+        return shared_replay_records
+
+    def iter_records(self) -> Iterator[Record]:
+        for receive_time, kind, offset, size in self._index_array.tolist():
+            yield receive_time, kind, bytes(self._body_buf[offset : offset + size])
+
+    def get_time_range(self) -> Optional[tuple[float, float]]:
+        if not self.handle.record_count:
+            return None
+        receive_time_array = self._index_array['receive_time']
+        return float(receive_time_array[0]), float(receive_time_array[-1])
+
+    def close(self):
+        """Release the block of this process (the owner removes it)"""
+        _shared_replay_records_dict.pop(self.handle.name, None)
+        # views into the buffer must be released before the block is closed
+        self._index_array = np.zeros(0, dtype=INDEX_DTYPE)
+        self._body_buf.release()
+        self._shared_memory.close()
+        if self._is_owner:
+            self._shared_memory.unlink()
+
+
+_shared_replay_records_dict: dict[str, SharedReplayRecords] = {}
+
+
+def get_predefined_config_dict(strategy_label: str) -> dict:
+    """`configDict` of the `resource/strategyPredefined` parameter of the strategy"""
+    parameter = Parameter(strategy_label, strategyLabel=strategy_label)
+    return parameter['configDict']
+
+
+def run_sweep_job(
+    strategy_brain_class: Type[StrategyBrain],
+    config_dict: dict,
+    market_info: dict,
+    replay_handle: SharedReplayHandle,
+    iteration_sec: float = 1.0,
+    fill_simulator_kwargs: Optional[dict] = None,
+) -> dict:
+    """Replay of one config over one day, returns the result dict (a row of the sweep)
+
+    An error of the job (e.g. the config is not valid, or not valid for the market) does not
+    stop the sweep, it is returned in `error`.
+    """
+    fill_simulator_kwargs = {} if fill_simulator_kwargs is None else fill_simulator_kwargs
+    replay_records = SharedReplayRecords.attach(replay_handle)
+    engine = None
+    try:
+        engine = ReplayEngine(
+            strategy_brain=strategy_brain_class.new_from_config_dict(config_dict=config_dict),
+            market_info=market_info,
+            iteration_sec=iteration_sec,
+            fill_simulator=FillSimulator(**fill_simulator_kwargs),
+        )
+        engine.run(replay_records.iter_records())
+        return {'error': None, **get_replay_result_dict(engine)}
+    except Exception as e:
+        return {'error': f'{e.__class__.__name__}: {e}'}
+    finally:
+        if engine is not None:
+            engine.stop()
+
+
+def get_replay_result_dict(engine: ReplayEngine) -> dict:
+    """PnL, fill rate and inventory statistics of a finished replay
+
+    PnL is marked to the mid price of the last public book (Yes at mid, No at 1 - mid).
+    """
+    cash, position_dict = 0.0, {'Yes': 0.0, 'No': 0.0}
+    for trade_rec in engine.exchange.get_house_trade_rec_list():
+        sign = 1 if trade_rec.side == 'BUY' else -1
+        cash -= sign * trade_rec.price * trade_rec.size
+        position_dict[trade_rec.outcome] += sign * trade_rec.size
+    yes_position, no_position = position_dict['Yes'], position_dict['No']
+    public_mob, _, _ = engine.monitor.get_market_order_books()
+    best_bid1000, best_ask1000 = public_mob.get_main_asset_best_price1000s()
+    mid_price = (best_bid1000 + best_ask1000) / 2000
+    balance_position_array = np.asarray(engine.get_balance_position_list(), dtype=float)
+    exchange_stats_dict = engine.exchange.get_stats_dict()
+    placed_size = exchange_stats_dict['placed_size']
+    return {
+        **engine.get_stats_dict(),
+        **exchange_stats_dict,
+        'fill_rate': exchange_stats_dict['filled_size'] / placed_size if placed_size else np.nan,
+        'cash': cash,
+        'yes_position': yes_position,
+        'no_position': no_position,
+        'mid_price': mid_price,
+        'pnl': cash + yes_position * mid_price + no_position * (1 - mid_price),
+        'balance_position': engine.monitor.get_house_balance_position(),
+        'balance_position_abs_mean': (
+            float(np.abs(balance_position_array).mean()) if len(balance_position_array) else 0.0
+        ),
+        'balance_position_abs_max': (
+            float(np.abs(balance_position_array).max()) if len(balance_position_array) else 0.0
+        ),
+    }
+
+
+class ReplaySweep:
+    """Parameter sweep of a strategy over recorded days, (config x day) jobs run in parallel
+
+    Records of every day are loaded once into shared memory (`SharedReplayRecords`), jobs get
+    only the handle. Jobs run through `Worker` (`Worker.new_multiproc` by default, all cores but
+    one), every job is an independent replay with its own `FillSimulator`, so the results do not
+    depend on the worker. Results are one DataFrame row per job: the config (dot keys with the
+    `config.` prefix), the day and `get_replay_result_dict`.
+    """
+
+    def __init__(
+        self,
+        strategy_brain_class: Type[StrategyBrain],
+        market_info: dict,
+        dir_path: str,
+        name: Optional[str] = None,
+        iteration_sec: float = 1.0,
+        fill_simulator_kwargs: Optional[dict] = None,
+    ):
+        assert issubclass(strategy_brain_class, StrategyBrain)
+        assert iteration_sec > 0
+        self.strategy_brain_class = strategy_brain_class
+        self.market_info = market_info
+        self.dir_path = dir_path
+        self.name = name
+        self.iteration_sec = iteration_sec
+        self.fill_simulator_kwargs = {} if fill_simulator_kwargs is None else fill_simulator_kwargs
+
+    def run(
+        self,
+        config_dict_list: list[dict],
+        day_list: list[datetime.date],
+        worker: Optional[Worker] = None,
+    ) -> pd.DataFrame:
+        """Day is a UTC day (it is replayed from 00:00 to 24:00)"""
+        assert config_dict_list
+        assert day_list
+        worker = Worker.new_multiproc() if worker is None else worker
+
+        replay_records_list = []
+        try:
+            for day in day_list:
+                start_time, end_time = self.get_day_time_range(day)
+                record_iter = iter_recorded_records(
+                    self.dir_path,
+                    name=self.name,
+                    start_time=start_time,
+                    end_time=end_time,
+                    kind_list=[KIND_WS_MARKET, KIND_REST_BOOK],
+                )
+                replay_records_list.append(SharedReplayRecords.new_from_records(record_iter))
+
+            job_list = list(product(range(len(config_dict_list)), range(len(day_list))))
+            result_list = worker.starmap(
+                run_sweep_job,
+                kwargs_list=[
+                    {
+                        'config_dict': config_dict_list[config_nr],
+                        'replay_handle': replay_records_list[day_nr].handle,
+                    }
+                    for config_nr, day_nr in job_list
+                ],
+                strategy_brain_class=self.strategy_brain_class,
+                market_info=self.market_info,
+                iteration_sec=self.iteration_sec,
+                fill_simulator_kwargs=self.fill_simulator_kwargs,
+            )
+        finally:
+            for replay_records in replay_records_list:
+                replay_records.close()
+
+        row_list = []
+        for (config_nr, day_nr), result_dict in zip(job_list, result_list):
+            config_dot_dict = DotNest.convert_nest2dotDict(config_dict_list[config_nr])
+            row_list.append({
+                'config_nr': config_nr,
+                'day': day_list[day_nr],
+                **{f'config.{key}': value for key, value in config_dot_dict.items()},
+                **result_dict,
+            })
+        return pd.DataFrame(row_list)
+
+    @staticmethod
+    def get_day_time_range(day: datetime.date) -> tuple[float, float]:
+        start_dt = datetime.datetime(day.year, day.month, day.day, tzinfo=datetime.timezone.utc)
+        end_dt = start_dt + datetime.timedelta(days=1)
+        return start_dt.timestamp(), end_dt.timestamp()
+
+
+def __dummy__():
+    from anre.config.config import config as anre_config
+    from anre.connection.polymarket.api.clob import ClobClient
+    from anre.trading.strategy.brain.brains.fixed_market_maker.fixed_market_maker import (
+        FixedMarketMaker,
+    )
+
+    condition_id = '0x0de7d3a8cb29764fc91c5941a00e1cf010b9ee0f2f4b0cd82a9e0737ffed0c96'
+    market_info = ClobClient().get_single_market_info(condition_id=condition_id)
+    config_dict = get_predefined_config_dict('FixedMarketMaker')
+    config_dict_list = [
+        {**config_dict, 'share_size': share_size, 'target_base_step_level': step_level}
+        for share_size in [5, 10, 20, 50]
+        for step_level in range(1, 6)
+    ]
+    sweep = ReplaySweep(
+        strategy_brain_class=FixedMarketMaker,
+        market_info=market_info,
+        dir_path=anre_config.path.get_path_to_data_dir('recorder'),
+        fill_simulator_kwargs={'place_latency_sec': 0.2, 'cancel_latency_sec': 0.2},
+    )
+    sweep_df = sweep.run(
+        config_dict_list=config_dict_list,
+        day_list=[datetime.date(2025, 6, 16), datetime.date(2025, 6, 17)],
+        worker=Worker.new_multiproc(show_progress=True),
+    )
+    sweep_df.groupby('config_nr')[['pnl', 'fill_rate', 'balance_position_abs_max']].mean()
@@ -0,0 +1,168 @@
+import tempfile
+
+from anre.connection.polymarket.api.clob import ClobMarketInfoParser
+from anre.connection.polymarket.api.recorder.recorder import MarketDataRecorder
+from anre.trading.replay.engine import ReplayEngine
+from anre.trading.replay.fill import FillSimulator
+from anre.trading.replay.tests.test_replay import _record_book_change_steps
+from anre.trading.strategy.brain.brains.fixed_market_maker.fixed_market_maker import (
+    FixedMarketMaker,
+)
+from anre.utils import testutil
+from anre.utils.Json.Json import Json
+
+_ASSET_ID = 'asset'
+
+
+def _new_fill_simulator(**kwargs) -> FillSimulator:
+    fill_simulator = FillSimulator(**kwargs)
+    fill_simulator.on_book(
+        asset_id=_ASSET_ID,
+        bid_level1000_list=[(480, 50_000), (500, 100_000)],
+        ask_level1000_list=[(520, 30_000), (540, 80_000)],
+        now=0,
+    )
+    return fill_simulator
+
+
+class TestFillSimulator(testutil.TestCase):
+    def test_trade_consumes_queue(self) -> None:
+        fill_simulator = _new_fill_simulator()
+        fill_simulator.place('a', _ASSET_ID, 'BUY', price1000=500, size1000=50_000, now=1)
+        event_list = fill_simulator.advance(now=1)
+        assert [el.kind for el in event_list] == ['placed']
+        assert fill_simulator.get_queue_ahead1000('a') == 100_000
+
+        event_list = fill_simulator.on_trade(_ASSET_ID, 500, 120_000, taker_side='SELL', now=2)
+        assert [(el.kind, el.price1000, el.size1000, el.is_taker) for el in event_list] == [
+            ('fill', 500, 20_000, False)
+        ]
+        assert fill_simulator.get_queue_ahead1000('a') == 0
+        assert fill_simulator.get_remaining1000('a') == 30_000
+
+        # depletion of the traded size is not counted again, the level is refilled by others
+        event_list = fill_simulator.on_price_change(_ASSET_ID, [(500, 0, 'BUY')], now=3)
+        event_list += fill_simulator.on_price_change(_ASSET_ID, [(500, 10_000, 'BUY')], now=3)
+        assert event_list == []
+        assert fill_simulator.get_remaining1000('a') == 30_000
+
+        # trade at a worse price, our order was in front of it
+        event_list = fill_simulator.on_trade(_ASSET_ID, 490, 40_000, taker_side='SELL', now=4)
+        assert [(el.order_id, el.size1000) for el in event_list] == [('a', 30_000)]
+        assert fill_simulator.get_remaining1000('a') == 0
+
+    def test_depletion_fill_share(self) -> None:
+        for depletion_fill_share, queue_ahead1000 in [(0, 60_000), (0.5, 60_000), (1, 60_000)]:
+            fill_simulator = _new_fill_simulator(depletion_fill_share=depletion_fill_share)
+            fill_simulator.place('a', _ASSET_ID, 'BUY', price1000=500, size1000=50_000, now=1)
+            fill_simulator.advance(now=1)
+            fill_simulator.on_price_change(_ASSET_ID, [(500, 60_000, 'BUY')], now=2)
+            assert fill_simulator.get_queue_ahead1000('a') == queue_ahead1000
+
+        # the level is gone: cancels only, or trades through the queue and the order
+        result_dict = {}
+        for depletion_fill_share in [0, 0.5, 1]:
+            fill_simulator = _new_fill_simulator(depletion_fill_share=depletion_fill_share)
+            fill_simulator.place('a', _ASSET_ID, 'BUY', price1000=500, size1000=50_000, now=1)
+            fill_simulator.advance(now=1)
+            fill_simulator.on_price_change(_ASSET_ID, [(500, 150_000, 'BUY')], now=2)
+            event_list = fill_simulator.on_price_change(_ASSET_ID, [(500, 0, 'BUY')], now=3)
+            result_dict[depletion_fill_share] = sum(el.size1000 for el in event_list)
+        assert result_dict == {0: 0, 0.5: 25_000, 1: 50_000}
+
+    def test_cross_and_latency(self) -> None:
+        fill_simulator = _new_fill_simulator(place_latency_sec=0.5, cancel_latency_sec=0.2)
+        fill_simulator.place('a', _ASSET_ID, 'BUY', price1000=520, size1000=50_000, now=1)
+        assert fill_simulator.advance(now=1.4) == []
+
+        # the rest of a crossing order is on the book with no queue ahead
+        event_list = fill_simulator.advance(now=1.5)
+        assert [(el.kind, el.price1000, el.size1000, el.is_taker) for el in event_list] == [
+            ('placed', 0, 0, False),
+            ('fill', 520, 30_000, True),
+        ]
+        assert fill_simulator.get_remaining1000('a') == 20_000
+        assert fill_simulator.get_queue_ahead1000('a') == 0
+
+        # filled during the cancel latency
+        assert fill_simulator.cancel('a', now=2)
+        event_list = fill_simulator.on_price_change(_ASSET_ID, [(510, 5_000, 'SELL')], now=2.1)
+        assert [(el.kind, el.price1000, el.size1000) for el in event_list] == [('fill', 520, 5_000)]
+        event_list = fill_simulator.advance(now=2.2)
+        assert [(el.kind, el.time) for el in event_list] == [('canceled', 2.2)]
+        assert not fill_simulator.cancel('a', now=3)
+
+    def test_many_orders(self) -> None:
+        fill_simulator = _new_fill_simulator(max_order_count=2)
+        for nr in range(10):
+            fill_simulator.place(f'{nr}', _ASSET_ID, 'SELL', 540, size1000=1_000, now=1)
+        assert len(fill_simulator.advance(now=1)) == 10
+        event_list = fill_simulator.on_trade(_ASSET_ID, 550, 4_500, taker_side='BUY', now=2)
+        assert [(el.order_id, el.size1000) for el in event_list] == [
+            ('0', 1_000),
+            ('1', 1_000),
+            ('2', 1_000),
+            ('3', 1_000),
+            ('4', 500),
+        ]
+
+
+def _record_trade(dir_path: str, market_info: dict, receive_time: float):
+    """Public trade (taker sells 30 Yes at 0.04) after the recorded book changes"""
+    bool_market_cred = ClobMarketInfoParser.get_bool_market_cred(market_info)
+    trade = {
+        'asset_id': bool_market_cred.main_asset_id,
+        'event_type': 'last_trade_price',
+        'fee_rate_bps': '0',
+        'market': bool_market_cred.condition_id,
+        'price': '0.04',
+        'side': 'SELL',
+        'size': '30',
+        'timestamp': str(int(receive_time * 1000)),
+    }
+    recorder = MarketDataRecorder(dir_path=dir_path, name='trade')
+    recorder.record_ws_frame('market', receive_time, Json.dumps([trade]))
+    recorder.stop()
+
+
+class TestReplayFills(testutil.TestCase):
+    def test_fills_make_position(self) -> None:
+        with tempfile.TemporaryDirectory() as dir_path:
+            market_info = _record_book_change_steps(dir_path)
+            _record_trade(dir_path, market_info, receive_time=1750108640.0)
+
+            result_list = []
+            for _ in range(2):
+                engine = ReplayEngine(
+                    strategy_brain=FixedMarketMaker.new(share_size=50, place_patience=1),
+                    market_info=market_info,
+                    iteration_sec=0.5,
+                    fill_simulator=FillSimulator(place_latency_sec=0.2, cancel_latency_sec=0.2),
+                )
+                engine.run_dir(dir_path)
+                engine.stop()
+                house_trade_rec_list = engine.exchange.get_house_trade_rec_list()
+                # the long bid at 0.05 was in front of the trade at 0.04
+                assert [
+                    (el.outcome, el.side, el.size, el.price) for el in house_trade_rec_list
+                ] == [('Yes', 'BUY', 30, 0.05)]
+
+                # fills get into the monitor as the live user channel trades
+                position_dict = {'Yes': 0.0, 'No': 0.0}
+                for trade_rec in house_trade_rec_list:
+                    sign = 1 if trade_rec.side == 'BUY' else -1
+                    position_dict[trade_rec.outcome] += sign * trade_rec.size
+                position_by_outcome = engine.monitor._house_trade_cache.get_position_by_outcome()
+                self.assertAlmostEqual(position_by_outcome[0], position_dict['Yes'])
+                self.assertAlmostEqual(position_by_outcome[1], position_dict['No'])
+
+                house_order_list = engine.monitor.get_house_order_dict_list()
+                assert {el['id'] for el in house_order_list} == set(
+                    engine.exchange.get_live_order_dict()
+                )
+                result_list.append((
+                    [trade_rec.__dict__ for trade_rec in house_trade_rec_list],
+                    sorted((el['id'], el['remaining_size1000']) for el in house_order_list),
+                ))
+
+            assert result_list[0] == result_list[1]
@@ -0,0 +1,63 @@
+import tempfile
+from itertools import groupby
+
+from anre.config.config import config as anre_config
+from anre.connection.polymarket.api.recorder.recorder import MarketDataRecorder
+from anre.trading.replay.engine import ReplayEngine
+from anre.trading.strategy.brain.brains.fixed_market_maker.fixed_market_maker import (
+    FixedMarketMaker,
+)
+from anre.utils import testutil
+from anre.utils.Json.Json import Json
+
+
+def _record_book_change_steps(dir_path: str) -> dict:
+    """Records the steps of the cache test resource, returns the market info"""
+    file_path = anre_config.path.get_path_to_root_dir(
+        'src/anre/connection/polymarket/api/cache/tests/resources/book_change_step_list.json'
+    )
+    step_list = Json.load(path=file_path)
+    message_list = step_list[-1]['ws_market_message_list']
+
+    recorder = MarketDataRecorder(dir_path=dir_path)
+    recorder.record_rest_books(step_list[0]['clob_mob_list'], receive_time=1750108600.0)
+    for message in message_list:
+        if message['event_type'] == '_internal':
+            recorder.record_ws_frame('market', message['timestamp'], message)
+    market_message_list = [el for el in message_list if el['event_type'] != '_internal']
+    for receive_time, frame_message_iter in groupby(market_message_list, key=lambda el: el['_rt']):
+        frame = [{k: v for k, v in el.items() if k != '_rt'} for el in frame_message_iter]
+        recorder.record_ws_frame('market', receive_time, Json.dumps(frame))
+    recorder.stop()
+    return step_list[0]['clob_market_info_dict']
+
+
+class TestReplayEngine(testutil.TestCase):
+    def test_replay_is_repeatable(self) -> None:
+        with tempfile.TemporaryDirectory() as dir_path:
+            market_info = _record_book_change_steps(dir_path)
+
+            result_list = []
+            for _ in range(2):
+                strategy_brain = FixedMarketMaker.new(share_size=50, place_patience=1)
+                engine = ReplayEngine(
+                    strategy_brain=strategy_brain, market_info=market_info, iteration_sec=0.5
+                )
+                stats_dict = engine.run_dir(dir_path)
+                house_order_list = sorted(
+                    (el['id'], el['bool_side'], el['price1000'], el['remaining_size1000'])
+                    for el in engine.monitor.get_house_order_dict_list()
+                )
+                result_list.append(house_order_list)
+
+                assert stats_dict['record_count'] == 13
+                assert stats_dict['strategy_iteration_count'] > 10
+                # faster than the recorded time span
+                assert stats_dict['run_time'] < stats_dict['replay_time'] - 1750108600.0
+                assert set(engine.exchange.get_live_order_dict()) == {
+                    el[0] for el in house_order_list
+                }
+                engine.stop()
+
+            assert result_list[0] == result_list[1]
+            assert sorted(el[1] for el in result_list[0]) == ['LONG', 'SHORT']
@@ -0,0 +1,100 @@
+import datetime
+import tempfile
+
+import pandas as pd
+
+from anre.trading.replay.sweep import (
+    ReplaySweep,
+    SharedReplayRecords,
+    get_predefined_config_dict,
+)
+from anre.trading.replay.tests.test_fill import _record_trade
+from anre.trading.replay.tests.test_replay import _record_book_change_steps
+from anre.trading.strategy.brain.brains.fixed_market_maker.fixed_market_maker import (
+    FixedMarketMaker,
+)
+from anre.utils import testutil
+from anre.utils.worker.worker import Worker
+
+_DAY_LIST = [datetime.date(2025, 6, 16), datetime.date(2025, 6, 17)]
+
+
+class TestSharedReplayRecords(testutil.TestCase):
+    def test_records_roundtrip(self) -> None:
+        record_list = [(1.5, 1, b'[]'), (2.0, 3, b'{"a": 1}'), (2.5, 1, b'')]
+        shared_replay_records = SharedReplayRecords.new_from_records(record_list)
+        try:
+            handle = shared_replay_records.handle
+            assert handle.record_count == 3
+            assert SharedReplayRecords.attach(handle) is shared_replay_records
+            assert list(shared_replay_records.iter_records()) == record_list
+            assert shared_replay_records.get_time_range() == (1.5, 2.5)
+        finally:
+            shared_replay_records.close()
+
+        shared_replay_records = SharedReplayRecords.new_from_records([])
+        assert list(shared_replay_records.iter_records()) == []
+        assert shared_replay_records.get_time_range() is None
+        shared_replay_records.close()
+
+
+def _run_sweep(config_dict_list: list[dict], worker: Worker) -> pd.DataFrame:
+    with tempfile.TemporaryDirectory() as dir_path:
+        market_info = _record_book_change_steps(dir_path)
+        _record_trade(dir_path, market_info, receive_time=1750108640.0)
+        sweep = ReplaySweep(
+            strategy_brain_class=FixedMarketMaker,
+            market_info=market_info,
+            dir_path=dir_path,
+            iteration_sec=0.5,
+        )
+        return sweep.run(config_dict_list=config_dict_list, day_list=_DAY_LIST, worker=worker)
+
+
+def _get_config_dict_list(share_size_list: list[int]) -> list[dict]:
+    config_dict = get_predefined_config_dict('FixedMarketMaker')
+    return [
+        {**config_dict, 'share_size': share_size, 'place_patience': 1}
+        for share_size in share_size_list
+    ]
+
+
+class TestReplaySweep(testutil.TestCase):
+    def test_sweep(self) -> None:
+        config_dict_list = _get_config_dict_list([20, 50, 10])
+        sweep_df = _run_sweep(config_dict_list, worker=Worker.new_sequential())
+        day_list = _DAY_LIST
+
+        assert len(sweep_df) == 6
+        assert sweep_df['config.share_size'].tolist() == [20, 20, 50, 50, 10, 10]
+        assert sweep_df['day'].tolist() == day_list * 3
+        # the order of 10 at 0.05 is too small, the error does not stop the other jobs
+        assert sweep_df['error'].isnull().tolist() == [True, True, True, True, False, True]
+        # the recording is of the first day only
+        assert sweep_df['record_count'].fillna(-1).tolist() == [14, 0, 14, 0, -1, 0]
+        day_df = sweep_df.loc[lambda df: df['record_count'] > 0].set_index('config.share_size')
+        # the trade of 30 at 0.04 fills the long bids at 0.05, marked to the last mid
+        assert day_df['filled_size'].to_dict() == {20: 20.0, 50: 30.0}
+        assert day_df['yes_position'].to_dict() == {20: 20.0, 50: 30.0}
+        assert day_df['balance_position_abs_max'].to_dict() == {20: 20.0, 50: 30.0}
+        for share_size, filled_size in [(20, 20.0), (50, 30.0)]:
+            row = day_df.loc[share_size]
+            assert row['fill_rate'] == filled_size / row['placed_size']
+            self.assertAlmostEqual(row['pnl'], filled_size * (row['mid_price'] - 0.05))
+
+    def test_invalid_config(self) -> None:
+        config_dict_list = _get_config_dict_list([20, 50])
+        config_dict_list[0]['unknown_key'] = 1
+        config_dict_list[1]['share_size'] = 'many'
+        sweep_df = _run_sweep(config_dict_list, worker=Worker.new_sequential())
+        assert len(sweep_df) == 4
+        error_list = sweep_df['error'].tolist()
+        assert all(isinstance(el, str) for el in error_list)
+        assert 'unknown_key' in error_list[0]
+
+    def test_multiproc(self) -> None:
+        config_dict_list = _get_config_dict_list([20, 50, 10])
+        sweep_df = _run_sweep(config_dict_list, worker=Worker.new_multiproc(max_worker=2))
+        sequential_sweep_df = _run_sweep(config_dict_list, worker=Worker.new_sequential())
+        column_list = ['config_nr', 'day', 'error', 'record_count', 'filled_size', 'pnl']
+        pd.testing.assert_frame_equal(sweep_df[column_list], sequential_sweep_df[column_list])
@@ -1,8 +1,10 @@
+from typing import Optional
+
 from anre.trading.strategy.action.actions.base import StrategyAtomicAction
 
 
 class CancelOrdersByIds(StrategyAtomicAction):
-    def __init__(self, order_ids):
+    def __init__(self, order_ids, parent_id: Optional[str] = None):
         assert order_ids
-        super().__init__()
+        super().__init__(parent_id=parent_id)
         self.order_ids = order_ids
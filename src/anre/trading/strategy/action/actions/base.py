@@ -1,3 +1,4 @@
+import time
 import uuid
 from abc import ABC, abstractmethod
 from typing import Optional
@@ -16,6 +17,8 @@ class StrategyAction(ABC):
         self._is_failed: bool = False
         self._is_done: bool = False  # failed or success
         self._created_order_ids: list[str] = []
+        self._start_time: Optional[float] = None  # perf_counter
+        self._finish_time: Optional[float] = None
         self.parent_id: Optional[str] = parent_id
         assert not kwargs, f'Unexpected kwargs: {kwargs}'
 
@@ -34,6 +37,7 @@ class StrategyAction(ABC):
         assert not self._is_aborted, f'Action is already aborted: {self}'
         self._is_started = True
         self._is_pending = True
+        self._start_time = time.perf_counter()
 
     def set_final_status(self, is_success: bool, is_failed: bool):
         assert self._is_started, 'Action is not started'
@@ -46,6 +50,7 @@ class StrategyAction(ABC):
         self._is_failed = is_failed
         self._is_pending = False
         self._is_done = True
+        self._finish_time = time.perf_counter()
 
     def set_created_order_ids(self, order_ids: list[str]):
         self._created_order_ids = order_ids
@@ -54,6 +59,20 @@ class StrategyAction(ABC):
     def created_order_ids(self) -> list[str]:
         return self._created_order_ids
 
+    @property
+    def start_time(self) -> Optional[float]:
+        return self._start_time
+
+    @property
+    def finish_time(self) -> Optional[float]:
+        return self._finish_time
+
+    @property
+    def latency_sec(self) -> Optional[float]:
+        if self._start_time is None or self._finish_time is None:
+            return None
+        return self._finish_time - self._start_time
+
     @property
     def is_approved(self) -> bool:
         return self._is_approved
@@ -93,6 +112,8 @@ class StrategyAction(ABC):
 
 class StrategyAtomicAction(StrategyAction):
     is_atomic: bool = True
+    # ordering relative to the other half of a replace (see `ReplaceBoolMarketOrder`)
+    pipeline_mode: Optional[str] = None
 
     def to_atomic_actions(self) -> list['StrategyAtomicAction']:
         return [self]
@@ -1,9 +1,15 @@
-from typing import Literal
+import logging
+from typing import Literal, Optional
 
 from anre.trading.strategy.action.actions.atomic.cancel_orders_by_ids import CancelOrdersByIds
 from anre.trading.strategy.action.actions.atomic.place_direct_order import PlaceDirectOrder
 from anre.trading.strategy.action.actions.base import StrategyAtomicAction, StrategyComplexAction
 
+# cancel_then_place - the old order is off the book while the new one is posted (no extra exposure)
+# place_then_cancel - the new order is live before the old one is canceled (both live for a while)
+# concurrent - both requests are in flight at the same time (shortest replace, both can be live)
+PIPELINE_MODES = ('cancel_then_place', 'place_then_cancel', 'concurrent')
+
 
 class ReplaceBoolMarketOrder(StrategyComplexAction):
     def __init__(
@@ -15,7 +21,16 @@ class ReplaceBoolMarketOrder(StrategyComplexAction):
         bool_side: Literal["LONG", "SHORT"],
         order_type: str = "GTC",
         cancel_order_ids: list | tuple | None = None,
+        pipeline_mode: str = 'cancel_then_place',
+        cancel_size1000: Optional[int] = None,
+        max_exposure_size1000: Optional[int] = None,
     ):
+        """
+        :param pipeline_mode: ordering of the place and the cancel, one of `PIPELINE_MODES`
+        :param cancel_size1000: remaining size of the canceled orders (for the exposure check)
+        :param max_exposure_size1000: if both orders could be live at the same time and
+            size1000 + cancel_size1000 exceeds it, the replace falls back to cancel_then_place
+        """
         assert bool_side in ("LONG", "SHORT"), f"bool_side must be LONG or SHORT, got {bool_side}"
         assert isinstance(main_price1000, int), f"price1000 must int, got {main_price1000}"
         assert isinstance(size1000, int), f"size1000 must int, got {size1000}"
@@ -30,6 +45,9 @@ class ReplaceBoolMarketOrder(StrategyComplexAction):
         assert size1000 * (1000 - main_price1000) >= 1000000, "Size to small relative to price (2)"
         cancel_order_ids = [] if cancel_order_ids is None else cancel_order_ids
         assert isinstance(cancel_order_ids, list)
+        assert pipeline_mode in PIPELINE_MODES, f"unknown pipeline_mode: {pipeline_mode}"
+        assert cancel_size1000 is None or cancel_size1000 >= 0
+        assert max_exposure_size1000 is None or max_exposure_size1000 > 0
 
         super().__init__()
         self.main_token_id = main_asset_id
@@ -39,18 +57,49 @@ class ReplaceBoolMarketOrder(StrategyComplexAction):
         self.bool_side = bool_side
         self.order_type = order_type
         self.cancel_order_ids = cancel_order_ids
+        self.pipeline_mode = pipeline_mode
+        self.cancel_size1000 = cancel_size1000
+        self.max_exposure_size1000 = max_exposure_size1000
+        self.effective_pipeline_mode = self._get_effective_pipeline_mode()
         self._atomic_actions: list[StrategyAtomicAction] | None = None
+        self._latency_dict: dict[str, float | None] = {}
 
     def __repr__(self):
         return (
-            f"PlaceBoolMarketOrder(main_token_id={self.main_token_id}, "
+            f"ReplaceBoolMarketOrder(main_token_id={self.main_token_id}, "
             f"counter_token_id={self.counter_token_id}, "
             f"main_price1000={self.main_price1000}, "
             f"size1000={self.size1000}, "
             f"bool_side={self.bool_side}, "
-            f"order_type={self.order_type})"
+            f"order_type={self.order_type}, "
+            f"pipeline_mode={self.effective_pipeline_mode})"
         )
 
+    @property
+    def latency_dict(self) -> dict[str, float | None]:
+        """place, cancel and whole replace latency in seconds (after the execution)"""
+        return self._latency_dict.copy()
+
+    def get_max_exposure_size1000(self, pipeline_mode: str) -> Optional[int]:
+        """Upper bound of the house size live at once during the replace (None - unknown)"""
+        if pipeline_mode == 'cancel_then_place' or not self.cancel_order_ids:
+            return self.size1000
+        if self.cancel_size1000 is None:
+            return None
+        return self.size1000 + self.cancel_size1000
+
+    def _get_effective_pipeline_mode(self) -> str:
+        if self.pipeline_mode == 'cancel_then_place' or self.max_exposure_size1000 is None:
+            return self.pipeline_mode
+        exposure_size1000 = self.get_max_exposure_size1000(self.pipeline_mode)
+        if exposure_size1000 is None or exposure_size1000 > self.max_exposure_size1000:
+            logging.getLogger(__name__).info(
+                f'Replace exposure {exposure_size1000} > {self.max_exposure_size1000}.'
+                f' pipeline_mode {self.pipeline_mode} falls back to cancel_then_place.'
+            )
+            return 'cancel_then_place'
+        return self.pipeline_mode
+
     def to_atomic_actions(self) -> list[StrategyAtomicAction]:
         # TODO: galimeoptimizuoti, kad viso kapitalo nesuavlgytume
 
@@ -74,13 +123,16 @@ class ReplaceBoolMarketOrder(StrategyComplexAction):
             order_type=self.order_type,
             parent_id=self.internal_id,
         )
+        place_action.pipeline_mode = self.effective_pipeline_mode
         if self.is_approved:
             place_action.set_approved()
         atomic_actions.append(place_action)
         if self.cancel_order_ids:
             cancel_action = CancelOrdersByIds(
                 order_ids=self.cancel_order_ids,
+                parent_id=self.internal_id,
             )
+            cancel_action.pipeline_mode = self.effective_pipeline_mode
             if self.is_approved:
                 cancel_action.set_approved()
             atomic_actions.append(cancel_action)
@@ -106,11 +158,24 @@ class ReplaceBoolMarketOrder(StrategyComplexAction):
 
         if cancel_action is not None:
             assert cancel_action.is_done
-
         assert place_action is not None
         assert place_action.parent_id and place_action.parent_id == self.internal_id
         assert place_action.is_done
+
+        # an action that failed before its request has no start (or finish) time
+        timed_actions = [
+            action
+            for action in atomic_actions
+            if action.start_time is not None and action.finish_time is not None
+        ]
+        self._latency_dict = {
+            'place': place_action.latency_sec,
+            'cancel': cancel_action.latency_sec if cancel_action is not None else None,
+            'replace': max(action.finish_time for action in timed_actions)
+            - min(action.start_time for action in timed_actions)
+            if timed_actions
+            else None,
+        }
         if place_action.created_order_ids:
             self.set_created_order_ids(place_action.created_order_ids)
         self.set_final_status(is_success=place_action.is_success, is_failed=place_action.is_failed)
-
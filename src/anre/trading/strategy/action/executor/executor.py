@@ -1,14 +1,64 @@
-from anre.connection.polymarket.api.clob import ClobClient
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from anre.connection.polymarket.api.clob import ClobClient, OrderSigner
 from anre.connection.polymarket.master_client import MasterClient
 from anre.trading.strategy.action.actions.atomic.cancel_orders_by_ids import CancelOrdersByIds
 from anre.trading.strategy.action.actions.atomic.cancel_orders_by_market import CancelOrdersByMarket
 from anre.trading.strategy.action.actions.atomic.place_direct_order import PlaceDirectOrder
 from anre.trading.strategy.action.actions.base import StrategyAtomicAction
+from anre.utils.latency.tracer import STAGE_ACK, STAGE_POST, STAGE_SIGN, get_latency_tracer
 
 
 class StrategyActionExecutor:
-    def __init__(self) -> None:
-        self._clob_client: ClobClient = MasterClient().get_clob_client()
+    """Executes atomic actions with as few requests as possible
+
+    All `CancelOrdersByIds` of a stage are merged into one bulk cancel. Places are signed up front
+    and posted in bulk, the per order responses are mapped back to the actions.
+
+    Stages (`pipeline_mode` of the replace halves decides the stage):
+        1. cancels by market
+        2. cancels (except place_then_cancel) and concurrent places - two requests in parallel
+        3. other places (after the cancels, so the freed balance can be used)
+        4. place_then_cancel cancels
+    So a requote is one round trip (concurrent) or two.
+    """
+
+    _EXECUTION_ORDER = ('CancelOrdersByMarket', 'CancelOrdersByIds', 'PlaceDirectOrder')
+    # the parallel cancel/place requests of all executors of the process share one pool, so many
+    # markets do not mean many threads (the api rate limit is shared anyway)
+    _shared_thread_pool: Optional[ThreadPoolExecutor] = None
+    _shared_thread_pool_max_workers = 8
+    _shared_thread_pool_lock = threading.Lock()
+
+    def __init__(
+        self,
+        clob_client: ClobClient | None = None,
+        order_signer: OrderSigner | None = None,
+        thread_pool: ThreadPoolExecutor | None = None,
+    ) -> None:
+        if clob_client is None:
+            clob_client = MasterClient().get_clob_client()
+        self._clob_client: ClobClient = clob_client
+        # pre-signed orders (optional), otherwise orders are signed on place
+        self._order_signer: OrderSigner | None = order_signer
+        # an injected pool is owned (and shut down) by the caller
+        self._thread_pool: ThreadPoolExecutor = (
+            thread_pool if thread_pool is not None else self._get_shared_thread_pool()
+        )
+
+    @staticmethod
+    def _get_shared_thread_pool() -> ThreadPoolExecutor:
+        # set on StrategyActionExecutor, so that subclasses share the same pool
+        with StrategyActionExecutor._shared_thread_pool_lock:
+            if StrategyActionExecutor._shared_thread_pool is None:
+                StrategyActionExecutor._shared_thread_pool = ThreadPoolExecutor(
+                    max_workers=StrategyActionExecutor._shared_thread_pool_max_workers,
+                    thread_name_prefix='StrategyActionExecutor',
+                )
+            return StrategyActionExecutor._shared_thread_pool
 
     def execute_actions(self, action_list: list[StrategyAtomicAction]):
         if not all([action.is_atomic for action in action_list]):
@@ -16,18 +66,47 @@ class StrategyActionExecutor:
             raise ValueError(f'Some actions are not atomic: {bad_actions}')
 
         action_list_dict = self._get_action_list_dict_by_class(action_list=action_list)
-        for cls_name, action_list in action_list_dict.items():
-            if cls_name == 'CancelOrdersByMarket':
-                self._execute_cancel_orders_by_market(action_list=action_list)
+        unknown_cls_names = set(action_list_dict) - set(self._EXECUTION_ORDER)
+        if unknown_cls_names:
+            raise ValueError(f'Unknown action class: {sorted(unknown_cls_names)}')
 
-            elif cls_name == 'CancelOrdersByIds':
-                self._execute_cancel_orders_by_ids(action_list=action_list)
+        cancel_by_market_action_list = action_list_dict.get('CancelOrdersByMarket', [])
+        cancel_action_list = action_list_dict.get('CancelOrdersByIds', [])
+        place_action_list = action_list_dict.get('PlaceDirectOrder', [])
+        late_cancel_action_list = [
+            action for action in cancel_action_list if action.pipeline_mode == 'place_then_cancel'
+        ]
+        early_cancel_action_list = [
+            action for action in cancel_action_list if action.pipeline_mode != 'place_then_cancel'
+        ]
+        early_place_action_list = [
+            action for action in place_action_list if action.pipeline_mode == 'concurrent'
+        ]
+        late_place_action_list = [
+            action for action in place_action_list if action.pipeline_mode != 'concurrent'
+        ]
 
-            elif cls_name == 'PlaceDirectOrder':
-                self._execute_place_direct_order(action_list=action_list)
-
-            else:
-                raise ValueError(f'Unknown action class: {cls_name}')
+        if cancel_by_market_action_list:
+            self._execute_cancel_orders_by_market(action_list=cancel_by_market_action_list)
+        if early_cancel_action_list and early_place_action_list:
+            future_list = [
+                self._thread_pool.submit(
+                    self._execute_cancel_orders_by_ids, action_list=early_cancel_action_list
+                ),
+                self._thread_pool.submit(
+                    self._execute_place_direct_order, action_list=early_place_action_list
+                ),
+            ]
+            for future in future_list:
+                future.result()
+        elif early_cancel_action_list:
+            self._execute_cancel_orders_by_ids(action_list=early_cancel_action_list)
+        elif early_place_action_list:
+            self._execute_place_direct_order(action_list=early_place_action_list)
+        if late_place_action_list:
+            self._execute_place_direct_order(action_list=late_place_action_list)
+        if late_cancel_action_list:
+            self._execute_cancel_orders_by_ids(action_list=late_cancel_action_list)
 
     @staticmethod
     def _get_action_list_dict_by_class(
@@ -57,41 +136,68 @@ class StrategyActionExecutor:
             action.set_final_status(is_success=True, is_failed=False)
 
     def _execute_cancel_orders_by_ids(self, action_list: list[StrategyAtomicAction]):
+        order_ids = []
         for action in action_list:
             assert isinstance(action, CancelOrdersByIds)
             action.set_started()
-            resp = self._clob_client.cancel_orders_by_ids(
-                order_ids=action.order_ids,
-            )
-            """
-            {'not_canceled': {},
-            'canceled': ['0x972057f509c7b98cd3ea21e399b239cf937371892541f8bc5e2f88620613b69a']}
-            {'not_canceled': {'0x972057f509c7b98cd3ea21e399b239cf937371892541f8bc5e2f88620613b69a': 'order already canceled'},
-            'canceled': []}
-            """
-            # nelabai aisku kaip traktuoti cancel faile, bet tik del to, kad jau nebera co cancalinti. Arba jei dalis orderiu cancelino. KOlkas zymim, kad iskas OK
-            action.set_final_status(is_success=True, is_failed=False)
+            order_ids.extend(action.order_ids)
+        # one bulk call for all actions (the same id can be in several actions)
+        resp = self._clob_client.cancel_orders_by_ids(
+            order_ids=list(dict.fromkeys(order_ids)),
+        )
+        """
+        {'not_canceled': {},
+        'canceled': ['0x972057f509c7b98cd3ea21e399b239cf937371892541f8bc5e2f88620613b69a']}
+        {'not_canceled': {'0x972057f509c7b98cd3ea21e399b239cf937371892541f8bc5e2f88620613b69a': 'order already canceled'},
+        'canceled': []}
+        """
+        # an action fails if any of its orders is not canceled (also "order already canceled")
+        not_canceled_dict = resp.get('not_canceled') or {}
+        for action in action_list:
+            is_failed = any(order_id in not_canceled_dict for order_id in action.order_ids)
+            action.set_final_status(is_success=not is_failed, is_failed=is_failed)
 
     def _execute_place_direct_order(self, action_list: list[StrategyAtomicAction]):
+        latency_tracer = get_latency_tracer()
+        signed_order_list = []
         for action in action_list:
             assert isinstance(action, PlaceDirectOrder)
             action.set_started()
-            resp = self._clob_client.place_order(
-                token_id=action.token_id,
-                price=action.price1000 / 1000,
-                size=action.size1000 / 1000,
-                side=action.trade_side,
-                order_type=action.order_type,
+            sign_start_time_ns = time.perf_counter_ns()
+            if self._order_signer is not None:
+                signed_order = self._order_signer.get_signed_order(
+                    token_id=action.token_id,
+                    price1000=action.price1000,
+                    size1000=action.size1000,
+                    side=action.trade_side,
+                )
+            else:
+                signed_order = self._clob_client.create_signed_order(
+                    token_id=action.token_id,
+                    price=action.price1000 / 1000,
+                    size=action.size1000 / 1000,
+                    side=action.trade_side,
+                )
+            latency_tracer.record_ns(STAGE_SIGN, time.perf_counter_ns() - sign_start_time_ns)
+            signed_order_list.append(signed_order)
+        with latency_tracer.trace(STAGE_POST):
+            resp_list = self._clob_client.post_orders(
+                signed_order_list=signed_order_list,
+                order_type_list=[action.order_type for action in action_list],
             )
-            """
-            {'errorMsg': '',
-             'orderID': '0x3eb90476a22ec4a835565fae8fee6132674d5d27e0ad8b233241e21119c45b36',
-             'takingAmount': '',
-             'makingAmount': '',
-             'status': 'live',
-             'success': True}
-            """
+        ack_perf_time, ack_time = time.perf_counter(), time.time()
+        """
+        [{'errorMsg': '',
+         'orderID': '0x3eb90476a22ec4a835565fae8fee6132674d5d27e0ad8b233241e21119c45b36',
+         'takingAmount': '',
+         'makingAmount': '',
+         'status': 'live',
+         'success': True}]
+        """
+        for action, resp in zip(action_list, resp_list, strict=True):
             if resp['success']:
+                latency_tracer.record(STAGE_ACK, ack_perf_time - action.start_time)
+                latency_tracer.mark_order_acked(order_id=resp['orderID'], ack_time=ack_time)
                 action.set_created_order_ids(order_ids=[resp['orderID']])
                 action.set_final_status(is_success=True, is_failed=False)
             else:
@@ -0,0 +1,118 @@
+import threading
+import unittest
+
+from anre.trading.strategy.action.actions.atomic.cancel_orders_by_ids import CancelOrdersByIds
+from anre.trading.strategy.action.actions.atomic.place_direct_order import PlaceDirectOrder
+from anre.trading.strategy.action.executor.worker import ActionWorker
+
+
+class TestActionWorker(unittest.TestCase):
+    def test_cancel_is_not_blocked_by_slow_place(self):
+        release_event = threading.Event()
+        done_list = []
+
+        def execute_fun(action_list):
+            for action in action_list:
+                action.set_approved()
+                action.set_started()
+            if isinstance(action_list[0], PlaceDirectOrder):
+                release_event.wait(timeout=5)
+            for action in action_list:
+                action.set_final_status(is_success=True, is_failed=False)
+
+        def callback(action_list, error):
+            assert error is None
+            done_list.append(action_list[0].__class__.__name__)
+
+        worker = ActionWorker(execute_fun=execute_fun, max_workers=2, max_queue_size=2)
+        try:
+            place = PlaceDirectOrder(
+                token_id='AAA', price1000=400, size1000=10000, trade_side='BUY'
+            )
+            cancel = CancelOrdersByIds(order_ids=['o1'])
+            assert worker.submit([place], callback=callback)
+            assert worker.submit([cancel], callback=callback)
+
+            assert not worker.join(timeout=0.2)
+            assert done_list == ['CancelOrdersByIds']
+            assert worker.is_busy()
+            assert worker.get_in_flight_action_list() == [place]
+
+            release_event.set()
+            assert worker.join(timeout=5)
+            assert done_list == ['CancelOrdersByIds', 'PlaceDirectOrder']
+            assert not worker.is_busy()
+
+            latency_report_dict = worker.get_latency_report_dict()
+            assert set(latency_report_dict) == {'PlaceDirectOrder', 'CancelOrdersByIds'}
+            assert latency_report_dict['PlaceDirectOrder']['count'] == 1
+            assert latency_report_dict['PlaceDirectOrder']['maxTime'] >= 0.2
+        finally:
+            release_event.set()
+            worker.stop()
+
+    def test_full_queue_rejects_batch(self):
+        started_event = threading.Event()
+        release_event = threading.Event()
+
+        def execute_fun(action_list):
+            started_event.set()
+            release_event.wait(timeout=5)
+
+        worker = ActionWorker(execute_fun=execute_fun, max_workers=1, max_queue_size=1)
+        try:
+            assert worker.submit([CancelOrdersByIds(order_ids=['o1'])])
+            assert started_event.wait(timeout=5)
+            assert worker.submit([CancelOrdersByIds(order_ids=['o2'])])
+            assert not worker.submit([CancelOrdersByIds(order_ids=['o3'])])
+            assert len(worker.get_in_flight_action_list()) == 2
+        finally:
+            release_event.set()
+            worker.stop()
+
+    def test_error_is_passed_to_callback(self):
+        error_list = []
+
+        def execute_fun(action_list):
+            raise RuntimeError('boom')
+
+        worker = ActionWorker(execute_fun=execute_fun, max_workers=1)
+        try:
+            worker.submit(
+                [CancelOrdersByIds(order_ids=['o1'])],
+                callback=lambda action_list, error: error_list.append(error),
+            )
+            assert worker.join(timeout=5)
+            assert len(error_list) == 1 and isinstance(error_list[0], RuntimeError)
+        finally:
+            worker.stop()
+
+    def test_shared_by_owners(self):
+        release_event = threading.Event()
+
+        def slow_execute_fun(action_list):
+            release_event.wait(timeout=5)
+
+        def fast_execute_fun(action_list):
+            pass
+
+        worker = ActionWorker(max_workers=2)
+        try:
+            slow_owner, fast_owner = object(), object()
+            slow_cancel = CancelOrdersByIds(order_ids=['o1'])
+            assert worker.submit([slow_cancel], execute_fun=slow_execute_fun, owner=slow_owner)
+            assert worker.submit(
+                [CancelOrdersByIds(order_ids=['o2'])],
+                execute_fun=fast_execute_fun,
+                owner=fast_owner,
+            )
+            # the owner waits only for its own batches
+            assert worker.join(timeout=5, owner=fast_owner)
+            assert not worker.is_busy(owner=fast_owner)
+            assert worker.is_busy(owner=slow_owner)
+            assert worker.get_in_flight_action_list(owner=slow_owner) == [slow_cancel]
+            assert worker.get_in_flight_action_list(owner=fast_owner) == []
+            assert worker.is_busy()
+        finally:
+            release_event.set()
+            worker.stop()
@@ -0,0 +1,189 @@
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from anre.trading.strategy.action.actions.atomic.cancel_orders_by_ids import CancelOrdersByIds
+from anre.trading.strategy.action.actions.atomic.place_direct_order import PlaceDirectOrder
+from anre.trading.strategy.action.actions.complex.replace_bool_market_order import (
+    ReplaceBoolMarketOrder,
+)
+from anre.trading.strategy.action.executor.executor import StrategyActionExecutor
+
+
+class _ClobClient:
+    def __init__(self, not_canceled_dict=None):
+        self.call_list = []
+        self.thread_name_set = set()
+        self.not_canceled_dict = {} if not_canceled_dict is None else not_canceled_dict
+
+    def cancel_orders_by_ids(self, order_ids):
+        self.call_list.append(('cancel_orders_by_ids', order_ids))
+        self.thread_name_set.add(threading.current_thread().name)
+        return {
+            'not_canceled': {
+                order_id: msg
+                for order_id, msg in self.not_canceled_dict.items()
+                if order_id in order_ids
+            },
+            'canceled': [
+                order_id for order_id in order_ids if order_id not in self.not_canceled_dict
+            ],
+        }
+
+    def create_signed_order(self, token_id, price, size, side):
+        return (token_id, price, size, side)
+
+    def post_orders(self, signed_order_list, order_type_list):
+        self.call_list.append(('post_orders', signed_order_list))
+        self.thread_name_set.add(threading.current_thread().name)
+        return [
+            {'success': signed_order[1] < 0.9, 'orderID': f'id{nr}', 'errorMsg': ''}
+            for nr, signed_order in enumerate(signed_order_list)
+        ]
+
+
+class TestStrategyActionExecutor(unittest.TestCase):
+    def test_requote_is_two_bulk_calls(self):
+        clob_client = _ClobClient()
+        executor = StrategyActionExecutor(clob_client=clob_client)
+
+        place_action_list = [
+            PlaceDirectOrder(token_id='AAA', price1000=400, size1000=10000, trade_side='BUY'),
+            PlaceDirectOrder(token_id='AAA', price1000=950, size1000=10000, trade_side='SELL'),
+            PlaceDirectOrder(token_id='BBB', price1000=500, size1000=10000, trade_side='BUY'),
+        ]
+        cancel_action_list = [
+            CancelOrdersByIds(order_ids=['o1', 'o2']),
+            CancelOrdersByIds(order_ids=['o2', 'o3']),
+        ]
+        action_list = place_action_list + cancel_action_list
+        for action in action_list:
+            action.set_approved()
+
+        executor.execute_actions(action_list=action_list)
+
+        assert clob_client.call_list == [
+            ('cancel_orders_by_ids', ['o1', 'o2', 'o3']),
+            (
+                'post_orders',
+                [('AAA', 0.4, 10.0, 'BUY'), ('AAA', 0.95, 10.0, 'SELL'), ('BBB', 0.5, 10.0, 'BUY')],
+            ),
+        ]
+        assert all(action.is_success for action in cancel_action_list)
+        assert [action.is_success for action in place_action_list] == [True, False, True]
+        assert [action.created_order_ids for action in place_action_list] == [['id0'], [], ['id2']]
+
+    def test_not_canceled_is_failed(self):
+        clob_client = _ClobClient(not_canceled_dict={'o2': 'order already canceled'})
+        executor = StrategyActionExecutor(clob_client=clob_client)
+
+        cancel_action_list = [
+            CancelOrdersByIds(order_ids=['o1']),
+            CancelOrdersByIds(order_ids=['o2', 'o3']),
+            CancelOrdersByIds(order_ids=['o3']),
+        ]
+        for action in cancel_action_list:
+            action.set_approved()
+
+        executor.execute_actions(action_list=cancel_action_list)
+
+        assert clob_client.call_list == [('cancel_orders_by_ids', ['o1', 'o2', 'o3'])]
+        assert [action.is_success for action in cancel_action_list] == [True, False, True]
+        assert [action.is_failed for action in cancel_action_list] == [False, True, False]
+
+    def _execute_replace(self, **kwargs) -> tuple[_ClobClient, ReplaceBoolMarketOrder]:
+        clob_client = _ClobClient()
+        executor = StrategyActionExecutor(clob_client=clob_client)
+        action = ReplaceBoolMarketOrder(
+            main_asset_id='AAA',
+            counter_asset_id='BBB',
+            main_price1000=400,
+            size1000=10000,
+            bool_side='LONG',
+            cancel_order_ids=['o1'],
+            **kwargs,
+        )
+        action.set_approved()
+        executor.execute_actions(action_list=action.to_atomic_actions())
+        action.set_state_from_atomic_actions()
+        assert action.is_success
+        assert set(action.latency_dict) == {'place', 'cancel', 'replace'}
+        assert all(latency >= 0 for latency in action.latency_dict.values())
+        return clob_client, action
+
+    def test_replace_pipeline_modes(self):
+        clob_client, action = self._execute_replace(pipeline_mode='cancel_then_place')
+        assert [el[0] for el in clob_client.call_list] == ['cancel_orders_by_ids', 'post_orders']
+
+        clob_client, action = self._execute_replace(pipeline_mode='place_then_cancel')
+        assert [el[0] for el in clob_client.call_list] == ['post_orders', 'cancel_orders_by_ids']
+
+        clob_client, action = self._execute_replace(pipeline_mode='concurrent')
+        assert {el[0] for el in clob_client.call_list} == {'post_orders', 'cancel_orders_by_ids'}
+        assert all(el.startswith('StrategyActionExecutor') for el in clob_client.thread_name_set)
+
+    def test_replace_exposure_check(self):
+        clob_client, action = self._execute_replace(
+            pipeline_mode='concurrent', cancel_size1000=10000, max_exposure_size1000=20000
+        )
+        assert action.effective_pipeline_mode == 'concurrent'
+
+        # both orders could be live at once, it is more than allowed
+        clob_client, action = self._execute_replace(
+            pipeline_mode='place_then_cancel', cancel_size1000=10001, max_exposure_size1000=20000
+        )
+        assert action.effective_pipeline_mode == 'cancel_then_place'
+        assert [el[0] for el in clob_client.call_list] == ['cancel_orders_by_ids', 'post_orders']
+
+        # unknown size of the canceled orders
+        clob_client, action = self._execute_replace(
+            pipeline_mode='concurrent', max_exposure_size1000=20000
+        )
+        assert action.effective_pipeline_mode == 'cancel_then_place'
+
+    def test_thread_pool_is_shared(self):
+        executor = StrategyActionExecutor(clob_client=_ClobClient())
+        other_executor = StrategyActionExecutor(clob_client=_ClobClient())
+        assert executor._thread_pool is other_executor._thread_pool
+
+        thread_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix='Injected')
+        self.addCleanup(thread_pool.shutdown)
+        clob_client = _ClobClient()
+        executor = StrategyActionExecutor(clob_client=clob_client, thread_pool=thread_pool)
+        action = ReplaceBoolMarketOrder(
+            main_asset_id='AAA',
+            counter_asset_id='BBB',
+            main_price1000=400,
+            size1000=10000,
+            bool_side='LONG',
+            cancel_order_ids=['o1'],
+            pipeline_mode='concurrent',
+        )
+        action.set_approved()
+        executor.execute_actions(action_list=action.to_atomic_actions())
+        assert all(el.startswith('Injected') for el in clob_client.thread_name_set)
+
+    def test_replace_state_of_unfinished_place(self):
+        action = ReplaceBoolMarketOrder(
+            main_asset_id='AAA',
+            counter_asset_id='BBB',
+            main_price1000=400,
+            size1000=10000,
+            bool_side='LONG',
+            cancel_order_ids=['o1'],
+            pipeline_mode='cancel_then_place',
+        )
+        action.set_approved()
+        cancel_action, place_action = sorted(
+            action.to_atomic_actions(), key=lambda el: isinstance(el, PlaceDirectOrder)
+        )
+        cancel_action.set_started()
+        cancel_action.set_final_status(is_success=True, is_failed=False)
+        # the place has no times yet, the state check fails before any latency is computed
+        with self.assertRaises(AssertionError):
+            action.set_state_from_atomic_actions()
+
+        place_action.set_started()
+        place_action.set_final_status(is_success=True, is_failed=False)
+        action.set_state_from_atomic_actions()
+        assert action.latency_dict['replace'] >= action.latency_dict['place']
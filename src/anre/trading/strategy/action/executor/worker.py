@@ -0,0 +1,171 @@
+import logging
+import queue
+import threading
+from typing import Callable, Optional
+
+from anre.trading.strategy.action.actions.base import StrategyAction
+from anre.utils.functionsRunLog import FunctionsRunLog
+
+ExecuteFun = Callable[[list[StrategyAction]], Optional[list[StrategyAction]]]
+CallbackFun = Callable[[list[StrategyAction], Optional[Exception]], None]
+
+
+class ActionWorker:
+    """Long lived threads that execute action batches from a bounded queue
+
+    `execute_fun` executes a batch, it can return extra actions (e.g. atomic ones) whose latency is
+    tracked too. After a batch the `callback` is called with the batch and the error (or None).
+    With several workers a cancel batch is not stuck behind a slow place batch.
+
+    One worker can be shared by many submitters (e.g. strategy boxes of `MultiExecution`): a batch
+    is submitted with its own `execute_fun` and `owner`, and the busy state can be asked per owner.
+    """
+
+    def __init__(
+        self,
+        execute_fun: Optional[ExecuteFun] = None,
+        max_workers: int = 2,
+        max_queue_size: int = 4,
+        name: str = 'ActionWorker',
+    ):
+        assert max_workers > 0
+        assert max_queue_size > 0
+        self._execute_fun = execute_fun
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue_size)
+        self._lock = threading.Lock()
+        # notified when an in flight batch is finished (joins wait per owner)
+        self._idle_condition = threading.Condition(self._lock)
+        self._stop_event = threading.Event()
+        # batch_nr -> (owner, action_list)
+        self._in_flight_batch_dict: dict[int, tuple[object, list[StrategyAction]]] = {}
+        self._batch_nr = 0
+        self._latency_log = FunctionsRunLog()
+        self._logger = logging.getLogger(__name__)
+        self._thread_list = [
+            threading.Thread(name=f'{name}_{nr}', target=self._run, daemon=True)
+            for nr in range(max_workers)
+        ]
+        for thread in self._thread_list:
+            thread.start()
+
+    def submit(
+        self,
+        action_list: list[StrategyAction],
+        callback: Optional[CallbackFun] = None,
+        execute_fun: Optional[ExecuteFun] = None,
+        owner: object = None,
+    ) -> bool:
+        """Queue the batch. Returns False if the queue is full (the batch is not queued)
+
+        `execute_fun` overrides the default of the worker for this batch.
+        """
+        assert not self._stop_event.is_set(), 'ActionWorker is stopped'
+        execute_fun = self._execute_fun if execute_fun is None else execute_fun
+        assert execute_fun is not None, 'execute_fun is not set'
+        with self._lock:
+            self._batch_nr += 1
+            batch_nr = self._batch_nr
+            self._in_flight_batch_dict[batch_nr] = (owner, action_list)
+        try:
+            self._queue.put_nowait((batch_nr, action_list, callback, execute_fun))
+        except queue.Full:
+            with self._lock:
+                self._in_flight_batch_dict.pop(batch_nr)
+                self._idle_condition.notify_all()
+            return False
+        return True
+
+    def is_busy(self, owner: object = None) -> bool:
+        """There are queued or executing batches (of the `owner`, if given)"""
+        with self._lock:
+            return any(
+                owner is None or batch_owner is owner
+                for batch_owner, _ in self._in_flight_batch_dict.values()
+            )
+
+    def get_in_flight_action_list(self, owner: object = None) -> list[StrategyAction]:
+        with self._lock:
+            return [
+                action
+                for batch_owner, action_list in self._in_flight_batch_dict.values()
+                if owner is None or batch_owner is owner
+                for action in action_list
+            ]
+
+    def get_latency_report_dict(self) -> dict[str, dict]:
+        """Latency (seconds) by action class, `FunctionsRunLog` report"""
+        return self._latency_log.get_reportDict()
+
+    def join(self, timeout: Optional[float] = None, owner: object = None) -> bool:
+        """Wait until all queued batches (of the `owner`, if given) are executed
+
+        Returns False on timeout.
+        """
+        with self._idle_condition:
+            return self._idle_condition.wait_for(
+                lambda: (
+                    not any(
+                        owner is None or batch_owner is owner
+                        for batch_owner, _ in self._in_flight_batch_dict.values()
+                    )
+                ),
+                timeout=timeout,
+            )
+
+    def stop(self):
+        self._stop_event.set()
+        # idle threads are woken up, they do not wait for the queue timeout
+        for _ in self._thread_list:
+            try:
+                self._queue.put_nowait(None)
+            except queue.Full:
+                break
+        for thread in self._thread_list:
+            thread.join()
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            try:
+                item = self._queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            if item is None:
+                # stop wake up
+                self._queue.task_done()
+                continue
+            batch_nr, action_list, callback, execute_fun = item
+            try:
+                self._execute_batch(batch_nr, action_list, callback, execute_fun)
+            finally:
+                self._queue.task_done()
+
+    def _execute_batch(
+        self,
+        batch_nr: int,
+        action_list: list[StrategyAction],
+        callback: Optional[CallbackFun],
+        execute_fun: ExecuteFun,
+    ):
+        error = None
+        extra_action_list = None
+        try:
+            extra_action_list = execute_fun(action_list)
+        except Exception as e:
+            error = e
+            self._logger.exception(f'Action batch execution failed: {e}')
+        finally:
+            with self._lock:
+                self._in_flight_batch_dict.pop(batch_nr)
+                self._idle_condition.notify_all()
+            for action in action_list + (extra_action_list or []):
+                self._update_latency(action)
+        if callback is not None:
+            try:
+                callback(action_list, error)
+            except Exception as e:
+                self._logger.exception(f'Action batch callback failed: {e}')
+
+    def _update_latency(self, action: StrategyAction):
+        latency_sec = action.latency_sec
+        if latency_sec is not None:
+            self._latency_log.record(action.__class__.__name__, int(latency_sec * 1e9))
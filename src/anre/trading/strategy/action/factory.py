@@ -21,6 +21,9 @@ class Factory:
         bool_side: Literal["LONG", "SHORT"],
         order_type: str = "GTC",
         cancel_order_ids: list | tuple | None = None,
+        pipeline_mode: str = 'cancel_then_place',
+        cancel_size1000: int | None = None,
+        max_exposure_size1000: int | None = None,
     ) -> ReplaceBoolMarketOrder:
         return ReplaceBoolMarketOrder(
             main_asset_id=main_asset_id,
@@ -30,6 +33,9 @@ class Factory:
             bool_side=bool_side,
             order_type=order_type,
             cancel_order_ids=cancel_order_ids,
+            pipeline_mode=pipeline_mode,
+            cancel_size1000=cancel_size1000,
+            max_exposure_size1000=max_exposure_size1000,
         )
 
     @classmethod
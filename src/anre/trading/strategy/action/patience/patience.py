@@ -1,3 +1,4 @@
+import time
 from threading import Lock
 from typing import List, Tuple
 
@@ -7,6 +8,7 @@ from anre.trading.strategy.action.actions.base import StrategyAction
 from anre.trading.strategy.action.actions.complex.place_bool_market_order import (
     PlaceBoolMarketOrder,
 )
+from anre.utils.latency.tracer import STAGE_APPROVAL, get_latency_tracer
 
 
 class Patience:
@@ -15,6 +17,8 @@ class Patience:
     def __init__(self):
         self._passActionList: List[StrategyAction] = []
         self._waitDict = {}
+        # key -> time of the first wish (for the approval latency)
+        self._firstWishTimeDict = {}
         self._iterationNr = 0
         self._iterationIsStarted: bool = False
         self._lock: Lock = Lock()
@@ -24,6 +28,7 @@ class Patience:
             self._iterationIsStarted = False
             self._passActionList: List[StrategyAction] = []
             self._waitDict = {}
+            self._firstWishTimeDict = {}
 
     def start_iteration(self):
         assert not self._iterationIsStarted
@@ -43,6 +48,11 @@ class Patience:
                 for key, values in self._waitDict.items()
                 if values[0] == self._iterationNr
             }
+            self._firstWishTimeDict = {
+                key: value
+                for key, value in self._firstWishTimeDict.items()
+                if key in self._waitDict
+            }
 
             self._iterationIsStarted = False
 
@@ -104,24 +114,29 @@ class Patience:
             oldIterationNr, oldAction, oldIterationCount = self._waitDict.pop(key)
             if (iterationRequre == 0) and (not pauseRelease):
                 # pass action without comparing
-                action.set_approved()
-                self._passActionList.append(action)
+                self._approve(key=key, action=action)
             else:
                 iterationCount = oldIterationCount + 1
                 if (iterationRequre <= iterationCount) and (not pauseRelease):
                     # it waited enouth
-                    action.set_approved()
-                    self._passActionList.append(action)
+                    self._approve(key=key, action=action)
                 else:
                     # keep waiting
                     self._put_intoWaiting(key=key, action=action, iterationCount=iterationCount)
 
         elif (iterationRequre == 0) and (not pauseRelease):
-            action.set_approved()
-            self._passActionList.append(action)
+            self._approve(key=key, action=action)
 
         else:
             self._put_intoWaiting(key=key, action=action, iterationCount=0)
 
+    def _approve(self, key: Tuple, action: StrategyAction):
+        action.set_approved()
+        self._passActionList.append(action)
+        first_wish_time = self._firstWishTimeDict.pop(key, None)
+        wait_time = time.perf_counter() - first_wish_time if first_wish_time is not None else 0.0
+        get_latency_tracer().record(STAGE_APPROVAL, wait_time)
+
     def _put_intoWaiting(self, key, action, iterationCount):
         self._waitDict[key] = (self._iterationNr, action, iterationCount)
+        self._firstWishTimeDict.setdefault(key, time.perf_counter())
@@ -10,16 +10,21 @@ I sita sluoksnis turi sueiti viskas, kad nepriklausotume nuo strategijos geros v
 import logging
 import traceback
 from collections import defaultdict
-from threading import Lock, Thread
+from threading import Lock
 from typing import Any, Dict, List, Optional, Tuple
 
+from anre.connection.polymarket.api.clob import OrderSigner
 from anre.trading.monitor.base import BaseMonitor
+from anre.trading.strategy.action.actions.atomic.cancel_orders_by_ids import CancelOrdersByIds
+from anre.trading.strategy.action.actions.atomic.cancel_orders_by_market import CancelOrdersByMarket
 from anre.trading.strategy.action.actions.base import StrategyAction
 from anre.trading.strategy.action.executor.executor import StrategyActionExecutor
+from anre.trading.strategy.action.executor.worker import ActionWorker
 from anre.trading.strategy.brain.brains.base.brainBase import StrategyBrain
 from anre.trading.strategy.premissionLock.permissionLock import PermissionLock
 from anre.utils.communication.messanger.messenger import Messenger
 from anre.utils.functionsRunLog import FunctionsRunLog
+from anre.utils.latency.tracer import STAGE_BRAIN_DECISION, get_latency_tracer
 from anre.utils.time.timer.iTimer import ITimer
 from anre.utils.time.timer.timerReal import TimerReal
 
@@ -33,17 +38,25 @@ class StrategyBox:
         monitor: BaseMonitor,
         quiet: bool = False,
         raise_if_error: bool = True,
+        order_signer: Optional[OrderSigner] = None,
+        cancel_while_executing: bool = False,
+        timer: Optional[ITimer] = None,
+        action_executor: Optional[StrategyActionExecutor] = None,
+        action_worker: Optional[ActionWorker] = None,
     ):
         assert isinstance(strategy_brain, StrategyBrain)
         assert isinstance(monitor, BaseMonitor)
         assert raise_if_error is None or isinstance(raise_if_error, bool)
+        assert order_signer is None or action_executor is None, (
+            'order_signer is used only by the default action executor'
+        )
 
         assert not strategy_brain.is_setting_object_finished
         strategy_brain.set_objects(monitor=monitor)
         assert strategy_brain.is_setting_object_finished
 
         self._strategy_brain: StrategyBrain = strategy_brain
-        self._timer: ITimer = TimerReal()
+        self._timer: ITimer = TimerReal() if timer is None else timer
         self._monitor: BaseMonitor = monitor
         self._aliveActionList: List[StrategyAction] = []
         self._updateLock = Lock()
@@ -54,9 +67,19 @@ class StrategyBox:
         self.functionsRunLog = FunctionsRunLog()
         self.permissionLock = PermissionLock(allowedValues={0, 20, 30, 40})
         self._latestBookChangeTimeSec_fromBetOrders: float = 0.0
-        self._action_executor = StrategyActionExecutor()
+        if action_executor is None:
+            action_executor = StrategyActionExecutor(order_signer=order_signer)
+        self._action_executor = action_executor
+        # False: the brain is frozen while actions are executing. True: the brain is not frozen,
+        # but while places are executing only cancels go through (new places are aborted, the
+        # brain wishes them again)
+        self._cancel_while_executing: bool = cancel_while_executing
+        # a shared worker (e.g. of `MultiExecution`) is not stopped by the box
+        self._is_own_action_worker: bool = action_worker is None
+        if action_worker is None:
+            action_worker = ActionWorker(name='StrategyBox.ActionWorker')
+        self._action_worker: ActionWorker = action_worker
 
-        self._job_execute_actionList: Optional[Thread] = None
         self._cacheDict: Dict[str, Tuple[float, Any]] = defaultdict(lambda: (0.0, None))
 
     def __del__(self):
@@ -89,7 +112,8 @@ class StrategyBox:
                         # it is OK, just the first iteration
                         pass
 
-                self._iteration_internalCore()
+                with self.functionsRunLog.track('iteration'):
+                    self._iteration_internalCore()
                 self._lastIterationFinishTime = self._timer.nowS()
 
                 takesTime = self._lastIterationFinishTime - self._lastIterationStartTime
@@ -104,7 +128,8 @@ class StrategyBox:
             self._messenger.error(msg)
 
     def _iteration_internalCore(self):
-        action_freeze = self.get_is_still_executing()
+        is_place_executing = self.get_is_place_executing()
+        action_freeze = self.get_is_still_executing() if not self._cancel_while_executing else False
 
         # qa
         self.functionsRunLog.runFunction(self._qa_all, '_qa_all')
@@ -112,11 +137,12 @@ class StrategyBox:
         # get action list
         action_list = []
         try:
-            action_list = self.functionsRunLog.runFunction(
-                self._strategy_brain.update_state_and_get_action_list,
-                '_strategy_brain.update_state_and_get_action_list',
-                action_freeze=action_freeze,
-            )
+            with get_latency_tracer().trace(STAGE_BRAIN_DECISION):
+                action_list = self.functionsRunLog.runFunction(
+                    self._strategy_brain.update_state_and_get_action_list,
+                    '_strategy_brain.update_state_and_get_action_list',
+                    action_freeze=action_freeze,
+                )
 
         except BaseException as e:
             msg = f'An error happened in strategy request. See below what happened and what was done next. Error: {e.__class__.__name__}({e}); traceback: {traceback.format_exc()}'
@@ -146,6 +172,15 @@ class StrategyBox:
             msg = f'StrategyBox._iteration_internalCore: action_freeze is True, but action_list is not empty.: {action_list}'
             self._messenger.warning(msg)
 
+        if self._cancel_while_executing and is_place_executing and action_list:
+            # the outcome of the executing places is not known yet, the brain will repeat the rest
+            held_action_list = [
+                action for action in action_list if not self._is_cancel_action(action)
+            ]
+            if held_action_list:
+                self._abort_actions(held_action_list)
+                action_list = [action for action in action_list if self._is_cancel_action(action)]
+
         self.functionsRunLog.runFunction(
             self._execute_action_list, '_execute_actionList', action_list=action_list
         )
@@ -157,35 +192,64 @@ class StrategyBox:
         pass
 
     def _execute_action_list(self, action_list: [StrategyAction]):
-        self._job_execute_actionList = self._create_thread(
-            target=self._execute_actionList_core,
-            action_list=action_list,
+        if not action_list:
+            return
+        is_submitted = self._action_worker.submit(
+            action_list=action_list, execute_fun=self._execute_actionList_core, owner=self
         )
-        self._job_execute_actionList.start()
+        if not is_submitted:
+            msg = f'StrategyBox action queue is full. Actions are skipped: {action_list}'
+            self._messenger.warning(msg)
+            self._abort_actions(action_list)
+
+    @staticmethod
+    def _abort_actions(action_list: list[StrategyAction]):
+        """Actions that are not executed, so that nobody waits for their result"""
+        for action in action_list:
+            if not action.is_aborted:
+                action.set_aborted()
 
     def get_is_still_executing(self) -> bool:
         """Ar place funkcija visdar sukasi"""
-        isAlive = (
-            self._job_execute_actionList is not None and self._job_execute_actionList.is_alive()
-        )
-        return isAlive
-
-    @classmethod
-    def _create_thread(cls, target, **kwargs):
-        thread = Thread(
-            name=target.__name__,
-            target=target,
-            kwargs=kwargs,
+        return self._action_worker.is_busy(owner=self)
+
+    def join_actions(self, timeout: Optional[float] = None) -> bool:
+        """Wait until the submitted actions are executed. Returns False on timeout"""
+        return self._action_worker.join(timeout=timeout, owner=self)
+
+    def stop_actions(self):
+        """Stop the own action worker threads, actions can not be executed after it
+
+        A shared worker is stopped by its owner, the box only waits for its actions.
+        """
+        if self._is_own_action_worker:
+            self._action_worker.stop()
+        else:
+            self._action_worker.join(owner=self)
+
+    def get_is_place_executing(self) -> bool:
+        return any(
+            not self._is_cancel_action(action)
+            for action in self._action_worker.get_in_flight_action_list(owner=self)
         )
-        return thread
 
-    def _execute_actionList_core(self, action_list: list[StrategyAction]):
+    def get_action_latency_report_dict(self) -> dict[str, dict]:
+        return self._action_worker.get_latency_report_dict()
+
+    @staticmethod
+    def _is_cancel_action(action: StrategyAction) -> bool:
+        return isinstance(action, (CancelOrdersByIds, CancelOrdersByMarket))
+
+    def _execute_actionList_core(self, action_list: list[StrategyAction]) -> list[StrategyAction]:
         # print(f"Call strategyBox._execute_actionList_core: {action_list}")
 
         atomic_action_list = [act for action in action_list for act in action.to_atomic_actions()]
         self._action_executor.execute_actions(action_list=atomic_action_list)
         for action in action_list:
             action.set_state_from_atomic_actions()
+        # complex actions are reported by the worker, atomic are returned for the latency report
+        action_id_set = {id(action) for action in action_list}
+        return [action for action in atomic_action_list if id(action) not in action_id_set]
 
         # permissionLockInt = self.permissionLock.get_currentValueInt()
         #
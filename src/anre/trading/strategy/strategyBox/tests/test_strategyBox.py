@@ -1,6 +1,129 @@
+import threading
 import unittest
 
+from anre.trading.monitor.base import BaseMonitor
+from anre.trading.strategy.action.actions.atomic.cancel_orders_by_ids import CancelOrdersByIds
+from anre.trading.strategy.action.actions.atomic.place_direct_order import PlaceDirectOrder
+from anre.trading.strategy.action.executor.worker import ActionWorker
+from anre.trading.strategy.brain.brains.fixed_market_maker.fixed_market_maker import (
+    FixedMarketMaker,
+)
+from anre.trading.strategy.strategyBox.strategyBox import StrategyBox
 
-class TestStrategyBox(unittest.TestCase):
-    def test_smoke(self):
+
+class _Monitor(BaseMonitor):
+    def iteration(self, gtt=2):
+        pass
+
+    def assert_up_to_date(self, gtt=None):
         pass
+
+
+class _Brain(FixedMarketMaker):
+    """Returns the queued action lists, records the freeze flags"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.action_list_list = []
+        self.action_freeze_list = []
+
+    def update_state_and_get_action_list(self, action_freeze: bool):
+        self.action_freeze_list.append(action_freeze)
+        if action_freeze or not self.action_list_list:
+            return []
+        return self.action_list_list.pop(0)
+
+
+class _ActionExecutor:
+    """Places wait for `release_event`"""
+
+    def __init__(self):
+        self.release_event = threading.Event()
+        self.executed_list = []
+
+    def execute_actions(self, action_list):
+        if any(isinstance(action, PlaceDirectOrder) for action in action_list):
+            self.release_event.wait(timeout=5)
+        self.executed_list.extend(action_list)
+
+
+def _new_place() -> PlaceDirectOrder:
+    return PlaceDirectOrder(token_id='AAA', price1000=400, size1000=10000, trade_side='BUY')
+
+
+def _new_strategy_box(**kwargs) -> tuple[StrategyBox, _Brain, _ActionExecutor]:
+    strategy_brain = _Brain.new(share_size=10)
+    action_executor = _ActionExecutor()
+    strategy_box = StrategyBox(
+        strategy_brain=strategy_brain,
+        monitor=_Monitor(),
+        quiet=True,
+        action_executor=action_executor,
+        **kwargs,
+    )
+    return strategy_box, strategy_brain, action_executor
+
+
+class TestStrategyBox(unittest.TestCase):
+    def test_freeze_while_executing(self):
+        strategy_box, strategy_brain, action_executor = _new_strategy_box()
+        try:
+            strategy_brain.action_list_list = [[_new_place()]]
+            strategy_box.iteration()
+            assert strategy_box.get_is_still_executing()
+            strategy_box.iteration()
+            action_executor.release_event.set()
+            assert strategy_box.join_actions(timeout=5)
+            strategy_box.iteration()
+            # the brain is frozen while the place is executing
+            assert strategy_brain.action_freeze_list == [False, True, False]
+        finally:
+            action_executor.release_event.set()
+            strategy_box.stop_actions()
+
+    def test_cancel_while_executing(self):
+        strategy_box, strategy_brain, action_executor = _new_strategy_box(
+            cancel_while_executing=True
+        )
+        try:
+            held_place, cancel = _new_place(), CancelOrdersByIds(order_ids=['o1'])
+            strategy_brain.action_list_list = [[_new_place()], [held_place, cancel]]
+            strategy_box.iteration()
+            strategy_box.iteration()
+            assert strategy_brain.action_freeze_list == [False, False]
+            # the place is held back (aborted, so it is not waited for), the cancel goes through
+            assert held_place.is_aborted
+            action_executor.release_event.set()
+            assert strategy_box.join_actions(timeout=5)
+            assert cancel in action_executor.executed_list
+            assert held_place not in action_executor.executed_list
+        finally:
+            action_executor.release_event.set()
+            strategy_box.stop_actions()
+
+    def test_shared_action_worker(self):
+        action_worker = ActionWorker(max_workers=2)
+        slow_box, slow_brain, slow_executor = _new_strategy_box(action_worker=action_worker)
+        fast_box, fast_brain, fast_executor = _new_strategy_box(action_worker=action_worker)
+        try:
+            slow_brain.action_list_list = [[_new_place()]]
+            fast_brain.action_list_list = [[CancelOrdersByIds(order_ids=['o1'])]]
+            slow_box.iteration()
+            fast_box.iteration()
+            # the busy state is per box
+            assert fast_box.join_actions(timeout=5)
+            assert slow_box.get_is_still_executing()
+            assert not fast_box.get_is_still_executing()
+
+            # the box does not stop the shared worker
+            fast_box.stop_actions()
+            slow_executor.release_event.set()
+            slow_box.stop_actions()
+            assert not slow_box.get_is_still_executing()
+            fast_brain.action_list_list = [[CancelOrdersByIds(order_ids=['o2'])]]
+            fast_box.iteration()
+            assert fast_box.join_actions(timeout=5)
+            assert len(fast_executor.executed_list) == 2
+        finally:
+            slow_executor.release_event.set()
+            action_worker.stop()
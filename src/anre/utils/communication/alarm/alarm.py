@@ -4,14 +4,16 @@ from os import environ
 environ['PYGAME_HIDE_SUPPORT_PROMPT'] = '1'
 import pygame
 
-pygame.mixer.init()
-
 _dirPath = os.path.abspath(os.path.dirname(__file__))
 _alarmFilePath = os.path.join(_dirPath, 'emergency006.wav')
 assert os.path.isfile(_alarmFilePath), f'AlarmFileNotCount: {_alarmFilePath}'
 
 
 def alarm():
+    # the mixer is started on the first alarm, not at import: SDL takes over SIGTERM, so a
+    # process that only imports it (e.g. a pool worker) can not be terminated
+    if not pygame.mixer.get_init():
+        pygame.mixer.init()
     pygame.mixer.music.load(_alarmFilePath)
     pygame.mixer.music.play()
     print("Alarm!")
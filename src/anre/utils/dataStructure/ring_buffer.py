@@ -0,0 +1,49 @@
+from typing import Any
+
+
+class SpscRingBuffer:
+    """Bounded single producer / single consumer ring buffer without locks
+
+    The producer only writes `_write_count`, the consumer only writes `_read_count`. A slot is
+    filled before `_write_count` is published (and cleared before `_read_count` is), and an
+    attribute store is atomic under the GIL, so the two sides never see a half done step.
+    Do not share one side between several threads.
+    """
+
+    def __init__(self, capacity: int):
+        assert capacity > 0
+        self._capacity = capacity
+        self._slot_list: list[Any] = [None] * capacity
+        self._write_count = 0
+        self._read_count = 0
+
+    @property
+    def capacity(self) -> int:
+        return self._capacity
+
+    def __len__(self) -> int:
+        return self._write_count - self._read_count
+
+    def is_full(self) -> bool:
+        return len(self) >= self._capacity
+
+    def put(self, item: Any) -> bool:
+        """Producer side. Returns False if the buffer is full (the item is not added)"""
+        write_count = self._write_count
+        if write_count - self._read_count >= self._capacity:
+            return False
+        self._slot_list[write_count % self._capacity] = item
+        self._write_count = write_count + 1
+        return True
+
+    def pop_all(self) -> list[Any]:
+        """Consumer side. All items in the put order"""
+        read_count = self._read_count
+        write_count = self._write_count
+        item_list = []
+        for count in range(read_count, write_count):
+            idx = count % self._capacity
+            item_list.append(self._slot_list[idx])
+            self._slot_list[idx] = None
+        self._read_count = write_count
+        return item_list
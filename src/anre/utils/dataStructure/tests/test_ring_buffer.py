@@ -0,0 +1,35 @@
+import threading
+import time
+
+from anre.utils import testutil
+from anre.utils.dataStructure.ring_buffer import SpscRingBuffer
+
+
+class TestSpscRingBuffer(testutil.TestCase):
+    def test_bounded_fifo(self) -> None:
+        ring_buffer = SpscRingBuffer(capacity=3)
+        assert [ring_buffer.put(nr) for nr in range(4)] == [True, True, True, False]
+        assert ring_buffer.is_full()
+        assert ring_buffer.pop_all() == [0, 1, 2]
+        assert ring_buffer.pop_all() == []
+        assert ring_buffer.put(3) and ring_buffer.put(4)
+        assert len(ring_buffer) == 2
+        assert ring_buffer.pop_all() == [3, 4]
+
+    def test_producer_consumer_threads(self) -> None:
+        ring_buffer = SpscRingBuffer(capacity=16)
+        count = 20000
+        item_list = []
+
+        def _produce():
+            for nr in range(count):
+                while not ring_buffer.put(nr):
+                    time.sleep(0)
+
+        thread = threading.Thread(target=_produce)
+        thread.start()
+        while len(item_list) < count:
+            item_list.extend(ring_buffer.pop_all())
+            time.sleep(0)
+        thread.join()
+        assert item_list == list(range(count))
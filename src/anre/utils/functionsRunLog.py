@@ -1,50 +1,134 @@
 # mypy: disable-error-code="assignment,var-annotated"
+import threading
 import time
-from typing import Any, Callable
+from contextlib import contextmanager
+from typing import Any, Callable, Optional
 
 import pandas as pd
 
+from anre.utils.latency.histogram import LatencyHistogram
+
+
+class _LabelLog:
+    __slots__ = ('label', 'parent', 'histogram', 'lastTime_ns')
+
+    def __init__(self, label: str, parent: Optional[str]):
+        self.label = label
+        self.parent = parent
+        self.histogram = LatencyHistogram()
+        self.lastTime_ns = 0
+
 
 class FunctionsRunLog:
-    """Funkciju paleidinijimo trakeris - kiek kartu, kik uztruko"""
+    """Funkciju paleidinijimo trakeris - kiek kartu, kik uztruko
+
+    Laikai matuojami `perf_counter_ns` ir saugomi histogramose (p50/p90/p99/max, ne tik vidurkis).
+    Ideti paleidimai (runFunction viduje runFunction tame paciame threade) gauna label
+    `parent/child`, todel galima matyti kur dingsta tevo laikas (`get_breakdownDf`).
+    Kiekvienas label turi savo lock (histogramoje), bendro lock nera.
+    """
+
+    _sep = '/'
 
     def __init__(self) -> None:
-        self._takesTimeStepsInIteration = {}
-        self._inCurrent = None
-        self._startTime_step = 0
+        self._labelLogDict: dict[str, _LabelLog] = {}
+        self._threadLocal = threading.local()
+        # (runLabel, startTime_ns) of the latest started run (any thread)
+        self._currentRun: Optional[tuple[str, int]] = None
 
     def runFunction(self, fun: Callable, runLabel: str, *args: Any, **kwargs: Any):
-        self._inCurrent = runLabel
-        self._startTime_step = startTime = time.time()
-        res = fun(*args, **kwargs)
-        stopTime = time.time()
-        runTime = stopTime - startTime
-        self._inCurrent = None
-
-        rec = self._takesTimeStepsInIteration.get(
-            runLabel, {'label': runLabel, 'count': 0, 'lastTime': runTime, 'meanTime': runTime}
-        )
-        rec['count'] += 1
-        rec['lastTime'] = runTime
-        rec['meanTime'] = 0.1 * runTime + 0.9 * rec['meanTime']
-        self._takesTimeStepsInIteration[runLabel] = rec
-        self._inCurrent = None
-        return res
+        with self.track(runLabel):
+            return fun(*args, **kwargs)
+
+    @contextmanager
+    def track(self, runLabel: str):
+        """Matuoja bloko laika, kaip `runFunction`"""
+        stack = self._get_stack()
+        parent = stack[-1][0] if stack else None
+        label = runLabel if parent is None else f'{parent}{self._sep}{runLabel}'
+        currentRun = (label, time.perf_counter_ns())
+        stack.append(currentRun)
+        self._currentRun = currentRun
+        try:
+            yield
+        finally:
+            runTime_ns = time.perf_counter_ns() - currentRun[1]
+            stack.pop()
+            if self._currentRun is currentRun:
+                self._currentRun = stack[-1] if stack else None
+            self.record(runLabel=label, runTime_ns=runTime_ns, parent=parent)
+
+    def record(self, runLabel: str, runTime_ns: int, parent: Optional[str] = None):
+        """Irasyti laika, ismatuota kitur (pvz. veiksmo latency)"""
+        labelLog = self._labelLogDict.get(runLabel)
+        if labelLog is None:
+            # setdefault is atomic, so concurrent first runs share one log
+            labelLog = self._labelLogDict.setdefault(
+                runLabel, _LabelLog(label=runLabel, parent=parent)
+            )
+        labelLog.histogram.record(runTime_ns)
+        labelLog.lastTime_ns = runTime_ns
 
     def get_reportDict(self) -> dict[str, dict]:
-        return self._takesTimeStepsInIteration.copy()
+        """Laikai sekundemis"""
+        reportDict = {}
+        for label, labelLog in list(self._labelLogDict.items()):
+            histogram = labelLog.histogram
+            if not histogram.count:
+                # just created by another thread
+                continue
+            p50, p90, p99 = histogram.get_value_at_percentile_list([50, 90, 99])
+            reportDict[label] = {
+                'label': label,
+                'parent': labelLog.parent,
+                'count': histogram.count,
+                'lastTime': labelLog.lastTime_ns * 1e-9,
+                'meanTime': histogram.mean * 1e-9,
+                'p50Time': p50 * 1e-9,
+                'p90Time': p90 * 1e-9,
+                'p99Time': p99 * 1e-9,
+                'maxTime': histogram.max * 1e-9,
+                'totalTime': histogram.sum * 1e-9,
+            }
+        return reportDict
 
     def get_reportDf(self) -> pd.DataFrame:
         reportDict = self.get_reportDict()
         df = pd.DataFrame(list(reportDict.values()))
+        if df.empty:
+            return df
         df.set_index('label', inplace=True)
         df.sort_index(inplace=True)
         return df
 
+    def get_breakdownDf(self, runLabel: str) -> pd.DataFrame:
+        """Vaiku laikai ir ju dalis tevo bendrame laike (likusi dalis - `_self`)"""
+        reportDict = self.get_reportDict()
+        assert runLabel in reportDict, f'unknown runLabel: {runLabel}'
+        totalTime = reportDict[runLabel]['totalTime']
+        recList = [rec for rec in reportDict.values() if rec['parent'] == runLabel]
+        selfRec = {
+            'label': f'{runLabel}{self._sep}_self',
+            'parent': runLabel,
+            'totalTime': totalTime - sum(rec['totalTime'] for rec in recList),
+        }
+        df = pd.DataFrame(recList + [selfRec])
+        df['share'] = df['totalTime'] / totalTime if totalTime else 0.0
+        df.set_index('label', inplace=True)
+        df.sort_values('totalTime', ascending=False, inplace=True)
+        return df
+
     def get_currentRun(self) -> tuple[float, str | None]:
         """Grazina runLable jei siuo metu runinama atitinkama funkcija"""
-        if self._inCurrent is None:
+        currentRun = self._currentRun
+        if currentRun is None:
             return 0.0, None
         else:
-            runTime = time.time() - self._startTime_step
-            return round(runTime, 2), self._inCurrent
+            runTime = (time.perf_counter_ns() - currentRun[1]) * 1e-9
+            return round(runTime, 2), currentRun[0]
+
+    def _get_stack(self) -> list[tuple[str, int]]:
+        stack = getattr(self._threadLocal, 'stack', None)
+        if stack is None:
+            stack = self._threadLocal.stack = []
+        return stack
@@ -124,7 +124,8 @@ class IterationProcessLocal:
             return None
 
         try:
-            self.iteration()
+            with self.functionsRunLog.track('iteration'):
+                self.iteration()
             takesTime = time.time() - startTime
             self._tryCount = 0
         except BaseException as error:
@@ -199,9 +200,10 @@ class IterationProcessLocal:
             self.__iterationTakesTimeMean > self._config.wait
             and not self._tooLongIterations_wasWarned
         ):
-            msg = "Itarciju vidurkis, tapo didesnis, nei wait config. Obj:{obj} - {objStr} ".format(
+            msg = "Itarciju vidurkis, tapo didesnis, nei wait config. Obj:{obj} - {objStr}\n{reportDf}".format(
                 obj=self.__class__.__name__,
                 objStr=str(self),
+                reportDf=str(self.functionsRunLog.get_reportDf()),
             )
             self._spreadMsg_warning(msg)
             self._tooLongIterations_wasWarned = True
@@ -0,0 +1,8 @@
+from .histogram import LatencyHistogram
+from .tracer import LatencyTracer, get_latency_tracer
+
+__all__ = [
+    "LatencyHistogram",
+    "LatencyTracer",
+    "get_latency_tracer",
+]
@@ -0,0 +1,161 @@
+import math
+import threading
+from typing import Optional
+
+
+class LatencyHistogram:
+    """Log-linear (HDR style) histogram of non negative int values, e.g. nanoseconds
+
+    Values below `2 * 2**sub_bucket_bits` are counted exactly. Above that every power of two is
+    split into `2**sub_bucket_bits` equal buckets, so the relative error is at most
+    `2**-sub_bucket_bits` (~3% by default) for any value size, and the memory is small (~1200
+    buckets for values up to one hour in ns). Tail percentiles are kept, unlike with an EMA.
+
+    Every histogram has its own lock, there is no global lock.
+    """
+
+    def __init__(self, sub_bucket_bits: int = 5):
+        assert 1 <= sub_bucket_bits <= 16
+        self._sub_bucket_bits = sub_bucket_bits
+        self._sub_bucket_count = 1 << sub_bucket_bits
+        self._count_list: list[int] = []
+        self._count = 0
+        self._sum = 0
+        self._min: Optional[int] = None
+        self._max: Optional[int] = None
+        self._lock = threading.Lock()
+
+    @property
+    def count(self) -> int:
+        return self._count
+
+    @property
+    def sum(self) -> int:
+        return self._sum
+
+    @property
+    def min(self) -> Optional[int]:
+        return self._min
+
+    @property
+    def max(self) -> Optional[int]:
+        return self._max
+
+    @property
+    def mean(self) -> Optional[float]:
+        return self._sum / self._count if self._count else None
+
+    def record(self, value: int, count: int = 1):
+        assert count > 0
+        value = max(int(value), 0)
+        idx = self._get_bucket_idx(value)
+        with self._lock:
+            if idx >= len(self._count_list):
+                self._count_list.extend([0] * (idx + 1 - len(self._count_list)))
+            self._count_list[idx] += count
+            self._count += count
+            self._sum += value * count
+            self._min = value if self._min is None else min(self._min, value)
+            self._max = value if self._max is None else max(self._max, value)
+
+    def merge(self, other: 'LatencyHistogram'):
+        assert isinstance(other, LatencyHistogram)
+        assert other._sub_bucket_bits == self._sub_bucket_bits
+        with other._lock:
+            count_list = other._count_list.copy()
+            count, sum_, min_, max_ = other._count, other._sum, other._min, other._max
+        if not count:
+            return
+        with self._lock:
+            if len(count_list) > len(self._count_list):
+                self._count_list.extend([0] * (len(count_list) - len(self._count_list)))
+            for idx, bucket_count in enumerate(count_list):
+                self._count_list[idx] += bucket_count
+            self._count += count
+            self._sum += sum_
+            self._min = min_ if self._min is None else min(self._min, min_)
+            self._max = max_ if self._max is None else max(self._max, max_)
+
+    def reset(self):
+        with self._lock:
+            self._count_list = []
+            self._count = 0
+            self._sum = 0
+            self._min = None
+            self._max = None
+
+    def copy(self) -> 'LatencyHistogram':
+        histogram = LatencyHistogram(sub_bucket_bits=self._sub_bucket_bits)
+        histogram.merge(self)
+        return histogram
+
+    def get_value_at_percentile(self, percentile: float) -> Optional[int]:
+        """Upper bound of the bucket where the percentile (0-100) is reached, capped by max"""
+        assert 0 <= percentile <= 100
+        return self.get_value_at_percentile_list([percentile])[0]
+
+    def get_value_at_percentile_list(self, percentile_list: list[float]) -> list[Optional[int]]:
+        with self._lock:
+            count_list = self._count_list.copy()
+            count, max_ = self._count, self._max
+        if not count:
+            return [None] * len(percentile_list)
+
+        # one pass over buckets for all percentiles
+        target_list = [
+            max(math.ceil(percentile / 100 * count), 1) for percentile in percentile_list
+        ]
+        order = sorted(range(len(percentile_list)), key=lambda nr: target_list[nr])
+        value_list: list[Optional[int]] = [max_] * len(percentile_list)
+        cum_count = 0
+        pos = 0
+        for idx, bucket_count in enumerate(count_list):
+            cum_count += bucket_count
+            while pos < len(order) and cum_count >= target_list[order[pos]]:
+                value_list[order[pos]] = min(self._get_bucket_upper(idx), max_)
+                pos += 1
+            if pos == len(order):
+                break
+        return value_list
+
+    def get_bucket_list(self) -> list[tuple[int, int]]:
+        """Non empty buckets as (upper bound, count)"""
+        with self._lock:
+            count_list = self._count_list.copy()
+        return [
+            (self._get_bucket_upper(idx), bucket_count)
+            for idx, bucket_count in enumerate(count_list)
+            if bucket_count
+        ]
+
+    def to_dict(self, scale: float = 1.0) -> dict[str, Optional[float]]:
+        """Summary, values are multiplied by `scale` (e.g. 1e-9 for ns -> seconds)"""
+        p50, p90, p99, p999 = self.get_value_at_percentile_list([50, 90, 99, 99.9])
+        mean = self.mean
+
+        def _scale(value):
+            return None if value is None else value * scale
+
+        return {
+            'count': self._count,
+            'mean': _scale(mean),
+            'min': _scale(self._min),
+            'p50': _scale(p50),
+            'p90': _scale(p90),
+            'p99': _scale(p99),
+            'p999': _scale(p999),
+            'max': _scale(self._max),
+        }
+
+    def _get_bucket_idx(self, value: int) -> int:
+        if value < 2 * self._sub_bucket_count:
+            return value
+        exponent = value.bit_length() - self._sub_bucket_bits - 1
+        return exponent * self._sub_bucket_count + (value >> exponent)
+
+    def _get_bucket_upper(self, idx: int) -> int:
+        if idx < 2 * self._sub_bucket_count:
+            return idx
+        exponent = idx // self._sub_bucket_count - 1
+        mantissa = idx - exponent * self._sub_bucket_count
+        return ((mantissa + 1) << exponent) - 1
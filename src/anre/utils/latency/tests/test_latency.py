@@ -0,0 +1,82 @@
+import urllib.request
+
+import numpy as np
+
+from anre.utils import testutil
+from anre.utils.latency import LatencyHistogram, LatencyTracer
+from anre.utils.latency.tracer import STAGE_POST, STAGE_USER_CHANNEL
+
+
+class TestLatencyHistogram(testutil.TestCase):
+    def test_percentiles_within_relative_error(self) -> None:
+        rng = np.random.default_rng(0)
+        value_arr = rng.lognormal(mean=15, sigma=1.5, size=20000).astype(np.int64)
+        histogram = LatencyHistogram(sub_bucket_bits=5)
+        for value in value_arr:
+            histogram.record(int(value))
+
+        assert histogram.count == len(value_arr)
+        assert histogram.min == value_arr.min()
+        assert histogram.max == value_arr.max()
+        for percentile in [50, 90, 99, 99.9]:
+            expected = np.percentile(value_arr, percentile, method='inverted_cdf')
+            value = histogram.get_value_at_percentile(percentile)
+            assert expected <= value <= expected * (1 + 2**-5), (percentile, expected, value)
+        assert histogram.get_value_at_percentile(100) == value_arr.max()
+
+    def test_small_values_are_exact_and_merge(self) -> None:
+        histogram = LatencyHistogram()
+        for value in range(1, 11):
+            histogram.record(value)
+        assert histogram.get_value_at_percentile_list([10, 50, 100]) == [1, 5, 10]
+
+        other = LatencyHistogram()
+        other.record(10**9, count=10)
+        histogram.merge(other)
+        assert histogram.count == 20
+        assert histogram.get_value_at_percentile(50) == 10
+        assert histogram.get_value_at_percentile(51) == 10**9
+        assert histogram.to_dict(scale=1e-9)['max'] == 1.0
+
+        assert LatencyHistogram().get_value_at_percentile(50) is None
+
+
+class TestLatencyTracer(testutil.TestCase):
+    def test_user_channel_matched_by_order_id(self) -> None:
+        tracer = LatencyTracer(max_pending_order_count=2)
+        tracer.mark_order_acked('o1', ack_time=100.0)
+        tracer.mark_order_seen('o1', seen_time=100.25)
+        # the user channel can be faster than the post response
+        tracer.mark_order_seen('o2', seen_time=200.0)
+        tracer.mark_order_acked('o2', ack_time=200.1)
+        # never acked orders are dropped
+        for nr in range(5):
+            tracer.mark_order_seen(f'x{nr}', seen_time=300.0)
+
+        rec = tracer.get_report_dict()[STAGE_USER_CHANNEL]
+        assert rec['count'] == 2
+        assert rec['min'] == 0
+        self.assertAlmostEqual(rec['max'], 0.25, places=6)
+        assert len(tracer._pending_order_dict) == 2
+
+    def test_report_and_prometheus_endpoint(self) -> None:
+        tracer = LatencyTracer()
+        for latency_sec in [0.01, 0.02, 0.5]:
+            tracer.record(STAGE_POST, latency_sec)
+        with tracer.trace('brain_decision'):
+            pass
+
+        df = tracer.get_report_df()
+        assert list(df.index) == ['brain_decision', STAGE_POST]
+        assert df.loc[STAGE_POST, 'count'] == 3
+        self.assertAlmostEqual(df.loc[STAGE_POST, 'max'], 0.5, places=6)
+
+        server = tracer.serve_prometheus(port=0)
+        try:
+            url = f'http://127.0.0.1:{server.server_address[1]}/metrics'
+            text = urllib.request.urlopen(url, timeout=5).read().decode()
+        finally:
+            server.shutdown()
+            server.server_close()
+        assert 'anre_latency_seconds_count{stage="post"} 3' in text
+        assert 'anre_latency_seconds{stage="post",quantile="0.5"}' in text
@@ -0,0 +1,191 @@
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+import pandas as pd
+
+from anre.utils.latency.histogram import LatencyHistogram
+
+# stages of the order path (values are seconds)
+STAGE_WS_RECEIVE = 'ws_receive'  # server message timestamp -> websocket receive (`_rt`)
+STAGE_BOOK_APPLY = 'book_apply'  # websocket receive -> applied to the cache
+STAGE_BRAIN_DECISION = 'brain_decision'  # strategy brain call
+STAGE_APPROVAL = 'approval'  # first wish -> approved by patience
+STAGE_SIGN = 'sign'  # signing of one order
+STAGE_POST = 'post'  # bulk post request round trip
+STAGE_ACK = 'ack'  # place action started -> order id received
+STAGE_USER_CHANNEL = 'user_channel'  # order id received -> order seen on the user channel
+STAGE_LIST = [
+    STAGE_WS_RECEIVE,
+    STAGE_BOOK_APPLY,
+    STAGE_BRAIN_DECISION,
+    STAGE_APPROVAL,
+    STAGE_SIGN,
+    STAGE_POST,
+    STAGE_ACK,
+    STAGE_USER_CHANNEL,
+]
+
+
+class LatencyTracer:
+    """Latency histograms (ns resolution) per stage of the order lifecycle
+
+    Stages are free labels, `STAGE_LIST` are the ones recorded by the trading path. The order
+    round trip to the user channel is matched by order id: `mark_order_acked` and
+    `mark_order_seen` can come in any order (the user channel can be faster than the post
+    response), the latency is recorded when both are known. Both times are wall times
+    (`time.time()`), as the websocket receive time `_rt`.
+
+    Export: `get_report_df` (DataFrame) or `get_prometheus_text` / `serve_prometheus`.
+    """
+
+    def __init__(self, max_pending_order_count: int = 10000, sub_bucket_bits: int = 5):
+        assert max_pending_order_count > 0
+        self._max_pending_order_count = max_pending_order_count
+        self._sub_bucket_bits = sub_bucket_bits
+        self._histogram_dict: dict[str, LatencyHistogram] = {}
+        self._histogram_dict_lock = threading.Lock()
+        # order_id -> (is_acked, time); is_acked False means it was seen on the user channel first
+        self._pending_order_dict: OrderedDict[str, tuple[bool, float]] = OrderedDict()
+        self._pending_order_lock = threading.Lock()
+
+    def get_histogram(self, stage: str) -> LatencyHistogram:
+        histogram = self._histogram_dict.get(stage)
+        if histogram is None:
+            with self._histogram_dict_lock:
+                histogram = self._histogram_dict.setdefault(
+                    stage, LatencyHistogram(sub_bucket_bits=self._sub_bucket_bits)
+                )
+        return histogram
+
+    def record(self, stage: str, latency_sec: float):
+        self.get_histogram(stage).record(int(latency_sec * 1e9))
+
+    def record_ns(self, stage: str, latency_ns: int):
+        self.get_histogram(stage).record(latency_ns)
+
+    @contextmanager
+    def trace(self, stage: str):
+        start_time_ns = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            self.record_ns(stage, time.perf_counter_ns() - start_time_ns)
+
+    def mark_order_acked(self, order_id: str, ack_time: Optional[float] = None):
+        ack_time = time.time() if ack_time is None else ack_time
+        self._mark_order(order_id=order_id, is_acked=True, event_time=ack_time)
+
+    def mark_order_seen(self, order_id: str, seen_time: Optional[float] = None):
+        seen_time = time.time() if seen_time is None else seen_time
+        self._mark_order(order_id=order_id, is_acked=False, event_time=seen_time)
+
+    def reset(self):
+        with self._histogram_dict_lock:
+            self._histogram_dict = {}
+        with self._pending_order_lock:
+            self._pending_order_dict.clear()
+
+    def get_report_dict(self) -> dict[str, dict]:
+        """Summary in seconds by stage"""
+        with self._histogram_dict_lock:
+            histogram_dict = self._histogram_dict.copy()
+        return {
+            stage: {'stage': stage, **histogram.to_dict(scale=1e-9)}
+            for stage, histogram in histogram_dict.items()
+        }
+
+    def get_report_df(self) -> pd.DataFrame:
+        report_dict = self.get_report_dict()
+        columns = ['stage', 'count', 'mean', 'min', 'p50', 'p90', 'p99', 'p999', 'max']
+        df = pd.DataFrame(list(report_dict.values()), columns=columns)
+        df.set_index('stage', inplace=True)
+        df.sort_index(inplace=True)
+        return df
+
+    def get_prometheus_text(self, metric_name: str = 'anre_latency_seconds') -> str:
+        """Prometheus text exposition format (summary with quantiles) of all stages"""
+        line_list = [
+            f'# HELP {metric_name} Latency of the order lifecycle stages.',
+            f'# TYPE {metric_name} summary',
+        ]
+        for stage, rec in sorted(self.get_report_dict().items()):
+            for quantile, key in [('0.5', 'p50'), ('0.9', 'p90'), ('0.99', 'p99'), ('1', 'max')]:
+                value = rec[key] if rec[key] is not None else float('nan')
+                line_list.append(f'{metric_name}{{stage="{stage}",quantile="{quantile}"}} {value}')
+            _sum = (rec['mean'] or 0) * rec['count']
+            line_list.append(f'{metric_name}_sum{{stage="{stage}"}} {_sum}')
+            line_list.append(f'{metric_name}_count{{stage="{stage}"}} {rec["count"]}')
+        return '\n'.join(line_list) + '\n'
+
+    def serve_prometheus(self, port: int = 9108, host: str = '127.0.0.1') -> ThreadingHTTPServer:
+        """Serves `get_prometheus_text` on http://host:port/metrics in a daemon thread
+
+        Call `shutdown()` on the returned server to stop it.
+        """
+        tracer = self
+
+        class _Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.rstrip('/') not in ['', '/metrics']:
+                    self.send_error(404)
+                    return
+                body = tracer.get_prometheus_text().encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), _Handler)
+        thread = threading.Thread(
+            name='LatencyTracer.prometheus', target=server.serve_forever, daemon=True
+        )
+        thread.start()
+        return server
+
+    def _mark_order(self, order_id: str, is_acked: bool, event_time: float):
+        with self._pending_order_lock:
+            rec = self._pending_order_dict.get(order_id)
+            if rec is None:
+                self._pending_order_dict[order_id] = (is_acked, event_time)
+                if len(self._pending_order_dict) > self._max_pending_order_count:
+                    # e.g. updates of orders placed by other processes are never acked here
+                    self._pending_order_dict.popitem(last=False)
+                return
+            if rec[0] == is_acked:
+                # repeated event (e.g. order update), the first one counts
+                return
+            self._pending_order_dict.pop(order_id)
+        ack_time, seen_time = (event_time, rec[1]) if is_acked else (rec[1], event_time)
+        self.record(STAGE_USER_CHANNEL, max(seen_time - ack_time, 0.0))
+
+
+_latency_tracer: Optional[LatencyTracer] = None
+_latency_tracer_lock = threading.Lock()
+
+
+def get_latency_tracer() -> LatencyTracer:
+    """Process wide tracer, the trading path records into it"""
+    global _latency_tracer
+    if _latency_tracer is None:
+        with _latency_tracer_lock:
+            if _latency_tracer is None:
+                _latency_tracer = LatencyTracer()
+    return _latency_tracer
+
+
+def __dummy__():
+    latency_tracer = get_latency_tracer()
+    with latency_tracer.trace(STAGE_BRAIN_DECISION):
+        time.sleep(0.01)
+    latency_tracer.get_report_df()
+    server = latency_tracer.serve_prometheus(port=9108)
+    # curl http://127.0.0.1:9108/metrics
+    server.shutdown()
@@ -0,0 +1,59 @@
+import threading
+import time
+
+from anre.utils import testutil
+from anre.utils.functionsRunLog import FunctionsRunLog
+
+
+class TestFunctionsRunLog(testutil.TestCase):
+    def test_percentiles_and_nested_labels(self) -> None:
+        functionsRunLog = FunctionsRunLog()
+
+        def _child(sleepTime: float):
+            time.sleep(sleepTime)
+            return sleepTime
+
+        def _parent(sleepTime: float):
+            assert functionsRunLog.get_currentRun()[1] == 'parent'
+            functionsRunLog.runFunction(_child, 'child', sleepTime)
+            assert functionsRunLog.get_currentRun()[1] == 'parent'
+            return 'done'
+
+        for nr in range(10):
+            sleepTime = 0.05 if nr == 9 else 0.001
+            assert functionsRunLog.runFunction(_parent, 'parent', sleepTime=sleepTime) == 'done'
+        assert functionsRunLog.get_currentRun() == (0.0, None)
+
+        reportDict = functionsRunLog.get_reportDict()
+        assert set(reportDict) == {'parent', 'parent/child'}
+        childRec = reportDict['parent/child']
+        assert childRec['parent'] == 'parent'
+        assert childRec['count'] == 10
+        # the single slow run is in the tail, not smoothed away
+        assert childRec['p50Time'] < 0.02
+        assert childRec['maxTime'] >= 0.05
+        assert childRec['p99Time'] == childRec['maxTime']
+        assert childRec['lastTime'] >= 0.05
+
+        breakdownDf = functionsRunLog.get_breakdownDf('parent')
+        assert list(breakdownDf.index) == ['parent/child', 'parent/_self']
+        self.assertAlmostEqual(breakdownDf['share'].sum(), 1.0)
+        assert breakdownDf.loc['parent/child', 'share'] > 0.5
+
+        reportDf = functionsRunLog.get_reportDf()
+        assert list(reportDf.index) == ['parent', 'parent/child']
+
+    def test_threads_do_not_nest(self) -> None:
+        functionsRunLog = FunctionsRunLog()
+        threadList = [
+            threading.Thread(target=functionsRunLog.runFunction, args=(time.sleep, 'sleep', 0.01))
+            for _ in range(8)
+        ]
+        for thread in threadList:
+            thread.start()
+        for thread in threadList:
+            thread.join()
+
+        reportDict = functionsRunLog.get_reportDict()
+        assert set(reportDict) == {'sleep'}
+        assert reportDict['sleep']['count'] == 8
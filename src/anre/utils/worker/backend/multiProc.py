@@ -61,10 +61,15 @@ class MultiProc(IBackend):
                     for i, resEl in enumerate(pool.imap_unordered(self._lamda_helper, xs)):
                         pool_result_list.append(resEl)
                         pbar.update()
+                # workers exit by themselves, `terminate` (at the pool exit) is not needed
+                pool.close()
+                pool.join()
 
         else:
             with multiprocessing.pool.Pool(processes=_poolSize, context=context) as pool:
                 pool_result_list = pool.map(self._lamda_helper, xs)
+                pool.close()
+                pool.join()
 
         pool_result_list.sort(key=lambda r: r[0])
         result_list = [el[1] for el in pool_result_list]